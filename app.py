@@ -7,9 +7,10 @@
 - 비디오 재생과 싱크: '벽시계 기준'으로 프레임 타임을 맞추고, 늦으면 grab()으로 프레임 스킵
 - 제어 API: /jobs/{job_id}/control (pause/resume/stop)
 - 프론트에 그릴 수 있도록 매 tick 에 바운딩박스(xyxy, cls, conf)와 원본 프레임 해상도(img_w, img_h) 포함
+- 감지는 backend/detectors/vision.py 의 FireDetector 엔진 사용 (main.py 와 공용)
 """
 
-import asyncio, json, time, uuid
+import asyncio, json, os, time, uuid
 from pathlib import Path
 from typing import AsyncGenerator, Dict, Any
 
@@ -20,7 +21,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from ultralytics import YOLO
+from backend.detectors.vision import FireDetector
 
 # ---------- 경로/모델 설정 ----------
 ROOT = Path(__file__).resolve().parent.parent
@@ -38,24 +39,6 @@ for p in (UPLOADS, RUNS, MODELS_DIR):
     p.mkdir(parents=True, exist_ok=True)
 
 
-def load_model() -> YOLO:
-    """EXPLICIT_MODEL → models/*.onnx → models/*.pt 순으로 모델 로드"""
-    if EXPLICIT_MODEL.exists():
-        print(f"[model] Using explicit: {EXPLICIT_MODEL}")
-        return YOLO(str(EXPLICIT_MODEL))
-    onnx = next(MODELS_DIR.glob("*.onnx"), None)
-    if onnx:
-        print(f"[model] Using ONNX: {onnx}")
-        return YOLO(str(onnx))
-    pt = next(MODELS_DIR.glob("*.pt"), None)
-    if pt:
-        print(f"[model] Using PT: {pt}")
-        return YOLO(str(pt))
-    raise RuntimeError("모델 가중치를 찾지 못했습니다. EXPLICIT_MODEL 또는 models/ 확인.")
-
-
-MODEL = load_model()
-
 # ---------- 규칙/하이퍼파라미터 (내장) ----------
 RULES = {
     # 추론 하이퍼파라미터(속도/정확도 트레이드오프)
@@ -63,6 +46,7 @@ RULES = {
     "conf": 0.30,
     "iou": 0.10,
     "max_det": 10,
+    "precision": os.getenv("MODEL_PRECISION", "fp32"),  # "int8": 양자화 모델(*_int8.onnx)
 
     # 프레임 샘플링: target FPS로 낮춰 처리 (실시간 페이싱의 핵심)
     "fps_target": 5,     # 25fps 원본이면 5프레임마다 1번 추론
@@ -82,6 +66,29 @@ RULES = {
     },
 }
 
+def model_weights() -> str:
+    """EXPLICIT_MODEL → models/*.onnx → models/*.pt 순으로 가중치 선택 (양자화 모델은 precision 으로 선택)"""
+    if EXPLICIT_MODEL.exists():
+        print(f"[model] Using explicit: {EXPLICIT_MODEL}")
+        return str(EXPLICIT_MODEL)
+    onnx = next((p for p in MODELS_DIR.glob("*.onnx") if not p.name.endswith("_int8.onnx")), None)
+    if onnx:
+        print(f"[model] Using ONNX: {onnx}")
+        return str(onnx)
+    pt = next(MODELS_DIR.glob("*.pt"), None)
+    if pt:
+        print(f"[model] Using PT: {pt}")
+        return str(pt)
+    raise RuntimeError("모델 가중치를 찾지 못했습니다. EXPLICIT_MODEL 또는 models/ 확인.")
+
+
+# 감지 엔진: 추론 파라미터는 위 RULES, 후처리 설정은 기본값만 (backend/thresholds.json 의 ROI / Person 억제는 쓰지 않음)
+DETECTOR = FireDetector(
+    weights=model_weights(),
+    config={"model": {k: RULES[k] for k in ("imgsz", "conf", "iou", "max_det", "precision")}},
+    config_path=None,
+)
+
 # ---------- FastAPI 기본 설정 ----------
 app = FastAPI()
 app.add_middleware(
@@ -231,40 +238,10 @@ async def process_video_job(job_id: str, path: Path):
             if frame_idx % stride != 0:
                 continue
 
-            # --- YOLO 추론 ---
-            res = MODEL.predict(
-                source=frame,
-                imgsz=RULES["imgsz"],
-                conf=RULES["conf"],
-                iou=RULES["iou"],
-                device="cpu",
-                max_det=RULES["max_det"],
-                verbose=False,
-            )[0]
-
-            # 최대 점수 및 박스 수집
-            fire_raw, smoke_raw = 0.0, 0.0
-            boxes_out = []
-            if res.boxes is not None and res.boxes.cls is not None:
-                xyxy = res.boxes.xyxy.cpu().tolist()
-                clss = res.boxes.cls.cpu().int().tolist()
-                confs = res.boxes.conf.cpu().tolist()
-                for (x1, y1, x2, y2), c, cf in zip(xyxy, clss, confs):
-                    if c in (0, 1):  # 0:Fire, 1:Smoke
-                        boxes_out.append(
-                            {
-                                "x1": x1,
-                                "y1": y1,
-                                "x2": x2,
-                                "y2": y2,
-                                "cls": int(c),
-                                "conf": round(float(cf), 3),
-                            }
-                        )
-                        if c == 0:
-                            fire_raw = max(fire_raw, float(cf))
-                        if c == 1:
-                            smoke_raw = max(smoke_raw, float(cf))
+            # --- 감지 (fire/smoke 최대 점수 및 박스) ---
+            res = DETECTOR.infer(frame)
+            fire_raw, smoke_raw = res["fire_score"], res["smoke_score"]
+            boxes_out = res["boxes"]
 
             # EMA & hazard
             F_ema = alpha * fire_raw + (1 - alpha) * F_ema
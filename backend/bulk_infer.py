@@ -0,0 +1,282 @@
+# backend/bulk_infer.py
+"""
+정지 이미지 일괄 추론 (POST /infer)
+- 입력: multipart/form-data (이미지 파일 여러 개) 또는 tar / zip 아카이브 본문
+- 디코딩은 스레드 풀, 추론은 FireDetector.infer_many 배치 → 이미지별 결과를 완료되는 대로 NDJSON 한 줄씩
+- 메모리 상한: 요청 크기와 무관하게 '대기 중 이미지 max_pending 장 + 배치 1개 + 파트 1개'
+  * multipart 는 요청 본문을 청크 단위로 파싱 → 대기열이 차면 본문 읽기를 멈춤 (TCP backpressure)
+  * tar / zip 은 본문을 임시 파일로 받아 두고 (zip 은 끝의 목차가 필요) 멤버를 하나씩 읽음
+"""
+
+import asyncio
+import re
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+ARCHIVE_TYPES = {
+    "application/x-tar": "tar",
+    "application/tar": "tar",
+    "application/gzip": "tar",
+    "application/x-gtar": "tar",
+    "application/zip": "zip",
+    "application/x-zip-compressed": "zip",
+}
+
+_FILENAME = re.compile(r'filename="([^"]*)"', re.I)
+_NAME = re.compile(r'\bname="([^"]*)"', re.I)
+
+
+class PartTooLarge(ValueError):
+    pass
+
+
+def multipart_boundary(content_type: str) -> Optional[bytes]:
+    m = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    return m.group(1).encode("latin-1") if m else None
+
+
+class MultipartSplitter:
+    """
+    multipart/form-data 본문을 청크 단위로 받아 완성된 파트 [(헤더 dict, 본문 bytes)] 를 반환
+    본문 전체를 메모리에 올리지 않음 (진행 중인 파트 1개 + 경계 길이만큼만 보관)
+    """
+
+    def __init__(self, boundary: bytes, max_part_bytes: int = 32 << 20):
+        self.delim = b"\r\n--" + boundary
+        self.max_part_bytes = max_part_bytes
+        self.buf = bytearray(b"\r\n")  # 첫 경계 앞에는 CRLF 가 없으므로 보정
+        self.state = "preamble"
+        self.headers: Dict[str, str] = {}
+        self.body = bytearray()
+
+    def feed(self, chunk: bytes) -> List[Tuple[Dict[str, str], bytes]]:
+        self.buf += chunk
+        parts = []
+        while True:
+            if self.state == "preamble":
+                idx = self.buf.find(self.delim)
+                if idx < 0:
+                    del self.buf[:max(0, len(self.buf) - len(self.delim))]
+                    return parts
+                del self.buf[:idx + len(self.delim)]
+                self.state = "after_delim"
+            elif self.state == "after_delim":
+                if len(self.buf) < 2:
+                    return parts
+                if self.buf[:2] == b"--":
+                    self.state = "epilogue"
+                    self.buf.clear()
+                    return parts
+                end = self.buf.find(b"\r\n")
+                if end < 0:
+                    return parts
+                del self.buf[:end + 2]  # 경계 뒤 공백 + CRLF
+                self.state = "headers"
+            elif self.state == "headers":
+                end = self.buf.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self.buf) > 16 << 10:
+                        raise ValueError("multipart headers too large")
+                    return parts
+                self.headers = {}
+                for line in bytes(self.buf[:end]).decode("utf-8", "replace").split("\r\n"):
+                    key, _, value = line.partition(":")
+                    self.headers[key.strip().lower()] = value.strip()
+                del self.buf[:end + 4]
+                self.body = bytearray()
+                self.state = "body"
+            elif self.state == "body":
+                idx = self.buf.find(self.delim)
+                if idx < 0:
+                    # 경계가 청크 사이에 걸칠 수 있으므로 꼬리는 남김
+                    keep = len(self.delim) - 1
+                    if len(self.buf) > keep:
+                        self.body += self.buf[:-keep]
+                        del self.buf[:-keep]
+                    self._check_size()
+                    return parts
+                self.body += self.buf[:idx]
+                self._check_size()
+                del self.buf[:idx + len(self.delim)]
+                parts.append((self.headers, bytes(self.body)))
+                self.body = bytearray()
+                self.state = "after_delim"
+            else:  # epilogue
+                self.buf.clear()
+                return parts
+
+    def _check_size(self) -> None:
+        if len(self.body) > self.max_part_bytes:
+            raise PartTooLarge(f"part exceeds {self.max_part_bytes} bytes")
+
+    @property
+    def finished(self) -> bool:
+        return self.state == "epilogue"
+
+
+async def iter_multipart(stream: AsyncIterator[bytes], boundary: bytes,
+                         max_part_bytes: int = 32 << 20) -> AsyncIterator[Tuple[str, bytes]]:
+    """요청 본문 스트림 → (파일 이름, 내용) - 파일이 아닌 폼 필드는 건너뜀"""
+    splitter = MultipartSplitter(boundary, max_part_bytes)
+    async for chunk in stream:
+        for headers, body in splitter.feed(chunk):
+            disp = headers.get("content-disposition", "")
+            m = _FILENAME.search(disp)
+            if m is None:
+                continue
+            name = m.group(1) or (_NAME.search(disp) or m).group(1)
+            yield name, body
+    if not splitter.finished:
+        raise ValueError("truncated multipart body")
+
+
+async def spool_body(stream: AsyncIterator[bytes], max_bytes: int, mem_bytes: int = 8 << 20) -> BinaryIO:
+    """요청 본문을 임시 파일로 저장 (mem_bytes 까지는 메모리, 넘으면 디스크)"""
+    f = tempfile.SpooledTemporaryFile(max_size=mem_bytes)
+    total = 0
+    try:
+        async for chunk in stream:
+            total += len(chunk)
+            if total > max_bytes:
+                raise PartTooLarge(f"archive exceeds {max_bytes} bytes")
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        f.close()
+        raise
+    f.seek(0)
+    return f
+
+
+def _is_image(name: str) -> bool:
+    p = PurePosixPath(name)
+    return p.suffix.lower() in IMAGE_EXTS and not any(part.startswith(".") for part in p.parts)
+
+
+def iter_archive(f: BinaryIO, kind: str, max_member_bytes: int = 32 << 20) -> Iterator[Tuple[str, bytes]]:
+    """tar(.gz) / zip 에서 이미지 멤버를 순서대로 하나씩 읽음 (동기 - 스레드에서 호출)"""
+    if kind == "zip":
+        with zipfile.ZipFile(f) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not _is_image(info.filename):
+                    continue
+                if info.file_size > max_member_bytes:
+                    yield info.filename, None
+                    continue
+                yield info.filename, zf.read(info)
+    else:
+        with tarfile.open(fileobj=f, mode="r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not _is_image(member.name):
+                    continue
+                if member.size > max_member_bytes:
+                    yield member.name, None
+                    continue
+                yield member.name, tf.extractfile(member).read()
+
+
+async def iterate_in_thread(it: Iterator[Tuple[str, bytes]]) -> AsyncIterator[Tuple[str, bytes]]:
+    """동기 이터레이터를 이벤트 루프를 막지 않고 순회"""
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, it, done)
+        if item is done:
+            return
+        yield item
+
+
+def decode_image(data: Optional[bytes]) -> Optional[np.ndarray]:
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _record(index: int, name: str, res: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "name": name,
+        "img_w": res["img_w"],
+        "img_h": res["img_h"],
+        "fire_score": round(res["fire_score"], 4),
+        "smoke_score": round(res["smoke_score"], 4),
+        "boxes": res["boxes"],
+    }
+
+
+async def infer_images(
+    detector,
+    items: AsyncIterator[Tuple[str, Optional[bytes]]],
+    batch_size: int = 8,
+    workers: int = 4,
+    max_pending: int = 32,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    (이름, 인코딩된 이미지) 스트림 → 이미지별 결과 dict 를 입력 순서대로 yield
+    - 디코딩: workers 개 스레드에서 병렬
+    - 대기열이 max_pending 장이면 입력 읽기를 멈춤 → 메모리 상한
+    - 디코딩 실패 / 크기 초과(내용 None) 는 {"index", "name", "error"} 로 보고하고 계속
+    - 입력이 중간에 끊기면(잘린 본문/아카이브) 그 전까지 받은 이미지는 모두 결과를 낸 뒤 예외를 다시 던짐
+    """
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-decode")
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    done = object()
+
+    async def produce():
+        try:
+            index = 0
+            async for name, data in items:
+                fut = None if data is None else loop.run_in_executor(pool, decode_image, data)
+                await pending.put((index, name, fut))
+                index += 1
+            await pending.put(done)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await pending.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        finished = False
+        while not finished:
+            batch = [await pending.get()]
+            while len(batch) < batch_size and not pending.empty():
+                batch.append(pending.get_nowait())
+            error = None
+            if isinstance(batch[-1], Exception):  # 입력 오류는 항상 마지막 항목 (producer 가 멈춤)
+                error = batch.pop()
+                finished = True
+            elif batch[-1] is done:
+                finished = True
+                batch.pop()
+
+            frames, ok, failed = [], [], []
+            for index, name, fut in batch:
+                frame = await fut if fut is not None else None
+                if frame is None:
+                    failed.append((index, name, "too large" if fut is None else "decode failed"))
+                else:
+                    frames.append(frame)
+                    ok.append((index, name))
+            results = await asyncio.to_thread(detector.infer_many, frames) if frames else []
+
+            out = [_record(i, n, r) for (i, n), r in zip(ok, results)]
+            out += [{"index": i, "name": n, "error": err} for i, n, err in failed]
+            for rec in sorted(out, key=lambda r: r["index"]):
+                yield rec
+            if error is not None:
+                raise error
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except (asyncio.CancelledError, Exception):
+            pass
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,204 @@
+# backend/compare_models.py
+"""
+FP32 / INT8 감지 모델 나란히 비교 (양자화 모델을 배포해도 되는지 클립 단위로 판단)
+- 같은 샘플 프레임(fps_target 간격)을 두 모델에 번갈아 넣어 ms/frame 측정
+- 클래스별 원시 conf(필터 전 프레임별 최대값) 차이: 평균 / p95 / 최대 절대 오차, 평균 편향
+- 각 모델 점수로 HazardScorer 를 돌려 상태 타임라인(NORMAL → ... → CALL_119) 비교
+  * 전이 순서가 다르거나, 상태 첫 도달 시각이 tolerance 초 넘게 차이 나면 "changed"
+
+사용 예:
+  python backend/compare_models.py --clips media/uploads/*.mp4 --rules rules.json \
+      [--fp32 models/vision/best_nano_111.pt] [--int8 models/vision/best_nano_111_int8.onnx] [--json report.json]
+rules.json: main.py 의 RULES (ema_alpha / weights / thresholds / imgsz / conf / iou / max_det / fps_target)
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from detectors.vision import FireDetector, find_weights, int8_weights
+from scoring import STATES, HazardScorer
+
+
+def sample_clip(path: Path, fps_target: float) -> Iterator[Tuple[float, np.ndarray]]:
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    stride = max(1, round(fps / fps_target))
+    idx = -1
+    try:
+        while cap.grab():
+            idx += 1
+            if idx % stride:
+                continue
+            ok, frame = cap.retrieve()
+            if ok:
+                yield idx / fps, frame
+    finally:
+        cap.release()
+
+
+def class_max(dets: Sequence[Tuple], names: Dict[int, str]) -> Dict[str, float]:
+    """필터 전 원시 박스 → 클래스 이름별 최대 conf"""
+    out = {name: 0.0 for name in names.values()}
+    for cls, conf, *_ in dets:
+        name = names.get(int(cls), f"class_{int(cls)}")
+        out[name] = max(out.get(name, 0.0), float(conf))
+    return out
+
+
+def timeline(fire: np.ndarray, smoke: np.ndarray, rules: Dict[str, Any]) -> List[str]:
+    scorer = HazardScorer(rules)
+    return [scorer.update(float(f), float(s)) for f, s in zip(fire, smoke)]
+
+
+def transitions(t: np.ndarray, states: List[str]) -> List[Tuple[float, str]]:
+    out: List[Tuple[float, str]] = []
+    for ti, st in zip(t, states):
+        if not out or out[-1][1] != st:
+            out.append((round(float(ti), 3), st))
+    return out
+
+
+def first_reach(t: np.ndarray, states: List[str]) -> Dict[str, Optional[float]]:
+    """상태별 첫 도달 시각 (그 상태 이상 레벨에 처음 들어간 시각, 못 가면 None)"""
+    levels = np.array([STATES.index(s) for s in states], dtype=np.int8)
+    out: Dict[str, Optional[float]] = {}
+    for lvl, name in enumerate(STATES[1:], 1):
+        hit = np.nonzero(levels >= lvl)[0]
+        out[name] = round(float(t[hit[0]]), 3) if len(hit) else None
+    return out
+
+
+def _delta_stats(a: np.ndarray, b: np.ndarray) -> Dict[str, float]:
+    d = b - a
+    if len(d) == 0:
+        return {"mean_abs": 0.0, "p95_abs": 0.0, "max_abs": 0.0, "bias": 0.0}
+    ad = np.abs(d)
+    return {
+        "mean_abs": round(float(ad.mean()), 4),
+        "p95_abs": round(float(np.percentile(ad, 95)), 4),
+        "max_abs": round(float(ad.max()), 4),
+        "bias": round(float(d.mean()), 4),
+    }
+
+
+def compare_clip(ref: FireDetector, cand: FireDetector, path: Path, rules: Dict[str, Any],
+                 tolerance: Optional[float] = None) -> Dict[str, Any]:
+    """ref(FP32) 대비 cand(INT8) 비교 결과 - tolerance 기본값은 1 tick (1 / fps_target 초)"""
+    fps_target = rules["fps_target"]
+    tolerance = 1.0 / fps_target if tolerance is None else tolerance
+    names = sorted(set(ref.names.values()) | set(cand.names.values()))
+
+    ts: List[float] = []
+    ms = {"ref": [], "cand": []}
+    scores = {"ref": {"fire": [], "smoke": []}, "cand": {"fire": [], "smoke": []}}
+    conf = {"ref": {n: [] for n in names}, "cand": {n: [] for n in names}}
+    warmed = False
+    for i, (t, frame) in enumerate(sample_clip(path, fps_target)):
+        if not warmed:
+            ref.infer(frame), cand.infer(frame)
+            warmed = True
+        # 순서에 따른 캐시 편향을 줄이려 프레임마다 번갈아 먼저 실행
+        order = (("ref", ref), ("cand", cand)) if i % 2 == 0 else (("cand", cand), ("ref", ref))
+        for key, det in order:
+            started = time.perf_counter()
+            res = det.infer(frame)
+            ms[key].append((time.perf_counter() - started) * 1000)
+            scores[key]["fire"].append(res["fire_score"])
+            scores[key]["smoke"].append(res["smoke_score"])
+            per_class = class_max(res["dets"], det.names)
+            for n in names:
+                conf[key][n].append(per_class.get(n, 0.0))
+        ts.append(t)
+
+    t_arr = np.asarray(ts, dtype=np.float64)
+    arr = {k: {c: np.asarray(v, dtype=np.float64) for c, v in s.items()} for k, s in scores.items()}
+    states = {k: timeline(arr[k]["fire"], arr[k]["smoke"], rules) for k in ("ref", "cand")}
+    trans = {k: transitions(t_arr, states[k]) for k in states}
+    reach = {k: first_reach(t_arr, states[k]) for k in states}
+
+    order_changed = [s for _, s in trans["ref"]] != [s for _, s in trans["cand"]]
+    reach_shift = {}
+    for name in STATES[1:]:
+        a, b = reach["ref"][name], reach["cand"][name]
+        reach_shift[name] = None if a is None and b is None else (
+            "missing" if a is None or b is None else round(b - a, 3))
+    shifted = any(v == "missing" or (v is not None and abs(v) > tolerance) for v in reach_shift.values())
+
+    return {
+        "clip": str(path),
+        "ticks": len(ts),
+        "ms_per_frame": {k: round(float(np.mean(v)), 2) if v else None for k, v in ms.items()},
+        "speedup": round(float(np.mean(ms["ref"]) / np.mean(ms["cand"])), 2) if ts else None,
+        "conf_delta": {
+            n: _delta_stats(np.asarray(conf["ref"][n]), np.asarray(conf["cand"][n])) for n in names
+        },
+        "score_delta": {c: _delta_stats(arr["ref"][c], arr["cand"][c]) for c in ("fire", "smoke")},
+        "state_mismatch_ticks": int(sum(a != b for a, b in zip(states["ref"], states["cand"]))),
+        "first_reach": reach,
+        "first_reach_shift": reach_shift,
+        "transitions": trans,
+        "timeline_changed": bool(order_changed or shifted),
+    }
+
+
+def _print_report(rep: Dict[str, Any]) -> None:
+    status = "⚠️ changed" if rep["timeline_changed"] else "✅ same"
+    ms = rep["ms_per_frame"]
+    print(f"\n🎬 {rep['clip']} ({rep['ticks']} ticks)")
+    print(f"  ms/frame  fp32={ms['ref']}  int8={ms['cand']}  (x{rep['speedup']})")
+    for name, d in rep["conf_delta"].items():
+        print(f"  conf Δ {name:<10} mean={d['mean_abs']:.4f}  p95={d['p95_abs']:.4f}  "
+              f"max={d['max_abs']:.4f}  bias={d['bias']:+.4f}")
+    print(f"  timeline {status}  (상태 불일치 {rep['state_mismatch_ticks']} ticks)")
+    for name, shift in rep["first_reach_shift"].items():
+        if shift is not None:
+            print(f"    {name:<15} fp32={rep['first_reach']['ref'][name]}  int8={rep['first_reach']['cand'][name]}"
+                  f"  Δ={shift}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="FP32 / INT8 감지 모델 정확도·속도 비교")
+    ap.add_argument("--clips", nargs="+", type=Path, required=True)
+    ap.add_argument("--rules", type=Path, required=True, help="RULES JSON (main.py 의 RULES)")
+    ap.add_argument("--fp32", help="FP32 가중치 (기본: find_weights())")
+    ap.add_argument("--int8", help="INT8 모델 (기본: FP32 가중치 옆 *_int8.onnx)")
+    ap.add_argument("--tolerance", type=float, help="상태 첫 도달 시각 허용 차이(초, 기본 1 tick)")
+    ap.add_argument("--json", type=Path, help="전체 결과 JSON 저장")
+    args = ap.parse_args(argv)
+
+    rules = json.loads(args.rules.read_text(encoding="utf-8"))
+    fp32 = args.fp32 or find_weights()
+    int8 = args.int8 or str(int8_weights(fp32))
+    if not Path(int8).exists():
+        ap.error(f"INT8 model not found: {int8} (python backend/quantize.py --weights {fp32})")
+    model_cfg = {"model": {k: rules[k] for k in ("imgsz", "conf", "iou", "max_det") if k in rules}}
+    ref = FireDetector(weights=fp32, config=model_cfg)
+    cand = FireDetector(weights=int8, config=model_cfg)
+
+    reports = [compare_clip(ref, cand, clip, rules, args.tolerance) for clip in args.clips]
+    for rep in reports:
+        _print_report(rep)
+
+    changed = [r["clip"] for r in reports if r["timeline_changed"]]
+    ms_ref = np.mean([r["ms_per_frame"]["ref"] for r in reports if r["ticks"]])
+    ms_cand = np.mean([r["ms_per_frame"]["cand"] for r in reports if r["ticks"]])
+    print(f"\n📊 평균 ms/frame fp32={ms_ref:.2f} int8={ms_cand:.2f} (x{ms_ref / ms_cand:.2f}), "
+          f"타임라인 변경 클립 {len(changed)}/{len(reports)}")
+    if args.json:
+        args.json.write_text(json.dumps({"fp32": fp32, "int8": int8, "clips": reports},
+                                        ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📄 저장: {args.json}")
+    return 1 if changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
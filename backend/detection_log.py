@@ -0,0 +1,150 @@
+# backend/detection_log.py
+"""
+원시 감지 결과 바이너리 로그 (media/runs/{job_id}/detections.dlog)
+- 분석한 tick 마다 점수 계산에 쓴 YOLO 박스(class, conf, xyxy)를 EMA/상태 판정 전 그대로 기록
+  (ROI/HSV/사람 억제는 픽셀이 필요해 재생 때 다시 할 수 없으므로 필터 후 박스 - FireDetector 결과의 kept)
+  → EMA/가중치/임계치만 바꿔 보는 튜닝은 YOLO 재실행 없이 로그 재생으로 처리 (sweep_rules.py)
+- 형식: MAGIC + 헤더 길이(u32) + JSON 헤더(클래스 매핑, 기록 당시 RULES 등)
+        이후 tick 마다 [t f64][n u16][flags u8] + 박스 n개 × [cls u16][conf f32][x1 y1 x2 y2 u16]
+        flags: FLAG_GAP = 앞으로 seek 해서 직전 tick 과 이어지지 않음 (분석도 초기 상태에서 다시 시작)
+               FLAG_GATED = 캐스케이드 게이트가 감지를 건너뜀 (박스 없음 = "감지 안 함", 실시간 점수는 0 으로 갱신)
+  (v1 로그는 flags 없음 - 읽을 때 0)
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"DLOG\x02"
+MAGIC_V1 = b"DLOG\x01"
+_TICK = struct.Struct("<dHB")
+_TICK_V1 = struct.Struct("<dH")
+FLAG_GAP = 1
+FLAG_GATED = 2
+_BOX = struct.Struct("<Hf4H")
+BOX_DTYPE = np.dtype([("cls", "<u2"), ("conf", "<f4"), ("xyxy", "<u2", (4,))])
+
+
+def detections_path(run_dir: Path) -> Path:
+    return run_dir / "detections.dlog"
+
+
+class DetectionLog:
+    """
+    tick 마다 append(t, dets, gated) - dets 는 (N, 6) 배열 또는 (cls, conf, x1, y1, x2, y2) 목록
+    t 오름차순만 기록 (seek 로 다시 분석한 구간은 건너뜀, 건너뛴 구간 뒤 첫 tick 은 FLAG_GAP)
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.last_t = None
+        self._cut = False
+        self._f = open(path, "wb", buffering=1 << 16)
+        meta = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._f.write(MAGIC + struct.pack("<I", len(meta)) + meta)
+
+    def cut(self) -> None:
+        """seek: 다음에 기록하는 tick 이 직전 기록과 이어지지 않으면 FLAG_GAP (TickLog.cut 과 같음)"""
+        self._cut = True
+
+    def append(self, t: float, dets: Union[np.ndarray, Sequence[Tuple[int, float, float, float, float, float]]],
+               gated: bool = False) -> bool:
+        if self.last_t is not None and t <= self.last_t:
+            self._cut = False
+            return False
+        flags = FLAG_GAP if self._cut and self.last_t is not None else 0
+        if gated:
+            flags |= FLAG_GATED
+        self._cut = False
+        self.last_t = t
+        d = np.asarray(dets, dtype=np.float64).reshape(-1, 6)
+        rec = np.empty(len(d), dtype=BOX_DTYPE)
+        rec["cls"] = d[:, 0]
+        rec["conf"] = d[:, 1]
+        rec["xyxy"] = np.clip(np.rint(d[:, 2:]), 0, 65535)
+        self._f.write(_TICK.pack(t, len(d), flags) + rec.tobytes())
+        return True
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+
+class DetectionRecord:
+    """읽어 들인 로그 - 박스는 tick 순서로 이어 붙이고 offsets 로 구간 표시 (CSR)"""
+
+    def __init__(self, header: Dict[str, Any], t: np.ndarray, offsets: np.ndarray, boxes: np.ndarray,
+                 flags: Optional[np.ndarray] = None):
+        self.header = header
+        self.t = t              # (T,) 영상 시각(초)
+        self.offsets = offsets  # (T+1,) tick i 의 박스 = boxes[offsets[i]:offsets[i+1]]
+        self.boxes = boxes      # (N,) BOX_DTYPE
+        self.flags = flags if flags is not None else np.zeros(len(t), dtype=np.uint8)  # (T,) FLAG_*
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """(T,) bool - 직전 tick 과 이어지지 않는 tick (여기서 점수 상태를 초기화해 재생)"""
+        return (self.flags & FLAG_GAP) != 0
+
+    @property
+    def gated(self) -> np.ndarray:
+        """(T,) bool - 게이트가 감지를 건너뛴 tick (박스가 없어도 "불 없음" 이 아니라 "모름")"""
+        return (self.flags & FLAG_GATED) != 0
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def class_max(self, class_ids: Iterable[int], conf_min: float = 0.0) -> np.ndarray:
+        """tick 별로 주어진 클래스 박스의 최대 conf (없으면 0) → (T,)"""
+        out = np.zeros(len(self.t), dtype=np.float32)
+        if len(self.boxes) == 0:
+            return out
+        conf = np.where(
+            np.isin(self.boxes["cls"], list(class_ids)) & (self.boxes["conf"] >= conf_min),
+            self.boxes["conf"], 0.0,
+        ).astype(np.float32)
+        counts = np.diff(self.offsets)
+        nonempty = counts > 0
+        if nonempty.any():
+            out[nonempty] = np.maximum.reduceat(conf, self.offsets[:-1][nonempty])
+        return out
+
+
+def read_detections(path: Path) -> DetectionRecord:
+    data = Path(path).read_bytes()
+    if data.startswith(MAGIC):
+        tick = _TICK
+    elif data.startswith(MAGIC_V1):
+        tick = _TICK_V1
+    else:
+        raise ValueError(f"not a detection log: {path}")
+    pos = len(MAGIC)
+    (meta_len,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    header = json.loads(data[pos:pos + meta_len].decode("utf-8"))
+    pos += meta_len
+
+    ts, offsets, flags, chunks = [], [0], [], []
+    total = 0
+    end = len(data)
+    while pos + tick.size <= end:
+        t, n, *f = tick.unpack_from(data, pos)
+        pos += tick.size
+        size = n * _BOX.size
+        if pos + size > end:
+            break  # 기록 중 중단된 마지막 tick 은 버림
+        if n:
+            chunks.append(np.frombuffer(data, dtype=BOX_DTYPE, count=n, offset=pos))
+        pos += size
+        total += n
+        ts.append(t)
+        offsets.append(total)
+        flags.append(f[0] if f else 0)
+
+    boxes = np.concatenate(chunks) if chunks else np.zeros(0, dtype=BOX_DTYPE)
+    return DetectionRecord(header, np.asarray(ts, dtype=np.float64), np.asarray(offsets, dtype=np.int64), boxes,
+                           np.asarray(flags, dtype=np.uint8))
@@ -0,0 +1,123 @@
+# backend/detectors/cascade.py
+"""
+2단계 캐스케이드의 1단계: 프레임 전체를 아주 작은 해상도로 보고 "불/연기일 수도 있음" 점수를 매기는 게이트
+- 불: 불꽃 색(빨강~노랑, 채도/명도 높음) 픽셀 비율
+- 연기: 저채도 회색 픽셀 중 배경(샘플 프레임 이동 평균)과 달라진 픽셀 비율 - 정지된 회색 벽/하늘은 제외,
+        천천히 짙어지는 연기도 배경과의 차이가 누적되어 잡힘
+- score = max(불 비율 / fire_norm, 연기 비율 / smoke_norm) (0~1)
+YOLO 감지는 score >= threshold 이거나, 상태가 NORMAL 이 아니거나, force_every 번 연속 건너뛰었을 때만 실행
+(임계치는 보수적으로 낮게 - 놓치는 것보다 감지를 더 돌리는 쪽)
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+CASCADE_DEFAULTS: Dict[str, Any] = {
+    "enabled": False,
+    "size": 64,            # 게이트 입력 긴 변(px)
+    "threshold": 0.10,     # score 가 이 이상이면 감지 실행
+    "fire_norm": 0.01,     # 불꽃 색 픽셀 1% → score 1.0
+    "smoke_norm": 0.02,    # 움직이는 회색 픽셀 2% → score 1.0
+    "motion_diff": 8,      # 배경 대비 밝기 차이가 이 이상이면 변화로 판정
+    "bg_alpha": 0.1,       # 배경 이동 평균 갱신 비율
+    "force_every": 10,     # 연속으로 이만큼 건너뛰면 한 번은 감지 (안전장치)
+}
+
+
+def shrink(frame: np.ndarray, size: int) -> np.ndarray:
+    """긴 변이 size 가 되도록 축소 (INTER_AREA - 압축 노이즈/해상도 차이가 평균으로 묻힘)"""
+    h, w = frame.shape[:2]
+    r = size / max(h, w)
+    return cv2.resize(frame, (max(1, round(w * r)), max(1, round(h * r))), interpolation=cv2.INTER_AREA)
+
+
+def fire_color_mask(hsv: np.ndarray) -> np.ndarray:
+    """불꽃 색(빨강~노랑, 채도/명도 높음) 픽셀 - OpenCV HSV (H 0~180)"""
+    hue, sat, val = hsv[:, :, 0], hsv[:, :, 1], hsv[:, :, 2]
+    return ((hue <= 35) | (hue >= 170)) & (sat >= 100) & (val >= 150)
+
+
+class FrameGate:
+    """job 1개용 게이트 (직전 프레임을 기억하므로 job 마다 하나씩)"""
+
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None):
+        self.cfg = {**CASCADE_DEFAULTS, **(cfg or {})}
+        self.stats: Dict[str, Any] = {
+            "frames": 0,            # 게이트를 거친 샘플 프레임
+            "detector_calls": 0,    # 감지 실행
+            "skipped": 0,           # 감지 생략 (= 절약한 호출)
+            "passed_by": {"score": 0, "state": 0, "forced": 0},
+            "hits": 0,              # 감지 실행 중 fire/smoke 가 실제로 나온 횟수
+            "score_hits": 0,        # 그중 게이트 점수로 통과한 경우
+            "saved_ratio": 0.0,
+            "hit_rate": 0.0,        # hits / detector_calls
+            "gate_precision": 0.0,  # score_hits / passed_by.score
+        }
+        self._bg: Optional[np.ndarray] = None  # float32 배경
+        self._since_detect = 0
+        self._last_reason: Optional[str] = None
+
+    def reset(self) -> None:
+        """seek 등으로 프레임 연속성이 끊기면 호출 (다음 프레임은 감지 실행)"""
+        self._bg = None
+
+    def score(self, frame: np.ndarray) -> Tuple[float, Dict[str, float]]:
+        c = self.cfg
+        tiny = shrink(frame, c["size"])
+        hsv = cv2.cvtColor(tiny, cv2.COLOR_BGR2HSV)
+        sat, val = hsv[:, :, 1], hsv[:, :, 2]
+
+        fire_frac = float(fire_color_mask(hsv).mean())
+
+        smoke_frac = 0.0
+        gray = cv2.cvtColor(tiny, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        if self._bg is not None and self._bg.shape == gray.shape:
+            moving = np.abs(gray - self._bg) > c["motion_diff"]
+            smoke_frac = float(((sat <= 40) & (val >= 70) & (val <= 230) & moving).mean())
+            cv2.accumulateWeighted(gray, self._bg, c["bg_alpha"])
+        else:
+            self._bg = gray.copy()
+
+        s = min(1.0, max(fire_frac / c["fire_norm"], smoke_frac / c["smoke_norm"]))
+        return s, {"fire": round(fire_frac, 4), "smoke": round(smoke_frac, 4)}
+
+    def should_detect(self, frame: np.ndarray, state: str = "NORMAL") -> bool:
+        first = self._bg is None  # 배경이 아직 없으면 감지 실행
+        s, _ = self.score(frame)
+        self.stats["frames"] += 1
+        if state != "NORMAL":
+            reason = "state"
+        elif s >= self.cfg["threshold"]:
+            reason = "score"
+        elif first or self._since_detect + 1 >= self.cfg["force_every"]:
+            reason = "forced"
+        else:
+            reason = None
+
+        self._last_reason = reason
+        if reason is None:
+            self._since_detect += 1
+            self.stats["skipped"] += 1
+        else:
+            self._since_detect = 0
+            self.stats["detector_calls"] += 1
+            self.stats["passed_by"][reason] += 1
+        self._update_ratios()
+        return reason is not None
+
+    def record(self, found: bool) -> None:
+        """감지 실행 결과 보고 (fire/smoke 박스가 있었는지)"""
+        if found:
+            self.stats["hits"] += 1
+            if self._last_reason == "score":
+                self.stats["score_hits"] += 1
+        self._update_ratios()
+
+    def _update_ratios(self) -> None:
+        st = self.stats
+        st["saved_ratio"] = round(st["skipped"] / st["frames"], 4) if st["frames"] else 0.0
+        st["hit_rate"] = round(st["hits"] / st["detector_calls"], 4) if st["detector_calls"] else 0.0
+        by_score = st["passed_by"]["score"]
+        st["gate_precision"] = round(st["score_hits"] / by_score, 4) if by_score else 0.0
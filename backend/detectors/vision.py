@@ -0,0 +1,483 @@
+# backend/detectors/vision.py
+"""
+화재/연기 감지 엔진 (main.py / app.py / 테스트 스크립트 공용)
+- 모델은 가중치 경로별로 한 번만 로드해 모든 FireDetector 가 공유 (forward 는 lock 으로 직렬화)
+- 전처리: letterbox(비율 유지 + 회색 패딩) → RGB/CHW/0~1 float 변환을 미리 할당한 버퍼에 직접 기록
+  → 프레임마다 배열을 새로 만들지 않고, 배치 버퍼는 torch.from_numpy 로 복사 없이 모델에 전달
+- 출력: 프레임별 (N, 6) 배열 하나를 벡터 연산으로 좌표 복원/ROI/클래스 분류 (박스마다 tolist 없음)
+- infer_many(frames): 여러 프레임을 한 번의 forward 로 추론
+- process_video(path): 디코딩 스레드 + 크기 제한 큐(backpressure) 기반 비동기 제너레이터
+- 설정: backend/thresholds.json (roi / hsv_filter / person_suppression) + 모델 추론 파라미터
+- model.precision = "int8" 이면 가중치 옆의 *_int8.onnx (backend/quantize.py 로 생성) 사용
+"""
+
+import asyncio
+import copy
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ROOT = BACKEND_DIR.parent
+CONFIG_PATH = BACKEND_DIR / "thresholds.json"
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "model": {"imgsz": 416, "conf": 0.15, "iou": 0.20, "max_det": 20, "max_batch": 8, "precision": "fp32"},
+    "roi": {"enabled": False, "coordinates": [0.0, 0.0, 1.0, 1.0]},
+    "hsv_filter": {"enabled": False, "h_range": [0, 60], "s_min": 0.5, "v_min": 0.5, "min_fire_ratio": 0.08},
+    "person_suppression": {"enabled": False, "iou_threshold": 0.5, "fire_ratio_threshold": 0.20},
+}
+
+PAD_VALUE = 114
+
+
+def _merge(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    out = copy.deepcopy(base)
+    for k, v in (extra or {}).items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _merge(out[k], v)
+        else:
+            out[k] = copy.deepcopy(v)
+    return out
+
+
+def load_config(path: Optional[Path] = CONFIG_PATH, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """기본값 ← thresholds.json ← overrides 순으로 병합"""
+    cfg = DEFAULT_CONFIG
+    if path is not None and Path(path).exists():
+        cfg = _merge(cfg, json.loads(Path(path).read_text(encoding="utf-8")))
+    return _merge(cfg, overrides or {})
+
+
+def find_weights(preferred: Iterable[Path] = ()) -> str:
+    """preferred → models/vision/best_nano_111.pt → models/*.onnx|*.pt → yolo11n.pt(자동 다운로드)"""
+    candidates = list(preferred) + [
+        BACKEND_DIR / "models" / "vision" / "best_nano_111.pt",
+        ROOT / "models" / "vision" / "best_nano_111.pt",
+    ]
+    for p in candidates:
+        if Path(p).exists() and not _is_int8(p):
+            return str(p)
+    for pattern in ("*.onnx", "*.pt"):
+        for models_dir in (BACKEND_DIR / "models", ROOT / "models"):
+            found = next((p for p in models_dir.glob(pattern) if not _is_int8(p)), None) if models_dir.exists() else None
+            if found:
+                return str(found)
+    return "yolo11n.pt"
+
+
+def _is_int8(path) -> bool:
+    return Path(path).name.endswith("_int8.onnx")
+
+
+def int8_weights(weights) -> Path:
+    """FP32 가중치 → 같은 폴더의 INT8 양자화 모델 경로 (backend/quantize.py 산출물)"""
+    p = Path(weights)
+    return p.with_name(f"{p.stem}_int8.onnx")
+
+
+def select_weights(weights: Optional[str] = None, precision: str = "fp32") -> str:
+    """precision 에 맞는 가중치 경로 - INT8 모델이 아직 없으면 경고 후 FP32"""
+    if precision not in ("fp32", "int8"):
+        raise ValueError(f"unknown precision: {precision}")
+    weights = str(weights or find_weights())
+    if precision == "fp32" or _is_int8(weights):
+        return weights
+    quantized = int8_weights(weights)
+    if quantized.exists():
+        return str(quantized)
+    print(f"⚠️ INT8 모델 없음 ({quantized}) → FP32 사용. 생성: python backend/quantize.py --weights {weights}")
+    return weights
+
+
+def _nms_fn():
+    """ultralytics NMS 함수 (버전에 따라 위치가 다름, 없으면 None)"""
+    try:
+        from ultralytics.utils.nms import non_max_suppression
+    except ImportError:
+        try:
+            from ultralytics.utils.ops import non_max_suppression
+        except ImportError:
+            return None
+    return non_max_suppression
+
+
+class YoloBackend:
+    """
+    ultralytics YOLO 래퍼: (B, 3, S, S) float32 배치 → 프레임별 (N, 6) [x1, y1, x2, y2, conf, cls]
+    - 첫 호출은 model.predict() 로 predictor(AutoBackend) 를 준비
+    - 이후에는 AutoBackend forward + NMS 만 직접 호출 → Results 객체 생성과
+      입력 텐서를 원본 이미지(uint8 HWC)로 되돌리는 복사를 생략하고 (N, 6) 텐서를 그대로 numpy 로 반환
+    """
+
+    def __init__(self, weights: str):
+        from ultralytics import YOLO
+
+        self.weights = weights
+        self.model = YOLO(weights)
+        self.names: Dict[int, str] = dict(self.model.names or {})
+        # export 된 모델(onnx 등)은 배치 크기가 고정(1)인 경우가 많음
+        self.max_batch: Optional[int] = None if str(weights).endswith(".pt") else 1
+        self.lock = threading.Lock()
+        self._nms = _nms_fn()
+
+    def predict(self, batch: np.ndarray, conf: float, iou: float, max_det: int) -> List[np.ndarray]:
+        import torch
+
+        with self.lock:
+            predictor = getattr(self.model, "predictor", None)
+            if self._nms is not None and predictor is not None and getattr(predictor, "model", None) is not None:
+                with torch.inference_mode():
+                    preds = predictor.model(torch.from_numpy(batch))  # 버퍼 메모리 공유 (복사 없음)
+                    dets = self._nms(preds, conf, iou, max_det=max_det)
+                return [d.numpy() for d in dets]
+            results = self.model.predict(
+                source=torch.from_numpy(batch),  # 버퍼 메모리 공유 (복사 없음)
+                imgsz=batch.shape[-1],
+                conf=conf,
+                iou=iou,
+                max_det=max_det,
+                device="cpu",
+                verbose=False,
+            )
+        empty = np.zeros((0, 6), dtype=np.float32)
+        return [r.boxes.data.cpu().numpy() if r.boxes is not None else empty for r in results]
+
+
+_SHARED: Dict[str, Any] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_backend(weights: Optional[str] = None) -> YoloBackend:
+    """가중치 경로별 단일 모델 인스턴스 (여러 FireDetector / 서버 작업이 공유)"""
+    weights = weights or find_weights()
+    with _SHARED_LOCK:
+        backend = _SHARED.get(weights)
+        if backend is None:
+            print(f"[model] Using: {weights}")
+            backend = _SHARED[weights] = YoloBackend(weights)
+        return backend
+
+
+def class_ids(names: Dict[int, str]) -> Tuple[List[int], List[int], List[int]]:
+    """클래스 이름으로 fire / smoke / person ID 매핑 (못 찾으면 fire=[0], smoke=[1])"""
+    fire, smoke, person = [], [], []
+    for cid, name in (names or {}).items():
+        n = name.lower()
+        if "fire" in n or "flame" in n or "burn" in n:
+            fire.append(cid)
+        elif "smoke" in n or "vapor" in n:
+            smoke.append(cid)
+        elif n == "person":
+            person.append(cid)
+    return fire or [0], smoke or [1], person
+
+
+class Letterbox:
+    """
+    프레임 → imgsz×imgsz (비율 유지 + 패딩) 변환을 미리 할당한 버퍼에서 수행
+    - resize 는 canvas 의 ROI view 에 바로 기록 (중간 버퍼/복사 없음), 패딩은 geometry 가 바뀔 때만 다시 칠함
+    - canvas 를 채널 평면으로 나눈 뒤(cv2.split, 연속 메모리) 평면별로 0~1 float32 변환해
+      batch[i] 에 RGB/CHW 순서로 바로 기록 - 간격 있는 BGR→RGB/HWC→CHW view 를 한 번에 읽는 것보다 약 2배 빠름
+    """
+
+    def __init__(self, imgsz: int, max_batch: int):
+        self.imgsz = imgsz
+        self.canvas = np.full((imgsz, imgsz, 3), PAD_VALUE, dtype=np.uint8)
+        self.batch = np.empty((max_batch, 3, imgsz, imgsz), dtype=np.float32)
+        self.planes = tuple(np.empty((imgsz, imgsz), dtype=np.uint8) for _ in range(3))
+        self._geom: Optional[Tuple[float, int, int, int, int]] = None
+        self._scale = np.float32(1.0 / 255.0)
+
+    def geometry(self, h: int, w: int) -> Tuple[float, int, int, int, int]:
+        r = min(self.imgsz / h, self.imgsz / w)
+        nw, nh = max(1, round(w * r)), max(1, round(h * r))
+        return r, nw, nh, (self.imgsz - nw) // 2, (self.imgsz - nh) // 2
+
+    def load(self, i: int, frame: np.ndarray) -> Tuple[float, int, int, int, int]:
+        geom = self.geometry(*frame.shape[:2])
+        r, nw, nh, left, top = geom
+        if geom != self._geom:
+            self.canvas.fill(PAD_VALUE)
+            self._geom = geom
+        roi = self.canvas[top:top + nh, left:left + nw]
+        if (nh, nw) == frame.shape[:2]:
+            np.copyto(roi, frame)
+        else:
+            cv2.resize(frame, (nw, nh), dst=roi, interpolation=cv2.INTER_LINEAR)
+        cv2.split(self.canvas, self.planes)
+        for c, plane in enumerate(reversed(self.planes)):  # BGR 평면 → RGB 순서
+            np.multiply(plane, self._scale, out=self.batch[i, c])
+        return geom
+
+
+def _iou(a: Sequence[float], b: Sequence[float]) -> float:
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    if inter <= 0:
+        return 0.0
+    area = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / max(1e-6, area)
+
+
+class FireDetector:
+    """
+    감지 엔진
+    infer(frame) / infer_many(frames) 결과:
+      fire_score, smoke_score : 필터 후 클래스별 최대 conf (없으면 0)
+      fire_boxes, smoke_boxes, person_boxes : {x1, y1, x2, y2, cls, conf, confidence, label, class_name}
+        (confidence = conf, 기존 스크립트 호환)
+      boxes : fire_boxes + smoke_boxes (SSE tick 형식)
+      dets  : 필터 전 원시 박스 (N, 6) float64 배열 [cls, conf, x1, y1, x2, y2] (원본 좌표)
+      kept  : (N,) bool - dets 중 점수에 쓰인 박스 (fire/smoke 클래스, ROI/HSV/사람 억제 통과 = boxes)
+    """
+
+    def __init__(
+        self,
+        weights: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        config_path: Optional[Path] = CONFIG_PATH,
+        backend: Any = None,
+    ):
+        self.cfg = load_config(config_path, config)
+        if backend is None:
+            backend = shared_backend(select_weights(weights, self.cfg["model"]["precision"]))
+        self.backend = backend
+        self.names: Dict[int, str] = dict(self.backend.names)
+        self.fire_ids, self.smoke_ids, self.person_ids = class_ids(self.names)
+        # 클래스 id → (결과 키, 라벨), 겹치면 fire > smoke > person 우선
+        self._groups: Dict[int, Tuple[str, str]] = {}
+        for key, label, ids in (
+            ("person_boxes", "person", self.person_ids),
+            ("smoke_boxes", "smoke", self.smoke_ids),
+            ("fire_boxes", "fire", self.fire_ids),
+        ):
+            self._groups.update({c: (key, label) for c in ids})
+
+        m = self.cfg["model"]
+        self.max_batch = min(m["max_batch"], getattr(self.backend, "max_batch", None) or m["max_batch"])
+        self.letterbox = Letterbox(m["imgsz"], self.max_batch)
+        self._lock = threading.Lock()  # 전처리 버퍼는 인스턴스별 - 동시 호출 시 직렬화
+
+    # ---------- 추론 ----------
+    def infer(self, frame: np.ndarray) -> Dict[str, Any]:
+        return self.infer_many([frame])[0]
+
+    def infer_many(self, frames: Sequence[np.ndarray]) -> List[Dict[str, Any]]:
+        m = self.cfg["model"]
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            for lo in range(0, len(frames), self.max_batch):
+                chunk = frames[lo:lo + self.max_batch]
+                geoms = [self.letterbox.load(i, f) for i, f in enumerate(chunk)]
+                preds = self.backend.predict(self.letterbox.batch[:len(chunk)], m["conf"], m["iou"], m["max_det"])
+                for frame, geom, det in zip(chunk, geoms, preds):
+                    out.append(self._postprocess(frame, det, geom))
+        return out
+
+    # ---------- 후처리 ----------
+    def _postprocess(self, frame: np.ndarray, det: np.ndarray, geom) -> Dict[str, Any]:
+        r, _, _, left, top = geom
+        h, w = frame.shape[:2]
+        n = 0 if det is None else len(det)
+        dets = np.empty((n, 6), dtype=np.float64)
+        kept = np.zeros(n, dtype=bool)
+        result: Dict[str, Any] = {
+            "fire_score": 0.0, "smoke_score": 0.0,
+            "fire_boxes": [], "smoke_boxes": [], "person_boxes": [],
+            "boxes": [], "dets": dets, "kept": kept, "img_w": w, "img_h": h,
+        }
+        if n == 0:
+            return result
+
+        # letterbox 좌표 → 원본 좌표 (배열 한 번에)
+        dets[:, 0] = det[:, 5]
+        dets[:, 1] = det[:, 4]
+        xyxy = dets[:, 2:]
+        xyxy[:] = det[:, :4]
+        xyxy[:, 0::2] -= left
+        xyxy[:, 1::2] -= top
+        xyxy /= r
+        np.clip(xyxy[:, 0::2], 0, w, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, h, out=xyxy[:, 1::2])
+
+        keep = None
+        roi = self.cfg["roi"]
+        if roi["enabled"]:
+            rx1, ry1, rx2, ry2 = roi["coordinates"]
+            cx = (xyxy[:, 0] + xyxy[:, 2]) / (2 * w)
+            cy = (xyxy[:, 1] + xyxy[:, 3]) / (2 * h)
+            keep = ((cx >= rx1) & (cx <= rx2) & (cy >= ry1) & (cy <= ry2)).tolist()
+
+        raw_conf: Dict[int, float] = {}  # 점수는 반올림 전 conf 로 계산 (감지 로그 재생과 일치)
+        row: Dict[int, int] = {}         # 박스 → dets 행 (kept 표시용)
+        # 파이썬 값 변환은 배열 전체를 한 번만 (박스 수가 적어 그룹별 마스크보다 dict 조회가 빠름)
+        for i, (c, cf, x1, y1, x2, y2) in enumerate(dets.tolist()):
+            if keep is not None and not keep[i]:
+                continue
+            c = int(c)
+            group = self._groups.get(c)
+            if group is None:
+                continue
+            key, label = group
+            box = {
+                "x1": x1, "y1": y1, "x2": x2, "y2": y2,
+                "cls": c, "conf": round(cf, 3), "confidence": round(cf, 3), "label": label,
+                "class_name": self.names.get(c, f"class_{c}"),
+            }
+            raw_conf[id(box)] = cf
+            row[id(box)] = i
+            result[key].append(box)
+
+        if result["fire_boxes"]:
+            result["fire_boxes"] = self._filter_fire(frame, result["fire_boxes"], result["person_boxes"])
+        result["fire_score"] = max((raw_conf[id(b)] for b in result["fire_boxes"]), default=0.0)
+        result["smoke_score"] = max((raw_conf[id(b)] for b in result["smoke_boxes"]), default=0.0)
+        result["boxes"] = result["fire_boxes"] + result["smoke_boxes"]
+        kept[[row[id(b)] for b in result["boxes"]]] = True
+        return result
+
+    def fire_ratio(self, frame: np.ndarray, box: Dict[str, Any]) -> float:
+        """박스 안에서 불색(HSV) 픽셀 비율"""
+        hsv = self.cfg["hsv_filter"]
+        x1, y1 = int(box["x1"]), int(box["y1"])
+        x2, y2 = int(np.ceil(box["x2"])), int(np.ceil(box["y2"]))
+        crop = frame[y1:y2, x1:x2]
+        if crop.size == 0:
+            return 0.0
+        h0, h1 = hsv["h_range"]
+        lower = np.array([h0 / 2, hsv["s_min"] * 255, hsv["v_min"] * 255])  # OpenCV H 범위 0~180
+        upper = np.array([h1 / 2, 255, 255])
+        mask = cv2.inRange(cv2.cvtColor(crop, cv2.COLOR_BGR2HSV), lower, upper)
+        return cv2.countNonZero(mask) / float(mask.size)
+
+    def _filter_fire(self, frame: np.ndarray, fires: List[Dict[str, Any]],
+                     persons: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """HSV 색상 게이트 + 사람과 겹치는 불색 약한 박스 억제"""
+        hsv, ps = self.cfg["hsv_filter"], self.cfg["person_suppression"]
+        check_person = ps["enabled"] and persons
+        if not hsv["enabled"] and not check_person:
+            return fires
+        kept = []
+        for b in fires:
+            ratio = self.fire_ratio(frame, b)
+            if hsv["enabled"] and ratio < hsv["min_fire_ratio"]:
+                continue
+            if check_person and ratio < ps["fire_ratio_threshold"]:
+                coords = (b["x1"], b["y1"], b["x2"], b["y2"])
+                if any(_iou(coords, (p["x1"], p["y1"], p["x2"], p["y2"])) > ps["iou_threshold"] for p in persons):
+                    continue
+            kept.append(b)
+        return kept
+
+    # ---------- 영상 스트리밍 ----------
+    async def process_video(
+        self,
+        path,
+        fps_target: Optional[float] = 5.0,
+        batch_size: int = 4,
+        max_pending: int = 8,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        영상 프레임을 fps_target 간격으로 샘플링해 추론 결과를 순서대로 yield
+        - infer() 결과 + frame_number, t, scores {fire, smoke}, boxes {fire: [...], smoke: [...]}
+          (boxes 는 기존 process_video 형식 - 평면 목록이 필요하면 fire_boxes + smoke_boxes)
+        - 디코딩은 별도 스레드, 큐가 max_pending 장이면 디코더가 대기 (소비자가 느리면 앞서가지 않음)
+        - 프레임은 고정 크기 버퍼 풀에 디코딩 (추론이 끝난 버퍼를 디코더가 다시 사용 → 프레임당 할당 없음)
+        - 소비자가 중간에 break 해도 디코더 스레드/캡처를 정리
+        """
+        pending: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        free: "queue.Queue" = queue.Queue()
+        for _ in range(max_pending + batch_size + 1):
+            free.put(None)  # 첫 retrieve 에서 프레임 크기로 할당
+        stop = threading.Event()
+        done = object()
+
+        cap = cv2.VideoCapture(str(path))
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        stride = max(1, round(fps / fps_target)) if fps_target else 1
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def take_buffer():
+            while not stop.is_set():
+                try:
+                    return True, free.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return False, None
+
+        def decode():
+            try:
+                idx = -1
+                while not stop.is_set():
+                    if not cap.grab():
+                        break
+                    idx += 1
+                    if idx % stride:
+                        continue
+                    ok, buf = take_buffer()
+                    if not ok:
+                        break
+                    ok, frame = cap.retrieve(buf)
+                    if not ok or not put((idx, idx / fps, frame)):
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                cap.release()
+                put(done)
+
+        thread = threading.Thread(target=decode, name=f"decode:{Path(str(path)).name}", daemon=True)
+        thread.start()
+        try:
+            finished = False
+            while not finished:
+                items = [await asyncio.to_thread(pending.get)]
+                while len(items) < batch_size:
+                    try:
+                        items.append(pending.get_nowait())
+                    except queue.Empty:
+                        break
+                for item in items:
+                    if isinstance(item, Exception):
+                        raise item
+                if items[-1] is done:
+                    finished = True
+                    items.pop()
+                if not items:
+                    break
+                results = await asyncio.to_thread(self.infer_many, [f for _, _, f in items])
+                for _, _, frame in items:
+                    free.put(frame)
+                for (idx, t, _), res in zip(items, results):
+                    res.update(
+                        frame_number=idx,
+                        t=t,
+                        scores={"fire": res["fire_score"], "smoke": res["smoke_score"]},
+                        boxes={"fire": res["fire_boxes"], "smoke": res["smoke_boxes"]},
+                    )
+                    yield res
+        finally:
+            stop.set()
+            while True:  # 대기 중인 put 을 풀어 디코더가 종료되도록
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+            await asyncio.to_thread(thread.join, 2.0)
@@ -1,6 +1,7 @@
 import smtplib
 import os
 from email.mime.text import MIMEText
+from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from dotenv import load_dotenv
@@ -15,8 +16,8 @@ class EmailNotifier:
         self.smtp_pass = os.getenv('SMTP_PASS')
         self.alert_email = os.getenv('ALERT_EMAIL')
 
-    def send_emergency_alert(self, job_id, scores, timestamp=None):
-        """119 호출 상황 시 긴급 메일 발송"""
+    def send_emergency_alert(self, job_id, scores, timestamp=None, snapshot_path=None):
+        """119 호출 상황 시 긴급 메일 발송 (snapshot_path 가 있으면 현장 스냅샷 첨부)"""
         if not all([self.smtp_user, self.smtp_pass, self.alert_email]):
             print("⚠️ 이메일 설정이 완료되지 않았습니다.")
             return False
@@ -56,6 +57,13 @@ class EmailNotifier:
 
             msg.attach(MIMEText(html_body, 'html', 'utf-8'))
 
+            if snapshot_path and os.path.exists(snapshot_path):
+                with open(snapshot_path, 'rb') as f:
+                    image = MIMEImage(f.read(), _subtype='jpeg')
+                image.add_header('Content-Disposition', 'attachment',
+                                 filename=os.path.basename(snapshot_path))
+                msg.attach(image)
+
             with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.smtp_user, self.smtp_pass)
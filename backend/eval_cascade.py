@@ -0,0 +1,151 @@
+# backend/eval_cascade.py
+"""
+캐스케이드 게이트 평가: 항상 감지(always-on) 대비 게이트를 켰을 때 놓친 감지 / 절약한 감지 호출
+- 같은 샘플 프레임에 대해 감지는 한 번만 실행하고, 게이트가 건너뛴 프레임은 결과를 0 으로 바꿔 비교
+- 놓친 감지: always-on 에서 fire/smoke 박스가 나왔는데 게이트가 건너뛴 tick
+- 첫 감지 지연, 상태 타임라인(첫 도달 시각) 차이도 함께 출력
+- --synthetic: 화재+연기 / 연기만 / 화재 없음 합성 클립을 만들어 평가 (create_test_video.py 와 같은 방식)
+
+사용 예:
+  python backend/eval_cascade.py --synthetic --rules rules.json
+  python backend/eval_cascade.py --clips media/uploads/*.mp4 --rules rules.json --threshold 0.05
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from compare_models import first_reach, sample_clip
+from detectors.cascade import CASCADE_DEFAULTS, FrameGate
+from detectors.vision import FireDetector
+from scoring import STATES, HazardScorer
+
+
+def write_synthetic_clips(out_dir: Path, fps: int = 10, seconds: int = 20, size=(640, 480)) -> List[Path]:
+    """화재+연기 / 연기만 / 화재 없음(움직이는 물체) 클립 3개"""
+    w, h = size
+    rng = np.random.default_rng(0)
+    paths = []
+    for kind in ("fire_smoke", "smoke_only", "no_fire"):
+        path = out_dir / f"{kind}.mp4"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+        for i in range(fps * seconds):
+            progress = i / (fps * seconds)
+            frame = np.full((h, w, 3), 50, dtype=np.uint8)
+            # 화재와 무관한 움직임 (게이트 오통과 유도)
+            x = int(40 + (w - 140) * progress)
+            cv2.rectangle(frame, (x, h - 120), (x + 60, h - 20), (160, 60, 20), -1)
+            if kind == "fire_smoke" and progress > 0.2:
+                intensity = min((progress - 0.2) * 2, 1.0)
+                color = (0, int(100 + 155 * intensity), int(200 + 55 * intensity))
+                for _ in range(5):
+                    off = rng.integers(-30, 31, size=2)
+                    radius = int((50 + intensity * 100) * (0.5 + rng.random() * 0.5))
+                    cv2.circle(frame, (w // 2 + int(off[0]), h // 2 + int(off[1])), radius, color, -1)
+            if kind != "no_fire" and progress > 0.4:
+                intensity = min((progress - 0.4) * 1.5, 1.0)
+                area = frame[50:200, 150:500]
+                shade = int(100 + 50 * intensity + 20 * np.sin(i / 3))  # 일렁이는 연기
+                overlay = np.full_like(area, shade)
+                cv2.addWeighted(area, 1 - intensity * 0.6, overlay, intensity * 0.6, 0, area)
+            cv2.putText(frame, f"Frame: {i:03d}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            writer.write(frame)
+        writer.release()
+        paths.append(path)
+    return paths
+
+
+def evaluate_clip(detector: FireDetector, path: Path, rules: Dict[str, Any],
+                  gate_cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    gate = FrameGate(gate_cfg)
+    always, gated = HazardScorer(rules), HazardScorer(rules)
+    ts, states_on, states_gated, missed_t = [], [], [], []
+    first_on = first_gated = None
+
+    for t, frame in sample_clip(path, rules["fps_target"]):
+        res = detector.infer(frame)
+        found = res["fire_score"] > 0 or res["smoke_score"] > 0
+        if found and first_on is None:
+            first_on = t
+        states_on.append(always.update(res["fire_score"], res["smoke_score"]))
+
+        if gate.should_detect(frame, gated.state):
+            gate.record(found)
+            fire, smoke = res["fire_score"], res["smoke_score"]
+            if found and first_gated is None:
+                first_gated = t
+        else:
+            fire = smoke = 0.0
+            if found:
+                missed_t.append(round(t, 3))
+        states_gated.append(gated.update(fire, smoke))
+        ts.append(t)
+
+    t_arr = np.asarray(ts, dtype=np.float64)
+    reach_on, reach_gated = first_reach(t_arr, states_on), first_reach(t_arr, states_gated)
+    return {
+        "clip": str(path),
+        "cascade": gate.stats,
+        "missed_detections": len(missed_t),
+        "missed_at": missed_t[:20],
+        "first_detection": {"always_on": first_on, "gated": first_gated},
+        "first_reach": {"always_on": reach_on, "gated": reach_gated},
+        "state_mismatch_ticks": int(sum(a != b for a, b in zip(states_on, states_gated))),
+        "timeline_changed": reach_on != reach_gated,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="캐스케이드 게이트 평가 (always-on 감지 대비)")
+    ap.add_argument("--clips", nargs="*", type=Path, default=[])
+    ap.add_argument("--synthetic", action="store_true", help="합성 클립 생성 후 평가")
+    ap.add_argument("--rules", type=Path, required=True, help="RULES JSON (main.py 의 RULES)")
+    ap.add_argument("--weights", help="감지 모델 가중치 (기본: find_weights())")
+    ap.add_argument("--threshold", type=float, help=f"게이트 임계치 (기본 {CASCADE_DEFAULTS['threshold']})")
+    ap.add_argument("--json", type=Path, help="전체 결과 JSON 저장")
+    args = ap.parse_args(argv)
+
+    rules = json.loads(args.rules.read_text(encoding="utf-8"))
+    gate_cfg = dict(rules.get("cascade") or {})
+    if args.threshold is not None:
+        gate_cfg["threshold"] = args.threshold
+    model_cfg = {"model": {k: rules[k] for k in ("imgsz", "conf", "iou", "max_det") if k in rules}}
+    detector = FireDetector(weights=args.weights, config=model_cfg)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = list(args.clips) + (write_synthetic_clips(Path(tmp)) if args.synthetic else [])
+        if not clips:
+            ap.error("pass --clips and/or --synthetic")
+        reports = [evaluate_clip(detector, clip, rules, gate_cfg) for clip in clips]
+
+    for rep in reports:
+        st = rep["cascade"]
+        print(f"\n🎬 {Path(rep['clip']).name}: 감지 {st['detector_calls']}/{st['frames']} "
+              f"(절약 {st['saved_ratio'] * 100:.1f}%), 통과 사유 {st['passed_by']}, 적중률 {st['hit_rate']:.2f}")
+        print(f"  놓친 감지 {rep['missed_detections']}회 {rep['missed_at'] or ''}")
+        print(f"  첫 감지 always-on={rep['first_detection']['always_on']} gated={rep['first_detection']['gated']}")
+        if rep["timeline_changed"]:
+            for name in STATES[1:]:
+                a, b = rep["first_reach"]["always_on"][name], rep["first_reach"]["gated"][name]
+                if a != b:
+                    print(f"  ⚠️ {name} 첫 도달 always-on={a} gated={b}")
+
+    frames = sum(r["cascade"]["frames"] for r in reports)
+    calls = sum(r["cascade"]["detector_calls"] for r in reports)
+    missed = sum(r["missed_detections"] for r in reports)
+    print(f"\n📊 전체: 감지 호출 {calls}/{frames} (절약 {(1 - calls / max(frames, 1)) * 100:.1f}%), "
+          f"놓친 감지 {missed}회, 타임라인 변경 {sum(r['timeline_changed'] for r in reports)}/{len(reports)}")
+    if args.json:
+        args.json.write_text(json.dumps(reports, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📄 저장: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# backend/export_ticks.py
+"""
+분석 tick 일괄 내보내기 (NDJSON / CSV / Parquet) - media/runs/{job_id}/ticks.ndjson 에서 바로 스트리밍
+- tick 을 한 줄씩 읽어 행으로 바꾸고, 형식별로 일정 크기(청크 / row group)마다 바이트를 내보냄
+  → 몇 천 시간 분량을 내보내도 메모리는 청크 1개 분량만 사용
+- 행: job_id, t(영상 시각), wall_ts(분석 시각), state, EMA 점수, 원시 점수, gated, gap, 박스 목록
+  gap = 앞으로 seek 해서 직전 행과 이 행 사이 영상 구간은 분석하지 않음 (그 사이는 데이터 없음)
+- 여러 job: wall_ts 기준 [since, until] 구간 - 파일 수정 시각/첫 tick 으로 범위 밖 job 은 읽지 않고 건너뜀
+- Parquet 은 pyarrow 가 설치된 경우만 (없으면 ExportUnavailable)
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tick_log import TICKS_NAME
+
+COLUMNS = ["job_id", "t", "wall_ts", "state", "fire", "smoke", "hazard",
+           "raw_fire", "raw_smoke", "gated", "gap", "n_boxes", "boxes"]
+BOX_FIELDS = ("label", "cls", "conf", "x1", "y1", "x2", "y2")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """요청한 형식을 쓸 수 없음 (선택 의존성 없음)"""
+
+
+# ---------- 읽기 ----------
+
+def read_ticks(path: Path) -> Iterator[Dict[str, Any]]:
+    """tick 을 한 줄씩 읽기 - 분석 중인 job 의 마지막 줄이 덜 써졌으면 거기서 멈춤"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+
+def tick_row(job_id: str, tick: Dict[str, Any]) -> Dict[str, Any]:
+    scores = tick.get("scores") or {}
+    raw = tick.get("raw_scores") or {}
+    boxes = [{k: b.get(k) for k in BOX_FIELDS} for b in tick.get("boxes") or ()]
+    return {
+        "job_id": job_id,
+        "t": tick.get("t"),
+        "wall_ts": tick.get("wall_ts"),
+        "state": tick.get("state"),
+        "fire": scores.get("fire"),
+        "smoke": scores.get("smoke"),
+        "hazard": scores.get("hazard"),
+        "raw_fire": raw.get("fire"),
+        "raw_smoke": raw.get("smoke"),
+        "gated": bool(tick.get("gated", False)),
+        "gap": bool(tick.get("gap", False)),
+        "n_boxes": len(boxes),
+        "boxes": boxes,
+    }
+
+
+def iter_job_rows(path: Path, job_id: str, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """job 1개의 행 (영상 시각 t 가 [start, end] 인 tick, tick 은 t 오름차순이라 end 를 넘으면 중단)"""
+    for tick in read_ticks(path):
+        t = tick.get("t", 0.0)
+        if start is not None and t < start:
+            continue
+        if end is not None and t > end:
+            return
+        yield tick_row(job_id, tick)
+
+
+def _first_wall_ts(path: Path) -> Optional[float]:
+    return next((tick.get("wall_ts") for tick in read_ticks(path)), None)
+
+
+def find_jobs(runs: Path, since: float, until: Optional[float] = None,
+              job_ids: Optional[Sequence[str]] = None) -> List[Tuple[float, str, Path]]:
+    """구간과 겹칠 수 있는 job → (첫 wall_ts, job_id, ticks 경로) 를 첫 tick 시각 순으로"""
+    found = []
+    if job_ids:
+        dirs = [runs / j for j in job_ids if j and Path(j).name == j]  # 경로 이탈 방지
+    else:
+        dirs = [p for p in runs.iterdir() if p.is_dir()]
+    for run_dir in dirs:
+        path = run_dir / TICKS_NAME
+        try:
+            if os.stat(path).st_mtime < since:
+                continue  # 마지막 기록이 구간 시작 전
+        except FileNotFoundError:
+            continue
+        first = _first_wall_ts(path)
+        if first is None or (until is not None and first > until):
+            continue
+        found.append((first, run_dir.name, path))
+    found.sort()
+    return found
+
+
+def iter_range_rows(runs: Path, since: float, until: Optional[float] = None,
+                    job_ids: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """여러 job 의 행 중 wall_ts 가 [since, until] 인 것 (job 은 첫 tick 시각 순, job 안에서는 시간 순)"""
+    for _, job_id, path in find_jobs(runs, since, until, job_ids):
+        for tick in read_ticks(path):
+            ts = tick.get("wall_ts")
+            if ts is None or ts < since:
+                continue
+            if until is not None and ts > until:
+                break
+            yield tick_row(job_id, tick)
+
+
+# ---------- 쓰기 ----------
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]], chunk_bytes: int = 1 << 16) -> Iterator[bytes]:
+    buf: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(buf).encode("utf-8")
+            buf.clear()
+            size = 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+class _LineBuffer:
+    """csv.writer 출력 행을 리스트로 모음 (StringIO 처럼 내부 버퍼가 커지지 않음)"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.size = 0
+
+    def write(self, line: str) -> None:
+        self.lines.append(line)
+        self.size += len(line)
+
+    def take(self) -> bytes:
+        out = "".join(self.lines).encode("utf-8")
+        self.lines.clear()
+        self.size = 0
+        return out
+
+
+def csv_chunks(rows: Iterable[Dict[str, Any]], chunk_bytes: int = 1 << 16) -> Iterator[bytes]:
+    """박스 목록은 JSON 문자열 열로"""
+    buf = _LineBuffer()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([
+            json.dumps(row["boxes"], separators=(",", ":")) if c == "boxes" else ("" if row[c] is None else row[c])
+            for c in COLUMNS
+        ])
+        if buf.size >= chunk_bytes:
+            yield buf.take()
+    if buf.lines:
+        yield buf.take()
+
+
+class _ChunkSink:
+    """pyarrow 가 쓴 바이트를 모아 두었다가 row group 마다 꺼내 감 (파일 전체를 메모리에 두지 않음)"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    box = pa.struct([
+        ("label", pa.string()), ("cls", pa.int32()), ("conf", pa.float32()),
+        ("x1", pa.float32()), ("y1", pa.float32()), ("x2", pa.float32()), ("y2", pa.float32()),
+    ])
+    return pa.schema([
+        ("job_id", pa.string()), ("t", pa.float64()), ("wall_ts", pa.float64()), ("state", pa.string()),
+        ("fire", pa.float32()), ("smoke", pa.float32()), ("hazard", pa.float32()),
+        ("raw_fire", pa.float32()), ("raw_smoke", pa.float32()),
+        ("gated", pa.bool_()), ("gap", pa.bool_()), ("n_boxes", pa.int32()), ("boxes", pa.list_(box)),
+    ])
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_chunks(rows: Iterable[Dict[str, Any]], row_group: int = 10000) -> Iterator[bytes]:
+    """row_group 행마다 row group 1개를 쓰고 그 바이트를 바로 내보냄 (footer 는 마지막 청크)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportUnavailable("parquet export requires pyarrow") from e
+
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    columns: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+
+    def flush_group() -> bytes:
+        writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+        return sink.drain()
+
+    try:
+        n = 0
+        for row in rows:
+            for c in COLUMNS:
+                columns[c].append(row[c])
+            n += 1
+            if n % row_group == 0:
+                yield flush_group()
+        if n % row_group:
+            yield flush_group()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {"ndjson": ndjson_chunks, "csv": csv_chunks, "parquet": parquet_chunks}
+
+
+def export_chunks(rows: Iterable[Dict[str, Any]], fmt: str) -> Iterator[bytes]:
+    if fmt not in WRITERS:
+        raise ValueError(f"format must be one of {', '.join(WRITERS)}")
+    if fmt == "parquet" and not parquet_available():
+        raise ExportUnavailable("parquet export requires pyarrow")
+    return WRITERS[fmt](rows)
@@ -0,0 +1,368 @@
+# backend/frame_reuse.py
+"""
+지각 해시 기반 감지 결과 재사용 (media/frame_index.db, SQLite)
+- 같은 카메라 영상을 다시 자르거나 재인코딩해 올리면 바이트 해시는 달라도 프레임은 거의 같음
+  → 추론한 프레임마다 지문(지각 해시)과 감지 결과를 색인에 남기고, 새 영상 프레임이 이미 분석한 프레임과
+    맞으면 감지 엔진 대신 저장된 결과를 씀 (EMA/상태 계산은 그대로 다시)
+- 지문: 축소 회색조 dHash 64비트(조회 키) + 256비트(검증) + 16×16 칸별 불꽃 색 픽셀 비율 / 밝기·채도 평균(검증)
+  작은 불꽃이나 옅은 연기는 해시 비트를 거의 바꾸지 않으므로 어느 한 칸이라도 불꽃 색 비율이 다르거나
+  밝기/채도가 달라지면(연기 = 회색 막) 재사용하지 않음
+- 조회: 64비트를 16비트 4조각으로 나눠 조각별 색인 - 해밍 거리 3 이하면 적어도 한 조각이 정확히 같음 (비둘기집)
+  조각이 같은 행 중 64비트/256비트 거리 조건을 SQL 안에서 걸러 256비트 거리 순으로 max_candidates 개만 검증
+  → 거리 조건을 만족하는 프레임은 빠짐없이 후보가 됨 (같은 조각 값이 많은 정지/어두운 화면은 조회가 느려짐)
+- 재사용은 다른 업로드의 정렬된 구간에서만: 처음 맞은 위치부터 같은 시각 차이로 confirm 프레임 연속 맞고
+  그동안 실제 추론 결과가 원본과 같아야 그 뒤부터 재사용 (자기 job 의 기록은 쓰지 않음)
+- 결과 좌표는 0~1 로 저장해 해상도가 달라도 재사용, 모델/감지 설정이 바뀌면(model 서명) 서로 섞이지 않음
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from detectors.cascade import fire_color_mask, shrink
+
+REUSE_DEFAULTS: Dict[str, Any] = {
+    "enabled": False,
+    "size": 64,            # 해시 계산 입력 긴 변(px)
+    "fire_size": 256,      # 불꽃 색 비율 계산 입력 긴 변(px) - 작은 불꽃도 몇 픽셀은 남도록
+    "max_dist64": 3,       # 조회 키 해밍 거리 (3 이하만 조각 색인으로 빠짐없이 찾음)
+    "max_dist256": 20,     # 검증용 256비트 해밍 거리
+    "fire_abs": 0.04,      # 칸별 불꽃 색 비율 허용 차이: max(fire_abs, fire_rel × 큰 쪽)
+    "fire_rel": 0.25,      # (256px 에서 한 칸 16×9 픽셀 → fire_abs ≈ 6픽셀, 원본에 없던 작은 불꽃이면 재사용 안 함)
+    "tone_tol": 4,         # 칸별 밝기 평균 허용 차이 (0~255) - 회색 연기 막 10% 이상이면 넘음
+    "sat_tol": 12,         # 칸별 채도 평균 허용 차이 (0~255) - 색이 있는 장면에 낀 연기
+    "align_tol": 0.15,     # 연속 적중 확인 때 원본 시각 허용 오차(초)
+    "confirm": 3,          # 재사용 전 정렬된 위치에서 연속으로 맞고 추론 결과도 같아야 하는 프레임 수
+    "agree_tol": 0.05,     # 확인 중 추론 결과와 원본 fire/smoke 점수 허용 차이
+    "max_candidates": 64,  # 조각별 후보 상한 (정지 화면처럼 같은 키가 많을 때)
+    "flush_every": 64,     # 색인 기록 묶음 크기
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    t REAL NOT NULL,
+    h64 INTEGER NOT NULL,
+    b0 INTEGER NOT NULL,
+    b1 INTEGER NOT NULL,
+    b2 INTEGER NOT NULL,
+    b3 INTEGER NOT NULL,
+    h256 BLOB NOT NULL,
+    fire BLOB NOT NULL,
+    tone BLOB NOT NULL,
+    infer_ms REAL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frames_b0 ON frames(model, b0);
+CREATE INDEX IF NOT EXISTS frames_b1 ON frames(model, b1);
+CREATE INDEX IF NOT EXISTS frames_b2 ON frames(model, b2);
+CREATE INDEX IF NOT EXISTS frames_b3 ON frames(model, b3);
+CREATE INDEX IF NOT EXISTS frames_src ON frames(model, job_id, t);
+"""
+_CANDIDATE = "SELECT id, job_id, t, h64, h256, fire, tone FROM frames"
+
+GRID = 16
+# (h64, h256, 칸별 불꽃 색 비율 uint8 × 16×16 - 불꽃 색이 없으면 b"", 칸별 밝기 평균 + 채도 평균 uint8 × 16×16×2)
+Fingerprint = Tuple[int, bytes, bytes, bytes]
+
+
+def _dhash(gray: np.ndarray, n: int) -> bytes:
+    """(n+1)×n 으로 줄여 가로 이웃 밝기 비교 → n×n 비트"""
+    small = cv2.resize(gray, (n + 1, n), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
+
+
+def fingerprint(frame: np.ndarray, size: int = REUSE_DEFAULTS["size"],
+                fire_size: int = REUSE_DEFAULTS["fire_size"]) -> Fingerprint:
+    small = shrink(frame, fire_size)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    grid = cv2.resize(fire_color_mask(hsv).astype(np.float32), (GRID, GRID), interpolation=cv2.INTER_AREA)
+    q = np.rint(grid * 255).astype(np.uint8)
+    fire = q.tobytes() if q.any() else b""  # 대부분의 프레임 - 색인 크기 절약
+    tone = cv2.resize(hsv[:, :, 1:].astype(np.float32), (GRID, GRID), interpolation=cv2.INTER_AREA)
+    tone = np.rint(tone).astype(np.uint8).tobytes()  # 칸마다 (채도, 밝기)
+    gray = cv2.cvtColor(shrink(small, size), cv2.COLOR_BGR2GRAY)
+    return int.from_bytes(_dhash(gray, 8), "big"), _dhash(gray, 16), fire, tone
+
+
+def _signed(h: int) -> int:
+    """SQLite INTEGER 는 부호 있는 64비트"""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _bands(h: int) -> List[int]:
+    return [(h >> (16 * i)) & 0xFFFF for i in range(4)]
+
+
+def _dist(a: bytes, b: bytes) -> int:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).bit_count()
+
+
+def _hd64(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+def _fire_close(a: bytes, b: bytes, abs_tol: float, rel_tol: float) -> bool:
+    if a == b:
+        return True
+    fa = np.frombuffer(a or bytes(GRID ** 2), dtype=np.uint8).astype(np.int16)
+    fb = np.frombuffer(b or bytes(GRID ** 2), dtype=np.uint8).astype(np.int16)
+    tol = np.maximum(abs_tol * 255, rel_tol * np.maximum(fa, fb))
+    return bool((np.abs(fa - fb) <= tol).all())
+
+
+def _tone_close(a: bytes, b: bytes, tone_tol: float, sat_tol: float) -> bool:
+    """칸별 밝기/채도 평균이 모두 허용 범위 안 (옅은 연기 막은 해시는 그대로여도 여기서 걸림)"""
+    d = np.abs(np.frombuffer(a, dtype=np.uint8).astype(np.int16)
+               - np.frombuffer(b, dtype=np.uint8).astype(np.int16)).reshape(-1, 2)
+    return bool((d[:, 0] <= sat_tol).all() and (d[:, 1] <= tone_tol).all())
+
+
+def model_signature(detector: Any) -> str:
+    """감지 결과를 바꾸는 것(가중치, 감지 설정, 클래스 매핑)의 해시 - 다르면 재사용하지 않음"""
+    weights = getattr(getattr(detector, "backend", None), "weights", None)
+    mtime = Path(weights).stat().st_mtime if weights and Path(weights).exists() else None
+    blob = json.dumps({"cfg": detector.cfg, "names": detector.names, "weights": weights, "mtime": mtime},
+                      sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_result(fire_raw: float, smoke_raw: float, boxes: Sequence[Dict[str, Any]], dets: Any,
+                  w: int, h: int) -> str:
+    """감지 결과 → JSON (좌표는 0~1)"""
+    nboxes = [{**b, "x1": b["x1"] / w, "y1": b["y1"] / h, "x2": b["x2"] / w, "y2": b["y2"] / h} for b in boxes]
+    d = np.asarray(dets, dtype=np.float64).reshape(-1, 6).copy()
+    d[:, 2::2] /= w
+    d[:, 3::2] /= h
+    return json.dumps({"fire": fire_raw, "smoke": smoke_raw, "boxes": nboxes, "dets": d.tolist()},
+                      separators=(",", ":"))
+
+
+def decode_result(text: str, w: int, h: int) -> Tuple[float, float, List[Dict[str, Any]], np.ndarray]:
+    """JSON → (fire_raw, smoke_raw, boxes_out, dets) - 현재 프레임 크기 좌표로"""
+    r = json.loads(text)
+    boxes = [{**b, "x1": b["x1"] * w, "y1": b["y1"] * h, "x2": b["x2"] * w, "y2": b["y2"] * h} for b in r["boxes"]]
+    dets = np.asarray(r["dets"], dtype=np.float64).reshape(-1, 6)
+    dets[:, 2::2] *= w
+    dets[:, 3::2] *= h
+    return r["fire"], r["smoke"], boxes, dets
+
+
+class FrameIndex:
+    """지문 → 감지 결과 색인 (프로세스 공용, worker 간에는 같은 DB 파일을 공유)"""
+
+    def __init__(self, path: Path, model: str, cfg: Optional[Dict[str, Any]] = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.model = model
+        self.cfg = {**REUSE_DEFAULTS, **(cfg or {})}
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.create_function("hd64", 2, _hd64, deterministic=True)
+        self._db.create_function("hd256", 2, _dist, deterministic=True)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, "ReuseSession"] = {}  # job_id -> 현재 분석 실행의 세션 (이 세션만 기록)
+
+    def session(self, job_id: str) -> "ReuseSession":
+        """job 분석 시작 → 세션 (같은 job 의 이전 세션은 더 이상 기록하지 않음)"""
+        s = self._sessions[job_id] = ReuseSession(self, job_id)
+        return s
+
+    # ---------- 기록 ----------
+
+    def insert(self, rows: Sequence[Tuple[str, float, Fingerprint, float, str]]) -> None:
+        """rows: (job_id, t, 지문, 추론 ms, 결과 JSON)"""
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO frames (model, job_id, t, h64, b0, b1, b2, b3, h256, fire, tone, infer_ms, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.model, job_id, t, _signed(fp[0]), *_bands(fp[0]), fp[1], fp[2], fp[3], infer_ms, result)
+                 for job_id, t, fp, infer_ms, result in rows],
+            )
+
+    def delete_job(self, job_id: str) -> None:
+        """재분석: 그 job 이 남긴 프레임을 지우고 새로 기록"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM frames WHERE model = ? AND job_id = ?", (self.model, job_id))
+
+    # ---------- 조회 ----------
+
+    def _verify(self, fp: Fingerprint, rows) -> Optional[Tuple[int, str, float]]:
+        """후보 중 네 조건을 모두 만족하는 가장 가까운 프레임 → (id, 원본 job_id, 원본 t)"""
+        c = self.cfg
+        h64 = _signed(fp[0])
+        best, best_d = None, None
+        for rid, job_id, t, cand64, cand256, fire, tone in rows:
+            if _hd64(cand64, h64) > c["max_dist64"]:
+                continue
+            d = _dist(cand256, fp[1])
+            if d > c["max_dist256"] or (best_d is not None and d >= best_d):
+                continue
+            if not _fire_close(fire, fp[2], c["fire_abs"], c["fire_rel"]):
+                continue
+            if not _tone_close(tone, fp[3], c["tone_tol"], c["sat_tol"]):
+                continue
+            best, best_d = (rid, job_id, t), d
+        return best
+
+    def match(self, fp: Fingerprint, hint: Optional[Tuple[str, float]] = None,
+              exclude_job: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        지문과 맞는 분석된 프레임 → {"id", "job_id", "t", "infer_ms", "result", "continued"} (없으면 None)
+        hint: (원본 job_id, 예상 원본 t) - 직전 적중에서 이어지는 위치를 먼저 확인
+        exclude_job: 이 job 이 기록한 프레임은 후보에서 뺌
+        """
+        c = self.cfg
+        with self._lock:
+            found, continued = None, False
+            if hint is not None and hint[0] != exclude_job:
+                rows = self._db.execute(
+                    f"{_CANDIDATE} WHERE model = ? AND job_id = ? AND t BETWEEN ? AND ?",
+                    (self.model, hint[0], hint[1] - c["align_tol"], hint[1] + c["align_tol"]),
+                ).fetchall()
+                found = self._verify(fp, rows)
+                continued = found is not None
+            if found is None:
+                # 조각 색인으로 좁힌 뒤 거리 조건을 SQL 에서 걸러 가까운 순으로 - LIMIT 이 임의의 행을 자르지 않음
+                h64 = _signed(fp[0])
+                rows = []
+                for i, band in enumerate(_bands(fp[0])):
+                    rows += self._db.execute(
+                        f"{_CANDIDATE} WHERE model = ? AND b{i} = ? AND job_id != ? AND hd64(h64, ?) <= ? "
+                        f"AND hd256(h256, ?) <= ? ORDER BY hd256(h256, ?) LIMIT ?",
+                        (self.model, band, exclude_job or "", h64, c["max_dist64"],
+                         fp[1], c["max_dist256"], fp[1], c["max_candidates"]),
+                    ).fetchall()
+                found = self._verify(fp, rows)
+            if found is None:
+                return None
+            infer_ms, result = self._db.execute(
+                "SELECT infer_ms, result FROM frames WHERE id = ?", (found[0],)
+            ).fetchone()
+        return {"id": found[0], "job_id": found[1], "t": found[2], "infer_ms": infer_ms or 0.0,
+                "result": result, "continued": continued}
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            (frames,) = self._db.execute("SELECT COUNT(*) FROM frames").fetchone()
+        return {"model": self.model, "frames": frames,
+                "size_mb": round(self.path.stat().st_size / 2 ** 20, 1)}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ReuseSession:
+    """
+    job 1개의 재사용 상태: lookup(frame, t) 로 조회하고, 맞지 않아 실제로 추론했으면 record(...) 로 색인에 추가
+    통계: 조회/적중 수, 재사용 비율, 조회 비용, 절약한 추론 시간(원본 프레임의 실측 추론 시간 합 - 조회 비용)
+    """
+
+    def __init__(self, index: FrameIndex, job_id: str):
+        self.index = index
+        self.job_id = job_id
+        self.last_hit = False
+        self._fp: Optional[Fingerprint] = None
+        self._cursor: Optional[Tuple[str, float, float]] = None  # (원본 job_id, 원본 t, 이 job t)
+        self._confirmed = 0                                      # 정렬된 위치에서 추론 결과까지 같았던 연속 프레임 수
+        self._expect: Optional[Tuple[float, float]] = None       # 확인 중인 원본 프레임의 (fire, smoke)
+        self._pending: List[Tuple[str, float, Fingerprint, float, str]] = []
+        self._saved_ms = self._lookup_ms = 0.0
+        self.stats: Dict[str, Any] = {
+            "lookups": 0,
+            "hits": 0,
+            "recorded": 0,
+            "segments": 0,         # 확인을 거쳐 재사용한 정렬 구간 수
+            "rejected": 0,         # 확인 중 추론 결과가 원본과 달라 버린 구간 수
+            "sources": {},         # 원본 job_id → 적중 수
+            "reuse_ratio": 0.0,
+            "lookup_ms": 0.0,      # 조회 1회 평균 (지문 + 색인)
+            "cpu_saved_s": 0.0,
+        }
+
+    def lookup(self, frame: np.ndarray, t: float) -> Optional[Tuple[float, float, List[Dict[str, Any]], np.ndarray]]:
+        """이미 분석한 프레임과 맞으면 그 감지 결과 (fire_raw, smoke_raw, boxes_out, dets), 아니면 None"""
+        started = time.perf_counter()
+        self._fp = fingerprint(frame, self.index.cfg["size"], self.index.cfg["fire_size"])
+        hint = None
+        if self._cursor is not None:
+            src_job, src_t, at = self._cursor
+            hint = (src_job, src_t + (t - at))
+        hit = self.index.match(self._fp, hint, exclude_job=self.job_id)
+        st = self.stats
+        st["lookups"] += 1
+        self.last_hit = False
+        self._expect = None
+        out = None
+        if hit is None:
+            self._cursor, self._confirmed = None, 0
+        else:
+            if not hit["continued"]:
+                self._confirmed = 0  # 새 위치 - 정렬 구간 확인부터 다시
+            self._cursor = (hit["job_id"], hit["t"], t)
+            h, w = frame.shape[:2]
+            result = decode_result(hit["result"], w, h)
+            if self._confirmed < self.index.cfg["confirm"]:
+                self._expect = (result[0], result[1])  # 이번 프레임은 추론해서 record() 에서 비교
+            else:
+                self.last_hit = True
+                st["hits"] += 1
+                st["sources"][hit["job_id"]] = st["sources"].get(hit["job_id"], 0) + 1
+                if self._confirmed == self.index.cfg["confirm"]:
+                    st["segments"] += 1
+                    self._confirmed += 1
+                self._saved_ms += hit["infer_ms"]
+                out = result
+        self._lookup_ms += (time.perf_counter() - started) * 1000
+        st["reuse_ratio"] = round(st["hits"] / st["lookups"], 4)
+        st["lookup_ms"] = round(self._lookup_ms / st["lookups"], 3)
+        st["cpu_saved_s"] = round((self._saved_ms - self._lookup_ms) / 1000, 3)
+        return out
+
+    def record(self, t: float, fire_raw: float, smoke_raw: float, boxes: Sequence[Dict[str, Any]], dets: Any,
+               w: int, h: int, infer_s: float) -> None:
+        """
+        직전 lookup 에서 재사용하지 않아 실제로 추론한 결과를 색인에 추가 (묶어서 기록)
+        정렬 구간 확인 중이면 원본 결과와 비교 - 같으면 확인 프레임 수 +1, 다르면 그 구간은 버림
+        """
+        if self._fp is None or self.last_hit:
+            return
+        if self._expect is not None:
+            tol = self.index.cfg["agree_tol"]
+            if abs(fire_raw - self._expect[0]) <= tol and abs(smoke_raw - self._expect[1]) <= tol:
+                self._confirmed += 1
+            else:
+                self._cursor, self._confirmed = None, 0
+                self.stats["rejected"] += 1
+            self._expect = None
+        self._pending.append((self.job_id, t, self._fp, infer_s * 1000,
+                              encode_result(fire_raw, smoke_raw, boxes, dets, w, h)))
+        self._fp = None
+        self.stats["recorded"] += 1
+        if len(self._pending) >= self.index.cfg["flush_every"]:
+            self.flush()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, []
+        # 재분석이 새 세션을 만든 뒤(delete_job 후)에는 이전 실행의 프레임을 다시 넣지 않음
+        if self.index._sessions.get(self.job_id) is self:
+            self.index.insert(pending)
+
+    def close(self) -> None:
+        """분석 종료: 남은 기록을 쓰고 세션 해제"""
+        self.flush()
+        if self.index._sessions.get(self.job_id) is self:
+            del self.index._sessions[self.job_id]
@@ -0,0 +1,283 @@
+# backend/incidents.py
+"""
+사고 구간 색인 (media/incidents.db, SQLite)
+- 분석 중 tick 상태 열을 run-length 구간으로 접음: 같은 상태가 이어지는 동안 = 구간 1개
+  (state, 시작/끝 시각, 영상 시각 구간, 최대 hazard / fire / smoke, tick 수) - NORMAL 은 기록하지 않음
+- 전체 프레임 + 감지 구역(zones)별로 따로 접음 (zone 열, 전체 프레임은 NULL)
+- 구간은 상태가 바뀌거나 seek / 분석 종료 때 닫혀 DB 에 한 줄로 저장, 진행 중인 구간은 조회 때 메모리에서 합침
+- 조회: 시각 구간과 겹치는 구간 = (start_ts, end_ts) R*Tree 색인(incidents_span)으로 후보만 읽고 정확한 값으로 거름
+  → 구간 길이와 상관없이 몇 달치 기록에서도 밀리초 단위
+- 영상 시각(t)은 TickLog 처럼 오름차순만 - seek 로 이미 지난 구간을 다시 분석하면 그 tick 은 건너뜀
+  "gap" tick (앞으로 seek 해서 건너뛴 구간 뒤) 에서는 구간을 닫음 → 분석하지 않은 영상 시각은 구간에 넣지 않음
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from scoring import STATES
+
+RANK = {s: i for i, s in enumerate(STATES)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    kind TEXT,
+    name TEXT,
+    zone TEXT,
+    state TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    start_t REAL,
+    end_t REAL,
+    peak_hazard REAL,
+    peak_fire REAL,
+    peak_smoke REAL,
+    ticks INTEGER,
+    video_url TEXT
+);
+CREATE INDEX IF NOT EXISTS incidents_start ON incidents(start_ts);
+CREATE INDEX IF NOT EXISTS incidents_job ON incidents(job_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS incidents_span USING rtree(id, start_ts, end_ts);
+CREATE TRIGGER IF NOT EXISTS incidents_span_ins AFTER INSERT ON incidents BEGIN
+    INSERT INTO incidents_span VALUES (new.id, new.start_ts, new.end_ts);
+END;
+CREATE TRIGGER IF NOT EXISTS incidents_span_del AFTER DELETE ON incidents BEGIN
+    DELETE FROM incidents_span WHERE id = old.id;
+END;
+"""
+COLUMNS = ("job_id", "kind", "name", "zone", "state", "rank", "start_ts", "end_ts", "start_t", "end_t",
+           "peak_hazard", "peak_fire", "peak_smoke", "ticks", "video_url")
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """unix 초 또는 ISO 8601 (시간대가 없으면 서버 로컬 시각) → unix 초"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"invalid time: {value!r} (unix seconds or ISO 8601)") from None
+
+
+class _Folder:
+    """상태 1개 열(전체 프레임 또는 구역 1개) → 진행 중인 구간 1개"""
+
+    def __init__(self, base: Dict[str, Any]):
+        self.base = base
+        self.open: Optional[Dict[str, Any]] = None
+
+    def update(self, state: str, t: float, ts: float, scores: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """tick 1개 → 상태가 바뀌어 닫힌 구간 (없으면 None)"""
+        cur = self.open
+        if cur is not None and cur["state"] == state:
+            cur["end_t"], cur["end_ts"] = t, ts
+            cur["peak_hazard"] = max(cur["peak_hazard"], scores.get("hazard", 0.0))
+            cur["peak_fire"] = max(cur["peak_fire"], scores.get("fire", 0.0))
+            cur["peak_smoke"] = max(cur["peak_smoke"], scores.get("smoke", 0.0))
+            cur["ticks"] += 1
+            return None
+        closed = self.close(t, ts)
+        if state != "NORMAL":
+            self.open = {
+                **self.base, "state": state, "rank": RANK.get(state, 0),
+                "start_t": t, "end_t": t, "start_ts": ts, "end_ts": ts,
+                "peak_hazard": scores.get("hazard", 0.0),
+                "peak_fire": scores.get("fire", 0.0),
+                "peak_smoke": scores.get("smoke", 0.0),
+                "ticks": 1,
+            }
+        return closed
+
+    def close(self, t: Optional[float] = None, ts: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """진행 중인 구간을 닫음 (다음 상태의 첫 tick 시각이 있으면 그때까지)"""
+        cur, self.open = self.open, None
+        if cur is not None and t is not None:
+            cur["end_t"], cur["end_ts"] = t, ts
+        return cur
+
+
+class IncidentTracker:
+    """job 1개의 tick → 구간 (전체 프레임 + 구역별)"""
+
+    def __init__(self, store: "IncidentStore", job_id: str, kind: str, name: Optional[str],
+                 video_url: Optional[str]):
+        self.store = store
+        self.job_id = job_id
+        self.base = {"job_id": job_id, "kind": kind, "name": name, "video_url": video_url}
+        self.folders: Dict[Optional[str], _Folder] = {}
+        self.max_t: Optional[float] = None
+
+    def _folder(self, zone: Optional[str]) -> _Folder:
+        f = self.folders.get(zone)
+        if f is None:
+            f = self.folders[zone] = _Folder({**self.base, "zone": zone})
+        return f
+
+    def observe(self, tick: Dict[str, Any]) -> None:
+        t = tick["t"]
+        if self.max_t is not None and t <= self.max_t:
+            return
+        self.max_t = t
+        if tick.get("gap"):
+            self.cut()
+        ts = tick.get("wall_ts") or time.time()
+        closed = [self._folder(None).update(tick["state"], t, ts, tick.get("scores") or {})]
+        for zone, z in (tick.get("zones") or {}).items():
+            closed.append(self._folder(zone).update(z["state"], t, ts, z.get("scores") or {}))
+        self._insert([c for c in closed if c is not None])
+
+    def cut(self) -> None:
+        """seek: 영상 시각이 끊기므로 진행 중인 구간을 모두 닫음"""
+        self._insert([c for c in (f.close() for f in self.folders.values()) if c is not None])
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        # 재분석이 새 기록기를 만든 뒤(delete_job 후)에는 이전 실행의 구간을 다시 넣지 않음
+        if rows and self.store.trackers.get(self.job_id) is self:
+            self.store.insert(rows)
+
+    def open_intervals(self) -> List[Dict[str, Any]]:
+        return [dict(f.open) for f in self.folders.values() if f.open is not None]
+
+
+class IncidentStore:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        has_span = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'incidents_span'").fetchone() is not None
+        self._db.executescript(SCHEMA)
+        if not has_span:
+            # R*Tree 색인 이전에 만든 DB: 기존 구간을 한 번 채움
+            with self._db:
+                self._db.execute("INSERT INTO incidents_span SELECT id, start_ts, end_ts FROM incidents")
+        self._lock = threading.Lock()
+        self.trackers: Dict[str, IncidentTracker] = {}
+
+    # ---------- 기록 ----------
+
+    def tracker(self, job_id: str, kind: str = "upload", name: Optional[str] = None,
+                video_url: Optional[str] = None, reset: bool = False) -> IncidentTracker:
+        """job 분석 시작 → 구간 기록기 (reset: 재분석이라 이전 구간을 지움)"""
+        if reset:
+            self.delete_job(job_id)
+        tr = self.trackers[job_id] = IncidentTracker(self, job_id, kind, name, video_url)
+        return tr
+
+    def release(self, tracker: IncidentTracker) -> None:
+        """분석 종료 → 진행 중인 구간을 닫고 기록기 해제 (이미 재분석 기록기로 바뀌었으면 아무것도 기록하지 않음)"""
+        tracker.cut()
+        if self.trackers.get(tracker.job_id) is tracker:
+            del self.trackers[tracker.job_id]
+
+    def insert(self, rows: Iterable[Dict[str, Any]]) -> int:
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT INTO incidents ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(r[c] for c in COLUMNS) for r in rows],
+            )
+        return len(rows)
+
+    def delete_job(self, job_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM incidents WHERE job_id = ?", (job_id,))
+
+    def close(self) -> None:
+        for tr in list(self.trackers.values()):
+            self.release(tr)
+        self._db.close()
+
+    # ---------- 조회 ----------
+
+    def query(self, since: Optional[float] = None, until: Optional[float] = None, min_state: str = "PRE_FIRE",
+              job_id: Optional[str] = None, zone: Optional[str] = None,
+              limit: int = 10000) -> List[Dict[str, Any]]:
+        """
+        [since, until] 과 겹치는 min_state 이상 구간 (시작 시각 순, 진행 중인 구간 포함)
+        zone: None = 전체 프레임, "*" = 전체 프레임 + 모든 구역, 그 외 = 해당 구역
+        """
+        if min_state not in RANK:
+            raise ValueError(f"min_state must be one of {', '.join(STATES)}")
+        rank = RANK[min_state]
+        sql, args = ["rank >= ?"], [rank]
+        if since is not None:
+            # R*Tree 는 float32 라 범위를 바깥쪽으로 반올림 → 후보는 넉넉히, 정확한 겹침은 end_ts/start_ts 로
+            sql.append("id IN (SELECT id FROM incidents_span WHERE end_ts >= ? AND start_ts <= ?) AND end_ts >= ?")
+            args += [since, float("inf") if until is None else until, since]
+        if until is not None:
+            sql.append("start_ts <= ?")
+            args.append(until)
+        if job_id is not None:
+            sql.append("job_id = ?")
+            args.append(job_id)
+        if zone is None:
+            sql.append("zone IS NULL")
+        elif zone != "*":
+            sql.append("zone = ?")
+            args.append(zone)
+        with self._lock:
+            rows = [dict(r) for r in self._db.execute(
+                f"SELECT * FROM incidents WHERE {' AND '.join(sql)} ORDER BY start_ts LIMIT ?", args + [limit]
+            )]
+
+        for tr in list(self.trackers.values()):
+            if job_id is not None and tr.job_id != job_id:
+                continue
+            for r in tr.open_intervals():
+                if (r["rank"] >= rank and (since is None or r["end_ts"] >= since)
+                        and (until is None or r["start_ts"] <= until)
+                        and (zone == "*" or r["zone"] == zone)):
+                    rows.append({**r, "open": True})
+        rows.sort(key=lambda r: r["start_ts"])
+        return rows[:limit]
+
+
+def summarize(rows: List[Dict[str, Any]], since: Optional[float], until: Optional[float]) -> List[Dict[str, Any]]:
+    """job(+구역) 별: 최고 상태, 조회 구간 안에 든 시간 합(초), 구간 수"""
+    per: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+    for r in rows:
+        key = (r["job_id"], r["zone"])
+        s = per.get(key)
+        if s is None:
+            s = per[key] = {"job_id": r["job_id"], "name": r["name"], "kind": r["kind"], "zone": r["zone"],
+                            "max_state": r["state"], "peak_hazard": 0.0, "total_s": 0.0, "intervals": 0}
+        lo = r["start_ts"] if since is None else max(r["start_ts"], since)
+        hi = r["end_ts"] if until is None else min(r["end_ts"], until)
+        s["total_s"] += max(0.0, hi - lo)
+        s["intervals"] += 1
+        s["peak_hazard"] = max(s["peak_hazard"], r["peak_hazard"])
+        if RANK[r["state"]] > RANK[s["max_state"]]:
+            s["max_state"] = r["state"]
+    out = sorted(per.values(), key=lambda s: (-RANK[s["max_state"]], -s["total_s"]))
+    for s in out:
+        s["total_s"] = round(s["total_s"], 1)
+    return out
+
+
+def public(row: Dict[str, Any]) -> Dict[str, Any]:
+    """API 응답 형식: 영상 구간 링크 포함 (업로드 영상은 media fragment #t=시작,끝)"""
+    out = {k: row[k] for k in ("job_id", "kind", "name", "zone", "state", "start_ts", "end_ts",
+                               "peak_hazard", "peak_fire", "peak_smoke", "ticks")}
+    out["duration"] = round(row["end_ts"] - row["start_ts"], 3)
+    out["open"] = bool(row.get("open"))
+    video = {"start": row["start_t"], "end": row["end_t"]}
+    if row.get("video_url"):
+        video["url"] = f"{row['video_url']}#t={row['start_t']:.2f},{row['end_t']:.2f}"
+    out["video"] = video
+    return out
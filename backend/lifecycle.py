@@ -0,0 +1,254 @@
+# backend/lifecycle.py
+"""
+job 수명 관리 (장시간 구동 서버의 메모리/디스크 증가 방지)
+- 완료된 job 의 메모리 상태(JOBS/EVENT_QUEUES/RENDER_JOBS)는 job_ttl 후 제거
+- 완료 job 의 이벤트 큐는 마지막 구독자가 떠난 뒤 queue_idle_ttl 후 제거
+- 업로드 + 파생 산출물(media/runs, media/snap) 전체 용량이 disk_quota 를 넘으면
+  가장 오래 접근하지 않은 job 부터 파일 삭제(LRU)
+- 분석/렌더/프리뷰 진행 중이거나 구독자가 있는 job 은 절대 건드리지 않음
+"""
+
+import asyncio
+import json
+import os
+import resource
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from media_range import forget_etag
+
+LIFECYCLE_DEFAULTS = {
+    "job_ttl": 6 * 3600,         # 완료 job 메모리 보존 시간(초)
+    "queue_idle_ttl": 600,       # 구독자 없는 완료 job 큐 보존 시간(초)
+    "disk_quota_mb": 20 * 1024,  # 업로드 + 산출물 전체 한도
+    "sweep_interval": 60,        # 정리 주기(초)
+}
+
+
+def dir_size(path: Path) -> int:
+    """디렉토리(또는 파일) 전체 크기"""
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        total += e.stat(follow_symlinks=False).st_size
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def process_rss() -> int:
+    """현재 프로세스 RSS(bytes) - /proc 이 없으면 최대 RSS 로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class LifecycleManager:
+    """JOBS 등 전역 상태와 미디어 디렉토리를 주기적으로 정리"""
+
+    def __init__(self, jobs: Dict[str, Dict[str, Any]], queues: Dict[str, asyncio.Queue],
+                 flags: Dict[str, Dict[str, Any]], renders: Dict[str, Dict[str, Any]],
+                 snapshots, uploads: Path, runs: Path, cfg: Dict[str, Any]):
+        self.jobs = jobs
+        self.queues = queues
+        self.flags = flags
+        self.renders = renders
+        self.snapshots = snapshots
+        self.uploads = uploads
+        self.runs = runs
+        self.cfg = dict(LIFECYCLE_DEFAULTS, **cfg)
+        self.subscribers: Dict[str, int] = {}
+        self.last_sweep: Dict[str, Any] = {}
+        self._task = None
+
+    # ---------- 이벤트 훅 ----------
+    def touch(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job["last_access"] = time.time()
+
+    def subscribe(self, job_id: str) -> None:
+        self.subscribers[job_id] = self.subscribers.get(job_id, 0) + 1
+        self.touch(job_id)
+
+    def unsubscribe(self, job_id: str) -> None:
+        n = self.subscribers.get(job_id, 0) - 1
+        if n > 0:
+            self.subscribers[job_id] = n
+        else:
+            self.subscribers.pop(job_id, None)
+            job = self.jobs.get(job_id)
+            if job is not None:
+                job["idle_since"] = time.time()
+
+    def mark_finished(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job["finished_at"] = job["idle_since"] = time.time()
+
+    def is_busy(self, job_id: str) -> bool:
+        """분석/렌더/프리뷰 진행 중이거나 구독자가 있으면 정리 대상에서 제외"""
+        if job_id in self.flags or self.subscribers.get(job_id):
+            return True
+        render = self.renders.get(job_id)
+        if render and render.get("status") == "running":
+            return True
+        job = self.jobs.get(job_id)
+        return bool(job and job.get("preview") == "pending")
+
+    # ---------- 정리 ----------
+    def forget(self, job_id: str) -> None:
+        """메모리 상태만 제거 (파일은 디스크 한도 정책에 맡김)"""
+        self.jobs.pop(job_id, None)
+        self.queues.pop(job_id, None)
+        self.renders.pop(job_id, None)
+
+    def sweep_memory(self, now: float) -> Dict[str, int]:
+        queues_dropped = jobs_dropped = 0
+        for job_id in list(self.queues):
+            if self.is_busy(job_id):
+                continue
+            job = self.jobs.get(job_id)
+            idle_since = job.get("idle_since") if job else None
+            if job is None or (idle_since and now - idle_since >= self.cfg["queue_idle_ttl"]):
+                self.queues.pop(job_id, None)
+                queues_dropped += 1
+
+        for job_id, job in list(self.jobs.items()):
+            finished = job.get("finished_at")
+            if finished and not self.is_busy(job_id) and now - finished >= self.cfg["job_ttl"]:
+                self.forget(job_id)
+                jobs_dropped += 1
+        return {"queues_dropped": queues_dropped, "jobs_dropped": jobs_dropped}
+
+    def disk_usage(self) -> Dict[str, Dict[str, Any]]:
+        """job 별 디스크 사용량 (업로드/산출물/스냅샷) + 마지막 수정 시각"""
+        usage: Dict[str, Dict[str, Any]] = {}
+
+        def add(job_id: str, kind: str, path: Path):
+            if not path.exists():
+                return
+            entry = usage.setdefault(job_id, {"upload": 0, "runs": 0, "snap": 0, "mtime": 0.0})
+            entry[kind] += dir_size(path)
+            entry["mtime"] = max(entry["mtime"], path.stat().st_mtime)
+
+        for p in self.uploads.glob("*.mp4"):
+            add(p.stem, "upload", p)
+        for p in self.runs.iterdir():
+            if p.is_dir():
+                add(p.name, "runs", p)
+        for p in self.snapshots.root.iterdir():
+            if p.is_dir():
+                add(p.name, "snap", p)
+        for entry in usage.values():
+            entry["total"] = entry["upload"] + entry["runs"] + entry["snap"]
+        return usage
+
+    def pick_disk_victims(self, usage: Dict[str, Dict[str, Any]]) -> List[str]:
+        """한도 초과분을 채울 때까지 LRU 순으로 삭제 대상 선정"""
+        quota = self.cfg["disk_quota_mb"] << 20
+        total = sum(u["total"] for u in usage.values())
+        if total <= quota:
+            return []
+
+        def last_used(job_id: str) -> float:
+            job = self.jobs.get(job_id) or {}
+            return job.get("last_access") or usage[job_id]["mtime"]
+
+        victims = []
+        for job_id in sorted(usage, key=last_used):
+            if total <= quota:
+                break
+            if self.is_busy(job_id):
+                continue
+            victims.append(job_id)
+            total -= usage[job_id]["total"]
+        return victims
+
+    def delete_files(self, job_id: str) -> None:
+        """job 의 업로드/산출물/스냅샷 파일 삭제 (스레드에서 실행)"""
+        upload = self.uploads / f"{job_id}.mp4"
+        upload.unlink(missing_ok=True)
+        forget_etag(upload)
+        shutil.rmtree(self.runs / job_id, ignore_errors=True)
+        self.snapshots.drop_job(job_id)
+
+    async def sweep(self) -> Dict[str, Any]:
+        """1회 정리: 메모리는 이벤트 루프에서, 디스크 스캔/삭제는 스레드에서"""
+        started = time.monotonic()
+        stats = self.sweep_memory(time.time())
+        usage = await asyncio.to_thread(self.disk_usage)
+        victims = self.pick_disk_victims(usage)
+        for job_id in victims:
+            # 스레드로 넘기기 전에 메모리에서 먼저 제거 → 삭제 중 새 요청이 붙지 않음
+            self.forget(job_id)
+            await asyncio.to_thread(self.delete_files, job_id)
+        stats.update(
+            files_purged=len(victims),
+            bytes_freed=sum(usage[j]["total"] for j in victims),
+            elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+            at=time.time(),
+        )
+        if victims:
+            print(f"🧹 디스크 한도 초과 → job {len(victims)}개 파일 삭제 ({stats['bytes_freed'] >> 20}MB)")
+        self.last_sweep = stats
+        return stats
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.cfg["sweep_interval"])
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"❌ 수명 관리 정리 오류: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    # ---------- 조회 ----------
+    async def report(self) -> Dict[str, Any]:
+        """프로세스 RSS + job 별 메모리/디스크 사용량 (24시간 soak 테스트 확인용)"""
+        usage = await asyncio.to_thread(self.disk_usage)
+        jobs = {}
+        for job_id in set(self.jobs) | set(self.queues) | set(usage):
+            job = self.jobs.get(job_id, {})
+            q = self.queues.get(job_id)
+            queued = list(q._queue) if q is not None else []
+            jobs[job_id] = {
+                "in_memory": job_id in self.jobs,
+                "running": job_id in self.flags,
+                "done": job.get("done"),
+                "subscribers": self.subscribers.get(job_id, 0),
+                "queued_events": len(queued),
+                "queue_bytes_est": sum(len(json.dumps(item)) for item in queued),
+                "finished_at": job.get("finished_at"),
+                "last_access": job.get("last_access"),
+                "disk": usage.get(job_id, {}),
+            }
+        return {
+            "rss_bytes": process_rss(),
+            "disk_total_bytes": sum(u["total"] for u in usage.values()),
+            "disk_quota_bytes": self.cfg["disk_quota_mb"] << 20,
+            "snapshots": self.snapshots.usage(),
+            "counts": {
+                "jobs": len(self.jobs),
+                "queues": len(self.queues),
+                "running": len(self.flags),
+                "renders": len(self.renders),
+            },
+            "last_sweep": self.last_sweep,
+            "jobs": jobs,
+        }
@@ -1,84 +1,58 @@
 # backend/main.py
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import StreamingResponse, FileResponse, RedirectResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request, Query
+from fastapi.responses import StreamingResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 import os
 import json
+import mimetypes
 import uuid
 import asyncio
+import threading
 import time
+import tarfile
+import zipfile
 import cv2
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncGenerator, List
 from pydantic import BaseModel
-from ultralytics import YOLO
 from email_notifier import EmailNotifier
+from media_range import serve_file, new_hasher, seed_etag, forget_etag
+from proxy_media import get_pool, build_preview_assets, read_index
+from tick_log import TickLog, iter_ticks, ticks_path
+from render_video import render_annotated, RenderCancelled
+from snapshots import SnapshotStore
+from lifecycle import LifecycleManager
+from scoring import CheckpointIndex, HazardScorer
+from stream_source import LatestFrameReader
+from scheduler import InferenceScheduler, JobSlot
+from detection_log import DetectionLog, detections_path
+from detectors.vision import FireDetector
+from detectors.cascade import FrameGate
+from model_server import BusClient, BusQueue, RemoteDetector
+from playback_sync import PlaybackSync
+from zones import ZoneError, ZoneSet
+from summary_hub import SummaryHub, TappedQueue
+from frame_reuse import FrameIndex, model_signature
+from incidents import IncidentStore, parse_time, public as public_incident, summarize as summarize_incidents
+from export_ticks import ExportUnavailable, MEDIA_TYPES, export_chunks, iter_job_rows, iter_range_rows
+from bulk_infer import (ARCHIVE_TYPES, PartTooLarge, infer_images, iter_archive, iter_multipart,
+                        iterate_in_thread, multipart_boundary, spool_body)
 
 # 경로 설정
 ROOT = Path(__file__).resolve().parent.parent
 MEDIA = ROOT / "media"
 UPLOADS = MEDIA / "uploads"
 RUNS = MEDIA / "runs"
+SNAP = MEDIA / "snap"
 
-for p in (UPLOADS, RUNS):
+for p in (UPLOADS, RUNS, SNAP):
     p.mkdir(parents=True, exist_ok=True)
 
-# 모델 로드
-def load_model() -> YOLO:
-    # 절대 경로로 모델 파일 찾기
-    model_paths = [
-        ROOT / "backend" / "models" / "vision" / "best_nano_111.pt",
-        ROOT / "models" / "vision" / "best_nano_111.pt",
-        Path("./models/vision/best_nano_111.pt"),
-        Path("./backend/models/vision/best_nano_111.pt")
-    ]
-
-    for model_path in model_paths:
-        if model_path.exists():
-            print(f"[model] Using: {model_path}")
-            return YOLO(str(model_path))
-
-    print(f"[model] Using default: yolo11n.pt")
-    return YOLO('yolo11n.pt')
-
-MODEL = load_model()
 EMAIL_NOTIFIER = EmailNotifier()
 
-# 모델 클래스 정보 출력
-try:
-    print(f"[model] 클래스 이름: {MODEL.names}")
-    print(f"[model] 총 클래스 수: {len(MODEL.names) if MODEL.names else 'Unknown'}")
-except Exception as e:
-    print(f"[model] 클래스 정보 조회 실패: {e}")
-
-# 화재/연기 감지를 위한 클래스 ID 매핑
-FIRE_CLASS_IDS = []
-SMOKE_CLASS_IDS = []
-
-if MODEL.names:
-    for class_id, class_name in MODEL.names.items():
-        name_lower = class_name.lower()
-        if 'fire' in name_lower or 'flame' in name_lower or 'burn' in name_lower:
-            FIRE_CLASS_IDS.append(class_id)
-            print(f"[model] Fire 클래스 발견: {class_id} = {class_name}")
-        elif 'smoke' in name_lower or 'vapor' in name_lower:
-            SMOKE_CLASS_IDS.append(class_id)
-            print(f"[model] Smoke 클래스 발견: {class_id} = {class_name}")
-
-print(f"[model] Fire 클래스 IDs: {FIRE_CLASS_IDS}")
-print(f"[model] Smoke 클래스 IDs: {SMOKE_CLASS_IDS}")
-
-# 기본값 설정 (클래스가 발견되지 않으면)
-if not FIRE_CLASS_IDS:
-    FIRE_CLASS_IDS = [0]  # 기본적으로 0번을 Fire로 가정
-    print("[model] Fire 클래스를 찾지 못해 기본값 [0] 사용")
-
-if not SMOKE_CLASS_IDS:
-    SMOKE_CLASS_IDS = [1]  # 기본적으로 1번을 Smoke로 가정
-    print("[model] Smoke 클래스를 찾지 못해 기본값 [1] 사용")
-
 # 로깅 설정
 DEBUG_MODE = False  # False로 설정하면 로그가 거의 출력되지 않음
 QUIET_MODE = True   # True로 설정하면 거의 모든 로그 숨김
@@ -89,6 +63,7 @@ RULES = {
     "conf": 0.15,  # 더 낮은 임계값으로 설정 (더 많은 감지)
     "iou": 0.20,   # IoU 임계값도 약간 높여서 중복 제거
     "max_det": 20, # 최대 감지 수 증가
+    "precision": os.getenv("MODEL_PRECISION", "fp32"),  # "int8": backend/quantize.py 로 만든 양자화 모델 사용
     "fps_target": 5,
     "ema_alpha": 0.4,
     "weights": {"s_smoke": 0.6, "s_fire": 0.8, "growth": 0.4},
@@ -98,8 +73,87 @@ RULES = {
         "fire_growing": {"fire": 0.30, "hazard": 0.35}, # 낮은 임계치
         "call_119": {"hazard": 0.45},                    # 매우 낮은 임계치
     },
+    # 이벤트 스냅샷: 상태 전이 시 + 위험 상태 유지 중 interval 초마다 저장
+    "snapshot": {
+        "enabled": True,
+        "interval": 5.0,
+        "hot_states": ["FIRE_GROWING", "CALL_119"],
+        "overlay": True,
+        "jpeg_quality": 85,
+        "quota_mb": 500,
+    },
+    # job 수명 관리: 완료 job TTL, 유휴 큐 제거, 업로드+산출물 디스크 한도
+    "lifecycle": {
+        "job_ttl": 6 * 3600,
+        "queue_idle_ttl": 600,
+        "disk_quota_mb": 20 * 1024,
+        "sweep_interval": 60,
+    },
+    # 추론 용량 배분: 위험 상태 job 우선, 부족하면 NORMAL job 샘플링부터 줄임
+    "scheduler": {
+        "capacity_ips": None,   # None 이면 실측 추론 시간으로 추정
+        "min_ips": 0.5,
+        "max_queue": 10,
+    },
+    # seek 용 점수 체크포인트 간격(초) / 워밍업 허용 오차 (초기 EMA 영향이 eps 미만이 될 때까지 재분석)
+    "checkpoint": {"interval": 2.0, "warmup_eps": 0.02},
+    # 원시 감지 로그 (media/runs/{job_id}/detections.dlog) - sweep_rules.py 로 임계치 튜닝할 때 켬
+    "detection_log": {"enabled": False},
+    # 캐스케이드: 작은 해상도 색/움직임 게이트를 통과한 프레임만 YOLO 감지 (NORMAL 이 아니면 항상 감지)
+    "cascade": {
+        "enabled": False,
+        "size": 64,
+        "threshold": 0.10,
+        "fire_norm": 0.01,
+        "smoke_norm": 0.02,
+        "motion_diff": 8,
+        "bg_alpha": 0.1,
+        "force_every": 10,
+    },
+    # POST /infer 정지 이미지 일괄 추론: 배치 크기, 디코딩 스레드 수, 대기 이미지 수(메모리 상한), 크기 제한
+    "bulk_infer": {
+        "batch_size": 8,
+        "workers": 4,
+        "max_pending": 32,
+        "max_image_mb": 32,
+        "max_archive_mb": 4096,
+    },
+    # 공유 모델 서버(backend/model_server.py)의 Unix 소켓 - 지정하면 이 프로세스는 모델을 로드하지 않고
+    # 서버에 추론을 요청하며, job 이벤트를 버스로 발행 (uvicorn --workers N 에서 어느 worker 든 /events 구독 가능)
+    "model_server": {"socket": os.getenv("MODEL_SERVER_SOCKET")},
+    # 클라이언트 재생 시계(POST /jobs/{job_id}/clock) 기준 analyze-ahead: ahead 초 앞서 분석해 두고
+    # 재생 위치가 tick 시각에 도달할 때 전달. 보고가 stale_after 초 끊기면 서버 시계 방식으로 돌아감
+    "playback_sync": {"ahead": 3.0, "jump": 1.0, "max_late": 1.0, "stale_after": 10.0},
+    # GET /events/all 관제용 전체 job 요약: refresh 초마다 바뀐 job 만 모아 전송 (상태 변화는 즉시)
+    "summary": {"refresh": 1.0, "heartbeat": 15.0, "viewer_buffer": 16, "done_ttl": 300.0},
+    # 업로드 영상 감지 결과 재사용: 추론한 프레임의 지각 해시 → 감지 결과 색인(media/frame_index.db)
+    # 다른 업로드와 정렬된 구간이 confirm 프레임 연속 맞고 추론 결과도 같으면 그 뒤부터 감지 엔진 대신 저장된 결과 사용
+    # (EMA/상태는 다시 계산). 정지 화면 카메라가 자기 기록을 재사용하지 않도록 같은 job 은 제외
+    "reuse": {
+        "enabled": False,
+        "max_dist64": 3,
+        "max_dist256": 20,
+        "fire_abs": 0.04,
+        "fire_rel": 0.25,
+        "tone_tol": 4,
+        "sat_tol": 12,
+        "confirm": 3,
+    },
 }
 
+# 감지 엔진: backend/thresholds.json 의 ROI / Person 억제 / HSV 설정 + RULES 의 추론 파라미터
+# 모델 서버 모드면 서버 프로세스의 엔진을 공유 (설정도 서버 쪽 값)
+if RULES["model_server"]["socket"]:
+    DETECTOR = RemoteDetector(RULES["model_server"]["socket"])
+    BUS = BusClient(RULES["model_server"]["socket"])
+    print(f"[model] 모델 서버 사용: {RULES['model_server']['socket']} (pid {DETECTOR.server_pid})")
+else:
+    DETECTOR = FireDetector(config={"model": {k: RULES[k] for k in ("imgsz", "conf", "iou", "max_det", "precision")}})
+    BUS = None
+print(f"[model] 클래스 이름: {DETECTOR.names}")
+print(f"[model] Fire 클래스 IDs: {DETECTOR.fire_ids}, Smoke 클래스 IDs: {DETECTOR.smoke_ids}")
+REUSE = FrameIndex(MEDIA / "frame_index.db", model_signature(DETECTOR), RULES["reuse"]) if RULES["reuse"]["enabled"] else None
+
 app = FastAPI(title="Safety Detection 119", version="1.0.0")
 
 app.add_middleware(
@@ -113,7 +167,31 @@ app.add_middleware(
 # 글로벌 상태
 JOBS: Dict[str, Dict[str, Any]] = {}
 EVENT_QUEUES: Dict[str, asyncio.Queue] = {}
-JOB_FLAGS: Dict[str, Dict[str, Any]] = {}
+JOB_FLAGS: Dict[str, Dict[str, Any]] = {}    # job_id -> 실행 중인 분석 1회의 제어 플래그 (new_job_flags)
+RENDER_JOBS: Dict[str, Dict[str, Any]] = {}  # job_id -> 결과 영상 렌더링 진행 상황
+STREAMS: Dict[str, LatestFrameReader] = {}    # job_id -> 실시간 스트림 캡처 스레드
+PLAYBACK: Dict[str, PlaybackSync] = {}        # job_id -> 클라이언트 재생 시계 / 앞서 분석한 tick 버퍼
+SCHEDULER = InferenceScheduler(RULES["scheduler"])
+SUMMARY = SummaryHub(RULES["summary"], describe=lambda job_id: {
+    "kind": JOBS.get(job_id, {}).get("kind", "upload"),
+    "name": JOBS.get(job_id, {}).get("filename") or JOBS.get(job_id, {}).get("source"),
+})
+INCIDENTS = IncidentStore(MEDIA / "incidents.db")  # job 상태 열 → 사고 구간 색인 (job 정리 후에도 유지)
+
+SNAPSHOTS = SnapshotStore(
+    SNAP,
+    quota_bytes=RULES["snapshot"]["quota_mb"] << 20,
+    jpeg_quality=RULES["snapshot"]["jpeg_quality"],
+)
+LIFECYCLE = LifecycleManager(
+    JOBS, EVENT_QUEUES, JOB_FLAGS, RENDER_JOBS, SNAPSHOTS,
+    uploads=UPLOADS, runs=RUNS, cfg=RULES["lifecycle"],
+)
+
+@app.on_event("startup")
+async def start_lifecycle():
+    """백그라운드 정리 작업 시작"""
+    LIFECYCLE.start()
 
 # 유틸 함수
 def video_meta(path: Path):
@@ -128,10 +206,191 @@ def video_meta(path: Path):
     cap.release()
     return fps, w, h, n
 
+def detect_frame(frame, processed_frames: int):
+    """
+    감지 엔진 1회 추론 → (fire_raw, smoke_raw, boxes_out, dets) - 업로드/스트림 분석 공용
+    dets: 점수에 쓴 박스 (N, 6) 배열 [cls, conf, x1, y1, x2, y2] (ROI/HSV/사람 억제 후 - 감지 로그/재생이 실시간 점수와 같도록)
+    """
+    res = DETECTOR.infer(frame)
+    fire_raw, smoke_raw, boxes_out = res["fire_score"], res["smoke_score"], res["boxes"]
+
+    # 총 감지된 객체 수 로그
+    if len(res["dets"]):
+        print(f"🔍 프레임 {processed_frames}: YOLO가 {len(res['dets'])}개 객체 감지")
+    elif processed_frames % 30 == 0:  # 30프레임마다 감지 없음 로그
+        print(f"🔍 프레임 {processed_frames}: YOLO 감지 없음")
+
+    # 감지된 클래스 출력 (첫 10프레임만)
+    if processed_frames <= 10 and len(res["dets"]):
+        detected = [(int(c), DETECTOR.names.get(int(c), f"class_{int(c)}"), round(cf, 3))
+                    for c, cf, *_ in res["dets"].tolist()]
+        print(f"🎯 프레임 {processed_frames} 감지 클래스: {detected}")
+
+    for box in boxes_out:
+        icon = "🔥 FIRE" if box["label"] == "fire" else "💨 SMOKE"
+        print(f"{icon} 감지! 클래스: {box['cls']}({box['class_name']}), 신뢰도: {box['conf']:.3f}, "
+              f"위치: ({box['x1']:.0f},{box['y1']:.0f})-({box['x2']:.0f},{box['y2']:.0f})")
+
+    return fire_raw, smoke_raw, boxes_out, res["dets"][res["kept"]]
+
+def new_job_flags() -> Dict[str, Any]:
+    """
+    분석 실행 1회의 제어 플래그 (paused / stop / seek)
+    - task: 분석 코루틴이 시작하며 기록, finished: 그 실행의 정리(finally)가 끝나면 set
+    → 재분석은 이전 실행이 job 파일(ticks/detections/사고 구간/재사용 색인)을 다 닫은 뒤에 시작
+    """
+    return {"paused": False, "stop": False, "task": None, "finished": asyncio.Event()}
+
+async def stop_run(job_id: str, grace: float = 2.0) -> None:
+    """진행 중인 분석을 멈추고 끝날 때까지 대기 (가득 찬 큐 등에서 grace 초 넘게 멈춰 있으면 취소)"""
+    flags = JOB_FLAGS.get(job_id)
+    if flags is None:
+        return
+    flags["stop"] = True
+    try:
+        await asyncio.wait_for(asyncio.shield(flags["finished"].wait()), grace)
+    except asyncio.TimeoutError:
+        if flags["task"] is not None:
+            flags["task"].cancel()
+        await flags["finished"].wait()
+
+def release_flags(job_id: str, flags: Dict[str, Any]) -> None:
+    """실행 종료: 그 실행의 플래그일 때만 제거 (재분석이 이미 새 플래그를 넣었으면 유지)"""
+    if JOB_FLAGS.get(job_id) is flags:
+        JOB_FLAGS.pop(job_id)
+    flags["finished"].set()
+
+def new_gate(job_id: str):
+    """RULES["cascade"] 가 켜져 있으면 job 전용 게이트 생성 (통계는 JOBS[job_id]["cascade"])"""
+    if not RULES["cascade"]["enabled"]:
+        return None
+    gate = FrameGate(RULES["cascade"])
+    JOBS[job_id]["cascade"] = gate.stats
+    return gate
+
+def new_reuse(job_id: str):
+    """RULES["reuse"] 가 켜져 있으면 job 전용 재사용 세션 생성 (통계는 JOBS[job_id]["reuse"])"""
+    if REUSE is None:
+        return None
+    REUSE.delete_job(job_id)  # 재분석: 이전 기록은 새 결과로 대체
+    reuse = REUSE.session(job_id)
+    JOBS[job_id]["reuse"] = reuse.stats
+    return reuse
+
+def gated_detect(job_id: str, gate, frame, state: str, processed_frames: int, reuse=None, t: float = 0.0):
+    """
+    게이트 통과 시에만 감지 → (fire_raw, smoke_raw, boxes_out, dets, ran)
+    reuse 가 있으면 이미 분석한 프레임의 감지 결과를 먼저 찾고, 없을 때만 추론 후 색인에 추가
+    """
+    if gate is not None and not gate.should_detect(frame, state):
+        return 0.0, 0.0, [], [], False
+    hit = reuse.lookup(frame, t) if reuse is not None else None
+    if hit is not None:
+        fire_raw, smoke_raw, boxes_out, dets = hit
+    else:
+        infer_started = time.perf_counter()
+        fire_raw, smoke_raw, boxes_out, dets = detect_frame(frame, processed_frames)
+        infer_s = time.perf_counter() - infer_started
+        SCHEDULER.record_inference(job_id, infer_s)
+        if reuse is not None:
+            reuse.record(t, fire_raw, smoke_raw, boxes_out, dets, frame.shape[1], frame.shape[0], infer_s)
+    if gate is not None:
+        gate.record(fire_raw > 0 or smoke_raw > 0)
+    return fire_raw, smoke_raw, boxes_out, dets, True
+
+def score_zones(job_id: str, boxes_out, w: int, h: int, state: str, H: float):
+    """
+    job 에 감지 구역이 있으면 같은 감지 결과로 구역별 점수/상태 갱신
+    → (tick 의 "zones" 또는 None, 구역 포함 가장 높은 상태, hazard) - 스케줄러/캐스케이드 게이트는 이 상태 기준
+    """
+    zones = JOBS.get(job_id, {}).get("zones")
+    if not zones:
+        return None, state, H
+    zone_states = zones.update(boxes_out, w, h)
+    alert_state, alert_h = zones.worst(state, H)
+    return zone_states, alert_state, alert_h
+
+def open_detection_log(job_id: str, w: int, h: int, fps: float):
+    """RULES["detection_log"] 가 켜져 있으면 원시 감지 로그 생성 (헤더에 클래스 매핑/당시 RULES 기록)"""
+    if not RULES["detection_log"]["enabled"]:
+        return None
+    header = {
+        "job_id": job_id,
+        "source": JOBS.get(job_id, {}).get("filename") or JOBS.get(job_id, {}).get("source"),
+        "img_w": w, "img_h": h, "src_fps": fps,
+        "class_names": {str(k): v for k, v in DETECTOR.names.items()},
+        "fire_class_ids": DETECTOR.fire_ids,
+        "smoke_class_ids": DETECTOR.smoke_ids,
+        "filtered": True,  # 박스는 FireDetector 필터 후 (이전 로그는 필터 전 원시 박스)
+        "rules": {k: RULES[k] for k in ("conf", "ema_alpha", "weights", "thresholds", "fps_target")},
+    }
+    return DetectionLog(detections_path(RUNS / job_id), header)
+
+def snapshot_reason(state: str, last_state: str, t: float, last_snap_t):
+    """스냅샷 저장 사유: 상태 전이 / 위험 상태 유지 중 주기 저장 / None"""
+    cfg = RULES["snapshot"]
+    if not cfg["enabled"]:
+        return None
+    if state != last_state:
+        return "transition"
+    if state in cfg["hot_states"] and (last_snap_t is None or t - last_snap_t >= cfg["interval"]):
+        return "periodic"
+    return None
+
+def start_preview_job(job_id: str, src: Path):
+    """업로드 직후 프록시 영상/썸네일 스프라이트 생성을 프로세스 풀에 제출 (분석과 병행)"""
+    JOBS[job_id]["preview"] = "pending"
+    fut = asyncio.get_running_loop().run_in_executor(
+        get_pool(), build_preview_assets, str(src), str(RUNS / job_id)
+    )
+
+    def _done(f):
+        job = JOBS.get(job_id)
+        if job is None:
+            return
+        if f.cancelled():
+            job["preview"] = "cancelled"
+        elif f.exception() is not None:
+            job["preview"] = "error"
+            print(f"❌ 프리뷰 생성 실패: {job_id} - {f.exception()}")
+        else:
+            job["preview"] = "ready"
+
+    fut.add_done_callback(_done)
+
+def new_event_queue(job_id: str) -> asyncio.Queue:
+    """
+    job 이벤트 큐 - 모델 서버 모드면 버스에 job 을 (새 run 으로) 등록하고 이벤트를 버스로 발행
+    들어간 이벤트는 /events/all 요약(SUMMARY)에도 반영
+    """
+    if BUS is None:
+        return TappedQueue(job_id, SUMMARY.observe, maxsize=100)
+    job = JOBS[job_id]
+    info = {k: job.get(k) for k in ("kind", "filename", "source", "created")}
+    run = BUS.set_job(job_id, {**info, "worker": os.getpid()}, reset=True)
+    return BusQueue(job_id, BUS, run, tap=SUMMARY.observe)
+
+async def relay_bus_events(job_id: str, q: asyncio.Queue):
+    """버스 구독(전용 스레드) → 이 연결의 로컬 큐 (SSE 가 느리면 오래된 이벤트부터 버림)"""
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    try:
+        ok = await asyncio.to_thread(BUS.follow, job_id, lambda ev: loop.call_soon_threadsafe(put_latest, q, ev), stop)
+        if not ok:
+            put_latest(q, {"type": "error", "job_id": job_id, "error": "event bus unavailable"})
+    finally:
+        stop.set()
+
 async def sse_gen(job_id: str) -> AsyncGenerator[bytes, None]:
-    """SSE 스트림 제너레이터"""
+    """SSE 스트림 제너레이터 (모델 서버 모드면 버스에서 구독 - job 을 처리하는 worker 와 무관)"""
+    LIFECYCLE.subscribe(job_id)
+    relay = None
     try:
-        q = EVENT_QUEUES[job_id]
+        if BUS is not None:
+            q = asyncio.Queue(maxsize=100)
+            relay = asyncio.create_task(relay_bus_events(job_id, q))
+        else:
+            q = EVENT_QUEUES[job_id]
         await q.put({"type": "hello", "job_id": job_id})
         while True:
             try:
@@ -145,6 +404,10 @@ async def sse_gen(job_id: str) -> AsyncGenerator[bytes, None]:
     except Exception as e:
         print(f"❌ SSE 스트림 오류: {job_id} - {e}")
         yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n".encode("utf-8")
+    finally:
+        if relay is not None:
+            relay.cancel()
+        LIFECYCLE.unsubscribe(job_id)
 
 @app.post("/upload")
 async def upload_video(file: UploadFile, background_tasks: BackgroundTasks):
@@ -156,6 +419,10 @@ async def upload_video(file: UploadFile, background_tasks: BackgroundTasks):
     if not file.content_type or not file.content_type.startswith('video/'):
         raise HTTPException(status_code=400, detail="Video file required")
 
+    # 추론 용량/대기열이 모두 찼으면 거절
+    if not SCHEDULER.can_accept():
+        raise HTTPException(503, "inference capacity exhausted", headers={"Retry-After": "30"})
+
     job_id = uuid.uuid4().hex[:12]
     dest = UPLOADS / f"{job_id}.mp4"
 
@@ -163,54 +430,192 @@ async def upload_video(file: UploadFile, background_tasks: BackgroundTasks):
         # 업로드 디렉토리 확실히 생성
         UPLOADS.mkdir(parents=True, exist_ok=True)
 
-        # 파일 저장
-        content = await file.read()
+        # 파일 저장 (청크 단위 스트리밍 + ETag용 내용 해시 동시 계산)
+        hasher = new_hasher()
         with open(dest, "wb") as f:
-            f.write(content)
+            while True:
+                chunk = await file.read(1 << 20)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                f.write(chunk)
 
         # 파일이 실제로 저장되었는지 확인
         if not dest.exists() or dest.stat().st_size == 0:
             raise RuntimeError(f"File save failed: {dest}")
 
+        seed_etag(dest, hasher.hexdigest())
+
         if not QUIET_MODE:
             print(f"✅ 저장완료: {job_id} ({dest.stat().st_size} bytes)")
 
-        JOBS[job_id] = {"path": str(dest), "done": False, "err": None}
-        EVENT_QUEUES[job_id] = asyncio.Queue(maxsize=100)
-        JOB_FLAGS[job_id] = {"paused": False, "stop": False}
-
-        background_tasks.add_task(process_video_job, job_id, dest)
-        return {"job_id": job_id, "video_url": f"/media/uploads/{dest.name}"}
+        JOBS[job_id] = {
+            "path": str(dest), "filename": file.filename,
+            "done": False, "err": None, "created": time.time(),
+        }
+        LIFECYCLE.touch(job_id)
+        EVENT_QUEUES[job_id] = new_event_queue(job_id)
+        JOB_FLAGS[job_id] = new_job_flags()
+
+        start_preview_job(job_id, dest)
+        slot = SCHEDULER.register(job_id, RULES["fps_target"])
+        background_tasks.add_task(process_video_job, job_id, dest, slot)
+        return {
+            "job_id": job_id,
+            "video_url": f"/media/uploads/{dest.name}",
+            "status": slot.status,
+            "queue_position": SCHEDULER.queue_position(job_id),
+        }
 
     except Exception as e:
         if not QUIET_MODE:
             print(f"❌ 업로드실패: {e}")
         if dest.exists():
             dest.unlink()  # 실패 시 파일 삭제
+        forget_etag(dest)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 @app.get("/events")
 async def events(job_id: str):
     """SSE 스트림 엔드포인트"""
-    if job_id not in EVENT_QUEUES:
+    if BUS is not None:
+        if await asyncio.to_thread(BUS.get_job, job_id) is None:
+            raise HTTPException(404, "unknown job_id")
+    elif job_id not in EVENT_QUEUES:
         raise HTTPException(404, "unknown job_id")
     return StreamingResponse(sse_gen(job_id), media_type="text/event-stream")
 
-@app.get("/media/uploads/{name}")
-async def media_uploads(name: str):
-    """업로드된 원본 영상 재생용 엔드포인트"""
+@app.get("/events/all")
+async def events_all():
+    """
+    관제 화면용 전체 job 요약 SSE (연결 1개로 모든 job)
+    - 연결 직후 {"type": "snapshot", "jobs": [...]}, 이후 {"type": "summary", "jobs": [바뀐 job], "removed"?}
+    - job 요약: job_id, kind, name, status, state, hazard, since(마지막 상태 전이 시각), t, zones(구역별 상태)
+    - RULES["summary"]["refresh"] 초마다 모아서, 상태 변화는 바로 - 프레임은 한 번 인코딩해 모든 시청자가 공유
+    """
+    return StreamingResponse(SUMMARY.stream(), media_type="text/event-stream")
+
+@app.get("/events/all/stats")
+async def events_all_stats():
+    """요약 스트림 시청자 수 / 요약 job 수 / 보낸 프레임·바이트 (시청자 수와 무관하게 인코딩 1회)"""
+    return SUMMARY.report()
+
+@app.api_route("/media/uploads/{name}", methods=["GET", "HEAD"])
+async def media_uploads(name: str, request: Request):
+    """업로드된 원본 영상 재생용 엔드포인트 (Range 요청 → 206)"""
+    LIFECYCLE.touch(Path(name).stem)
     p = UPLOADS / name
-    if not p.exists():
+    if not p.is_file():
         raise HTTPException(404, f"File not found: {name}")
-    return FileResponse(str(p), media_type="video/mp4")
+    return await serve_file(request, p, media_type="video/mp4")
 
-@app.get("/media/{name}")
-async def media(name: str):
-    """미디어 파일 일반 엔드포인트"""
+@app.api_route("/media/{name}", methods=["GET", "HEAD"])
+async def media(name: str, request: Request):
+    """미디어 파일 일반 엔드포인트 (Range 요청 → 206)"""
+    LIFECYCLE.touch(Path(name).stem)
     p = UPLOADS / name
-    if not p.exists():
+    if not p.is_file():
         raise HTTPException(404, f"File not found: {name}")
-    return FileResponse(str(p), media_type="video/mp4")
+    return await serve_file(request, p, media_type="video/mp4")
+
+@app.api_route("/media/runs/{job_id}/{name}", methods=["GET", "HEAD"])
+async def media_runs(job_id: str, name: str, request: Request):
+    """분석 산출물(프록시 영상, 스프라이트 등) 서빙 (Range 지원)"""
+    LIFECYCLE.touch(job_id)
+    p = RUNS / job_id / name
+    if not p.is_file():
+        raise HTTPException(404, f"File not found: {job_id}/{name}")
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    return await serve_file(request, p, media_type=media_type)
+
+@app.get("/jobs/{job_id}/preview")
+async def preview(job_id: str):
+    """타임라인 hover 미리보기용 스프라이트 인덱스 (생성 중이면 status=pending)"""
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job_id")
+    status = JOBS[job_id].get("preview", "none")
+    index = read_index(RUNS / job_id) if status == "ready" else None
+    return {"job_id": job_id, "status": status, "base_url": f"/media/runs/{job_id}/", "index": index}
+
+def _render_view(job_id: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """렌더 상태 응답 (내부 cancel 이벤트 제외)"""
+    return {"job_id": job_id, **{k: v for k, v in info.items() if k != "cancel"}}
+
+def _run_render(job_id: str, src: Path, info: Dict[str, Any]):
+    """결과 영상 렌더링 (전용 스레드에서 실행)"""
+    out = RUNS / job_id / "annotated.mp4"
+
+    def _progress(done: int, total: int):
+        info["frames"] = done
+        info["progress"] = round(min(1.0, done / total), 4) if total else None
+
+    started = time.monotonic()
+    try:
+        result = render_annotated(src, iter_ticks(ticks_path(RUNS / job_id)), out,
+                                  progress=_progress, cancel=info["cancel"])
+        elapsed = time.monotonic() - started
+        info.update(
+            status="done",
+            progress=1.0,
+            url=f"/media/runs/{job_id}/{out.name}",
+            elapsed=round(elapsed, 2),
+            speed=round(result["frames"] / result["fps"] / elapsed, 2) if elapsed > 0 else None,
+        )
+        print(f"🎞️ 결과 영상 렌더 완료: {job_id} ({info['speed']}x 실시간)")
+    except RenderCancelled:
+        info["status"] = "cancelled"
+    except Exception as e:
+        print(f"❌ 결과 영상 렌더 실패: {job_id} - {e}")
+        info.update(status="error", error=str(e))
+
+@app.post("/jobs/{job_id}/render")
+async def start_render(job_id: str):
+    """분석 타임라인을 입힌 결과 영상(MP4) 렌더링 시작"""
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job_id")
+    if not JOBS[job_id].get("path"):
+        raise HTTPException(400, "live stream jobs have no source video to render")
+    if not JOBS[job_id]["done"] or not ticks_path(RUNS / job_id).exists():
+        raise HTTPException(409, "analysis not finished")
+
+    info = RENDER_JOBS.get(job_id)
+    if info and info["status"] == "running":
+        return _render_view(job_id, info)
+
+    info = {"status": "running", "progress": 0.0, "frames": 0, "cancel": threading.Event()}
+    RENDER_JOBS[job_id] = info
+    threading.Thread(
+        target=_run_render, args=(job_id, Path(JOBS[job_id]["path"]), info), daemon=True
+    ).start()
+    return _render_view(job_id, info)
+
+@app.get("/jobs/{job_id}/render")
+async def render_status(job_id: str):
+    """렌더링 진행률/결과 URL 조회"""
+    if job_id not in RENDER_JOBS:
+        raise HTTPException(404, "no render for job_id")
+    return _render_view(job_id, RENDER_JOBS[job_id])
+
+@app.delete("/jobs/{job_id}/render")
+async def cancel_render(job_id: str):
+    """진행 중인 렌더링 취소"""
+    if job_id not in RENDER_JOBS:
+        raise HTTPException(404, "no render for job_id")
+    RENDER_JOBS[job_id]["cancel"].set()
+    return {"ok": True}
+
+@app.get("/jobs/{job_id}/snapshots")
+async def list_snapshots(job_id: str):
+    """job 의 이벤트 스냅샷 목록 (영상 시각 t 순)"""
+    return {"job_id": job_id, "snapshots": SNAPSHOTS.list(job_id)}
+
+@app.get("/jobs/{job_id}/snapshots/{name}")
+async def get_snapshot(job_id: str, name: str, request: Request):
+    """스냅샷 이미지"""
+    p = SNAPSHOTS.path_for(job_id, name)
+    if p is None or not p.is_file():
+        raise HTTPException(404, f"Snapshot not found: {name}")
+    return await serve_file(request, p, media_type="image/jpeg")
 
 class Ctrl(BaseModel):
     cmd: str  # 'pause' | 'resume' | 'stop'
@@ -228,7 +633,223 @@ async def control(job_id: str, c: Ctrl):
         JOB_FLAGS[job_id]["stop"] = True
     else:
         raise HTTPException(400, "cmd must be pause|resume|stop")
-    return {"ok": True, "flags": JOB_FLAGS[job_id]}
+    return {"ok": True, "flags": {k: JOB_FLAGS[job_id][k] for k in ("paused", "stop")}}
+
+class SeekReq(BaseModel):
+    t: float  # 영상 시각(초)
+
+@app.post("/jobs/{job_id}/seek")
+async def seek_analysis(job_id: str, req: SeekReq):
+    """
+    진행 중인 분석을 영상 시각 t 로 이동
+    - t 이전의 가장 가까운 점수 체크포인트를 복원하고 t 까지 짧게 워밍업한 뒤 재생 속도로 이어서 분석
+    - 결과는 SSE {"type": "seeked"} 이벤트로 알림
+    """
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job_id")
+    if JOBS[job_id].get("kind") == "stream":
+        raise HTTPException(400, "live stream jobs cannot seek")
+    if job_id not in JOB_FLAGS:
+        raise HTTPException(409, "analysis is not running - use /jobs/{job_id}/restart")
+    JOB_FLAGS[job_id]["seek"] = max(0.0, req.t)
+    LIFECYCLE.touch(job_id)
+    return {"ok": True, "job_id": job_id, "t": JOB_FLAGS[job_id]["seek"]}
+
+class ClockReq(BaseModel):
+    t: float             # 플레이어 currentTime(초)
+    rate: float = 1.0    # playbackRate
+    paused: bool = False # 일시정지/버퍼링 중
+
+@app.post("/jobs/{job_id}/clock")
+async def report_clock(job_id: str, req: ClockReq):
+    """
+    플레이어 재생 시계 보고 (timeupdate/재생/정지/배속/탐색 때 + 주기적으로)
+    - 분석은 보고된 위치 + playback_sync.ahead 초까지 앞서 진행하고, tick 은 재생 위치가 도달할 때 SSE 로 전달
+    - 앞서 분석해 둔 구간 밖으로 탐색하면 /seek 과 같은 방식으로 분석 위치를 옮김
+    - 응답: 재생 위치 추정치, 앞서 분석한 구간, 전달 지연 통계
+    """
+    sync = PLAYBACK.get(job_id)
+    if sync is None or job_id not in JOB_FLAGS:
+        raise HTTPException(409, "analysis is not running for this job")
+    seek_t = sync.report(req.t, req.rate, req.paused)
+    if seek_t is not None:
+        JOB_FLAGS[job_id]["seek"] = seek_t
+    LIFECYCLE.touch(job_id)
+    return {"ok": True, "job_id": job_id, "seek": seek_t, **sync.report_stats()}
+
+class ZonesReq(BaseModel):
+    zones: List[Dict[str, Any]]  # [{"name", "polygon": [[x, y], ...] (0~1), "thresholds"?, "weights"?, "ema_alpha"?}]
+
+@app.put("/jobs/{job_id}/zones")
+async def set_zones(job_id: str, req: ZonesReq):
+    """
+    job 의 감지 구역 설정 (빈 목록이면 해제) - 분석 중이면 다음 tick 부터 적용, 재분석에도 유지
+    - 구역마다 다각형 + RULES 를 덮어쓰는 임계치/가중치/EMA 계수, 점수 상태는 새로 시작
+    - 감지는 프레임당 1회, 박스 중심으로 구역을 나눠 tick 의 "zones" 에 구역별 상태/점수
+    """
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job_id")
+    try:
+        zones = ZoneSet(req.zones, RULES)
+    except ZoneError as e:
+        raise HTTPException(400, str(e))
+    JOBS[job_id]["zones"] = zones if len(zones) else None
+    LIFECYCLE.touch(job_id)
+    return {"job_id": job_id, "zones": zones.describe()}
+
+@app.get("/jobs/{job_id}/zones")
+async def get_zones(job_id: str):
+    """job 의 감지 구역 정의와 현재 구역별 상태/점수"""
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job_id")
+    zones = JOBS[job_id].get("zones")
+    return {"job_id": job_id, "zones": zones.describe() if zones else []}
+
+@app.get("/jobs/{job_id}/cascade")
+async def cascade_status(job_id: str):
+    """캐스케이드 게이트 통계: 감지 실행/생략 수, 통과 사유, 적중률"""
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job")
+    stats = JOBS[job_id].get("cascade")
+    if stats is None:
+        raise HTTPException(404, "cascade gate is disabled for this job")
+    return {"job_id": job_id, **stats}
+
+@app.get("/jobs/{job_id}/reuse")
+async def reuse_status(job_id: str):
+    """감지 결과 재사용 통계: 조회/적중 수, 재사용 비율, 조회 비용, 절약한 추론 시간, 원본 job 별 적중 수"""
+    if job_id not in JOBS:
+        raise HTTPException(404, "unknown job")
+    stats = JOBS[job_id].get("reuse")
+    if stats is None:
+        raise HTTPException(404, "frame reuse is disabled for this job")
+    return {"job_id": job_id, **stats, "index": await asyncio.to_thread(REUSE.report)}
+
+def export_response(rows, fmt: str, name: str) -> StreamingResponse:
+    """행 이터레이터 → 형식별 청크 스트리밍 응답 (저장소에서 읽는 대로 전송, 전체를 메모리에 올리지 않음)"""
+    try:
+        chunks = export_chunks(rows, fmt)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except ExportUnavailable as e:
+        raise HTTPException(501, str(e))
+    return StreamingResponse(
+        chunks,  # 동기 이터레이터 → 스레드풀에서 파일 읽기/인코딩
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+@app.get("/jobs/{job_id}/export")
+async def export_job(job_id: str, format: str = "ndjson", start: float = None, end: float = None):
+    """job 의 전체 tick(점수/원시 점수/상태/박스) 내보내기 - start/end 는 영상 시각(초)"""
+    path = ticks_path(RUNS / job_id)
+    if not path.is_file():
+        raise HTTPException(404, "no analysis ticks recorded for job")
+    LIFECYCLE.touch(job_id)
+    return export_response(iter_job_rows(path, job_id, start, end), format, f"{job_id}_ticks")
+
+@app.get("/incidents")
+async def list_incidents(min_state: str = "SMOKE_DETECTED", since: str = Query(None, alias="from"),
+                         until: str = Query(None, alias="to"), job_id: str = None, zone: str = None,
+                         limit: int = 1000):
+    """
+    사고 구간 조회: [from, to] (unix 초 또는 ISO 8601) 와 겹치는 min_state 이상 구간
+    - 구간: job_id, state, start_ts/end_ts, duration, peak_hazard/fire/smoke, video(url#t=시작,끝 / 영상 시각)
+    - jobs: job 별 최고 상태와 조회 구간 안에 든 시간 합(total_s) - "어느 카메라가 얼마나" 에 바로 답함
+    - zone: 생략 = 전체 프레임, 구역 이름 = 해당 구역, "*" = 전체 + 모든 구역 / 진행 중인 구간은 open: true
+    """
+    try:
+        t0, t1 = parse_time(since), parse_time(until)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if t0 is not None and t1 is not None and t1 < t0:
+        raise HTTPException(400, "to must be >= from")
+    started = time.perf_counter()
+    try:
+        rows = await asyncio.to_thread(INCIDENTS.query, t0, t1, min_state, job_id, zone, max(1, min(limit, 100000)))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {
+        "from": t0, "to": t1, "min_state": min_state,
+        "jobs": summarize_incidents(rows, t0, t1),
+        "incidents": [public_incident(r) for r in rows],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+@app.get("/export")
+async def export_range(since: float, until: float = None, format: str = "ndjson", job_ids: str = None):
+    """여러 job 의 tick 을 분석 시각(wall_ts, unix 초) [since, until] 구간으로 내보내기 (job_ids: 쉼표 구분)"""
+    if until is not None and until < since:
+        raise HTTPException(400, "until must be >= since")
+    ids = [j for j in job_ids.split(",") if j] if job_ids else None
+    return export_response(iter_range_rows(RUNS, since, until, ids), format, f"ticks_{int(since)}")
+
+@app.get("/usage")
+async def usage():
+    """프로세스 RSS 와 job 별 메모리/디스크 사용량"""
+    return await LIFECYCLE.report()
+
+@app.get("/scheduler")
+async def scheduler_status():
+    """추론 용량, job 별 예산/실측 속도, 최근 스케줄링 결정"""
+    return SCHEDULER.report()
+
+@app.get("/model-server")
+async def model_server_status():
+    """공유 모델 서버 통계: 연결 수, 요청/프레임/배치 수, 평균 배치 크기, 버스 job/구독자 수"""
+    if BUS is None:
+        raise HTTPException(404, "model server is not configured (MODEL_SERVER_SOCKET)")
+    stats = await asyncio.to_thread(DETECTOR.server_stats)
+    return {**stats, "worker": os.getpid(), "bus_dropped": BUS.dropped}
+
+@app.post("/infer")
+async def bulk_infer(request: Request, batch_size: int = None, format: str = None):
+    """
+    정지 이미지 일괄 추론 → 이미지별 fire/smoke 점수와 박스를 NDJSON 으로 스트리밍
+    본문: multipart/form-data (파일 여러 개) 또는 tar(.gz) / zip (Content-Type 또는 ?format=tar|zip)
+    """
+    cfg = RULES["bulk_infer"]
+    ctype = request.headers.get("content-type", "")
+    kind = format or ARCHIVE_TYPES.get(ctype.split(";")[0].strip().lower())
+    max_image = cfg["max_image_mb"] << 20
+
+    if kind in ("tar", "zip"):
+        try:
+            body = await spool_body(request.stream(), cfg["max_archive_mb"] << 20)
+        except PartTooLarge as e:
+            raise HTTPException(413, str(e))
+        if kind == "zip" and not zipfile.is_zipfile(body):
+            body.close()
+            raise HTTPException(400, "invalid zip archive")
+        body.seek(0)
+        items = iterate_in_thread(iter_archive(body, kind, max_image))
+    elif ctype.startswith("multipart/form-data") and multipart_boundary(ctype):
+        body = None
+        items = iter_multipart(request.stream(), multipart_boundary(ctype), max_image)
+    else:
+        raise HTTPException(415, "multipart/form-data, tar or zip body required")
+
+    async def ndjson():
+        started, n = time.perf_counter(), 0
+        try:
+            async for rec in infer_images(
+                DETECTOR, items,
+                batch_size=max(1, min(batch_size or cfg["batch_size"], 64)),
+                workers=cfg["workers"],
+                max_pending=cfg["max_pending"],
+            ):
+                n += 1
+                yield (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        except (ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+            yield (json.dumps({"error": str(e)}, ensure_ascii=False) + "\n").encode("utf-8")
+        finally:
+            if body is not None:
+                body.close()
+            if not QUIET_MODE:
+                elapsed = time.perf_counter() - started
+                print(f"🖼️ 일괄 추론 {n}장: {elapsed:.2f}s ({n / max(elapsed, 1e-9):.1f} img/s)")
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @app.get("/test")
 async def test_endpoint():
@@ -246,10 +867,13 @@ async def send_emergency_email(request: EmailRequest):
     try:
         print(f"🚨 EMERGENCY EMAIL REQUEST: {request.job_id}")
 
-        success = EMAIL_NOTIFIER.send_emergency_alert(
+        snapshot = SNAPSHOTS.latest(request.job_id)
+        success = await asyncio.to_thread(
+            EMAIL_NOTIFIER.send_emergency_alert,
             job_id=request.job_id,
             scores=request.scores,
-            timestamp=request.timestamp
+            timestamp=request.timestamp,
+            snapshot_path=str(snapshot) if snapshot else None,
         )
 
         if success:
@@ -272,6 +896,9 @@ async def restart_analysis(job_id: str, background_tasks: BackgroundTasks):
         available_jobs = list(JOBS.keys())
         raise HTTPException(404, f"Job {job_id} not found. Available jobs: {available_jobs}")
 
+    if JOBS[job_id].get("kind") == "stream":
+        raise HTTPException(400, "live stream jobs cannot be restarted")
+
     video_path = Path(JOBS[job_id]["path"])
     print(f"📁 비디오 파일 경로: {video_path}")
 
@@ -279,49 +906,89 @@ async def restart_analysis(job_id: str, background_tasks: BackgroundTasks):
         print(f"❌ 비디오 파일이 존재하지 않음: {video_path}")
         raise HTTPException(404, f"Video file not found: {video_path}")
 
-    # 기존 작업 정리
+    # 기존 작업 정리 (타임라인이 다시 기록되므로 진행 중인 렌더도 취소)
+    if job_id in RENDER_JOBS:
+        RENDER_JOBS[job_id]["cancel"].set()
     if job_id in JOB_FLAGS:
-        JOB_FLAGS[job_id]["stop"] = True
-        print(f"🛑 기존 작업 중지 플래그 설정")
-
-    # 잠시 대기 (기존 작업이 완전히 종료되도록)
-    await asyncio.sleep(0.2)
+        print(f"🛑 기존 작업 중지 대기")
+    # 기존 작업이 tick/감지 로그, 사고 구간, 재사용 색인을 모두 닫을 때까지 대기 (같은 파일을 다시 열기 전에)
+    await stop_run(job_id)
 
     if job_id in EVENT_QUEUES:
         del EVENT_QUEUES[job_id]
         print(f"🗑️ 기존 이벤트 큐 삭제")
 
     # 새로운 분석 시작
-    EVENT_QUEUES[job_id] = asyncio.Queue(maxsize=100)
-    JOB_FLAGS[job_id] = {"paused": False, "stop": False}
+    EVENT_QUEUES[job_id] = new_event_queue(job_id)
+    JOB_FLAGS[job_id] = new_job_flags()
     JOBS[job_id]["done"] = False
     JOBS[job_id]["err"] = None
+    JOBS[job_id].pop("finished_at", None)
+    LIFECYCLE.touch(job_id)
 
     print(f"🚀 새로운 분석 작업 시작")
-    background_tasks.add_task(process_video_job, job_id, video_path)
+    slot = SCHEDULER.register(job_id, RULES["fps_target"])
+    background_tasks.add_task(process_video_job, job_id, video_path, slot)
     return {"ok": True, "message": "Analysis restarted", "job_id": job_id}
 
-async def process_video_job(job_id: str, path: Path):
+async def wait_admitted(job_id: str, slot: JobSlot, q: asyncio.Queue, flags: Dict[str, Any]) -> bool:
+    """추론 용량이 날 때까지 대기 (중지되면 False)"""
+    if slot.status == "queued":
+        await q.put({"type": "queued", "job_id": job_id, "position": SCHEDULER.queue_position(job_id)})
+    while not slot.admitted.is_set():
+        if flags.get("stop"):
+            return False
+        try:
+            await asyncio.wait_for(slot.admitted.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+    return slot.status == "running"
+
+async def process_video_job(job_id: str, path: Path, slot: JobSlot):
     """
+    - 스케줄러 입장 후 시작, 추론 예산(budget_ips)이 줄면 샘플링 간격을 늘림
     - stride = round(src_fps / fps_target) 만큼 프레임을 건너뛰며 추론
     - EMA로 fire/smoke 점수 산출 → hazard 계산
     - 상태 결정 후 매 tick 이벤트에 box/점수/상태/시간을 push
     - pause 동안 타임라인 보정(start_wall += pause_duration) → 싱크 유지
+    - checkpoint.interval 초마다 점수 상태를 체크포인트로 남기고, seek 요청 시
+      가까운 체크포인트(없으면 초기 상태) 복원 → 워밍업 구간만 재분석 → 새 위치에서 재생 속도로 계속
+    - 플레이어가 재생 시계를 보고하면(/clock) 서버 시계 대신 그 시계 기준으로 ahead 초 앞서 분석하고
+      tick 은 PlaybackSync 버퍼에서 재생 위치에 맞춰 전달 (대기/프레임 버리기 대신 앞서 분석)
     """
     if DEBUG_MODE:
         print(f"🎬 비디오 분석 시작: {job_id}")
     q = EVENT_QUEUES[job_id]
     flags = JOB_FLAGS[job_id]
+    flags["task"] = asyncio.current_task()
+    sync = PLAYBACK[job_id] = PlaybackSync(RULES["playback_sync"], tick=1.0 / RULES["fps_target"])
+    deliver = asyncio.create_task(sync.run(q.put))
+    tick_log = det_log = incidents = reuse = None
     try:
-        fps, w, h, _ = video_meta(path)
+        if not await wait_admitted(job_id, slot, q, flags):
+            await q.put({"type": "end", "job_id": job_id})
+            return
+
+        fps, w, h, n_frames = video_meta(path)
+        tick_log = TickLog(ticks_path(RUNS / job_id))
+        # 재분석이면 타임라인처럼 사고 구간도 새로 기록
+        incidents = INCIDENTS.tracker(job_id, "upload", JOBS[job_id].get("filename"),
+                                      f"/media/uploads/{path.name}", reset=True)
+        det_log = open_detection_log(job_id, w, h, fps)
         if DEBUG_MODE:
             print(f"📊 비디오 메타: {w}x{h}, {fps:.1f}fps")
 
         stride = max(1, round(fps / RULES["fps_target"]))
-        alpha = RULES["ema_alpha"]
-        w_smoke = RULES["weights"]["s_smoke"]
-        w_fire = RULES["weights"]["s_fire"]
-        w_growth = RULES["weights"]["growth"]
+        gate = new_gate(job_id)
+        reuse = new_reuse(job_id)
+        scorer = HazardScorer(RULES)
+        checkpoints = CheckpointIndex(RULES["checkpoint"]["interval"])
+        warm_s = scorer.warmup_ticks(RULES["checkpoint"]["warmup_eps"]) / RULES["fps_target"]
+        seek = None  # 진행 중인 seek 워밍업 정보
+        if JOBS[job_id].get("zones"):
+            JOBS[job_id]["zones"].reset()
+        snap_cfg = RULES["snapshot"]
+        last_snap_t = None
 
         cap = cv2.VideoCapture(str(path))
         if not cap.isOpened():
@@ -329,11 +996,13 @@ async def process_video_job(job_id: str, path: Path):
 
         start_wall = time.monotonic()
         frame_idx = -1
-        S_ema = F_ema = prev_S = prev_F = 0.0
-        state = "NORMAL"
+        F_ema = S_ema = 0.0
+        state = alert_state = "NORMAL"
         last_state = "NORMAL"
         pause_started = None
         processed_frames = 0
+        last_infer_idx = None
+        frame_buf = None  # 디코딩 버퍼 재사용 (첫 read 에서 할당)
 
         interval = 1.0 / fps if fps > 0 else 0.04
 
@@ -350,81 +1019,69 @@ async def process_video_job(job_id: str, path: Path):
                 start_wall += (time.monotonic() - pause_started)
                 pause_started = None
 
-            ok, frame = cap.read()
+            # 플레이어 시계가 있으면 서버 시계를 거기에 맞춰 둠 (보고가 끊기면 이 위치부터 서버 시계로 이어감)
+            if sync.active:
+                start_wall = time.monotonic() - sync.position()
+
+            # seek: t 이전 가장 가까운 체크포인트 복원 (워밍업 범위 밖이면 t - warm_s 부터 초기 상태로)
+            seek_t = flags.pop("seek", None)
+            if seek_t is not None:
+                if n_frames > 0:
+                    seek_t = min(seek_t, (n_frames - 1) / fps)
+                cp = checkpoints.nearest_before(seek_t)
+                zones = JOBS[job_id].get("zones")
+                if cp is not None and seek_t - cp["t"] <= warm_s:
+                    scorer.restore(cp["scorer"])
+                    if zones:
+                        zones.restore(cp["zones"])
+                    frame_idx = last_infer_idx = cp["frame_idx"]
+                else:
+                    cp = None
+                    scorer.reset()
+                    if zones:
+                        zones.reset()
+                    frame_idx = max(0, round((seek_t - warm_s) * fps)) - 1
+                    last_infer_idx = None
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx + 1)
+                last_state = state = alert_state = scorer.state
+                if gate is not None:
+                    gate.reset()
+                sync.clear()
+                incidents.cut()
+                tick_log.cut()
+                if det_log is not None:
+                    det_log.cut()
+                seek = {
+                    "target": seek_t,
+                    "checkpoint_t": cp["t"] if cp else None,
+                    "started": time.perf_counter(),
+                    "ticks": 0,
+                }
+
+            # 추론 예산에 맞춰 샘플링 간격 결정 - 건너뛸 프레임은 grab() 만 (색변환/복사 생략)
+            eff_stride = max(stride, round(fps / max(slot.budget_ips, 1e-3)))
+            if last_infer_idx is not None and frame_idx + 1 - last_infer_idx < eff_stride:
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+
+            # 플레이어 시계 기준 look-ahead 창이 찼으면 재생이 따라올 때까지 대기
+            if seek is None and not await sync.wait_room((frame_idx + 1) / fps):
+                continue
+
+            ok, frame = cap.read(frame_buf)
             if not ok:
                 break
+            frame_buf = frame
             frame_idx += 1
-
-            if frame_idx % stride != 0:
-                continue
+            last_infer_idx = frame_idx
 
             processed_frames += 1
 
-            # YOLO 추론
-            res = MODEL.predict(
-                source=frame,
-                imgsz=RULES["imgsz"],
-                conf=RULES["conf"],
-                iou=RULES["iou"],
-                device="cpu",
-                max_det=RULES["max_det"],
-                verbose=False,
-            )[0]
-
-            # 최대 점수 및 박스 수집
-            fire_raw, smoke_raw = 0.0, 0.0
-            boxes_out = []
-
-            # 총 감지된 객체 수 로그
-            total_detections = len(res.boxes.xyxy) if res.boxes is not None else 0
-            if total_detections > 0:
-                print(f"🔍 프레임 {processed_frames}: YOLO가 {total_detections}개 객체 감지")
-            elif processed_frames % 30 == 0:  # 30프레임마다 감지 없음 로그
-                print(f"🔍 프레임 {processed_frames}: YOLO 감지 없음")
-
-            if res.boxes is not None and len(res.boxes.xyxy) > 0:
-                xyxy = res.boxes.xyxy.cpu().tolist()
-                clss = res.boxes.cls.cpu().int().tolist()
-                confs = res.boxes.conf.cpu().tolist()
-
-                # 모델 클래스 이름 확인
-                class_names = res.names if hasattr(res, 'names') else {}
-
-                # 감지된 클래스 출력 (첫 10프레임만)
-                if processed_frames <= 10:
-                    detected_classes = [(c, class_names.get(c, f"class_{c}"), cf) for c, cf in zip(clss, confs)]
-                    if detected_classes:
-                        print(f"🎯 프레임 {processed_frames} 감지 클래스: {detected_classes}")
-
-                for (x1, y1, x2, y2), c, cf in zip(xyxy, clss, confs):
-                    class_name = class_names.get(c, f"class_{c}")
-
-                    # 동적 클래스 매핑 사용
-                    is_fire = c in FIRE_CLASS_IDS
-                    is_smoke = c in SMOKE_CLASS_IDS
-
-                    # 모든 감지된 객체를 boxes_out에 추가
-                    if is_fire or is_smoke:
-                        box_data = {
-                            "x1": float(x1), "y1": float(y1), "x2": float(x2), "y2": float(y2),
-                            "cls": int(c), "conf": round(float(cf), 3),
-                            "label": "fire" if is_fire else "smoke" if is_smoke else class_name
-                        }
-                        boxes_out.append(box_data)
-
-                        if is_fire:
-                            fire_raw = max(fire_raw, float(cf))
-                            # 모든 화재 감지 로그 (신뢰도 관계없이)
-                            print(f"🔥 FIRE 감지! 클래스: {c}({class_name}), 신뢰도: {cf:.3f}, 위치: ({x1:.0f},{y1:.0f})-({x2:.0f},{y2:.0f})")
-
-                        if is_smoke:
-                            smoke_raw = max(smoke_raw, float(cf))
-                            # 모든 연기 감지 로그 (신뢰도 관계없이)
-                            print(f"💨 SMOKE 감지! 클래스: {c}({class_name}), 신뢰도: {cf:.3f}, 위치: ({x1:.0f},{y1:.0f})-({x2:.0f},{y2:.0f})")
-                    else:
-                        # 화재/연기가 아닌 다른 객체 (매우 높은 신뢰도만)
-                        if cf > 0.8 and processed_frames % 50 == 0:
-                            print(f"🎯 기타 객체: {c}({class_name}), 신뢰도: {cf:.3f}")
+            fire_raw, smoke_raw, boxes_out, dets, ran = gated_detect(
+                job_id, gate, frame, alert_state, processed_frames, reuse, frame_idx / fps
+            )
 
             # 감지 로깅 (모든 감지 결과)
             if len(boxes_out) > 0:
@@ -432,48 +1089,56 @@ async def process_video_job(job_id: str, path: Path):
             elif processed_frames % 20 == 0:  # 20프레임마다 감지 없음 로그
                 print(f"⚪ 프레임 {processed_frames}: 감지 없음, Fire EMA: {F_ema:.3f}, Smoke EMA: {S_ema:.3f}")
 
-            # EMA & hazard
-            F_ema = alpha * fire_raw + (1 - alpha) * F_ema
-            S_ema = alpha * smoke_raw + (1 - alpha) * S_ema
-            growth = max(0.0, S_ema - prev_S) + max(0.0, F_ema - prev_F)
-            H = max(w_smoke * S_ema, w_fire * F_ema) + w_growth * growth
-            prev_S, prev_F = S_ema, F_ema
+            # EMA & hazard → 상태 결정
+            state = scorer.update(fire_raw, smoke_raw)
+            F_ema, S_ema, H = scorer.F_ema, scorer.S_ema, scorer.H
+            zone_states, alert_state, alert_h = score_zones(job_id, boxes_out, w, h, state, H)
+            SCHEDULER.update_state(job_id, alert_state, alert_h)
 
             # 박스 데이터에 EMA 점수 추가 (필터링 없이 모든 YOLO 감지 결과 표시)
             for box in boxes_out:
-                if box["cls"] == 0:  # Fire
+                if box["label"] == "fire":
                     box["ema_score"] = round(F_ema, 3)
                 else:  # Smoke
                     box["ema_score"] = round(S_ema, 3)
 
-            # 상태 결정
-            th = RULES["thresholds"]
-            if H > th["call_119"]["hazard"]:
-                state = "CALL_119"
-            elif (F_ema > th["fire_growing"]["fire"]) or (H > th["fire_growing"]["hazard"]):
-                state = "FIRE_GROWING"
-            elif S_ema > th["smoke_detected"]["smoke"]:
-                state = "SMOKE_DETECTED"
-            elif (S_ema > th["pre_fire"]["smoke"]) or (F_ema > th["pre_fire"]["fire"]):
-                state = "PRE_FIRE"
-            else:
-                state = "NORMAL"
-
             # 이벤트 push (SSE)
             t_video = frame_idx / fps
-
-            # 상태 변화 추적만 (이메일은 버튼 클릭 시 별도 API로 발송)
+            if det_log is not None:
+                det_log.append(t_video, dets, gated=not ran)
+            # 초기 상태에서 시작한 워밍업 구간은 EMA 가 아직 수렴 전이라 체크포인트로 쓰지 않음
+            if seek is None or seek["checkpoint_t"] is not None:
+                checkpoints.maybe_add(t_video, frame_idx, scorer, JOBS[job_id].get("zones"))
+
+            # seek 워밍업 중에는 점수만 갱신 (이벤트/스냅샷/재생 속도 맞추기 생략)
+            if seek is not None:
+                if t_video < seek["target"]:
+                    seek["ticks"] += 1
+                    last_state = state
+                    await asyncio.sleep(0)
+                    continue
+                start_wall = time.monotonic() - t_video
+                await q.put({
+                    "type": "seeked",
+                    "job_id": job_id,
+                    "t": t_video,
+                    "requested_t": seek["target"],
+                    "checkpoint_t": seek["checkpoint_t"],
+                    "warmup_ticks": seek["ticks"],
+                    "warmup_ms": round((time.perf_counter() - seek["started"]) * 1000, 1),
+                })
+                seek = None
+
+            # 상태 변화 추적 (이메일은 버튼 클릭 시 별도 API로 발송)
+            snap_reason = snapshot_reason(state, last_state, t_video, last_snap_t)
             last_state = state
             event_data = {
                 "type": "tick",
                 "job_id": job_id,
                 "t": t_video,
+                "wall_ts": time.time(),
                 "state": state,
-                "scores": {
-                    "fire": round(F_ema, 3),
-                    "smoke": round(S_ema, 3),
-                    "hazard": round(H, 3),
-                },
+                "scores": scorer.scores(),
                 "raw_scores": {
                     "fire": round(fire_raw, 3),
                     "smoke": round(smoke_raw, 3),
@@ -481,7 +1146,14 @@ async def process_video_job(job_id: str, path: Path):
                 "img_w": w,
                 "img_h": h,
                 "boxes": boxes_out,
+                "budget_ips": round(slot.budget_ips, 2),
             }
+            if zone_states is not None:
+                event_data["zones"] = zone_states
+            if not ran:
+                event_data["gated"] = True  # 게이트가 감지를 건너뜀
+            elif reuse is not None and reuse.last_hit:
+                event_data["reused"] = True  # 이미 분석한 프레임의 감지 결과 재사용
 
             # SSE 데이터 확인 (상태 변화나 높은 점수일 때만)
             # 중요한 이벤트만 로그
@@ -490,26 +1162,52 @@ async def process_video_job(job_id: str, path: Path):
             elif DEBUG_MODE and state != "NORMAL":
                 print(f"📤 {state}: fire={F_ema:.2f}, smoke={S_ema:.2f}, hazard={H:.2f}")
 
-            await q.put(event_data)
-
-            # 재생 속도 맞추기
-            due = start_wall + t_video
-            now = time.monotonic()
-            if due - now > 0:
-                await asyncio.sleep(due - now)
+            if snap_reason:
+                # 디코딩 버퍼는 다음 프레임에 덮어쓰므로 스냅샷(백그라운드 인코딩)에는 복사본을 넘김
+                event_data["snapshot"] = SNAPSHOTS.submit(
+                    job_id, frame.copy(), event_data, snap_reason, overlay=snap_cfg["overlay"]
+                )
+                last_snap_t = t_video
+
+            tick_log.append(event_data)
+            incidents.observe(event_data)
+            sync.push(event_data)  # 플레이어 시계가 없으면 바로 전달
+
+            # 재생 속도 맞추기: 플레이어 시계가 있으면 앞서 분석(창은 wait_room 이 제한), 없으면 서버 시계로 대기
+            # 분석이 재생 위치보다 뒤처졌으면 밀린 프레임은 grab() 으로 건너뜀
+            if sync.active:
+                lag = sync.position() - t_video
+                await asyncio.sleep(0)  # 전달 루프가 제때 돌도록 양보
             else:
-                lag = now - due
-                behind_frames = int(lag / interval)
-                for _ in range(max(0, behind_frames)):
-                    cap.grab()
-                    frame_idx += 1
+                lag = time.monotonic() - (start_wall + t_video)
+                if lag < 0:
+                    await asyncio.sleep(-lag)
+            for _ in range(max(0, int(lag / interval))):
+                cap.grab()
+                frame_idx += 1
 
         cap.release()
+        tick_log.close()  # 렌더/내보내기가 완전한 타임라인을 읽도록 done 표시 전에 닫음
+        INCIDENTS.release(incidents)
         print(f"✅ 분석 완료: {job_id}")
         if DEBUG_MODE:
             print(f"   처리 프레임: {processed_frames}")
-        await q.put({"type": "end", "job_id": job_id})
+        if gate is not None:
+            st = gate.stats
+            print(f"🚦 캐스케이드: 감지 {st['detector_calls']}/{st['frames']} (절약 {st['saved_ratio'] * 100:.1f}%)")
+        if reuse is not None:
+            reuse.flush()
+            st = reuse.stats
+            print(f"♻️ 감지 결과 재사용: {st['hits']}/{st['lookups']} (절약 {st['cpu_saved_s']:.1f}s)")
+        # 앞서 분석해 둔 tick 은 재생이 끝까지 따라올 때까지 마저 전달
+        await sync.drain(lambda: flags.get("stop"))
+        deliver.cancel()
+        while sync.buffer and not flags.get("stop"):
+            await q.put(sync.buffer.popleft())
+        await q.put({"type": "end", "job_id": job_id, "cascade": gate.stats if gate else None,
+                     "reuse": reuse.stats if reuse else None})
         JOBS[job_id]["done"] = True
+        LIFECYCLE.mark_finished(job_id)
 
     except Exception as e:
         print(f"❌ 분석 오류: {job_id}")
@@ -517,10 +1215,230 @@ async def process_video_job(job_id: str, path: Path):
             print(f"   에러: {e}")
             import traceback
             traceback.print_exc()
-        JOBS[job_id]["err"] = str(e)
+        if job_id in JOBS:
+            JOBS[job_id]["err"] = str(e)
+            LIFECYCLE.mark_finished(job_id)
         await q.put({"type": "error", "job_id": job_id, "error": str(e)})
+    except asyncio.CancelledError:
+        if not flags.get("stop"):
+            raise  # 재분석(stop_run)이 멈춘 실행을 취소한 경우만 여기서 끝냄
+    finally:
+        deliver.cancel()
+        if PLAYBACK.get(job_id) is sync:
+            PLAYBACK.pop(job_id)
+        SCHEDULER.unregister(slot)
+        if tick_log is not None:
+            tick_log.close()
+        if incidents is not None:
+            INCIDENTS.release(incidents)
+        if reuse is not None:
+            reuse.close()
+        if det_log is not None:
+            det_log.close()
+        release_flags(job_id, flags)
+
+class StreamRequest(BaseModel):
+    url: str                   # rtsp://..., http://..., 장치 번호("0" / "device:0")
+    fps_target: float = None   # 기본값 RULES["fps_target"]
+    zones: List[Dict[str, Any]] = None  # 감지 구역 (PUT /jobs/{job_id}/zones 와 같은 형식)
+
+@app.post("/streams")
+async def start_stream(req: StreamRequest, background_tasks: BackgroundTasks):
+    """실시간 스트림 분석 시작 → job_id 반환 (이벤트는 /events?job_id= 로 구독)"""
+    if not SCHEDULER.can_accept():
+        raise HTTPException(503, "inference capacity exhausted", headers={"Retry-After": "30"})
+    try:
+        zones = ZoneSet(req.zones, RULES) if req.zones else None
+    except ZoneError as e:
+        raise HTTPException(400, str(e))
+
+    job_id = uuid.uuid4().hex[:12]
+    JOBS[job_id] = {
+        "kind": "stream", "source": req.url, "path": None,
+        "done": False, "err": None, "created": time.time(),
+        "zones": zones,
+    }
+    EVENT_QUEUES[job_id] = new_event_queue(job_id)
+    JOB_FLAGS[job_id] = new_job_flags()
+    STREAMS[job_id] = LatestFrameReader(req.url).start()
+    LIFECYCLE.touch(job_id)
+
+    slot = SCHEDULER.register(job_id, req.fps_target or RULES["fps_target"])
+    background_tasks.add_task(process_stream_job, job_id, slot)
+    return {"job_id": job_id, "events_url": f"/events?job_id={job_id}", "status": slot.status}
+
+def _stream_view(job_id: str) -> Dict[str, Any]:
+    job = JOBS.get(job_id, {})
+    return {
+        "job_id": job_id,
+        "source": job.get("source"),
+        "running": job_id in JOB_FLAGS,
+        "capture": dict(STREAMS[job_id].stats),
+        "latency_ms": job.get("latency_ms"),
+        "ticks": job.get("ticks", 0),
+    }
+
+@app.get("/streams")
+async def list_streams():
+    """실행 중인 스트림 목록과 캡처/지연 통계"""
+    return {"streams": [_stream_view(job_id) for job_id in list(STREAMS)]}
+
+@app.get("/streams/{job_id}")
+async def stream_status(job_id: str):
+    """스트림 캡처 상태, 재연결 횟수, capture→tick 지연"""
+    if job_id not in STREAMS:
+        raise HTTPException(404, "unknown stream")
+    return _stream_view(job_id)
+
+@app.delete("/streams/{job_id}")
+async def stop_stream(job_id: str):
+    """스트림 분석 중지"""
+    if job_id not in STREAMS:
+        raise HTTPException(404, "unknown stream")
+    if job_id in JOB_FLAGS:
+        JOB_FLAGS[job_id]["stop"] = True
+    return {"ok": True}
+
+def put_latest(q: asyncio.Queue, item: Dict[str, Any]) -> None:
+    """큐가 가득 차면 가장 오래된 이벤트를 버리고 넣음 (실시간 스트림은 최신 상태 우선)"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            try:
+                q.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+async def process_stream_job(job_id: str, slot: JobSlot):
+    """
+    실시간 스트림 분석
+    - 캡처 스레드가 보관한 최신 프레임만 추론 (밀린 프레임은 버림)
+    - tick 간격 = 1 / 추론 예산(budget_ips), 추론이 느리면 쉬지 않고 다음 최신 프레임 처리
+    - capture → tick 지연(ms)을 tick 과 /streams/{id} 로 보고
+    """
+    q = EVENT_QUEUES[job_id]
+    flags = JOB_FLAGS[job_id]
+    flags["task"] = asyncio.current_task()
+    reader = STREAMS[job_id]
+    tick_log = det_log = incidents = None
+    latencies = deque(maxlen=200)
+    try:
+        if not await wait_admitted(job_id, slot, q, flags):
+            put_latest(q, {"type": "end", "job_id": job_id})
+            return
+
+        tick_log = TickLog(ticks_path(RUNS / job_id))
+        incidents = INCIDENTS.tracker(job_id, "stream", JOBS[job_id].get("source"))
+        gate = new_gate(job_id)
+        scorer = HazardScorer(RULES)
+        if JOBS[job_id].get("zones"):
+            JOBS[job_id]["zones"].reset()
+        started = time.monotonic()
+        last_state = alert_state = "NORMAL"
+        last_snap_t = None
+        processed_frames = 0
+
+        while not flags.get("stop"):
+            if flags.get("paused"):
+                await asyncio.sleep(0.05)
+                continue
+
+            tick_started = time.monotonic()
+            item = await asyncio.to_thread(reader.wait_next, 1.0)
+            if item is None:
+                continue  # 연결 대기/재연결 중
+            seq, frame, captured_at = item
+            processed_frames += 1
+
+            fire_raw, smoke_raw, boxes_out, dets, ran = gated_detect(
+                job_id, gate, frame, alert_state, processed_frames
+            )
+            h, w = frame.shape[:2]
+            state = scorer.update(fire_raw, smoke_raw)
+            zone_states, alert_state, alert_h = score_zones(job_id, boxes_out, w, h, state, scorer.H)
+            SCHEDULER.update_state(job_id, alert_state, alert_h)
+
+            now = time.monotonic()
+            latency_ms = (now - captured_at) * 1000
+            latencies.append(latency_ms)
+            ordered = sorted(latencies)
+            JOBS[job_id]["latency_ms"] = {
+                "last": round(latency_ms, 1),
+                "avg": round(sum(ordered) / len(ordered), 1),
+                "p95": round(ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0], 1),
+            }
+            JOBS[job_id]["ticks"] = processed_frames
+
+            t = now - started
+            if det_log is None and processed_frames == 1:
+                det_log = open_detection_log(job_id, w, h, reader.stats["src_fps"])
+            if det_log is not None:
+                det_log.append(t, dets, gated=not ran)
+            snap_reason = snapshot_reason(state, last_state, t, last_snap_t)
+            last_state = state
+            event_data = {
+                "type": "tick",
+                "job_id": job_id,
+                "t": t,
+                "wall_ts": time.time(),
+                "seq": seq,
+                "latency_ms": round(latency_ms, 1),
+                "state": state,
+                "scores": scorer.scores(),
+                "raw_scores": {
+                    "fire": round(fire_raw, 3),
+                    "smoke": round(smoke_raw, 3),
+                },
+                "img_w": w,
+                "img_h": h,
+                "boxes": boxes_out,
+            }
+            if zone_states is not None:
+                event_data["zones"] = zone_states
+            if not ran:
+                event_data["gated"] = True
+            if snap_reason:
+                event_data["snapshot"] = SNAPSHOTS.submit(
+                    job_id, frame, event_data, snap_reason, overlay=RULES["snapshot"]["overlay"]
+                )
+                last_snap_t = t
+
+            tick_log.append(event_data)
+            incidents.observe(event_data)
+            put_latest(q, event_data)
+
+            # 다음 tick 까지 남은 시간만큼 대기 (추론이 느리면 바로 다음 최신 프레임)
+            interval = 1.0 / max(slot.budget_ips, 1e-3)
+            remaining = interval - (time.monotonic() - tick_started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+        tick_log.close()
+        INCIDENTS.release(incidents)
+        print(f"✅ 스트림 종료: {job_id}")
+        put_latest(q, {"type": "end", "job_id": job_id, "cascade": gate.stats if gate else None})
+        JOBS[job_id]["done"] = True
+        LIFECYCLE.mark_finished(job_id)
+
+    except Exception as e:
+        print(f"❌ 스트림 분석 오류: {job_id} - {e}")
+        if job_id in JOBS:
+            JOBS[job_id]["err"] = str(e)
+            LIFECYCLE.mark_finished(job_id)
+        put_latest(q, {"type": "error", "job_id": job_id, "error": str(e)})
     finally:
-        JOB_FLAGS.pop(job_id, None)
+        SCHEDULER.unregister(slot)
+        reader.stop()
+        STREAMS.pop(job_id, None)
+        if tick_log is not None:
+            tick_log.close()
+        if incidents is not None:
+            INCIDENTS.release(incidents)
+        if det_log is not None:
+            det_log.close()
+        release_flags(job_id, flags)
 
 # 정적 파일 서빙
 app.mount("/media", StaticFiles(directory=str(MEDIA)), name="media")
@@ -0,0 +1,234 @@
+# backend/media_range.py
+"""
+업로드 영상 서빙용 HTTP Range 응답
+- 단일 byte-range 요청 → 206 Partial Content (Content-Range)
+- 범위 밖 요청 → 416 Range Not Satisfiable
+- If-Range / If-None-Match 지원, ETag = 업로드 때 계산한 내용 해시(blake2b, 업로드 옆 .etag 파일에 보관)
+  해시가 없는 파일은 크기+mtime ETag (요청 경로에서 파일 전체를 읽지 않음)
+- 서버가 ASGI zerocopy 확장을 제공하면 커널 sendfile로 전송,
+  아니면 os.pread 로 필요한 구간만 청크 단위로 읽어 전송
+"""
+
+import hashlib
+import os
+import stat
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 1 << 20   # 폴백 경로의 1회 read 크기 (1MB)
+ETAG_SUFFIX = ".etag"  # 업로드 옆 내용 해시 파일: "size mtime_ns etag"
+
+# path -> (size, mtime_ns, etag)
+_ETAG_CACHE: Dict[str, Tuple[int, int, str]] = {}
+_ETAG_LOCK = threading.Lock()
+
+
+def new_hasher():
+    """업로드/ETag 계산에 공통으로 쓰는 내용 해시"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def etag_sidecar(path: Path) -> Path:
+    return Path(path).with_name(Path(path).name + ETAG_SUFFIX)
+
+
+def seed_etag(path: Path, digest: str) -> None:
+    """업로드 시 스트리밍으로 계산한 해시를 캐시와 .etag 파일에 기록 (서버 재시작 후에도 재사용)"""
+    st = os.stat(path)
+    etag = f'"{digest}"'
+    side = etag_sidecar(path)
+    tmp = side.with_name(side.name + ".tmp")
+    tmp.write_text(f"{st.st_size} {st.st_mtime_ns} {etag}", encoding="utf-8")
+    os.replace(tmp, side)
+    with _ETAG_LOCK:
+        _ETAG_CACHE[str(path)] = (st.st_size, st.st_mtime_ns, etag)
+
+
+def _read_sidecar(path: Path) -> Optional[Tuple[int, int, str]]:
+    try:
+        size, mtime_ns, etag = etag_sidecar(path).read_text(encoding="utf-8").split()
+        return int(size), int(mtime_ns), etag
+    except (OSError, ValueError):
+        return None
+
+
+def file_etag(path: Path, st: os.stat_result) -> str:
+    """
+    strong ETag: 업로드 때 기록한 내용 해시 (캐시 → .etag 파일), (size, mtime)이 다르면 무효
+    - 해시가 없는 파일은 크기+mtime 으로 만든 ETag (파일이 바뀌면 같이 바뀜)
+    """
+    key = str(path)
+    with _ETAG_LOCK:
+        cached = _ETAG_CACHE.get(key)
+    if cached is None:
+        cached = _read_sidecar(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        etag = cached[2]
+    else:
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+    with _ETAG_LOCK:
+        _ETAG_CACHE[key] = (st.st_size, st.st_mtime_ns, etag)
+    return etag
+
+
+def forget_etag(path: Path) -> None:
+    """파일 삭제 시 캐시와 .etag 파일 정리"""
+    with _ETAG_LOCK:
+        _ETAG_CACHE.pop(str(path), None)
+    etag_sidecar(path).unlink(missing_ok=True)
+
+
+class RangeNotSatisfiable(Exception):
+    """요청 범위가 파일 크기를 벗어남 (416)"""
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    'bytes=a-b' | 'bytes=a-' | 'bytes=-n' → (start, end) (end 포함)
+    - 형식이 잘못됐거나 다중 범위면 None (Range 무시 → 200 전체 응답)
+    - 만족할 수 없는 범위면 RangeNotSatisfiable
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # suffix range: 마지막 n 바이트
+        if end is None or end <= 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - end), size - 1
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def _if_range_ok(value: str, etag: str, mtime: float) -> bool:
+    """If-Range 가 현재 표현과 일치하는지 (ETag는 strong 비교, 날짜는 정확히 일치)"""
+    value = value.strip()
+    if value.startswith('"') or value.startswith("W/"):
+        return value == etag
+    try:
+        return int(parsedate_to_datetime(value).timestamp()) == int(mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+class RangeFileResponse(Response):
+    """파일의 [start, end] 구간만 전송하는 응답"""
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        send_body: bool = True,
+    ) -> None:
+        self.path = path
+        self.start = start
+        self.length = max(0, end - start + 1)
+        self.status_code = status_code
+        self.media_type = media_type
+        self.send_body = send_body
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            # 서버가 zerocopy(sendfile)를 지원하면 커널에서 바로 소켓으로 전송
+            if "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": fd,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+                return
+
+            offset = self.start
+            remaining = self.length
+            while remaining > 0:
+                n = min(CHUNK_SIZE, remaining)
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, n, offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                # 파일이 전송 도중 잘린 경우 응답을 마무리
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
+
+
+async def serve_file(request: Request, path: Path, media_type: str = "video/mp4") -> Response:
+    """Range/If-Range/ETag 를 처리해 알맞은 응답(200/206/304/416)을 만든다"""
+    st = await anyio.to_thread.run_sync(os.stat, path)
+    if not stat.S_ISREG(st.st_mode):
+        return Response(status_code=404)
+
+    size = st.st_size
+    etag = await anyio.to_thread.run_sync(file_etag, path, st)
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "cache-control": "no-cache",
+    }
+    send_body = request.method != "HEAD"
+
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or etag in [v.strip() for v in inm.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_ok(if_range, etag, st.st_mtime)):
+        try:
+            rng = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            headers["content-range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if rng is not None:
+            start, end = rng
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(end - start + 1)
+            return RangeFileResponse(path, start, end, 206, headers, media_type, send_body)
+
+    headers["content-length"] = str(size)
+    return RangeFileResponse(path, 0, size - 1, 200, headers, media_type, send_body)
@@ -0,0 +1,569 @@
+# backend/model_server.py
+"""
+여러 uvicorn worker 가 모델 하나를 공유하는 로컬 추론 서버 + job 이벤트 버스
+- 서버 프로세스 1개만 FireDetector(모델)를 로드, worker 들은 Unix 소켓으로 요청 (worker 수와 무관하게 모델 메모리 1벌)
+- 프레임 바이트는 소켓으로 보내지 않음: 연결(채널)마다 공유 메모리를 두고 (offset, shape) 만 전송
+  → 서버는 같은 메모리를 numpy view 로 읽어 여러 worker 의 요청을 한 배치(infer_many)로 추론
+- 이벤트 버스: job 을 처리하는 worker 가 SSE 이벤트를 발행하면 어느 worker 든 /events 로 구독
+  (job 별 최근 history 개를 보관해 늦게 붙은 구독자에게 먼저 전달, 재분석(run) 이전 이벤트는 버림)
+
+실행 (backend/ 에서):
+  python model_server.py --socket /tmp/fire119-model.sock
+  MODEL_SERVER_SOCKET=/tmp/fire119-model.sock uvicorn main:app --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SERVER_DEFAULTS: Dict[str, Any] = {
+    "max_wait_ms": 2.0,      # 첫 요청 후 다른 worker 요청을 더 기다려 배치로 묶는 최대 시간
+    "history": 100,          # job 별 보관 이벤트 수 (늦게 붙은 구독자에게 재전송)
+    "max_jobs": 1000,        # 버스가 기억하는 job 수 (오래된 것부터 제거)
+    "connect_timeout": 30.0, # worker 가 서버 기동을 기다리는 시간
+    "ping_interval": 1.0,    # 구독 연결 유휴 시 ping (끊긴 구독자 정리)
+}
+
+
+def connect(address: str, timeout: Optional[float] = None) -> Tuple[Connection, Dict[str, Any]]:
+    """서버에 연결 (기동 전이면 timeout 까지 재시도) → (연결, 서버 정보)"""
+    timeout = SERVER_DEFAULTS["connect_timeout"] if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = Client(address, family="AF_UNIX")
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+    conn.send(("hello", os.getpid()))
+    return conn, _reply(conn.recv())
+
+
+def _reply(msg: Tuple[str, Any]) -> Any:
+    status, value = msg
+    if status != "ok":
+        raise RuntimeError(f"model server: {value}")
+    return value
+
+
+def _put_latest(q: "queue.Queue", item: Any) -> None:
+    """가득 차면 가장 오래된 항목을 버리고 넣음"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def _close_shm(shm: Optional[shared_memory.SharedMemory], unlink: bool = False) -> None:
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except BufferError:
+        pass  # 남은 view 가 있으면 GC 때 해제
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ---------- 서버 ----------
+
+class EventBus:
+    """job 별 이벤트 history + 구독자 큐 (서버 프로세스 안의 연결 스레드들이 공유)"""
+
+    def __init__(self, history: int = 100, max_jobs: int = 1000):
+        self.history = history
+        self.max_jobs = max_jobs
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._events: Dict[str, deque] = {}
+        self._subs: Dict[str, List["queue.Queue"]] = {}
+        self._lock = threading.Lock()
+
+    def set_job(self, job_id: str, info: Dict[str, Any], reset: bool = False) -> int:
+        """job 등록/갱신 → run 번호 (reset 이면 새 run 으로 history 를 비움)"""
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+            if job is None or reset:
+                job = {**(job or {}), "run": (job["run"] + 1) if job else 1, "done": False, "err": None}
+                self._events[job_id] = deque(maxlen=self.history)
+            job.update(info)
+            self.jobs[job_id] = job
+            while len(self.jobs) > self.max_jobs:
+                old, _ = self.jobs.popitem(last=False)
+                self._events.pop(old, None)
+            return job["run"]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def publish(self, job_id: str, run: int, event: Dict[str, Any]) -> bool:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["run"] != run:
+                return False  # 없는 job / 이전 run 의 늦은 이벤트
+            self._events[job_id].append(event)
+            if event.get("type") in ("end", "error"):
+                job["done"], job["err"] = True, event.get("error")
+            subs = list(self._subs.get(job_id, ()))
+        for q in subs:
+            _put_latest(q, event)
+        return True
+
+    def subscribe(self, job_id: str) -> Optional[Tuple["queue.Queue", List[Dict[str, Any]]]]:
+        """(구독 큐, 지금까지의 history) - 없는 job 이면 None"""
+        with self._lock:
+            if job_id not in self.jobs:
+                return None
+            q: "queue.Queue" = queue.Queue(maxsize=self.history)
+            self._subs.setdefault(job_id, []).append(q)
+            return q, list(self._events[job_id])
+
+    def unsubscribe(self, job_id: str, q: "queue.Queue") -> None:
+        with self._lock:
+            subs = self._subs.get(job_id, [])
+            if q in subs:
+                subs.remove(q)
+            if not subs:
+                self._subs.pop(job_id, None)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"jobs": len(self.jobs), "subscribers": sum(len(s) for s in self._subs.values())}
+
+
+class _Pending:
+    __slots__ = ("frames", "results", "error", "done")
+
+    def __init__(self, frames: List[np.ndarray]):
+        self.frames: Optional[List[np.ndarray]] = frames
+        self.results: Optional[List[Dict[str, Any]]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class ModelServer:
+    """
+    연결마다 스레드 1개가 요청을 받고, 배치 스레드 1개가 모인 요청을 한 번의 infer_many 로 처리
+    - 요청: ("infer", 공유 메모리 이름, [(offset, shape), ...]) → ("ok", 결과 목록)
+    - 버스: ("job", ...), ("get_job", ...), ("publish", ...), ("subscribe", job_id) → 이벤트 스트림
+    """
+
+    def __init__(self, detector, address: str, cfg: Optional[Dict[str, Any]] = None):
+        self.detector = detector
+        self.address = str(address)
+        self.cfg = {**SERVER_DEFAULTS, **(cfg or {})}
+        self.bus = EventBus(self.cfg["history"], self.cfg["max_jobs"])
+        self.stats: Dict[str, Any] = {"clients": 0, "requests": 0, "frames": 0, "batches": 0, "max_batch_frames": 0}
+        self._requests: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._listener: Optional[Listener] = None
+        self._stop = threading.Event()
+
+    def info(self) -> Dict[str, Any]:
+        det = self.detector
+        return {
+            "pid": os.getpid(),
+            "names": dict(det.names),
+            "fire_ids": det.fire_ids, "smoke_ids": det.smoke_ids, "person_ids": det.person_ids,
+            "max_batch": det.max_batch,
+            "cfg": det.cfg,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        st = dict(self.stats)
+        st["avg_batch_frames"] = round(st["frames"] / st["batches"], 2) if st["batches"] else 0.0
+        return {"pid": os.getpid(), "address": self.address, **st, "bus": self.bus.report()}
+
+    def start(self) -> "ModelServer":
+        if os.path.exists(self.address):
+            try:
+                Client(self.address, family="AF_UNIX").close()
+            except OSError:
+                os.unlink(self.address)  # 이전 실행이 남긴 소켓 파일
+            else:
+                raise RuntimeError(f"model server already running at {self.address}")
+        self._listener = Listener(self.address, family="AF_UNIX")
+        threading.Thread(target=self._accept_loop, name="model-accept", daemon=True).start()
+        threading.Thread(target=self._batch_loop, name="model-batch", daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._requests.put(None)
+        try:
+            Client(self.address, family="AF_UNIX").close()  # accept() 대기 해제
+        except OSError:
+            pass
+        self._listener.close()
+
+    # ---------- 연결 처리 ----------
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break
+            if self._stop.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self._serve, args=(conn,), name="model-conn", daemon=True).start()
+
+    def _attach(self, name: str, owner_pid: Optional[int]) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(name=name)
+        if owner_pid != os.getpid():
+            # 해제(unlink)는 만든 worker 책임 - 서버 종료 시 resource_tracker 가 지우지 않도록 등록 해제
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    def _serve(self, conn: Connection) -> None:
+        self.stats["clients"] += 1
+        owner_pid = None
+        shm: Optional[shared_memory.SharedMemory] = None
+        try:
+            while not self._stop.is_set():
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    break
+                op = msg[0]
+                if op == "hello":
+                    owner_pid = msg[1]
+                    conn.send(("ok", self.info()))
+                elif op == "infer":
+                    _, name, layout = msg
+                    if shm is None or shm.name != name:
+                        _close_shm(shm)
+                        shm = self._attach(name, owner_pid)
+                    req = _Pending([np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=off)
+                                    for off, shape in layout])
+                    self._requests.put(req)
+                    req.done.wait()
+                    conn.send(("error", req.error) if req.error else ("ok", req.results))
+                elif op == "publish":
+                    self.bus.publish(*msg[1:])  # 응답 없음 (발행 스레드가 연속 전송)
+                elif op == "job":
+                    conn.send(("ok", self.bus.set_job(*msg[1:])))
+                elif op == "get_job":
+                    conn.send(("ok", self.bus.get_job(msg[1])))
+                elif op == "stats":
+                    conn.send(("ok", self.report()))
+                elif op == "subscribe":
+                    self._stream_events(conn, msg[1])
+                    break
+                else:
+                    conn.send(("error", f"unknown op: {op}"))
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.stats["clients"] -= 1
+            _close_shm(shm)
+            conn.close()
+
+    def _stream_events(self, conn: Connection, job_id: str) -> None:
+        sub = self.bus.subscribe(job_id)
+        if sub is None:
+            conn.send(("error", f"unknown job: {job_id}"))
+            return
+        q, backlog = sub
+        try:
+            conn.send(("ok", self.bus.get_job(job_id)))
+            for event in backlog:
+                conn.send(("event", event))
+            while not self._stop.is_set():
+                try:
+                    conn.send(("event", q.get(timeout=self.cfg["ping_interval"])))
+                except queue.Empty:
+                    conn.send(("ping", None))  # 끊긴 구독자는 여기서 오류 → 정리
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.bus.unsubscribe(job_id, q)
+
+    # ---------- 배치 ----------
+    def _batch_loop(self) -> None:
+        wait = self.cfg["max_wait_ms"] / 1000.0
+        limit = self.detector.max_batch
+        while True:
+            req = self._requests.get()
+            if req is None:
+                return
+            batch, n = [req], len(req.frames)
+            deadline = time.monotonic() + wait
+            while n < limit:
+                try:
+                    nxt = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._requests.put(None)
+                    break
+                batch.append(nxt)
+                n += len(nxt.frames)
+
+            frames = [f for r in batch for f in r.frames]
+            try:
+                results = self.detector.infer_many(frames)
+            except Exception as e:
+                results = None
+                for r in batch:
+                    r.error = f"{type(e).__name__}: {e}"
+            del frames  # 공유 메모리 view 해제 (연결이 끊기면 바로 close 가능하도록)
+
+            i = 0
+            for r in batch:
+                k = len(r.frames)
+                r.frames = None
+                if results is not None:
+                    r.results = results[i:i + k]
+                i += k
+                r.done.set()
+            st = self.stats
+            st["requests"] += len(batch)
+            st["frames"] += n
+            st["batches"] += 1
+            st["max_batch_frames"] = max(st["max_batch_frames"], n)
+
+
+# ---------- worker 쪽 클라이언트 ----------
+
+class _Channel:
+    """서버 연결 1개 + 프레임 전달용 공유 메모리 (요청은 한 번에 하나)"""
+
+    def __init__(self, address: str, timeout: Optional[float] = None):
+        self.conn, self.info = connect(address, timeout)
+        self.shm: Optional[shared_memory.SharedMemory] = None
+
+    def request(self, msg: Tuple) -> Any:
+        self.conn.send(msg)
+        return _reply(self.conn.recv())
+
+    def infer(self, frames: Sequence[np.ndarray]) -> List[Dict[str, Any]]:
+        need = sum(f.nbytes for f in frames)
+        if self.shm is None or self.shm.size < need:
+            _close_shm(self.shm, unlink=True)
+            self.shm = shared_memory.SharedMemory(create=True, size=max(need, 1))
+        layout, offset = [], 0
+        for f in frames:
+            np.copyto(np.ndarray(f.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset), f)
+            layout.append((offset, f.shape))
+            offset += f.nbytes
+        return self.request(("infer", self.shm.name, layout))
+
+    def close(self) -> None:
+        _close_shm(self.shm, unlink=True)
+        self.shm = None
+        self.conn.close()
+
+
+class RemoteDetector:
+    """
+    FireDetector 와 같은 인터페이스(infer / infer_many / names / *_ids / max_batch)로 모델 서버에 추론 요청
+    - 호출 스레드마다 채널을 풀에서 빌려 씀 → 동시에 들어온 요청(다른 worker 포함)은 서버에서 한 배치로 묶임
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = None):
+        self.address = str(address)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_Channel]" = queue.LifoQueue()
+        ch = _Channel(self.address, timeout)
+        info = ch.info
+        self.names: Dict[int, str] = info["names"]
+        self.fire_ids, self.smoke_ids, self.person_ids = info["fire_ids"], info["smoke_ids"], info["person_ids"]
+        self.max_batch: int = info["max_batch"]
+        self.cfg: Dict[str, Any] = info["cfg"]
+        self.server_pid: int = info["pid"]
+        self._idle.put(ch)
+
+    def _take(self) -> _Channel:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _Channel(self.address, self.timeout)
+
+    def infer_many(self, frames: Sequence[np.ndarray]) -> List[Dict[str, Any]]:
+        if not frames:
+            return []
+        ch = self._take()
+        try:
+            results = ch.infer(frames)
+        except (EOFError, OSError):
+            ch.close()  # 끊긴 연결은 버림 (다음 호출에서 새로 연결)
+            raise
+        self._idle.put(ch)
+        return results
+
+    def infer(self, frame: np.ndarray) -> Dict[str, Any]:
+        return self.infer_many([frame])[0]
+
+    def server_stats(self) -> Dict[str, Any]:
+        ch = self._take()
+        try:
+            return ch.request(("stats",))
+        finally:
+            self._idle.put(ch)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class BusClient:
+    """
+    job 이벤트 버스 클라이언트
+    - publish: 전용 스레드가 순서대로 전송 (이벤트 루프를 막지 않음, 밀리면 버리고 dropped 증가)
+    - set_job / get_job: 요청-응답 (다른 worker 가 곧바로 /events 를 열어도 job 이 보이도록 동기 등록)
+    - follow: 구독 스레드에서 history → 실시간 이벤트를 콜백으로 전달
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = None, max_backlog: int = 10000):
+        self.address = str(address)
+        self.timeout = timeout
+        self.dropped = 0
+        self._req, _ = connect(self.address, timeout)
+        self._req_lock = threading.Lock()
+        self._pub, _ = connect(self.address, timeout)
+        self._out: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=max_backlog)
+        self._sender = threading.Thread(target=self._send_loop, name="bus-publish", daemon=True)
+        self._sender.start()
+
+    def _request(self, msg: Tuple) -> Any:
+        with self._req_lock:
+            self._req.send(msg)
+            return _reply(self._req.recv())
+
+    def set_job(self, job_id: str, info: Dict[str, Any], reset: bool = False) -> int:
+        return self._request(("job", job_id, info, reset))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._request(("get_job", job_id))
+
+    def publish(self, job_id: str, run: int, event: Dict[str, Any]) -> None:
+        try:
+            self._out.put_nowait(("publish", job_id, run, event))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """발행 대기 중인 이벤트를 모두 보낼 때까지 대기 (테스트/종료용)"""
+        deadline = time.monotonic() + timeout
+        while self._out.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _send_loop(self) -> None:
+        while True:
+            msg = self._out.get()
+            try:
+                if msg is None:
+                    return
+                self._pub.send(msg)
+            except OSError:
+                self.dropped += 1
+            finally:
+                self._out.task_done()
+
+    def follow(self, job_id: str, on_event: Callable[[Dict[str, Any]], None], stop: threading.Event) -> bool:
+        """
+        job 이벤트를 history 부터 on_event 로 전달 (stop / end / error 까지 블로킹)
+        없는 job 이거나 서버 연결이 끊기면 False
+        """
+        conn, _ = connect(self.address, self.timeout)
+        try:
+            conn.send(("subscribe", job_id))
+            if conn.recv()[0] != "ok":
+                return False
+            while not stop.is_set():
+                kind, event = conn.recv()  # 유휴 시에도 서버 ping 으로 주기적으로 깨어남
+                if kind != "event":
+                    continue
+                on_event(event)
+                if event.get("type") in ("end", "error"):
+                    break
+            return True
+        except (EOFError, OSError):
+            return False
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self._out.put(None)
+        self._sender.join(timeout=5.0)
+        self._pub.close()
+        self._req.close()
+
+
+class BusQueue(asyncio.Queue):
+    """
+    모델 서버 모드의 EVENT_QUEUES 항목: put 한 이벤트를 버스로 발행만 하고 보관하지 않음
+    - 구독은 어느 worker 든 버스에서 받으므로 로컬 큐가 차서 분석이 멈추지 않음
+    - asyncio.Queue.put / put_latest 등 기존 호출 코드는 그대로 (모두 put_nowait 을 거침)
+    """
+
+    def __init__(self, job_id: str, bus: BusClient, run: int,
+                 tap: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        super().__init__()
+        self.job_id = job_id
+        self.bus = bus
+        self.run = run
+        self.tap = tap  # 발행한 이벤트를 이 worker 안에서도 받아 볼 곳 (예: /events/all 요약)
+
+    def put_nowait(self, item: Dict[str, Any]) -> None:
+        self.bus.publish(self.job_id, self.run, item)
+        if self.tap is not None:
+            self.tap(self.job_id, item)
+
+
+def main(argv=None) -> int:
+    from detectors.vision import FireDetector
+
+    ap = argparse.ArgumentParser(description="공유 모델 서버 (uvicorn worker 들이 Unix 소켓으로 추론 요청)")
+    ap.add_argument("--socket", default=os.getenv("MODEL_SERVER_SOCKET", "/tmp/fire119-model.sock"))
+    ap.add_argument("--weights", help="감지 모델 가중치 (기본: find_weights())")
+    ap.add_argument("--precision", default=os.getenv("MODEL_PRECISION", "fp32"), choices=["fp32", "int8"])
+    ap.add_argument("--max-wait-ms", type=float, default=SERVER_DEFAULTS["max_wait_ms"],
+                    help="배치로 묶기 위해 다른 요청을 기다리는 최대 시간")
+    args = ap.parse_args(argv)
+
+    detector = FireDetector(weights=args.weights, config={"model": {"precision": args.precision}})
+    server = ModelServer(detector, args.socket, {"max_wait_ms": args.max_wait_ms}).start()
+    print(f"🧠 모델 서버 시작: {args.socket} (pid {os.getpid()}, 클래스 {detector.names})")
+    try:
+        while True:
+            time.sleep(60)
+            st = server.report()
+            print(f"📈 요청 {st['requests']} / 프레임 {st['frames']} / 배치 평균 {st['avg_batch_frames']} / "
+                  f"연결 {st['clients']} / 버스 job {st['bus']['jobs']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
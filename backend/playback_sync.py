@@ -0,0 +1,196 @@
+# backend/playback_sync.py
+"""
+클라이언트 재생 시계에 맞춘 analyze-ahead 버퍼
+- 브라우저가 POST /jobs/{job_id}/clock 으로 보고한 (currentTime, playbackRate, paused) 로 현재 재생 위치를 추정
+  (보고 사이에는 t + rate * 경과 시간으로 외삽)
+- 분석 루프는 재생 위치 + ahead 초까지 쉬지 않고 앞서 분석 → tick 을 영상 시각 순 버퍼에 넣음
+- 전달 루프(run)는 재생 위치가 tick 시각에 도달하는 순간 SSE 로 보냄
+  → 버퍼링/2배속/일시정지에도 오버레이가 재생 위치와 1 tick 이내로 맞음
+- 분석해 둔 구간 밖으로 탐색하면 report() 가 분석을 옮길 위치를 돌려줌 (체크포인트 seek 재사용)
+- 보고가 stale_after 초 이상 끊기면 비활성 → 버퍼를 바로 비우고 서버 시계 방식으로 돌아감
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+SYNC_DEFAULTS = {
+    "ahead": 3.0,         # 재생 위치보다 앞서 분석해 둘 구간(초)
+    "jump": 1.0,          # 예상 위치와 이만큼(초) 넘게 다르면 탐색으로 봄
+    "max_late": 1.0,      # 재생 위치보다 이만큼(초) 넘게 지난 tick 은 버림
+    "stale_after": 10.0,  # 보고가 끊긴 지 이만큼(초) 지나면 비활성
+    "idle_wait": 0.25,    # 대기 최대 간격(초) - 이 주기로 정지/seek 플래그를 다시 확인
+}
+
+
+class PlaybackSync:
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None, tick: float = 0.2,
+                 now: Callable[[], float] = time.monotonic):
+        self.cfg = {**SYNC_DEFAULTS, **(cfg or {})}
+        self.tick = tick  # tick 간격(초) - 정시 전달 판정 기준
+        self._now = now
+        self.t = 0.0
+        self.rate = 1.0
+        self.paused = True
+        self.at: Optional[float] = None  # 마지막 보고 시각 (None 이면 보고 전)
+        self.buffer: Deque[Dict[str, Any]] = deque()
+        self.analyzed_t: Optional[float] = None  # 마지막으로 분석한 tick 시각
+        self._wake = asyncio.Event()   # 전달 루프: 버퍼/시계 변경
+        self._moved = asyncio.Event()  # 분석 루프: 시계 변경
+        self.stats = {
+            "reports": 0, "seeks": 0, "delivered": 0, "on_time": 0, "dropped": 0,
+            "max_drift_ms": 0.0, "drift_ms_sum": 0.0, "ahead_wait_s": 0.0,
+        }
+
+    # ---------- 재생 시계 ----------
+
+    @property
+    def active(self) -> bool:
+        return self.at is not None and self._now() - self.at <= self.cfg["stale_after"]
+
+    def position(self, now: Optional[float] = None) -> float:
+        """지금 클라이언트 재생 위치 추정치(초)"""
+        if self.at is None:
+            return 0.0
+        if self.paused:
+            return self.t
+        return self.t + self.rate * ((self._now() if now is None else now) - self.at)
+
+    def until(self, t: float, now: Optional[float] = None) -> Optional[float]:
+        """재생 위치가 t 에 도달하기까지 남은 시간(초) - 멈춰 있으면 None"""
+        now = self._now() if now is None else now
+        left = t - self.position(now)
+        if left <= 0:
+            return 0.0
+        if self.paused or self.rate <= 0:
+            return None
+        return left / self.rate
+
+    def report(self, t: float, rate: float = 1.0, paused: bool = False) -> Optional[float]:
+        """
+        클라이언트 시계 갱신 → 분석해 둔 구간 밖으로 탐색했으면 분석을 옮길 위치, 아니면 None
+        (첫 보고는 마지막 분석 위치와 비교)
+        """
+        now = self._now()
+        expected = self.position(now) if self.active else self.analyzed_t
+        self.t, self.rate, self.paused, self.at = max(0.0, float(t)), max(0.0, float(rate)), bool(paused), now
+        self.stats["reports"] += 1
+        self._wake.set()
+        self._moved.set()
+        if expected is None or abs(self.t - expected) <= self.cfg["jump"]:
+            return None
+
+        # 탐색: 앞서 분석해 둔 구간 안이면 지나간 tick 만 버림
+        lo = self.buffer[0]["t"] if self.buffer else self.analyzed_t
+        if lo is not None and lo - self.tick <= self.t <= self.analyzed_t + self.tick:
+            while self.buffer and self.buffer[0]["t"] < self.t - self.tick:
+                self.buffer.popleft()
+                self.stats["dropped"] += 1
+            return None
+        self.clear()
+        self.stats["seeks"] += 1
+        return self.t
+
+    # ---------- 분석 쪽 ----------
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """분석한 tick 을 버퍼에 (영상 시각 오름차순)"""
+        self.buffer.append(event)
+        self.analyzed_t = event["t"]
+        self._wake.set()
+
+    def clear(self) -> None:
+        """분석 위치가 바뀜 → 이전 위치에서 앞서 분석한 tick 은 버림"""
+        self.stats["dropped"] += len(self.buffer)
+        self.buffer.clear()
+        self.analyzed_t = None
+        self._wake.set()
+
+    async def wait_room(self, t: float) -> bool:
+        """
+        영상 시각 t 를 분석해도 되는지 (재생 위치 + ahead 이내) - 아니면 시계가 바뀌거나
+        자리가 날 때까지(최대 idle_wait) 기다린 뒤 False → 호출 쪽은 플래그를 다시 확인하고 재시도
+        """
+        if not self.active:
+            return True
+        over = t - (self.position() + self.cfg["ahead"])
+        if over <= 0:
+            return True
+        wait = self.cfg["idle_wait"]
+        if not self.paused and self.rate > 0:
+            wait = min(wait, over / self.rate)
+        started = time.perf_counter()
+        self._moved.clear()
+        try:
+            await asyncio.wait_for(self._moved.wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+        self.stats["ahead_wait_s"] += time.perf_counter() - started
+        return False
+
+    # ---------- 전달 쪽 ----------
+
+    async def run(self, send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """재생 위치에 도달한 tick 을 send 로 전달 (취소될 때까지) - 비활성이면 바로 전달"""
+        while True:
+            self._wake.clear()
+            while self.buffer:
+                active = self.active
+                late = self.position() - self.buffer[0]["t"] if active else 0.0
+                if late < 0:
+                    break
+                event = self.buffer.popleft()
+                if late > self.cfg["max_late"]:
+                    self.stats["dropped"] += 1
+                    continue
+                if active:
+                    self._record(late)
+                await send(event)
+
+            wait = self.cfg["idle_wait"]
+            if self.buffer and self.active:
+                left = self.until(self.buffer[0]["t"])
+                if left is not None:
+                    wait = min(wait, left)
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self, stop: Callable[[], bool]) -> None:
+        """분석이 끝남 → 남은 tick 이 재생 위치에 맞춰 모두 전달될 때까지 (정지/비활성이면 중단)"""
+        while self.buffer and self.active and not stop():
+            self._moved.clear()
+            try:
+                await asyncio.wait_for(self._moved.wait(), self.cfg["idle_wait"])
+            except asyncio.TimeoutError:
+                pass
+
+    def _record(self, late: float) -> None:
+        st = self.stats
+        st["delivered"] += 1
+        st["on_time"] += late <= self.tick
+        st["drift_ms_sum"] += late * 1000
+        st["max_drift_ms"] = max(st["max_drift_ms"], late * 1000)
+
+    def report_stats(self) -> Dict[str, Any]:
+        st = self.stats
+        pos = self.position()
+        return {
+            "active": self.active,
+            "position": round(pos, 3),
+            "rate": self.rate,
+            "paused": self.paused,
+            "analyzed_t": self.analyzed_t,
+            "ahead_s": round(self.analyzed_t - pos, 3) if self.analyzed_t is not None else None,
+            "buffered": len(self.buffer),
+            "reports": st["reports"],
+            "seeks": st["seeks"],
+            "delivered": st["delivered"],
+            "on_time": st["on_time"],
+            "dropped": st["dropped"],
+            "mean_drift_ms": round(st["drift_ms_sum"] / st["delivered"], 1) if st["delivered"] else None,
+            "max_drift_ms": round(st["max_drift_ms"], 1),
+            "ahead_wait_s": round(st["ahead_wait_s"], 2),
+        }
@@ -0,0 +1,172 @@
+# backend/proxy_media.py
+"""
+업로드 후 백그라운드에서 생성하는 미리보기 자산
+- proxy.mp4   : 저해상도/저프레임 프록시 영상 (원본 대신 빠른 탐색용)
+- sprite.jpg  : N초마다 1장씩 뽑은 썸네일을 격자로 붙인 스프라이트 시트
+- sprite.json : 타일 크기/간격/열 수 등 인덱스 → 프론트에서 background-position 계산
+
+원본을 한 번만 디코딩하면서 프록시와 썸네일을 동시에 만든다.
+실시간 추론과 CPU를 다투지 않도록 낮은 우선순위의 별도 프로세스 풀에서 실행한다.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+PREVIEW_DEFAULTS = {
+    "proxy_height": 360,     # 프록시 영상 세로 해상도
+    "proxy_fps": 10,         # 프록시 영상 프레임레이트
+    "tile_width": 160,       # 썸네일 한 칸 가로 크기
+    "tile_interval": 2.0,    # 썸네일 간격(초) - 영상이 길면 max_tiles 에 맞춰 자동 확대
+    "max_tiles": 400,        # 스프라이트 한 장에 들어갈 최대 타일 수
+    "sprite_cols": 20,
+    "jpeg_quality": 70,
+}
+
+INDEX_NAME = "sprite.json"
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_init():
+    """프리뷰 워커: 낮은 우선순위 + OpenCV 단일 스레드 (추론 스레드 보호)"""
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+    cv2.setNumThreads(1)
+
+
+def get_pool(max_workers: int = 1) -> ProcessPoolExecutor:
+    """프리뷰 생성 전용 프로세스 풀 (지연 생성)"""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=max_workers, initializer=_worker_init)
+    return _POOL
+
+
+def shutdown_pool():
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def open_video_writer(path: Path, fps: float, size) -> cv2.VideoWriter:
+    """브라우저 재생 가능한 H.264(avc1)를 우선 시도, 안 되면 mp4v"""
+    for codec in ("avc1", "mp4v"):
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codec), fps, size)
+        if writer.isOpened():
+            return writer
+        writer.release()
+    raise RuntimeError(f"cannot open video writer: {path}")
+
+
+def read_index(out_dir: Path) -> Optional[Dict[str, Any]]:
+    """생성된 스프라이트 인덱스 로드 (없으면 None)"""
+    p = out_dir / INDEX_NAME
+    if not p.exists():
+        return None
+    with open(p, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_preview_assets(src: str, out_dir: str, opts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    원본 영상을 한 번 디코딩하며 프록시 영상 + 썸네일 스프라이트 + 인덱스 생성
+    (ProcessPoolExecutor 에서 실행되므로 인자/반환값은 pickle 가능한 기본 타입만 사용)
+    """
+    o = dict(PREVIEW_DEFAULTS, **(opts or {}))
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    cap = cv2.VideoCapture(src)
+    if not cap.isOpened():
+        raise RuntimeError(f"cannot open video: {src}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    if w <= 0 or h <= 0:
+        cap.release()
+        raise RuntimeError(f"invalid video size: {src}")
+    duration = n / fps if fps > 0 else 0.0
+
+    # 프록시 해상도 (짝수 정렬 - 코덱 요구사항)
+    ph = min(o["proxy_height"], h) // 2 * 2
+    pw = int(round(w * ph / h)) // 2 * 2
+    proxy_fps = min(float(o["proxy_fps"]), fps)
+    proxy_stride = max(1, round(fps / proxy_fps))
+
+    # 썸네일 격자 - 영상 길이에 맞춰 간격을 늘려 타일 수 제한
+    interval = max(float(o["tile_interval"]), duration / o["max_tiles"] if duration else 0.0)
+    tile_w = int(o["tile_width"])
+    tile_h = int(round(tile_w * h / w)) if w else tile_w
+    # 타일 시각은 마지막 프레임 시각까지만 (duration 이 interval 의 배수면 빈 칸이 생김)
+    last_t = (n - 1) / fps if n > 0 else 0.0
+    n_tiles = min(o["max_tiles"], int(last_t // interval) + 1) if duration else o["max_tiles"]
+    cols = min(o["sprite_cols"], n_tiles)
+    rows = (n_tiles + cols - 1) // cols
+    sprite = np.zeros((rows * tile_h, cols * tile_w, 3), dtype=np.uint8)
+
+    proxy_path = out / "proxy.mp4"
+    writer = open_video_writer(proxy_path, fps / proxy_stride, (pw, ph))
+    proxy_buf = np.empty((ph, pw, 3), dtype=np.uint8)
+    tile_buf = np.empty((tile_h, tile_w, 3), dtype=np.uint8)
+
+    frame_idx = -1
+    next_tile_t = 0.0
+    tile_count = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame_idx += 1
+            t = frame_idx / fps
+
+            if frame_idx % proxy_stride == 0:
+                cv2.resize(frame, (pw, ph), dst=proxy_buf, interpolation=cv2.INTER_AREA)
+                writer.write(proxy_buf)
+
+            if t >= next_tile_t and tile_count < rows * cols:
+                r, c = divmod(tile_count, cols)
+                cv2.resize(frame, (tile_w, tile_h), dst=tile_buf, interpolation=cv2.INTER_AREA)
+                sprite[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w] = tile_buf
+                tile_count += 1
+                next_tile_t += interval
+    finally:
+        cap.release()
+        writer.release()
+
+    # 실제로 채운 행까지만 저장 (FRAME_COUNT 가 부정확한 영상 대비)
+    used_rows = max(1, (tile_count + cols - 1) // cols)
+    cv2.imwrite(str(out / "sprite.jpg"), sprite[:used_rows * tile_h],
+                [cv2.IMWRITE_JPEG_QUALITY, int(o["jpeg_quality"])])
+
+    index = {
+        "proxy": "proxy.mp4",
+        "proxy_w": pw,
+        "proxy_h": ph,
+        "proxy_fps": round(fps / proxy_stride, 3),
+        "sprite": "sprite.jpg",
+        "interval": interval,
+        "tile_w": tile_w,
+        "tile_h": tile_h,
+        "cols": cols,
+        "rows": used_rows,
+        "count": tile_count,
+        "duration": frame_idx / fps if frame_idx >= 0 else duration,
+        "src_w": w,
+        "src_h": h,
+    }
+    tmp = out / (INDEX_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp, out / INDEX_NAME)  # 인덱스는 마지막에 원자적으로 기록
+    return index
@@ -0,0 +1,149 @@
+# backend/quantize.py
+"""
+감지 모델 INT8 사후 양자화 (post-training static quantization)
+- FP32 가중치(.pt) → ONNX export → 우리 업로드 영상에서 뽑은 프레임으로 보정(calibration) → *_int8.onnx
+- 보정 입력은 서비스와 같은 Letterbox 전처리를 거친 프레임 (분포가 실제 추론 입력과 같도록)
+- Detect 헤드의 후처리 연산(DFL/Concat/Sigmoid 등)은 양자화 오차에 민감해 FP32 로 남김 (헤드 Conv 는 양자화)
+- 생성된 모델은 RULES["precision"] = "int8" (또는 MODEL_PRECISION=int8) 로 선택
+  정확도/속도 비교: python backend/compare_models.py --clips ... --rules rules.json
+
+사용 예:
+  python backend/quantize.py --weights models/vision/best_nano_111.pt --frames 300
+  python backend/quantize.py --weights models/vision/best_nano_111.pt --videos media/uploads/*.mp4 --method percentile
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from detectors.vision import ROOT, Letterbox, find_weights, int8_weights
+
+UPLOADS = ROOT / "media" / "uploads"
+
+
+def sample_frames(videos: Sequence[Path], n_frames: int) -> Iterator[np.ndarray]:
+    """영상들에서 고르게 n_frames 장 추출 (영상마다 균등 간격)"""
+    videos = list(videos)
+    per_video = [n_frames // len(videos) + (i < n_frames % len(videos)) for i in range(len(videos))]
+    for path, n in zip(videos, per_video):
+        cap = cv2.VideoCapture(str(path))
+        try:
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+            if not cap.isOpened() or total <= 0 or n <= 0:
+                continue
+            for idx in np.linspace(0, total - 1, num=min(n, total)).round().astype(int):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+                ok, frame = cap.read()
+                if ok:
+                    yield frame
+        finally:
+            cap.release()
+
+
+class FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader 인터페이스 - 프레임을 Letterbox 로 전처리해 한 장씩 공급"""
+
+    def __init__(self, input_name: str, frames: Iterator[np.ndarray], imgsz: int):
+        self.input_name = input_name
+        self.frames = iter(frames)
+        self.letterbox = Letterbox(imgsz, 1)
+        self.count = 0
+
+    def get_next(self):
+        frame = next(self.frames, None)
+        if frame is None:
+            return None
+        self.letterbox.load(0, frame)
+        self.count += 1
+        return {self.input_name: self.letterbox.batch[:1].copy()}
+
+
+def head_postprocess_nodes(model) -> List[str]:
+    """ultralytics ONNX 그래프에서 마지막 모듈(Detect 헤드)의 Conv 가 아닌 노드 이름"""
+    prefixes = {}
+    for node in model.graph.node:
+        parts = node.name.split("/")
+        if len(parts) > 2 and parts[1].startswith("model.") and parts[1][6:].isdigit():
+            prefixes.setdefault(int(parts[1][6:]), []).append(node)
+    if not prefixes:
+        return []
+    return [n.name for n in prefixes[max(prefixes)] if n.op_type != "Conv"]
+
+
+def export_onnx(weights: str, imgsz: int) -> Path:
+    """FP32 ONNX export (배치 1 고정, ultralytics 메타데이터 포함)"""
+    from ultralytics import YOLO
+
+    return Path(YOLO(weights).export(format="onnx", imgsz=imgsz, batch=1, simplify=True, dynamic=False))
+
+
+def quantize(weights: str, videos: Sequence[Path], out: Optional[Path] = None, imgsz: int = 416,
+             n_frames: int = 300, method: str = "minmax") -> Path:
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    out = Path(out) if out else int8_weights(weights)
+    fp32 = Path(weights) if str(weights).endswith(".onnx") else export_onnx(weights, imgsz)
+    prepped = out.with_name(out.stem + ".prep.onnx")
+    quant_pre_process(str(fp32), str(prepped), skip_symbolic_shape=True)
+
+    model = onnx.load(str(prepped))
+    exclude = head_postprocess_nodes(model)
+    reader = FrameCalibrationReader(model.graph.input[0].name, sample_frames(videos, n_frames), imgsz)
+    print(f"🎯 보정: 영상 {len(videos)}개에서 최대 {n_frames}장, 방법={method}, FP32 유지 노드 {len(exclude)}개")
+
+    quantize_static(
+        str(prepped),
+        str(out),
+        reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=exclude,
+        calibrate_method={
+            "minmax": CalibrationMethod.MinMax,
+            "entropy": CalibrationMethod.Entropy,
+            "percentile": CalibrationMethod.Percentile,
+        }[method],
+    )
+    if reader.count == 0:
+        out.unlink(missing_ok=True)
+        raise RuntimeError("no calibration frames could be read from the given videos")
+
+    # 클래스 이름/입력 크기 등 ultralytics 메타데이터 유지 (INT8 모델도 YOLO() 로 로드)
+    src, q = onnx.load(str(fp32)), onnx.load(str(out))
+    del q.metadata_props[:]
+    q.metadata_props.extend(src.metadata_props)
+    onnx.save(q, str(out))
+    prepped.unlink(missing_ok=True)
+
+    size = lambda p: Path(p).stat().st_size / 1e6
+    print(f"✅ INT8 모델: {out} ({size(fp32):.1f} MB → {size(out):.1f} MB, 보정 {reader.count}장)")
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="감지 모델 INT8 사후 양자화")
+    ap.add_argument("--weights", help="FP32 가중치 (.pt 또는 .onnx, 기본: find_weights())")
+    ap.add_argument("--videos", nargs="*", type=Path, help="보정용 영상 (기본: media/uploads/*.mp4)")
+    ap.add_argument("--frames", type=int, default=300, help="보정 프레임 수")
+    ap.add_argument("--imgsz", type=int, default=416)
+    ap.add_argument("--method", default="minmax", choices=["minmax", "entropy", "percentile"])
+    ap.add_argument("--out", type=Path, help="출력 경로 (기본: 가중치 옆 *_int8.onnx)")
+    args = ap.parse_args(argv)
+
+    videos = args.videos or sorted(UPLOADS.glob("*.mp4"))
+    if not videos:
+        ap.error(f"no calibration videos (pass --videos or upload clips to {UPLOADS})")
+    quantize(args.weights or find_weights(), videos, args.out, args.imgsz, args.frames, args.method)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# backend/render_video.py
+"""
+사고 보고용 결과 영상 렌더링 (media/runs/{job_id}/annotated.mp4)
+- 분석 때 기록한 tick 타임라인(ticks.ndjson)을 재사용 → YOLO 재실행 없음
+- 원본을 한 번만 디코딩, tick 사이 프레임은 박스를 선형 보간
+- 분석하지 않은 구간(앞으로 seek 한 "gap" tick 앞, tick 간격이 MAX_INTERP_GAP 초과)은 직전 tick 을
+  MAX_HOLD 초까지만 유지하고 그 뒤는 "NO DATA" 배너 (오래된 박스/상태를 그리지 않음)
+- 디코드 → 그리기 → 인코드 3단계를 스레드로 파이프라인 처리
+- 프레임 버퍼는 미리 할당한 풀을 돌려 쓰고, 오버레이는 제자리(in-place)로 그림
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from proxy_media import open_video_writer
+
+# 상태별 배너 색상 (BGR) - 프론트 VideoPlayer 색상과 동일 계열
+STATE_COLORS = {
+    "NORMAL": (0, 200, 0),
+    "PRE_FIRE": (0, 255, 255),
+    "SMOKE_DETECTED": (0, 136, 255),
+    "FIRE_GROWING": (0, 68, 255),
+    "CALL_119": (0, 0, 255),
+}
+FIRE_COLOR = (68, 68, 239)    # #ef4444
+SMOKE_COLOR = (11, 158, 245)  # #f59e0b
+
+MAX_INTERP_GAP = 2.0  # tick 간격이 이보다 크면(스킵 구간) 보간하지 않음
+MAX_HOLD = 1.0        # 보간할 다음 tick 이 없을 때 직전 tick 을 유지하는 최대 시간(초), 그 뒤는 데이터 없음
+NO_DATA_COLOR = (128, 128, 128)
+
+_SENTINEL = None
+
+
+class RenderCancelled(Exception):
+    """렌더링 취소"""
+
+
+class TickCursor:
+    """프레임 시간 t 에 대해 앞/뒤 tick 을 찾는 단방향 커서 (tick 은 t 오름차순)"""
+
+    def __init__(self, ticks: Iterable[Dict[str, Any]]):
+        self._it = iter(ticks)
+        self.prev: Optional[Dict[str, Any]] = None
+        self.next: Optional[Dict[str, Any]] = next(self._it, None)
+
+    def at(self, t: float) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        while self.next is not None and self.next["t"] <= t:
+            self.prev = self.next
+            self.next = next(self._it, None)
+        return self.prev, self.next
+
+
+def _is_fire(box: Dict[str, Any]) -> bool:
+    label = box.get("label")
+    return label == "fire" if label else box.get("cls") == 0
+
+
+def _iou(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    ix = max(0.0, min(a["x2"], b["x2"]) - max(a["x1"], b["x1"]))
+    iy = max(0.0, min(a["y2"], b["y2"]) - max(a["y1"], b["y1"]))
+    inter = ix * iy
+    if inter <= 0:
+        return 0.0
+    area_a = (a["x2"] - a["x1"]) * (a["y2"] - a["y1"])
+    area_b = (b["x2"] - b["x1"]) * (b["y2"] - b["y1"])
+    return inter / max(1e-6, area_a + area_b - inter)
+
+
+def interp_boxes(a: List[Dict[str, Any]], b: List[Dict[str, Any]], w: float) -> List[Dict[str, Any]]:
+    """
+    두 tick 의 박스를 같은 클래스끼리 IoU 탐욕 매칭 후 선형 보간
+    매칭되지 않은 박스는 가까운 쪽 tick 의 것을 그대로 사용
+    """
+    out = []
+    used = set()
+    for ba in a:
+        best, best_iou = None, 0.0
+        for j, bb in enumerate(b):
+            if j in used or _is_fire(ba) != _is_fire(bb):
+                continue
+            iou = _iou(ba, bb)
+            if iou > best_iou:
+                best, best_iou = j, iou
+        if best is None:
+            if w < 0.5:
+                out.append(ba)
+            continue
+        used.add(best)
+        bb = b[best]
+        box = dict(ba)
+        for k in ("x1", "y1", "x2", "y2", "conf"):
+            box[k] = ba[k] + (bb[k] - ba[k]) * w
+        out.append(box)
+    if w >= 0.5:
+        out.extend(bb for j, bb in enumerate(b) if j not in used)
+    return out
+
+
+def tick_at(prev: Optional[Dict[str, Any]], nxt: Optional[Dict[str, Any]],
+            t: float) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    프레임 시각 t 의 (tick, 박스) - 분석 데이터가 없는 시각이면 (None, [])
+    다음 tick 이 MAX_INTERP_GAP 안이고 gap 이 아니면 보간, 아니면 직전 tick 을 MAX_HOLD 초까지만 유지
+    """
+    if prev is None:
+        return None, []
+    boxes = prev.get("boxes", [])
+    if nxt is not None and not nxt.get("gap") and nxt["t"] - prev["t"] <= MAX_INTERP_GAP:
+        wgt = (t - prev["t"]) / max(1e-6, nxt["t"] - prev["t"])
+        return prev, interp_boxes(boxes, nxt.get("boxes", []), wgt)
+    if t - prev["t"] <= MAX_HOLD:
+        return prev, boxes
+    return None, []
+
+
+def draw_no_data(img: np.ndarray, t: float) -> None:
+    """분석하지 않은 구간: 회색 배너만 (상태/박스 없음)"""
+    h, w = img.shape[:2]
+    scale = max(0.5, h / 720)
+    thick = max(2, int(round(2 * scale)))
+    bh = int(32 * scale)
+    cv2.rectangle(img, (0, 0), (w, bh), NO_DATA_COLOR, -1)
+    cv2.putText(img, f"NO DATA  t={t:6.1f}s  (not analysed)", (int(8 * scale), int(23 * scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6 * scale, (0, 0, 0), thick, cv2.LINE_AA)
+
+
+def draw_overlay(img: np.ndarray, tick: Dict[str, Any], boxes: List[Dict[str, Any]], t: float) -> None:
+    """상태 배너 + hazard 바 + 박스를 프레임에 직접 그림"""
+    h, w = img.shape[:2]
+    scale = max(0.5, h / 720)
+    thick = max(2, int(round(2 * scale)))
+    font = cv2.FONT_HERSHEY_SIMPLEX
+
+    for b in boxes:
+        color = FIRE_COLOR if _is_fire(b) else SMOKE_COLOR
+        p1 = (int(b["x1"]), int(b["y1"]))
+        p2 = (int(b["x2"]), int(b["y2"]))
+        cv2.rectangle(img, p1, p2, color, thick)
+        label = f"{'Fire' if _is_fire(b) else 'Smoke'} {b.get('conf', 0):.2f}"
+        cv2.putText(img, label, (p1[0] + 2, max(12, p1[1] - 6)), font, 0.5 * scale, color, thick, cv2.LINE_AA)
+
+    state = tick.get("state", "NORMAL")
+    scores = tick.get("scores", {})
+    bh = int(32 * scale)
+    cv2.rectangle(img, (0, 0), (w, bh), STATE_COLORS.get(state, (128, 128, 128)), -1)
+    text = (f"{state}  t={t:6.1f}s  hazard={scores.get('hazard', 0):.2f}  "
+            f"fire={scores.get('fire', 0):.2f}  smoke={scores.get('smoke', 0):.2f}")
+    cv2.putText(img, text, (int(8 * scale), int(23 * scale)), font, 0.6 * scale, (0, 0, 0), thick, cv2.LINE_AA)
+
+    # hazard 바 (배너 바로 아래)
+    bar_h = max(4, int(6 * scale))
+    hazard = min(1.0, max(0.0, float(scores.get("hazard", 0))))
+    cv2.rectangle(img, (0, bh), (w, bh + bar_h), (40, 40, 40), -1)
+    cv2.rectangle(img, (0, bh), (int(w * hazard), bh + bar_h), (0, 0, 255), -1)
+
+
+def render_annotated(
+    src: Path,
+    ticks: Iterable[Dict[str, Any]],
+    out_path: Path,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    pool_size: int = 8,
+) -> Dict[str, Any]:
+    """
+    원본 영상 + tick 타임라인 → 오버레이가 입혀진 MP4
+    - progress(done_frames, total_frames) 를 약 1초 분량마다 호출
+    - cancel 이벤트가 set 되면 중단하고 RenderCancelled 발생 (부분 파일 삭제)
+    """
+    cancel = cancel or threading.Event()
+    cap = cv2.VideoCapture(str(src))
+    if not cap.isOpened():
+        raise RuntimeError(f"cannot open video: {src}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    tmp_path = out_path.with_suffix(".part.mp4")
+    writer = open_video_writer(tmp_path, fps, (w, h))
+
+    # 프레임 버퍼 풀: 디코더가 꺼내 쓰고 인코더가 돌려줌 → 프레임당 할당 없음
+    free_q: "queue.Queue[np.ndarray]" = queue.Queue()
+    for _ in range(pool_size):
+        free_q.put(np.empty((h, w, 3), dtype=np.uint8))
+    decoded_q: "queue.Queue" = queue.Queue(maxsize=pool_size)
+    drawn_q: "queue.Queue" = queue.Queue(maxsize=pool_size)
+    errors: List[BaseException] = []
+
+    def decode():
+        idx = 0
+        try:
+            while not cancel.is_set():
+                buf = free_q.get()
+                ok, img = cap.read(buf)
+                if not ok:
+                    break
+                decoded_q.put((idx, img))
+                idx += 1
+        except BaseException as e:  # 스레드 예외는 메인에서 다시 발생
+            errors.append(e)
+        finally:
+            decoded_q.put(_SENTINEL)
+
+    def draw():
+        cursor = TickCursor(ticks)
+        try:
+            while True:
+                item = decoded_q.get()
+                if item is _SENTINEL:
+                    break
+                idx, img = item
+                t = idx / fps
+                tick, boxes = tick_at(*cursor.at(t), t)
+                if tick is not None:
+                    draw_overlay(img, tick, boxes, t)
+                else:
+                    draw_no_data(img, t)
+                drawn_q.put((idx, img))
+        except BaseException as e:
+            errors.append(e)
+            cancel.set()
+            # 디코더가 막히지 않도록 남은 프레임 버퍼를 풀로 회수
+            while True:
+                item = decoded_q.get()
+                if item is _SENTINEL:
+                    break
+                free_q.put(item[1])
+        finally:
+            drawn_q.put(_SENTINEL)
+
+    threads = [threading.Thread(target=decode, daemon=True), threading.Thread(target=draw, daemon=True)]
+    for th in threads:
+        th.start()
+
+    done = 0
+    report_every = max(1, int(round(fps)))
+    try:
+        while True:
+            item = drawn_q.get()
+            if item is _SENTINEL:
+                break
+            _, img = item
+            if not cancel.is_set():
+                try:
+                    writer.write(img)
+                    done += 1
+                    if progress and done % report_every == 0:
+                        progress(done, total)
+                except BaseException as e:
+                    errors.append(e)
+                    cancel.set()
+            free_q.put(img)
+    finally:
+        for th in threads:
+            th.join()
+        cap.release()
+        writer.release()
+
+    if errors or cancel.is_set():
+        tmp_path.unlink(missing_ok=True)
+        if errors:
+            raise errors[0]
+        raise RenderCancelled(str(out_path))
+
+    os.replace(tmp_path, out_path)
+    if progress:
+        progress(done, total or done)
+    return {"frames": done, "fps": fps, "width": w, "height": h, "path": str(out_path)}
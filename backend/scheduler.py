@@ -0,0 +1,246 @@
+# backend/scheduler.py
+"""
+다중 카메라/영상 동시 분석 시 추론 용량(초당 추론 수) 배분
+- job 마다 초당 추론 예산(budget_ips)을 두고, 상태/위험도가 높은 job 부터 채움
+  CALL_119 > FIRE_GROWING > SMOKE_DETECTED > PRE_FIRE > NORMAL
+- 용량이 모자라면 우선순위가 낮은 job 의 샘플링 주기부터 늘림 (최소 min_ips 는 보장)
+- 최소 보장량조차 줄 수 없으면 새 작업은 대기열에 넣고, 대기열도 차면 거절
+- 총 용량은 설정값이 없으면 실측 추론 시간(EMA)으로 추정
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+STATE_PRIORITY = {
+    "NORMAL": 0,
+    "PRE_FIRE": 1,
+    "SMOKE_DETECTED": 2,
+    "FIRE_GROWING": 3,
+    "CALL_119": 4,
+}
+
+SCHEDULER_DEFAULTS = {
+    "capacity_ips": None,    # 초당 총 추론 수 (None 이면 실측 추론 시간으로 추정)
+    "utilization": 0.85,     # 실측 추정 시 사용할 CPU 비율
+    "min_ips": 0.5,          # job 당 최소 보장 추론 수 (NORMAL 카메라도 완전히 멈추지 않음)
+    "max_queue": 10,         # 용량 초과 시 대기 가능한 작업 수
+    "rate_window": 10.0,     # 실측 추론 속도 계산 구간(초)
+}
+
+
+class JobSlot:
+    """스케줄러가 관리하는 job 1개의 상태"""
+
+    def __init__(self, job_id: str, max_ips: float, window: float):
+        self.job_id = job_id
+        self.max_ips = max_ips
+        self.state = "NORMAL"
+        self.hazard = 0.0
+        self.budget_ips = max_ips
+        self.status = "queued"
+        self.admitted = asyncio.Event()
+        self.created = time.time()
+        self._window = window
+        self._stamps: Deque[float] = deque()
+
+    def record(self, now: float) -> None:
+        self._stamps.append(now)
+        while self._stamps and now - self._stamps[0] > self._window:
+            self._stamps.popleft()
+
+    def achieved_ips(self, now: float) -> float:
+        while self._stamps and now - self._stamps[0] > self._window:
+            self._stamps.popleft()
+        return len(self._stamps) / self._window
+
+    @property
+    def priority(self) -> int:
+        return STATE_PRIORITY.get(self.state, 0)
+
+    def view(self, now: float) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "state": self.state,
+            "hazard": round(self.hazard, 3),
+            "max_ips": self.max_ips,
+            "budget_ips": round(self.budget_ips, 3),
+            "achieved_ips": round(self.achieved_ips(now), 3),
+            "shed": self.budget_ips < self.max_ips - 1e-6,
+        }
+
+
+class InferenceScheduler:
+    """상태 가중 추론 예산 배분 + 입장 제어"""
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.cfg = dict(SCHEDULER_DEFAULTS, **cfg)
+        self.slots: Dict[str, JobSlot] = {}
+        self.queue: Deque[str] = deque()
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self._infer_ema: Optional[float] = None
+        self._balanced_capacity = 0.0
+
+    # ---------- 용량 ----------
+    @property
+    def capacity_ips(self) -> float:
+        if self.cfg["capacity_ips"]:
+            return float(self.cfg["capacity_ips"])
+        if self._infer_ema is None:
+            return 10.0  # 실측 전 초기값
+        return self.cfg["utilization"] / max(1e-3, self._infer_ema)
+
+    def record_inference(self, job_id: str, seconds: float) -> None:
+        """추론 1회 완료 보고 → 실측 속도/용량 추정 갱신"""
+        self._infer_ema = seconds if self._infer_ema is None else 0.9 * self._infer_ema + 0.1 * seconds
+        slot = self.slots.get(job_id)
+        if slot is not None:
+            slot.record(time.monotonic())
+        # 실측 용량이 10% 이상 변하면 재배분
+        if abs(self.capacity_ips - self._balanced_capacity) > 0.1 * self._balanced_capacity:
+            self.rebalance("capacity")
+            self._admit_waiting()
+
+    def _running(self) -> List[JobSlot]:
+        return [s for s in self.slots.values() if s.status == "running"]
+
+    def _has_room(self, extra: int = 1) -> bool:
+        return (len(self._running()) + extra) * self.cfg["min_ips"] <= self.capacity_ips
+
+    # ---------- 입장 제어 ----------
+    def can_accept(self) -> bool:
+        """새 작업을 바로 실행하거나 대기열에 넣을 수 있는지"""
+        return self._has_room() or len(self.queue) < self.cfg["max_queue"]
+
+    def register(self, job_id: str, max_ips: float) -> JobSlot:
+        """job 등록: 여유가 있으면 바로 실행, 없으면 대기열"""
+        old = self.slots.get(job_id)
+        if old is not None:
+            self._remove(old)
+        slot = JobSlot(job_id, max_ips, self.cfg["rate_window"])
+        self.slots[job_id] = slot
+        if not self.queue and self._has_room():
+            self._admit(slot)
+        else:
+            self.queue.append(job_id)
+            self._log("queued", job_id=job_id, position=len(self.queue))
+        return slot
+
+    def unregister(self, slot: JobSlot) -> None:
+        """job 종료 (재시작으로 이미 교체된 slot 이면 무시)"""
+        if self.slots.get(slot.job_id) is slot:
+            self._remove(slot)
+            self._admit_waiting()
+
+    def _remove(self, slot: JobSlot) -> None:
+        self.slots.pop(slot.job_id, None)
+        if slot.job_id in self.queue:
+            self.queue.remove(slot.job_id)
+        slot.status = "finished"
+        slot.admitted.set()  # 대기 중이던 작업이 있다면 깨워서 종료하게 함
+        self.rebalance("unregister")
+
+    def _admit(self, slot: JobSlot) -> None:
+        slot.status = "running"
+        slot.admitted.set()
+        self._log("admitted", job_id=slot.job_id)
+        self.rebalance("admit")
+
+    def _admit_waiting(self) -> None:
+        while self.queue and self._has_room():
+            slot = self.slots.get(self.queue.popleft())
+            if slot is not None:
+                self._admit(slot)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        try:
+            return list(self.queue).index(job_id) + 1
+        except ValueError:
+            return None
+
+    # ---------- 예산 배분 ----------
+    def update_state(self, job_id: str, state: str, hazard: float) -> None:
+        """tick 마다 호출 - 상태가 바뀐 경우에만 재배분"""
+        slot = self.slots.get(job_id)
+        if slot is None:
+            return
+        slot.hazard = hazard
+        if state != slot.state:
+            prev = slot.state
+            slot.state = state
+            self.rebalance(f"{job_id}: {prev}→{state}")
+
+    def budget(self, job_id: str) -> float:
+        slot = self.slots.get(job_id)
+        return slot.budget_ips if slot is not None else 0.0
+
+    def rebalance(self, reason: str) -> None:
+        """
+        1) 실행 중인 모든 job 에 min_ips 보장
+        2) 남은 용량을 우선순위가 높은 tier 부터 max_ips 까지 채움
+        3) 다 채우지 못하는 tier 는 남은 용량을 hazard 가중으로 나눔 → 그 아래 tier 는 최소량만
+        """
+        running = self._running()
+        if not running:
+            return
+        capacity = self.capacity_ips
+        self._balanced_capacity = capacity
+        floor = min(self.cfg["min_ips"], capacity / len(running))
+        before = {s.job_id: s.budget_ips for s in running}
+        for s in running:
+            s.budget_ips = min(floor, s.max_ips)
+        remaining = capacity - sum(s.budget_ips for s in running)
+
+        for prio in sorted({s.priority for s in running}, reverse=True):
+            tier = [s for s in running if s.priority == prio]
+            want = sum(s.max_ips - s.budget_ips for s in tier)
+            if want <= remaining:
+                for s in tier:
+                    s.budget_ips = s.max_ips
+                remaining -= want
+                continue
+            # 용량 부족: hazard 가중 water-filling
+            active = [s for s in tier if s.budget_ips < s.max_ips]
+            while remaining > 1e-9 and active:
+                weights = {s.job_id: 1.0 + s.hazard for s in active}
+                total_w = sum(weights.values())
+                share = remaining
+                remaining = 0.0
+                for s in active:
+                    give = share * weights[s.job_id] / total_w
+                    room = s.max_ips - s.budget_ips
+                    if give >= room:
+                        s.budget_ips = s.max_ips
+                        remaining += give - room
+                    else:
+                        s.budget_ips += give
+                active = [s for s in active if s.budget_ips < s.max_ips]
+            break  # 하위 tier 는 최소 보장량만 유지
+
+        changed = {
+            s.job_id: [round(before[s.job_id], 2), round(s.budget_ips, 2)]
+            for s in running
+            if abs(before[s.job_id] - s.budget_ips) > 0.1 * max(before[s.job_id], 1e-6)
+        }
+        if changed:
+            self._log("rebalance", reason=reason, capacity_ips=round(capacity, 2), changed=changed)
+
+    def _log(self, action: str, **info) -> None:
+        self.decisions.append({"at": time.time(), "action": action, **info})
+
+    # ---------- 조회 ----------
+    def report(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        running = self._running()
+        return {
+            "capacity_ips": round(self.capacity_ips, 2),
+            "measured_infer_ms": round(self._infer_ema * 1000, 1) if self._infer_ema else None,
+            "allocated_ips": round(sum(s.budget_ips for s in running), 2),
+            "achieved_ips": round(sum(s.achieved_ips(now) for s in running), 2),
+            "running": len(running),
+            "queued": list(self.queue),
+            "jobs": [s.view(now) for s in sorted(self.slots.values(), key=lambda s: -s.priority)],
+            "decisions": list(self.decisions),
+        }
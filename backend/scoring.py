@@ -0,0 +1,110 @@
+# backend/scoring.py
+"""
+fire/smoke 원점수 → EMA → hazard → 상태 결정
+업로드 분석과 실시간 스트림 분석이 같은 로직을 쓰도록 분리
+- 주기적으로 점수 상태를 체크포인트로 남겨 두면 임의 시각으로 seek 시
+  가까운 체크포인트 복원 + 짧은 워밍업만으로 이어서 분석 가능
+"""
+
+import bisect
+import math
+from typing import Any, Dict, List, Optional
+
+STATES = ["NORMAL", "PRE_FIRE", "SMOKE_DETECTED", "FIRE_GROWING", "CALL_119"]
+
+
+class HazardScorer:
+    """tick 마다 update(fire_raw, smoke_raw) 를 호출해 상태를 갱신"""
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.alpha = rules["ema_alpha"]
+        self.w_smoke = rules["weights"]["s_smoke"]
+        self.w_fire = rules["weights"]["s_fire"]
+        self.w_growth = rules["weights"]["growth"]
+        self.th = rules["thresholds"]
+        self.reset()
+
+    def reset(self) -> None:
+        self.F_ema = self.S_ema = self.prev_F = self.prev_S = 0.0
+        self.H = 0.0
+        self.state = "NORMAL"
+
+    def update(self, fire_raw: float, smoke_raw: float) -> str:
+        alpha = self.alpha
+
+        # EMA & hazard
+        self.F_ema = alpha * fire_raw + (1 - alpha) * self.F_ema
+        self.S_ema = alpha * smoke_raw + (1 - alpha) * self.S_ema
+        growth = max(0.0, self.S_ema - self.prev_S) + max(0.0, self.F_ema - self.prev_F)
+        self.H = max(self.w_smoke * self.S_ema, self.w_fire * self.F_ema) + self.w_growth * growth
+        self.prev_S, self.prev_F = self.S_ema, self.F_ema
+
+        # 상태 결정
+        th = self.th
+        F, S, H = self.F_ema, self.S_ema, self.H
+        if H > th["call_119"]["hazard"]:
+            self.state = "CALL_119"
+        elif (F > th["fire_growing"]["fire"]) or (H > th["fire_growing"]["hazard"]):
+            self.state = "FIRE_GROWING"
+        elif S > th["smoke_detected"]["smoke"]:
+            self.state = "SMOKE_DETECTED"
+        elif (S > th["pre_fire"]["smoke"]) or (F > th["pre_fire"]["fire"]):
+            self.state = "PRE_FIRE"
+        else:
+            self.state = "NORMAL"
+        return self.state
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return {
+            "F_ema": self.F_ema, "S_ema": self.S_ema,
+            "prev_F": self.prev_F, "prev_S": self.prev_S,
+            "H": self.H, "state": self.state,
+        }
+
+    def restore(self, cp: Dict[str, Any]) -> None:
+        self.F_ema, self.S_ema = cp["F_ema"], cp["S_ema"]
+        self.prev_F, self.prev_S = cp["prev_F"], cp["prev_S"]
+        self.H, self.state = cp["H"], cp["state"]
+
+    def warmup_ticks(self, eps: float = 0.02) -> int:
+        """초기 상태의 영향이 eps 아래로 줄어드는 tick 수 ((1-alpha)^n < eps, growth 용 1 tick 추가)"""
+        if self.alpha >= 1:
+            return 1
+        return math.ceil(math.log(eps) / math.log(1 - self.alpha)) + 1
+
+    def scores(self) -> Dict[str, float]:
+        return {
+            "fire": round(self.F_ema, 3),
+            "smoke": round(self.S_ema, 3),
+            "hazard": round(self.H, 3),
+        }
+
+
+class CheckpointIndex:
+    """job 1개의 점수 체크포인트 (영상 시각 t 순 정렬, interval 초 간격)"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._ts: List[float] = []
+        self._items: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def maybe_add(self, t: float, frame_idx: int, scorer: HazardScorer, zones=None) -> bool:
+        """주변 interval 안에 체크포인트가 없으면 추가 (seek 로 구간이 뒤섞여도 간격 유지, 구역별 점수 상태도 함께)"""
+        i = bisect.bisect_left(self._ts, t)
+        if i > 0 and t - self._ts[i - 1] < self.interval:
+            return False
+        if i < len(self._ts) and self._ts[i] - t < self.interval:
+            return False
+        self._ts.insert(i, t)
+        self._items.insert(i, {
+            "t": t, "frame_idx": frame_idx, "scorer": scorer.checkpoint(),
+            "zones": zones.checkpoint() if zones else None,
+        })
+        return True
+
+    def nearest_before(self, t: float) -> Optional[Dict[str, Any]]:
+        i = bisect.bisect_right(self._ts, t)
+        return self._items[i - 1] if i else None
@@ -0,0 +1,156 @@
+# backend/snapshots.py
+"""
+감지 이벤트 스냅샷 저장소 (media/snap/{job_id}/)
+- 상태 전이 시, FIRE_GROWING/CALL_119 유지 중에는 최대 K초마다 1장 저장
+- JPEG 인코딩/파일 쓰기는 스레드 풀에서 처리 → 추론 루프를 막지 않음
+  (넘겨받은 프레임의 소유권을 가져감 - 디코딩 버퍼를 재사용하는 호출자는 복사본을 넘김)
+- 파일명 = {t(ms)}_{state}_{reason}.jpg → 재시작 후에도 인덱스 복원 가능
+- 전체 용량 한도(quota)를 넘으면 가장 오래 쓰이지 않은 스냅샷부터 삭제(LRU)
+"""
+
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from render_video import draw_overlay
+
+
+def snapshot_name(t: float, state: str, reason: str) -> str:
+    return f"{int(round(t * 1000)):010d}_{state}_{reason}.jpg"
+
+
+def _parse_name(name: str) -> Optional[Dict[str, Any]]:
+    stem = name[:-4] if name.endswith(".jpg") else None
+    if not stem:
+        return None
+    ms, _, rest = stem.partition("_")
+    state, _, reason = rest.rpartition("_")
+    if not ms.isdigit() or not state:
+        return None
+    return {"t": int(ms) / 1000.0, "state": state, "reason": reason}
+
+
+class SnapshotStore:
+    """job/t 로 색인되는 스냅샷 저장소 + LRU 디스크 한도"""
+
+    def __init__(self, root: Path, quota_bytes: int, max_workers: int = 2, jpeg_quality: int = 85):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.jpeg_quality = jpeg_quality
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snap")
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Dict[str, Any]]] = {}   # job_id -> name -> entry
+        self._lru: "OrderedDict[tuple, int]" = OrderedDict()     # (job_id, name) -> bytes
+        self._used = 0
+        self._seq = 0                                            # 기록 순번 (재시작 시 수정 시각 순으로 다시 매김)
+        self._load_existing()
+
+    def _load_existing(self):
+        """서버 재시작 시 디스크의 스냅샷으로 인덱스/LRU 복원 (수정 시각 순)"""
+        files = []
+        for job_dir in self.root.iterdir():
+            if not job_dir.is_dir():
+                continue
+            for p in job_dir.glob("*.jpg"):
+                meta = _parse_name(p.name)
+                if meta:
+                    st = p.stat()
+                    files.append((st.st_mtime, job_dir.name, p.name, st.st_size, meta))
+        for _, job_id, name, size, meta in sorted(files):
+            self._register(job_id, name, size, meta)
+
+    def _register(self, job_id: str, name: str, size: int, meta: Dict[str, Any]):
+        self._seq += 1
+        entry = dict(meta, name=name, bytes=size, url=f"/jobs/{job_id}/snapshots/{name}", seq=self._seq)
+        self._index.setdefault(job_id, {})[name] = entry
+        self._lru[(job_id, name)] = size
+        self._used += size
+
+    def _evict(self, keep: tuple) -> None:
+        """용량 한도를 넘는 동안 가장 오래된 스냅샷 삭제 (lock 보유 상태에서 호출)"""
+        while self._used > self.quota_bytes and len(self._lru) > 1:
+            key = next(iter(self._lru))
+            if key == keep:
+                self._lru.move_to_end(key)
+                continue
+            size = self._lru.pop(key)
+            self._used -= size
+            job_id, name = key
+            job = self._index.get(job_id, {})
+            job.pop(name, None)
+            if not job:
+                self._index.pop(job_id, None)
+            (self.root / job_id / name).unlink(missing_ok=True)
+
+    def submit(self, job_id: str, frame: np.ndarray, tick: Dict[str, Any],
+               reason: str, overlay: bool = True) -> str:
+        """
+        스냅샷 저장 예약 후 바로 URL 반환 (인코딩은 백그라운드)
+        frame 의 소유권은 저장소로 넘어옴 - 호출자는 이후 frame 을 수정하지 않아야 함
+        """
+        name = snapshot_name(tick["t"], tick["state"], reason)
+        fut: Future = self._executor.submit(self._write, job_id, name, frame, tick, reason, overlay)
+        fut.add_done_callback(_log_failure)
+        return f"/jobs/{job_id}/snapshots/{name}"
+
+    def _write(self, job_id: str, name: str, frame: np.ndarray, tick: Dict[str, Any],
+               reason: str, overlay: bool):
+        if overlay:
+            draw_overlay(frame, tick, tick.get("boxes", []), tick["t"])
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise RuntimeError(f"jpeg encode failed: {job_id}/{name}")
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with open(job_dir / name, "wb") as f:
+            f.write(buf.data)
+        with self._lock:
+            old = self._lru.pop((job_id, name), None)
+            if old is not None:
+                self._used -= old
+            self._register(job_id, name, len(buf), {"t": tick["t"], "state": tick["state"], "reason": reason})
+            self._evict(keep=(job_id, name))
+
+    def list(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._index.get(job_id, {}).values())
+        return sorted(entries, key=lambda e: e["t"])
+
+    def latest(self, job_id: str) -> Optional[Path]:
+        """가장 최근에 기록한 스냅샷 경로 - 긴급 메일 첨부용 (뒤로 seek 한 뒤면 영상 시각이 더 이른 것일 수 있음)"""
+        with self._lock:
+            entries = self._index.get(job_id)
+            entry = max(entries.values(), key=lambda e: e["seq"]) if entries else None
+        return self.root / job_id / entry["name"] if entry else None
+
+    def path_for(self, job_id: str, name: str) -> Optional[Path]:
+        """스냅샷 조회 (LRU 순서 갱신)"""
+        with self._lock:
+            if (job_id, name) not in self._lru:
+                return None
+            self._lru.move_to_end((job_id, name))
+        return self.root / job_id / name
+
+    def drop_job(self, job_id: str) -> None:
+        """job 의 스냅샷 전체 삭제 (수명 관리에서 호출)"""
+        with self._lock:
+            for name, entry in self._index.pop(job_id, {}).items():
+                if self._lru.pop((job_id, name), None) is not None:
+                    self._used -= entry["bytes"]
+        shutil.rmtree(self.root / job_id, ignore_errors=True)
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"bytes": self._used, "quota_bytes": self.quota_bytes, "files": len(self._lru)}
+
+
+def _log_failure(fut: Future):
+    if fut.exception() is not None:
+        print(f"❌ 스냅샷 저장 실패: {fut.exception()}")
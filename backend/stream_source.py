@@ -0,0 +1,145 @@
+# backend/stream_source.py
+"""
+실시간 카메라 입력 (RTSP / HTTP / 장치 번호)
+- 캡처 전용 스레드가 계속 읽고 '가장 최신 프레임 1장'만 보관 (latest-frame-wins)
+  → 추론이 느려도 오래된 프레임이 쌓이지 않음 (못 쓴 프레임은 dropped 로 집계)
+- 연결 실패/끊김 시 지수 백오프로 재연결
+- 프레임마다 캡처 시각(monotonic)을 함께 넘겨 capture → tick 지연 측정
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def open_capture(url: str):
+    """기본 opener: 숫자/'device:N' 은 로컬 장치, 그 외는 URL/파일 경로"""
+    import cv2
+
+    if url.isdigit():
+        return cv2.VideoCapture(int(url))
+    if url.startswith("device:"):
+        return cv2.VideoCapture(int(url.split(":", 1)[1]))
+    return cv2.VideoCapture(url)
+
+
+class LatestFrameReader:
+    """캡처 스레드 + 최신 프레임 슬롯"""
+
+    def __init__(
+        self,
+        url: str,
+        opener: Callable[[str], Any] = open_capture,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 10.0,
+    ):
+        self.url = url
+        self.opener = opener
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._captured_at = 0.0
+        self._consumed_seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats: Dict[str, Any] = {
+            "connected": False,
+            "frames_read": 0,
+            "frames_dropped": 0,
+            "reconnects": 0,
+            "open_failures": 0,
+            "last_error": None,
+            "width": 0,
+            "height": 0,
+            "src_fps": 0.0,
+        }
+
+    def start(self) -> "LatestFrameReader":
+        self._thread = threading.Thread(target=self._run, name=f"capture:{self.url}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _publish(self, frame) -> None:
+        with self._cond:
+            if self._seq > self._consumed_seq:
+                self.stats["frames_dropped"] += 1  # 이전 프레임은 한 번도 추론되지 못함
+            self._frame = frame
+            self._seq += 1
+            self._captured_at = time.monotonic()
+            self.stats["frames_read"] += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        backoff = self.backoff_initial
+        first = True
+        while not self._stop.is_set():
+            if not first:
+                self.stats["reconnects"] += 1
+            first = False
+
+            cap = None
+            try:
+                cap = self.opener(self.url)
+                if cap is None or not cap.isOpened():
+                    raise RuntimeError(f"cannot open stream: {self.url}")
+                self.stats["connected"] = True
+                self.stats["last_error"] = None
+                backoff = self.backoff_initial
+                self._read_meta(cap)
+
+                while not self._stop.is_set():
+                    ok, frame = cap.read()
+                    if not ok:
+                        self.stats["last_error"] = "read failed / end of stream"
+                        break
+                    self._publish(frame)
+            except Exception as e:
+                self.stats["open_failures"] += 1
+                self.stats["last_error"] = str(e)
+            finally:
+                self.stats["connected"] = False
+                if cap is not None:
+                    cap.release()
+
+            # 재연결 대기 (stop 시 즉시 깨어남)
+            if self._stop.wait(backoff):
+                break
+            backoff = min(self.backoff_max, backoff * 2)
+
+    def _read_meta(self, cap) -> None:
+        try:
+            import cv2
+
+            self.stats["width"] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.stats["height"] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.stats["src_fps"] = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        except Exception:
+            pass
+
+    def wait_next(self, timeout: float = 1.0) -> Optional[Tuple[int, Any, float]]:
+        """
+        아직 가져가지 않은 최신 프레임을 기다려 (seq, frame, captured_at) 반환
+        timeout 안에 새 프레임이 없거나 stop() 된 뒤에는 None
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= self._consumed_seq and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._stop.is_set() or self._seq <= self._consumed_seq:
+                return None
+            self._consumed_seq = self._seq
+            return self._seq, self._frame, self._captured_at
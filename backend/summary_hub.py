@@ -0,0 +1,194 @@
+# backend/summary_hub.py
+"""
+전체 job 요약 스트림 (GET /events/all) - 관제 화면 1개가 카메라 수십 대를 SSE 연결 1개로 봄
+- job 이벤트 큐에 들어가는 이벤트를 observe() 로 받아 job 별 요약(상태 / hazard / 마지막 상태 전이 시각)만 유지
+- 바뀐 job 만 모아 refresh 초마다 한 번 내보내고, 상태가 바뀌면 기다리지 않고 바로 내보냄
+- 내보낼 SSE 프레임은 한 번만 인코딩해 모든 시청자 큐에 같은 bytes 를 넣음 → 서버 비용은 시청자 수와 무관
+- 느린 시청자는 큐가 차면 밀린 프레임을 버리고 전체 스냅샷 1개로 다시 맞춤
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+SUMMARY_DEFAULTS = {
+    "refresh": 1.0,      # 바뀐 요약을 모아 내보내는 간격(초)
+    "heartbeat": 15.0,   # 보낼 것이 없을 때 연결 유지 간격(초)
+    "viewer_buffer": 16, # 시청자별 대기 프레임 수 - 넘치면 스냅샷으로 재동기화
+    "done_ttl": 300.0,   # 끝난 job 요약을 목록에 남겨 두는 시간(초)
+}
+
+
+def sse_frame(payload: Dict[str, Any]) -> bytes:
+    return f"data: {json.dumps(payload, ensure_ascii=False, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class TappedQueue(asyncio.Queue):
+    """
+    job 이벤트 큐: 들어간 이벤트를 tap(job_id, event) 에도 알림
+    (put / put_latest 모두 put_nowait 을 거치고, 큐가 차서 실패한 시도는 알리지 않음)
+    """
+
+    def __init__(self, job_id: str, tap: Callable[[str, Dict[str, Any]], None], maxsize: int = 0):
+        super().__init__(maxsize=maxsize)
+        self.job_id = job_id
+        self.tap = tap
+
+    def put_nowait(self, item: Dict[str, Any]) -> None:
+        super().put_nowait(item)
+        self.tap(self.job_id, item)
+
+
+class SummaryHub:
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None,
+                 describe: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.cfg = {**SUMMARY_DEFAULTS, **(cfg or {})}
+        self.describe = describe  # job_id → {"kind", "name"} (처음 본 job 만)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._urgent = False
+        self._viewers: Set[asyncio.Queue] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"events": 0, "frames": 0, "urgent_frames": 0, "encoded_bytes": 0, "resyncs": 0}
+
+    # ---------- 입력 ----------
+
+    def observe(self, job_id: str, event: Dict[str, Any]) -> None:
+        """job 이벤트 1개 → 요약 갱신 (tick / queued / end / error 만, 나머지는 무시)"""
+        kind = event.get("type")
+        if kind not in ("tick", "queued", "end", "error"):
+            return
+        self.stats["events"] += 1
+        s = self.jobs.get(job_id)
+        if s is None:
+            s = self.jobs[job_id] = {"job_id": job_id, **(self.describe(job_id) if self.describe else {}),
+                                     "status": "queued", "state": "NORMAL", "hazard": 0.0,
+                                     "since": time.time(), "t": None, "updated": time.time()}
+            self._urgent = True
+        self._removed.discard(job_id)
+
+        if kind == "tick":
+            state = event.get("state", "NORMAL")
+            if state != s["state"] or s["status"] != "running":
+                self._urgent = True
+            if state != s["state"]:
+                s["state"] = state
+                s["since"] = event.get("wall_ts") or time.time()
+            s["status"] = "running"
+            s["hazard"] = (event.get("scores") or {}).get("hazard", 0.0)
+            s["t"] = round(event.get("t", 0.0), 2)
+            zones = event.get("zones")
+            if zones:
+                states = {name: z["state"] for name, z in zones.items()}
+                if states != s.get("zones"):
+                    self._urgent = True
+                s["zones"] = states
+        else:
+            status = {"queued": "queued", "end": "done", "error": "error"}[kind]
+            if status != s["status"]:
+                self._urgent = True
+            s["status"] = status
+            if status != "queued":
+                self._expire(time.time())
+        s["updated"] = time.time()
+        self._dirty.add(job_id)
+        if self._urgent and self._wake is not None:
+            self._wake.set()
+
+    # ---------- 팬아웃 ----------
+
+    def snapshot_frame(self) -> bytes:
+        return sse_frame({"type": "snapshot", "ts": time.time(), "jobs": list(self.jobs.values())})
+
+    def _expire(self, now: float) -> None:
+        ttl = self.cfg["done_ttl"]
+        for job_id, s in list(self.jobs.items()):
+            if s["status"] in ("done", "error") and now - s["updated"] > ttl:
+                del self.jobs[job_id]
+                self._dirty.discard(job_id)
+                if self._viewers:  # 시청자가 없으면 다음 시청자는 스냅샷으로 받음
+                    self._removed.add(job_id)
+
+    def flush(self) -> Optional[bytes]:
+        """바뀐 요약 → SSE 프레임 1개 (인코딩 1회) 를 모든 시청자에게"""
+        self._expire(time.time())
+        if not self._dirty and not self._removed:
+            self._urgent = False
+            return None
+        payload: Dict[str, Any] = {
+            "type": "summary",
+            "ts": time.time(),
+            "jobs": [self.jobs[j] for j in sorted(self._dirty) if j in self.jobs],
+        }
+        if self._removed:
+            payload["removed"] = sorted(self._removed)
+        frame = sse_frame(payload)
+        self.stats["frames"] += 1
+        self.stats["urgent_frames"] += self._urgent
+        self.stats["encoded_bytes"] += len(frame)
+        self._dirty.clear()
+        self._removed.clear()
+        self._urgent = False
+
+        resync = None
+        for q in self._viewers:
+            try:
+                q.put_nowait(frame)
+            except asyncio.QueueFull:
+                # 밀린 프레임을 버리고 현재 전체 상태로 다시 맞춤 (스냅샷도 한 번만 인코딩)
+                while not q.empty():
+                    q.get_nowait()
+                if resync is None:
+                    resync = self.snapshot_frame()
+                q.put_nowait(resync)
+                self.stats["resyncs"] += 1
+        return frame
+
+    async def run(self) -> None:
+        """refresh 초마다, 또는 상태가 바뀌면 바로 flush (시청자가 없으면 멈춤)"""
+        next_at = time.monotonic() + self.cfg["refresh"]
+        while self._viewers:
+            wait = next_at - time.monotonic()
+            if not self._urgent and wait > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            self.flush()
+            if time.monotonic() >= next_at:
+                next_at = time.monotonic() + self.cfg["refresh"]
+        self._task = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """시청자 등록 → 현재 스냅샷이 들어 있는 큐 (flush 루프는 첫 시청자가 올 때 시작)"""
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.cfg["viewer_buffer"])
+        q.put_nowait(self.snapshot_frame())
+        self._viewers.add(q)
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._task is None:
+            self._dirty.clear()  # 스냅샷에 이미 들어 있음
+            self._task = asyncio.create_task(self.run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._viewers.discard(q)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """GET /events/all 응답 본문: 스냅샷 → summary 프레임들 (보낼 것이 없으면 heartbeat)"""
+        q = self.subscribe()
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(q.get(), timeout=self.cfg["heartbeat"])
+                except asyncio.TimeoutError:
+                    yield sse_frame({"type": "heartbeat", "ts": time.time()})
+        finally:
+            self.unsubscribe(q)
+
+    def report(self) -> Dict[str, Any]:
+        return {"viewers": len(self._viewers), "jobs": len(self.jobs), **self.stats}
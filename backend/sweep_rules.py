@@ -0,0 +1,276 @@
+# backend/sweep_rules.py
+"""
+원시 감지 로그(detections.dlog) 재생으로 RULES 파라미터 격자 탐색
+- YOLO 재실행 없이 EMA → hazard → 상태 로직을 설정 격자 전체에 한 번에 적용 (NumPy 브로드캐스팅)
+  * EMA 는 (conf, ema_alpha) 고유 조합 수만큼만 계산하고, 가중치/임계치는 (설정 P × tick T) 배열로 일괄 판정
+  * conf 는 기록 당시 RULES["conf"] 이상 값만 의미 있음 (그 아래 박스는 로그에 없음)
+  * 로그 박스는 FireDetector 필터(ROI/HSV/사람 억제) 후 - 재생 점수가 실시간 점수와 같음
+  * 캐스케이드 게이트가 건너뛴 tick(FLAG_GATED)은 실시간처럼 0 으로 재생 (--gated hold: 직전 감지 값 유지)
+- 클립별 정답(화재 시작 시각, 화재 없는 클립은 null)을 주면 설정마다
+  알림까지 걸린 시간(time-to-alert), 놓친 클립 수, 오경보 횟수를 집계
+
+사용 예:
+  python backend/sweep_rules.py media/runs/*/detections.dlog --grid grid.json --labels labels.json --top 20 --out sweep.csv
+
+grid.json  : {"ema_alpha": [0.2, 0.3, 0.4], "thresholds.call_119.hazard": [0.45, 0.6, 0.85], "conf": [0.15, 0.25]}
+labels.json: {"fire_clip.mp4": 12.5, "cooking.mp4": null}   (키: 업로드 파일명 / job_id / 로그 경로)
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from detection_log import DetectionRecord, read_detections
+from scoring import STATES
+
+PARAM_KEYS = [
+    "conf",
+    "ema_alpha",
+    "weights.s_smoke",
+    "weights.s_fire",
+    "weights.growth",
+    "thresholds.pre_fire.smoke",
+    "thresholds.pre_fire.fire",
+    "thresholds.smoke_detected.smoke",
+    "thresholds.fire_growing.fire",
+    "thresholds.fire_growing.hazard",
+    "thresholds.call_119.hazard",
+]
+
+
+def _get(rules: Dict[str, Any], key: str) -> float:
+    cur: Any = rules
+    for part in key.split("."):
+        cur = cur[part]
+    return float(cur)
+
+
+def build_grid(base_rules: Dict[str, Any], spec: Dict[str, List[float]]) -> Dict[str, np.ndarray]:
+    """격자 명세(점 표기 키 → 값 목록)의 곱집합 → 키마다 (P,) 배열 (명세에 없는 키는 base 값)"""
+    unknown = set(spec) - set(PARAM_KEYS)
+    if unknown:
+        raise ValueError(f"unknown grid keys: {sorted(unknown)}")
+    keys = [k for k in PARAM_KEYS if k in spec]
+    combos = list(itertools.product(*(spec[k] for k in keys))) or [()]
+    grid = {k: np.full(len(combos), _get(base_rules, k), dtype=np.float64) for k in PARAM_KEYS}
+    for j, k in enumerate(keys):
+        grid[k] = np.array([c[j] for c in combos], dtype=np.float64)
+    return grid
+
+
+def ema_series(raw: np.ndarray, alphas: np.ndarray, resets: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    raw (K, T), alphas (K,) → EMA (K, T) - 시간축 재귀만 루프, 설정축은 벡터 연산
+    resets (T,) bool: 그 tick 앞에서 EMA 를 0 으로 (분석 중 seek 로 HazardScorer.reset 된 지점)
+    """
+    out = np.empty_like(raw)
+    acc = np.zeros(raw.shape[0], dtype=raw.dtype)
+    a = alphas.astype(raw.dtype)
+    b = 1 - a
+    for i in range(raw.shape[1]):
+        if resets is not None and resets[i]:
+            acc = np.zeros_like(acc)
+        acc = a * raw[:, i] + b * acc
+        out[:, i] = acc
+    return out
+
+
+def hold_gated(raw: np.ndarray, gated: np.ndarray, gaps: np.ndarray) -> np.ndarray:
+    """raw (K, T) 에서 게이트가 건너뛴 tick 을 직전 감지 tick 값으로 채움 (gap 너머로는 유지하지 않음)"""
+    src = np.where(~gated | gaps, np.arange(raw.shape[1]), 0)
+    return raw[:, np.maximum.accumulate(src)]
+
+
+def simulate_levels(rec: DetectionRecord, grid: Dict[str, np.ndarray],
+                    fire_ids: List[int], smoke_ids: List[int], gated: str = "zero") -> np.ndarray:
+    """
+    설정 P 개 × tick T 개의 상태 레벨 (STATES 인덱스, int8)
+    scoring.HazardScorer.update 와 같은 식을 배열로 계산
+    gated: 게이트가 건너뛴 tick 의 원시 점수 - "zero" 실시간과 같이 0 / "hold" 직전 감지 값
+    """
+    P, T = len(grid["conf"]), len(rec)
+    if T == 0:
+        return np.zeros((P, 0), dtype=np.int8)
+
+    # (conf, alpha) 고유 조합별 EMA
+    pairs, inv = np.unique(np.stack([grid["conf"], grid["ema_alpha"]], axis=1), axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    confs = np.unique(pairs[:, 0])
+    fire_by_conf = {c: rec.class_max(fire_ids, c) for c in confs}
+    smoke_by_conf = {c: rec.class_max(smoke_ids, c) for c in confs}
+    fire_raw = np.stack([fire_by_conf[c] for c in pairs[:, 0]]).astype(np.float64)
+    smoke_raw = np.stack([smoke_by_conf[c] for c in pairs[:, 0]]).astype(np.float64)
+    gaps = rec.gaps
+    if gated == "hold" and rec.gated.any():
+        fire_raw = hold_gated(fire_raw, rec.gated & ~gaps, gaps)
+        smoke_raw = hold_gated(smoke_raw, rec.gated & ~gaps, gaps)
+    F_pairs = ema_series(fire_raw, pairs[:, 1], gaps)
+    S_pairs = ema_series(smoke_raw, pairs[:, 1], gaps)
+
+    col = lambda k: grid[k][:, None]  # (P, 1) → tick 축으로 브로드캐스트
+    F, S = F_pairs[inv], S_pairs[inv]
+    dS, dF = np.diff(S, axis=1, prepend=0.0), np.diff(F, axis=1, prepend=0.0)
+    dS[:, gaps], dF[:, gaps] = S[:, gaps], F[:, gaps]  # 초기화 직후 이전 값은 0
+    growth = np.maximum(0.0, dS) + np.maximum(0.0, dF)
+    H = np.maximum(col("weights.s_smoke") * S, col("weights.s_fire") * F) + col("weights.growth") * growth
+
+    return np.select(
+        [
+            H > col("thresholds.call_119.hazard"),
+            (F > col("thresholds.fire_growing.fire")) | (H > col("thresholds.fire_growing.hazard")),
+            S > col("thresholds.smoke_detected.smoke"),
+            (S > col("thresholds.pre_fire.smoke")) | (F > col("thresholds.pre_fire.fire")),
+        ],
+        [4, 3, 2, 1],
+        default=0,
+    ).astype(np.int8)
+
+
+def alert_metrics(levels: np.ndarray, t: np.ndarray, alert_level: int,
+                  onset: Optional[float]) -> Dict[str, np.ndarray]:
+    """
+    클립 1개에 대한 설정별 지표
+    - false_alerts: 화재 시작 전(또는 화재 없는 클립 전체)에 새로 시작된 알림 구간 수
+    - tta: 화재 시작 이후 첫 알림까지 걸린 초 (시작 시점에 이미 알림 중이면 0, 못 잡으면 nan)
+    """
+    alert = levels >= alert_level
+    rising = alert & ~np.pad(alert, ((0, 0), (1, 0)))[:, :-1]
+    if onset is None:
+        return {"false_alerts": rising.sum(axis=1), "tta": np.full(len(alert), np.nan)}
+
+    after = t >= onset
+    false_alerts = rising[:, ~after].sum(axis=1)
+    tta = np.full(len(alert), np.nan)
+    if after.any():
+        a = alert[:, after]
+        hit = a.any(axis=1)
+        first = a.argmax(axis=1)
+        tta[hit] = np.maximum(0.0, t[after][first[hit]] - onset)
+    return {"false_alerts": false_alerts, "tta": tta}
+
+
+def _label_for(path: Path, rec: DetectionRecord, labels: Dict[str, Optional[float]]):
+    for key in (rec.header.get("source"), rec.header.get("job_id"), str(path), path.parent.name):
+        if key and key in labels:
+            return True, labels[key]
+    return False, None
+
+
+def sweep(paths: List[Path], spec: Dict[str, List[float]], labels: Dict[str, Optional[float]],
+          alert_state: str = "CALL_119", base_rules: Optional[Dict[str, Any]] = None,
+          chunk: int = 4096, gated: str = "zero") -> Dict[str, Any]:
+    """
+    chunk: 한 번에 평가할 설정 수 (메모리 = chunk × tick 수 × 8B 배열 여러 개)
+    gated: 게이트가 건너뛴 tick 재생 방식 (simulate_levels 참고)
+    """
+    records = [(p, read_detections(p)) for p in paths]
+    if not records:
+        raise ValueError("no detection logs")
+    base = base_rules or records[0][1].header["rules"]
+    grid = build_grid(base, spec)
+    P = len(grid["conf"])
+    alert_level = STATES.index(alert_state)
+
+    false_alerts = np.zeros(P, dtype=np.int64)
+    missed = np.zeros(P, dtype=np.int64)
+    tta_sum = np.zeros(P)
+    tta_n = np.zeros(P, dtype=np.int64)
+    tta_max = np.zeros(P)
+    clips = []
+    for path, rec in records:
+        has_label, onset = _label_for(path, rec, labels)
+        if not has_label:
+            print(f"⚠️ 정답 없음 → 건너뜀: {path}")
+            continue
+        if not rec.header.get("filtered"):
+            print(f"⚠️ 필터 전 원시 박스 로그 (ROI/HSV/사람 억제 미반영 - 실시간 점수와 다를 수 있음): {path}")
+        for lo in range(0, P, chunk):
+            sl = slice(lo, min(P, lo + chunk))
+            sub = {k: v[sl] for k, v in grid.items()}
+            levels = simulate_levels(rec, sub, rec.header["fire_class_ids"], rec.header["smoke_class_ids"], gated)
+            m = alert_metrics(levels, rec.t, alert_level, onset)
+            false_alerts[sl] += m["false_alerts"]
+            if onset is not None:
+                hit = ~np.isnan(m["tta"])
+                missed[sl] += ~hit
+                tta_sum[sl] += np.nan_to_num(m["tta"])
+                tta_n[sl] += hit
+                tta_max[sl] = np.maximum(tta_max[sl], np.nan_to_num(m["tta"]))
+        clips.append({"path": str(path), "ticks": len(rec), "gated": int(rec.gated.sum()), "onset": onset})
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tta_mean = np.where(tta_n > 0, tta_sum / np.maximum(tta_n, 1), np.nan)
+    # 놓친 클립 → 오경보 → 평균 알림 시간 순
+    order = np.lexsort((np.nan_to_num(tta_mean, nan=np.inf), false_alerts, missed))
+    return {
+        "grid": grid,
+        "order": order,
+        "false_alerts": false_alerts,
+        "missed": missed,
+        "tta_mean": tta_mean,
+        "tta_max": tta_max,
+        "clips": clips,
+    }
+
+
+def _rows(result: Dict[str, Any], keys: List[str], limit: Optional[int] = None):
+    for i in result["order"][:limit]:
+        row = {k: round(float(result["grid"][k][i]), 4) for k in keys}
+        row.update(
+            missed=int(result["missed"][i]),
+            false_alerts=int(result["false_alerts"][i]),
+            tta_mean=None if np.isnan(result["tta_mean"][i]) else round(float(result["tta_mean"][i]), 2),
+            tta_max=round(float(result["tta_max"][i]), 2),
+        )
+        yield row
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="detections.dlog 재생으로 RULES 격자 탐색")
+    ap.add_argument("logs", nargs="+", type=Path)
+    ap.add_argument("--grid", type=Path, required=True, help="파라미터 격자 JSON")
+    ap.add_argument("--labels", type=Path, required=True, help="클립별 화재 시작 시각 JSON (화재 없음 = null)")
+    ap.add_argument("--base", type=Path, help="기준 RULES JSON (기본: 첫 로그에 기록된 RULES)")
+    ap.add_argument("--alert-state", default="CALL_119", choices=STATES[1:])
+    ap.add_argument("--gated", default="zero", choices=["zero", "hold"],
+                    help="게이트가 건너뛴 tick: zero = 실시간과 같이 0, hold = 직전 감지 값 유지")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--out", type=Path, help="전체 결과 CSV")
+    args = ap.parse_args(argv)
+
+    spec = json.loads(args.grid.read_text(encoding="utf-8"))
+    labels = json.loads(args.labels.read_text(encoding="utf-8"))
+    base = json.loads(args.base.read_text(encoding="utf-8")) if args.base else None
+
+    started = time.perf_counter()
+    result = sweep(args.logs, spec, labels, args.alert_state, base, gated=args.gated)
+    elapsed = time.perf_counter() - started
+    n_cfg = len(result["order"])
+    n_ticks = sum(c["ticks"] for c in result["clips"])
+    n_gated = sum(c["gated"] for c in result["clips"])
+    print(f"✅ 설정 {n_cfg}개 × 클립 {len(result['clips'])}개 ({n_ticks} ticks) 평가: {elapsed:.2f}s")
+    if n_gated:
+        print(f"⚠️ 게이트가 건너뛴 tick {n_gated}개 ({n_gated / max(n_ticks, 1):.0%}) → --gated {args.gated} 로 재생")
+
+    keys = [k for k in PARAM_KEYS if k in spec]
+    for rank, row in enumerate(_rows(result, keys, args.top), 1):
+        print(f"#{rank:<3} {row}")
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=keys + ["missed", "false_alerts", "tta_mean", "tta_max"])
+            writer.writeheader()
+            writer.writerows(_rows(result, keys))
+        print(f"📄 저장: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# backend/tick_log.py
+"""
+job 별 분석 tick 타임라인 저장소 (media/runs/{job_id}/ticks.ndjson)
+- 분석 중 SSE 로 보내는 tick 이벤트를 그대로 한 줄씩 기록
+- 결과 영상 렌더링 등에서 YOLO 재실행 없이 타임라인을 재사용
+- 앞으로 seek 해서 건너뛴 영상 구간은 기록이 없음 → 그 뒤 첫 tick 에 "gap": true
+  (렌더/내보내기/사고 구간은 이 tick 과 직전 tick 사이를 "데이터 없음" 으로 다룸)
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+TICKS_NAME = "ticks.ndjson"
+
+
+def ticks_path(run_dir: Path) -> Path:
+    return run_dir / TICKS_NAME
+
+
+class TickLog:
+    """
+    tick 이벤트 append 전용 기록기 (재분석 시 새로 작성 - 이전 실행의 기록기가 닫힌 뒤에 열 것, main.stop_run)
+    t 오름차순만 기록 - seek 로 이미 기록한 구간을 다시 분석하면 그 tick 은 건너뜀
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.last_t: Optional[float] = None
+        self._cut = False
+        self._f = open(path, "w", encoding="utf-8")
+
+    def cut(self) -> None:
+        """seek: 다음에 기록하는 tick 이 직전 기록과 이어지지 않으면 gap 표시"""
+        self._cut = True
+
+    def append(self, tick: Dict[str, Any]) -> bool:
+        if self.last_t is not None and tick["t"] <= self.last_t:
+            self._cut = False  # 이미 기록한 구간을 다시 지나는 중 → 기록 끝에서 이어짐
+            return False
+        if self._cut and self.last_t is not None:
+            tick["gap"] = True  # 직전 tick 과 이 tick 사이는 분석하지 않음 (SSE/사고 구간에도 같이 전달)
+        self._cut = False
+        self.last_t = tick["t"]
+        self._f.write(json.dumps(tick, ensure_ascii=False, separators=(",", ":")))
+        self._f.write("\n")
+        return True
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_ticks(path: Path) -> Iterator[Dict[str, Any]]:
+    """기록된 tick 을 시간 순서대로 하나씩 읽기 (전체를 메모리에 올리지 않음)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
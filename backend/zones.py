@@ -0,0 +1,156 @@
+# backend/zones.py
+"""
+카메라 1대 안의 여러 감지 구역 (예: 조리대 / 보관 선반 / 출입구)
+- 구역: 정규화 좌표(0~1) 다각형 + 구역별 thresholds / weights / ema_alpha (RULES 기본값 위에 덮어씀)
+- 다각형은 생성 시 GRID×GRID 마스크로 한 번 래스터화 → tick 마다 박스 중심을 격자 좌표로 바꿔
+  (구역 수 × 박스 수) 소속 행렬을 배열 인덱싱 한 번으로 구함
+- 감지는 프레임당 1회 (전체 프레임 결과를 구역별로 나눔) → 구역이 늘어도 추가 비용은 배열 연산 + 구역별 EMA 갱신뿐
+- 구역마다 HazardScorer (EMA / hazard / 상태) - seek 체크포인트에 함께 저장
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from scoring import STATES, HazardScorer
+
+GRID = 256
+OVERRIDE_KEYS = ("thresholds", "weights", "ema_alpha")
+
+
+class ZoneError(ValueError):
+    """구역 정의 오류"""
+
+
+def parse_zones(defs: Sequence[Dict[str, Any]], rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """구역 정의 검증 → {name, polygon, thresholds?, weights?, ema_alpha?} 목록"""
+    zones, seen = [], set()
+    for i, z in enumerate(defs):
+        if not isinstance(z, dict):
+            raise ZoneError(f"zone {i}: must be an object")
+        name = z.get("name")
+        if not isinstance(name, str) or not name:
+            raise ZoneError(f"zone {i}: name is required")
+        if name in seen:
+            raise ZoneError(f"zone {name}: duplicate name")
+        seen.add(name)
+        poly = z.get("polygon")
+        try:
+            pts = np.asarray(poly, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ZoneError(f"zone {name}: polygon must be [[x, y], ...]") from None
+        if pts.ndim != 2 or pts.shape[1] != 2 or len(pts) < 3:
+            raise ZoneError(f"zone {name}: polygon needs at least 3 [x, y] points")
+        if not np.isfinite(pts).all() or pts.min() < 0 or pts.max() > 1:
+            raise ZoneError(f"zone {name}: coordinates must be normalized to 0~1")
+        for key in ("thresholds", "weights"):
+            for k, v in (z.get(key) or {}).items():
+                if k not in rules[key]:
+                    raise ZoneError(f"zone {name}: unknown {key} key {k!r}")
+                if key == "thresholds" and (not isinstance(v, dict) or set(v) - set(rules[key][k])):
+                    raise ZoneError(f"zone {name}: thresholds.{k} keys must be within {sorted(rules[key][k])}")
+        zone = {"name": name, "polygon": pts.tolist()}
+        zone.update({k: z[k] for k in OVERRIDE_KEYS if z.get(k) is not None})
+        zones.append(zone)
+    return zones
+
+
+def zone_rules(rules: Dict[str, Any], zone: Dict[str, Any]) -> Dict[str, Any]:
+    """RULES 에 구역별 값을 덮어쓴 점수 규칙"""
+    th = {k: {**v, **zone.get("thresholds", {}).get(k, {})} for k, v in rules["thresholds"].items()}
+    return {
+        "ema_alpha": zone.get("ema_alpha", rules["ema_alpha"]),
+        "weights": {**rules["weights"], **zone.get("weights", {})},
+        "thresholds": th,
+    }
+
+
+def zone_mask(polygon: Sequence[Sequence[float]], grid: int = GRID) -> np.ndarray:
+    """정규화 다각형 → grid×grid bool 마스크 (격자 칸 [gx/grid, (gx+1)/grid))"""
+    mask = np.zeros((grid, grid), dtype=np.uint8)
+    shift = 4
+    pts = np.round(np.asarray(polygon) * grid * (1 << shift)).astype(np.int32)
+    cv2.fillPoly(mask, [pts], 1, lineType=cv2.LINE_8, shift=shift)
+    return mask.astype(bool)
+
+
+class ZoneSet:
+    """job 1개의 구역 목록 - update(boxes, w, h) 를 tick 마다 호출"""
+
+    def __init__(self, defs: Sequence[Dict[str, Any]], rules: Dict[str, Any], grid: int = GRID):
+        self.defs = parse_zones(defs, rules)
+        self.names = [z["name"] for z in self.defs]
+        self.grid = grid
+        if self.defs:
+            self.masks = np.stack([zone_mask(z["polygon"], grid) for z in self.defs])
+        else:
+            self.masks = np.zeros((0, grid, grid), dtype=bool)
+        self.scorers = [HazardScorer(zone_rules(rules, z)) for z in self.defs]
+
+    def __len__(self) -> int:
+        return len(self.defs)
+
+    def assign(self, boxes: Sequence[Dict[str, Any]], w: int, h: int) -> np.ndarray:
+        """박스 중심이 속한 구역 → (구역 수, 박스 수) bool 행렬 (한 박스가 여러 구역에 속할 수 있음)"""
+        if not boxes:
+            return np.zeros((len(self.defs), 0), dtype=bool)
+        xyxy = np.array([(b["x1"], b["y1"], b["x2"], b["y2"]) for b in boxes], dtype=np.float64)
+        g = self.grid
+        gx = np.clip(((xyxy[:, 0] + xyxy[:, 2]) * (g / (2.0 * w))).astype(np.intp), 0, g - 1)
+        gy = np.clip(((xyxy[:, 1] + xyxy[:, 3]) * (g / (2.0 * h))).astype(np.intp), 0, g - 1)
+        return self.masks[:, gy, gx]
+
+    def update(self, boxes: Sequence[Dict[str, Any]], w: int, h: int) -> Dict[str, Dict[str, Any]]:
+        """
+        필터 후 fire/smoke 박스를 구역별로 나눠 구역별 EMA/상태 갱신 → tick 의 "zones"
+        박스에는 속한 구역 이름 목록("zones")을 붙임
+        """
+        hit = self.assign(boxes, w, h)
+        if boxes:
+            conf = np.array([b["conf"] for b in boxes], dtype=np.float64)
+            is_fire = np.array([b["label"] == "fire" for b in boxes], dtype=bool)
+            fire_raw = np.where(hit & is_fire, conf, 0.0).max(axis=1).tolist()
+            smoke_raw = np.where(hit & ~is_fire, conf, 0.0).max(axis=1).tolist()
+            counts = hit.sum(axis=1).tolist()
+            for box, row in zip(boxes, hit.T.tolist()):
+                box["zones"] = [n for n, inside in zip(self.names, row) if inside]
+        else:
+            fire_raw = smoke_raw = counts = [0] * len(self.defs)
+
+        out = {}
+        for name, scorer, f, s, n in zip(self.names, self.scorers, fire_raw, smoke_raw, counts):
+            out[name] = {
+                "state": scorer.update(f, s),
+                "scores": scorer.scores(),
+                "raw_scores": {"fire": round(f, 3), "smoke": round(s, 3)},
+                "n_boxes": n,
+            }
+        return out
+
+    def worst(self, state: str, hazard: float) -> Tuple[str, float]:
+        """전체 프레임 상태/hazard 와 구역 상태 중 가장 높은 것 (스케줄러 우선순위 / 캐스케이드 게이트용)"""
+        for scorer in self.scorers:
+            if STATES.index(scorer.state) > STATES.index(state):
+                state = scorer.state
+            hazard = max(hazard, scorer.H)
+        return state, hazard
+
+    def reset(self) -> None:
+        for scorer in self.scorers:
+            scorer.reset()
+
+    def checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        return {name: scorer.checkpoint() for name, scorer in zip(self.names, self.scorers)}
+
+    def restore(self, cp: Optional[Dict[str, Dict[str, Any]]]) -> None:
+        """이름이 같은 구역만 복원 (체크포인트 이후 바뀐 구역은 초기 상태)"""
+        for name, scorer in zip(self.names, self.scorers):
+            if cp and name in cp:
+                scorer.restore(cp[name])
+            else:
+                scorer.reset()
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """구역 정의 + 현재 상태/점수"""
+        return [{**z, "state": s.state, "scores": s.scores()} for z, s in zip(self.defs, self.scorers)]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+정지 이미지 일괄 추론(POST /infer 파이프라인) 처리량 벤치마크 - 합성 JPEG 사용
+배치 크기별 images/sec 와 파이프라인 최대 RSS 증가량을 출력
+(기본은 엔진 오버헤드만 재는 빈 모델, --weights 로 실제 YOLO)
+
+사용 예: python bench_bulk_infer.py --images 400 --batches 1,2,4,8,16 [--weights models/vision/best_nano_111.pt]
+"""
+import argparse
+import asyncio
+import resource
+import sys
+import time
+
+sys.path.append('backend')
+
+import cv2
+import numpy as np
+
+from bulk_infer import infer_images
+from bench_detector import NullBackend
+from detectors.vision import FireDetector
+
+
+def synthetic_jpegs(n, h, w, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (9, 9), 0)  # 실제 사진에 가까운 압축률
+    out = []
+    for i in range(n):
+        ok, buf = cv2.imencode(".jpg", np.roll(base, i * 13, axis=1), [cv2.IMWRITE_JPEG_QUALITY, 85])
+        out.append(buf.tobytes())
+    return out
+
+
+async def run_once(det, jpegs, batch, workers, max_pending):
+    async def source():
+        for i, data in enumerate(jpegs):
+            yield f"{i}.jpg", data
+
+    n = 0
+    async for _ in infer_images(det, source(), batch_size=batch, workers=workers, max_pending=max_pending):
+        n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="POST /infer 일괄 추론 벤치마크")
+    ap.add_argument("--images", type=int, default=400)
+    ap.add_argument("--size", default="1280x720", help="합성 이미지 크기 WxH")
+    ap.add_argument("--batches", default="1,2,4,8,16")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--max-pending", type=int, default=32)
+    ap.add_argument("--imgsz", type=int, default=416)
+    ap.add_argument("--weights", help="실제 YOLO 가중치 (없으면 빈 모델로 엔진 오버헤드만 측정)")
+    args = ap.parse_args()
+
+    w, h = (int(v) for v in args.size.split("x"))
+    batches = [int(b) for b in args.batches.split(",")]
+    config = {"model": {"imgsz": args.imgsz, "max_batch": max(batches)}}
+    if args.weights:
+        det = FireDetector(weights=args.weights, config=config)
+    else:
+        det = FireDetector(config=config, backend=NullBackend())
+
+    jpegs = synthetic_jpegs(args.images, h, w)
+    mb = sum(map(len, jpegs)) / 1e6
+    print(f"📊 backend={type(det.backend).__name__}, {args.images}장 {w}x{h} JPEG ({mb:.1f} MB), "
+          f"workers={args.workers}, max_pending={args.max_pending}")
+
+    asyncio.run(run_once(det, jpegs[:max(batches)], max(batches), args.workers, args.max_pending))  # 워밍업
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for batch in batches:
+        started = time.perf_counter()
+        n = asyncio.run(run_once(det, jpegs, batch, args.workers, args.max_pending))
+        elapsed = time.perf_counter() - started
+        print(f"  batch={batch:>3}: {n / elapsed:8.1f} images/s  ({elapsed * 1000 / n:6.2f} ms/image)")
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"  최대 RSS 증가: {(rss_after - rss_before) / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+감지 엔진(FireDetector) 마이크로 벤치마크 - 합성 프레임 사용
+1) 전처리: 미리 할당한 letterbox 버퍼 vs 프레임마다 새 배열을 만드는 방식
+2) 추론: infer() 반복 vs infer_many() 배치 (기본은 엔진 오버헤드만 재는 빈 모델, --weights 로 실제 YOLO)
+3) 영상: 순차 read → infer vs process_video (디코딩 스레드 + backpressure)
+
+사용 예: python bench_detector.py --frames 200 --imgsz 416 [--weights models/vision/best_nano_111.pt]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append('backend')
+
+import cv2
+import numpy as np
+
+from detectors.vision import FireDetector, Letterbox, PAD_VALUE
+
+
+class NullBackend:
+    """forward 없이 고정 박스 1개 반환 - 엔진 자체 오버헤드 측정용"""
+
+    names = {0: "fire", 1: "smoke"}
+    max_batch = None
+
+    def predict(self, batch, conf, iou, max_det):
+        s = batch.shape[-1]
+        box = np.array([[s * 0.3, s * 0.3, s * 0.6, s * 0.6, 0.8, 0]], dtype=np.float32)
+        return [box for _ in range(len(batch))]
+
+
+def synthetic_frames(n, h, w, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+    return [np.roll(base, i * 7, axis=1) for i in range(n)]
+
+
+def naive_preprocess(frame, imgsz):
+    """버퍼 재사용 없이 매번 새 배열 생성 (일반적인 구현)"""
+    h, w = frame.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    nw, nh = round(w * r), round(h * r)
+    resized = cv2.resize(frame, (nw, nh))
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    padded = cv2.copyMakeBorder(resized, top, imgsz - nh - top, left, imgsz - nw - left,
+                                cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3)
+    rgb = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)).astype(np.float32)[None] / 255.0
+
+
+def timeit(fn, n):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) / n * 1000
+
+
+def bench_preprocess(frames, imgsz):
+    lb = Letterbox(imgsz, 1)
+
+    def prealloc():
+        for f in frames:
+            lb.load(0, f)
+
+    def naive():
+        for f in frames:
+            naive_preprocess(f, imgsz)
+
+    prealloc()  # 버퍼 준비
+    naive_preprocess(frames[0], imgsz)
+    a, b = timeit(naive, len(frames)), timeit(prealloc, len(frames))
+    print(f"  naive       : {a:7.3f} ms/frame")
+    print(f"  preallocated: {b:7.3f} ms/frame  (x{a / b:.2f})")
+
+
+def bench_infer(det, frames, batch):
+    def single():
+        for f in frames:
+            det.infer(f)
+
+    def batched():
+        for i in range(0, len(frames), batch):
+            det.infer_many(frames[i:i + batch])
+
+    det.infer_many(frames[:batch])  # 워밍업
+    a, b = timeit(single, len(frames)), timeit(batched, len(frames))
+    print(f"  infer()          : {a:7.3f} ms/frame  ({1000 / a:7.1f} fps)")
+    print(f"  infer_many({batch:>2})   : {b:7.3f} ms/frame  ({1000 / b:7.1f} fps)")
+
+
+def bench_video(det, frames, fps, batch):
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "bench.avi"
+        h, w = frames[0].shape[:2]
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+        for f in frames:
+            writer.write(f)
+        writer.release()
+
+        def sequential():
+            cap = cv2.VideoCapture(str(path))
+            while True:
+                ok, f = cap.read()
+                if not ok:
+                    break
+                det.infer(f)
+            cap.release()
+
+        async def pipelined():
+            async for _ in det.process_video(path, fps_target=None, batch_size=batch):
+                pass
+
+        a = timeit(sequential, len(frames))
+        b = timeit(lambda: asyncio.run(pipelined()), len(frames))
+        print(f"  read → infer     : {a:7.3f} ms/frame")
+        print(f"  process_video    : {b:7.3f} ms/frame  (x{a / b:.2f})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="FireDetector 마이크로 벤치마크")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--imgsz", type=int, default=416)
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--weights", help="실제 YOLO 가중치 (없으면 빈 모델로 엔진 오버헤드만 측정)")
+    args = ap.parse_args()
+
+    config = {"model": {"imgsz": args.imgsz, "max_batch": args.batch}}
+    if args.weights:
+        det = FireDetector(weights=args.weights, config=config)
+    else:
+        det = FireDetector(config=config, backend=NullBackend())
+    print(f"📊 backend={type(det.backend).__name__}, imgsz={args.imgsz}, frames={args.frames}")
+
+    for h, w in ((720, 1280), (1080, 1920)):
+        frames = synthetic_frames(args.frames, h, w)
+        print(f"\n[{w}x{h}] 전처리")
+        bench_preprocess(frames, args.imgsz)
+        print(f"[{w}x{h}] 추론")
+        bench_infer(det, frames, args.batch)
+
+    frames = synthetic_frames(min(args.frames, 150), 720, 1280)
+    print("\n[1280x720] 영상 처리")
+    bench_video(det, frames, 25.0, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+분석 결과 내보내기 처리량 벤치마크: 합성 ticks.ndjson → NDJSON / CSV / Parquet 형식별 rows/sec
+- 저장소 읽기 + 행 변환 + 인코딩 전체 (HTTP 전송 제외)
+- 출력 크기와 tracemalloc 최대 메모리(별도 실행)도 함께 출력 - 행 수를 늘려도 메모리는 거의 그대로
+
+사용 예: python bench_export.py --rows 200000 --boxes 2
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append('backend')
+
+from export_ticks import WRITERS, export_chunks, iter_job_rows, parquet_available
+from tick_log import TickLog, ticks_path
+
+
+def write_ticks(path: Path, rows: int, boxes: int):
+    t0 = time.time()
+    with TickLog(path) as log:
+        for i in range(rows):
+            log.append({
+                "type": "tick", "job_id": "bench", "t": i * 0.2, "wall_ts": t0 + i * 0.2,
+                "state": "SMOKE_DETECTED" if i % 50 < 10 else "NORMAL",
+                "scores": {"fire": 0.123, "smoke": 0.456, "hazard": 0.321},
+                "raw_scores": {"fire": 0.5, "smoke": 0.25},
+                "img_w": 1280, "img_h": 720,
+                "boxes": [{"x1": 100.5 + b, "y1": 200.25, "x2": 300.75, "y2": 400.0, "cls": b % 2, "conf": 0.734,
+                           "label": "fire" if b % 2 == 0 else "smoke", "class_name": "fire", "ema_score": 0.3}
+                          for b in range(boxes)],
+                "budget_ips": 5.0,
+            })
+
+
+def run(path: Path, fmt: str, traced: bool = False):
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    size = chunks = 0
+    for chunk in export_chunks(iter_job_rows(path, "bench"), fmt):
+        size += len(chunk)
+        chunks += 1
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, size, chunks, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description="tick 내보내기 형식별 처리량")
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--boxes", type=int, default=2, help="tick 당 박스 수")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = ticks_path(Path(d) / "bench")
+        write_ticks(path, args.rows, args.boxes)
+        print(f"📊 rows={args.rows}, boxes/tick={args.boxes}, ticks.ndjson {path.stat().st_size / 1e6:.1f} MB")
+        for fmt in WRITERS:
+            if fmt == "parquet" and not parquet_available():
+                print(f"  {fmt:<8} (pyarrow 없음 - 생략)")
+                continue
+            elapsed, size, chunks, _ = run(path, fmt)
+            _, _, _, peak = run(path, fmt, traced=True)
+            print(f"  {fmt:<8} {args.rows / elapsed:10.0f} rows/s   {size / 1e6:7.1f} MB in {chunks:5d} chunks"
+                  f"   peak {peak / 1024:8.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+감지 결과 재사용 색인 벤치마크: 색인 프레임 수별 조회 시간 (지문 계산 + 조각 색인 조회 + 검증)
+- 조회는 조각별 후보 몇 개만 읽으므로 프레임 수가 늘어도 거의 일정해야 함
+- --weights 를 주면 실제 모델 1회 추론 시간과 비교 (재사용 1회 절약 = 추론 시간 - 조회 시간)
+- 가장 큰 색인의 조회 p95 가 --budget-ms 를 넘으면 종료 코드 1
+
+사용 예: python bench_frame_reuse.py --frames 2000000 --weights models/best.pt
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append('backend')
+
+import numpy as np
+
+from frame_reuse import FrameIndex, fingerprint
+
+EMPTY_FIRE = b""
+TONE = bytes(range(256)) * 2  # 칸별 채도/밝기 (행마다 512바이트)
+RESULT = '{"fire":0,"smoke":0,"boxes":[],"dets":[]}'
+
+
+def random_rows(rng, n, start):
+    return [(f"job{(start + i) // 18000}", (start + i) * 0.2,
+             (rng.getrandbits(64), rng.getrandbits(256).to_bytes(32, "big"), EMPTY_FIRE, TONE), 40.0, RESULT)
+            for i in range(n)]
+
+
+def time_lookups(index, rng, known, n=500):
+    times = []
+    for _ in range(n):
+        _, _, fp, _, _ = rng.choice(known)
+        noisy = fp[0] ^ (1 << rng.randrange(64))
+        t = time.perf_counter()
+        assert index.match((noisy, *fp[1:])) is not None
+        times.append((time.perf_counter() - t) * 1000)
+    times.sort()
+    return times[n // 2], times[n * 95 // 100]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="재사용 색인 크기별 조회 시간")
+    ap.add_argument("--frames", type=int, default=1_000_000, help="최종 색인 프레임 수")
+    ap.add_argument("--weights", default=None, help="실제 모델 추론 시간 비교용 가중치")
+    ap.add_argument("--db", default=None, help="DB 경로 (기본: 임시 파일)")
+    ap.add_argument("--budget-ms", type=float, default=5.0, help="조회 p95 기준")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    index = FrameIndex(Path(args.db or Path(tempfile.mkdtemp()) / "frame_index.db"), "bench")
+    frame = np.random.default_rng(0).integers(0, 255, size=(720, 1280, 3), dtype=np.uint8)
+    started = time.perf_counter()
+    for _ in range(100):
+        fingerprint(frame)
+    print(f"📊 지문 계산 (1280x720) {(time.perf_counter() - started) * 10:.2f} ms/frame")
+
+    size, step = 0, 10_000
+    known = []
+    for target in sorted({min(args.frames, n) for n in (10_000, 100_000, 1_000_000, args.frames)}):
+        started = time.perf_counter()
+        while size < target:
+            rows = random_rows(rng, min(step, target - size), size)
+            index.insert(rows)
+            known.extend(rng.sample(rows, 10))
+            size += len(rows)
+        insert_s = time.perf_counter() - started
+        p50, p95 = time_lookups(index, rng, known)
+        print(f"  색인 {size:>10,} 프레임  조회 p50 {p50:6.3f} ms  p95 {p95:6.3f} ms   (추가 기록 {insert_s:.1f}s)")
+    print(f"  DB {index.report()['size_mb']} MB")
+
+    if args.weights:
+        from detectors.vision import FireDetector
+
+        det = FireDetector(weights=args.weights)
+        det.infer(frame)
+        started = time.perf_counter()
+        for _ in range(20):
+            det.infer(frame)
+        print(f"  모델 추론 1회 {(time.perf_counter() - started) / 20 * 1000:.1f} ms")
+
+    if p95 > args.budget_ms:
+        print(f"⚠️ 조회 p95 {p95:.3f} ms > 기준 {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
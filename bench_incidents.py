@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+사고 구간 조회 벤치마크: 몇 달치 구간 기록에서 GET /incidents 와 같은 겹침 조회 시간
+- 비교: 같은 질문을 tick 을 다시 읽어 답하면 조회 구간의 tick 수만큼 (5Hz × 카메라 수 × 초)
+- p95 가 --budget-ms 를 넘으면 종료 코드 1
+
+사용 예: python bench_incidents.py --cameras 50 --days 90
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append('backend')
+
+from incidents import IncidentStore, summarize
+from scoring import STATES
+
+
+def main():
+    ap = argparse.ArgumentParser(description="사고 구간 색인 조회 시간")
+    ap.add_argument("--cameras", type=int, default=50)
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--per-hour", type=float, default=3.0, help="카메라당 시간당 구간 수")
+    ap.add_argument("--window", type=float, default=2.0, help="조회 구간(시간)")
+    ap.add_argument("--db", default=None, help="DB 경로 (기본: 임시 파일)")
+    ap.add_argument("--budget-ms", type=float, default=50.0, help="조회 p95 기준")
+    args = ap.parse_args()
+
+    store = IncidentStore(Path(args.db or Path(tempfile.mkdtemp()) / "incidents.db"))
+    rng = random.Random(0)
+    end = time.time()
+    start = end - args.days * 86400
+    n = int(args.cameras * args.days * 24 * args.per_hour)
+    rows = []
+    for i in range(n):
+        ts = rng.uniform(start, end)
+        length = rng.expovariate(1 / 40.0)
+        rank = rng.choice([1, 1, 1, 2, 2, 3, 4])
+        rows.append({"job_id": f"cam{i % args.cameras}", "kind": "stream", "name": None,
+                     "zone": None if rng.random() < 0.7 else "zone0", "state": STATES[rank], "rank": rank,
+                     "start_ts": ts, "end_ts": ts + length, "start_t": 0.0, "end_t": length,
+                     "peak_hazard": rng.random(), "peak_fire": rng.random(), "peak_smoke": rng.random(),
+                     "ticks": int(length * 5), "video_url": None})
+    started = time.perf_counter()
+    for i in range(0, n, 10000):
+        store.insert(rows[i:i + 10000])
+    print(f"📊 구간 {n:,}개 (카메라 {args.cameras}대 × {args.days}일) 기록 {time.perf_counter() - started:.1f}s")
+
+    window = args.window * 3600
+    worst = 0.0
+    for min_state in ("PRE_FIRE", "SMOKE_DETECTED", "CALL_119"):
+        times, hits = [], 0
+        for _ in range(50):
+            since = rng.uniform(start, end - window)
+            t = time.perf_counter()
+            got = store.query(since, since + window, min_state)
+            summarize(got, since, since + window)
+            times.append((time.perf_counter() - t) * 1000)
+            hits += len(got)
+        times.sort()
+        worst = max(worst, times[47])
+        print(f"  {min_state:15s} p50 {times[25]:6.2f} ms  p95 {times[47]:6.2f} ms  (평균 {hits / 50:.0f}개)")
+    print(f"  tick 재생 방식이면 조회당 tick {args.cameras * window * 5:,.0f}개를 다시 읽음")
+    if worst > args.budget_ms:
+        print(f"⚠️ 조회 p95 {worst:.2f} ms > 기준 {args.budget_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
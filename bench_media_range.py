@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+영상 Range 서빙 처리량 벤치마크 (동시 시청자 시뮬레이션)
+- 임시 영상 파일(기본 256MB)을 만들어 로컬 uvicorn 으로 서빙
+- 시청자 N명이 각자 임의 위치로 seek → 작은 구간(Range) 요청을 반복
+- req/s, MB/s, 요청 지연(p50/p95) 출력
+
+사용 예: python bench_media_range.py --size-mb 1024 --viewers 16 --requests 50
+"""
+import argparse
+import http.client
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append('backend')
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from media_range import serve_file
+
+
+def make_file(path: Path, size_mb: int):
+    """희소 파일이 아닌 실제 데이터로 채운 테스트 파일 생성"""
+    block = os.urandom(1 << 20)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(path: Path, port: int) -> uvicorn.Server:
+    app = FastAPI()
+
+    @app.api_route("/media/{name}", methods=["GET", "HEAD"])
+    async def media(name: str, request: Request):
+        return await serve_file(request, path)
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def viewer(port: int, size: int, n_requests: int, range_kb: int, seed: int):
+    """한 명의 시청자: keep-alive 연결 하나로 임의 구간 seek 반복"""
+    rnd = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    latencies, nbytes = [], 0
+    span = range_kb * 1024
+    for _ in range(n_requests):
+        start = rnd.randrange(0, max(1, size - span))
+        t0 = time.perf_counter()
+        conn.request("GET", "/media/clip.mp4", headers={"Range": f"bytes={start}-{start + span - 1}"})
+        resp = conn.getresponse()
+        body = resp.read()
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status == 206, resp.status
+        nbytes += len(body)
+    conn.close()
+    return latencies, nbytes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=256)
+    ap.add_argument("--viewers", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=40)
+    ap.add_argument("--range-kb", type=int, default=512)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "clip.mp4"
+        print(f"📦 테스트 파일 생성: {args.size_mb}MB")
+        make_file(path, args.size_mb)
+        size = path.stat().st_size
+
+        port = free_port()
+        server = start_server(path, port)
+
+        # 첫 요청: ETag 조회 (해시를 기록하지 않은 파일이라 크기+mtime, 파일 전체를 읽지 않음)
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("HEAD", "/media/clip.mp4")
+        conn.getresponse().read()
+        conn.close()
+        print(f"🔑 첫 응답(ETag): {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.viewers) as ex:
+            results = list(ex.map(
+                lambda i: viewer(port, size, args.requests, args.range_kb, i),
+                range(args.viewers),
+            ))
+        elapsed = time.perf_counter() - t0
+
+        lats = sorted(l for r in results for l in r[0])
+        total_bytes = sum(r[1] for r in results)
+        p95 = lats[int(len(lats) * 0.95) - 1]
+        print(f"👥 시청자 {args.viewers}명 × {args.requests}회 seek ({args.range_kb}KB/요청)")
+        print(f"   요청/초: {len(lats) / elapsed:.1f}")
+        print(f"   처리량: {total_bytes / elapsed / (1 << 20):.1f} MB/s")
+        print(f"   지연 p50={statistics.median(lats) * 1000:.2f}ms  p95={p95 * 1000:.2f}ms")
+
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
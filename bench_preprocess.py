@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+프레임 1장 경로(디코딩 → 전처리 → 후처리) 마이크로 벤치마크: 이전 방식 vs 버퍼 재사용 방식
+- 이전: cap.read() 새 배열 → resize/copyMakeBorder/cvtColor/transpose/astype/÷255 → 결과를 xyxy/conf/cls 각각 tolist() + 박스별 튜플
+- 이후: cap.read(buf) 재사용 → Letterbox.load (canvas ROI 에 resize, 평면 분리 후 batch 에 바로 기록)
+        → (N, 6) 배열 하나를 벡터 연산으로 후처리
+단계별 µs/frame 과 프레임당 할당량(tracemalloc 로 추적한 numpy/cv2 배열 할당 최대치)을 출력
+
+사용 예: python bench_preprocess.py --frames 200 --size 1280x720 --imgsz 416
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append('backend')
+
+import cv2
+import numpy as np
+
+from bench_detector import NullBackend, naive_preprocess, synthetic_frames
+from detectors.vision import FireDetector, Letterbox
+
+
+def fake_output(imgsz, n=20, seed=0):
+    """모델 출력 흉내: letterbox 좌표 (N, 6) [x1, y1, x2, y2, conf, cls]"""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, imgsz * 0.7, size=(n, 2))
+    wh = rng.uniform(10, imgsz * 0.3, size=(n, 2))
+    return np.hstack([xy, xy + wh, rng.uniform(0.2, 0.9, (n, 1)), rng.integers(0, 2, (n, 1))]).astype(np.float32)
+
+
+def old_postprocess(det, frame, geom, detector):
+    """이전 방식: 좌표/conf/cls 를 각각 tolist() 후 박스마다 (cls, conf, x1, y1, x2, y2) 튜플 + 클래스 분기"""
+    r, _, _, left, top = geom
+    h, w = frame.shape[:2]
+    xyxy = det[:, :4].astype(np.float64)
+    xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - left) / r).clip(0, w)
+    xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - top) / r).clip(0, h)
+    out = {"fire_boxes": [], "smoke_boxes": [], "person_boxes": [], "dets": []}
+    for (x1, y1, x2, y2), cf, c in zip(xyxy.tolist(), det[:, 4].tolist(), det[:, 5].astype(int).tolist()):
+        out["dets"].append((c, cf, x1, y1, x2, y2))
+        if c in detector.fire_ids:
+            key, label = "fire_boxes", "fire"
+        elif c in detector.smoke_ids:
+            key, label = "smoke_boxes", "smoke"
+        elif c in detector.person_ids:
+            key, label = "person_boxes", "person"
+        else:
+            continue
+        out[key].append({"x1": x1, "y1": y1, "x2": x2, "y2": y2, "cls": c, "conf": round(cf, 3),
+                         "label": label, "class_name": detector.names.get(c, f"class_{c}")})
+    return out
+
+
+def measure(step, n):
+    """(µs/frame, 프레임당 최대 추적 할당 KB) - 시간은 tracemalloc 없이 따로 측정"""
+    for i in range(min(n, 10)):
+        step(i)
+    started = time.perf_counter()
+    for i in range(n):
+        step(i)
+    us = (time.perf_counter() - started) / n * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for i in range(min(n, 50)):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(i)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return us, float(np.mean(peaks)) / 1024
+
+
+def report(name, before, after):
+    (ub, kb), (ua, ka) = before, after
+    print(f"  {name:<12} before {ub:8.1f} µs {kb:9.1f} KB   after {ua:8.1f} µs {ka:9.1f} KB   (x{ub / ua:.2f})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="프레임 전처리/후처리 할당·시간 벤치마크")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--imgsz", type=int, default=416)
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.split("x"))
+    imgsz, n = args.imgsz, args.frames
+
+    frames = synthetic_frames(16, h, w)
+    det = FireDetector(config={"model": {"imgsz": imgsz, "max_batch": 1}}, config_path=None, backend=NullBackend())
+    lb = Letterbox(imgsz, 1)
+    out = fake_output(imgsz)
+    print(f"📊 {w}x{h} → {imgsz}, frames={n}")
+
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "bench.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (w, h))
+        for i in range(n + 20):
+            writer.write(frames[i % len(frames)])
+        writer.release()
+
+        caps = {}
+        buf = np.empty((h, w, 3), dtype=np.uint8)
+
+        def reader(key):
+            cap = caps.get(key)
+            if cap is None or not cap.grab():
+                if cap is not None:
+                    cap.release()
+                cap = caps[key] = cv2.VideoCapture(str(path))
+                cap.grab()
+            return cap
+
+        decode_old = measure(lambda i: reader("old").retrieve(), n)
+        decode_new = measure(lambda i: reader("new").retrieve(buf), n)
+        for cap in caps.values():
+            cap.release()
+    report("decode", decode_old, decode_new)
+
+    pre_old = measure(lambda i: naive_preprocess(frames[i % len(frames)], imgsz), n)
+    pre_new = measure(lambda i: lb.load(0, frames[i % len(frames)]), n)
+    report("preprocess", pre_old, pre_new)
+
+    geom = lb.geometry(h, w)
+    post_old = measure(lambda i: old_postprocess(out, frames[0], geom, det), n)
+    post_new = measure(lambda i: det._postprocess(frames[0], out, geom), n)
+    report("postprocess", post_old, post_new)
+
+    total_old = [a + b + c for a, b, c in zip(decode_old, pre_old, post_old)]
+    total_new = [a + b + c for a, b, c in zip(decode_new, pre_new, post_new)]
+    report("total", total_old, total_new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+결과 영상 렌더링 벤치마크 (backend/render_video.py)
+- 합성 원본 영상 + 5Hz tick 타임라인(박스 몇 개, 중간에 앞으로 seek 한 gap) → annotated.mp4
+- 렌더 fps 와 원본 fps 비교 (× 실시간) - 1보다 크면 원본 재생보다 빨리 렌더링
+
+사용 예: python bench_render_video.py --seconds 30 --size 1280x720 --fps 30
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append('backend')
+
+import cv2
+import numpy as np
+
+from render_video import render_annotated
+from tick_log import TickLog, iter_ticks, ticks_path
+
+
+def write_source(path, seconds, fps, size):
+    w, h = size
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    base = np.random.default_rng(0).integers(40, 200, (h // 8, w // 8, 3), dtype=np.uint8)
+    base = cv2.resize(base, size, interpolation=cv2.INTER_LINEAR)
+    for i in range(int(seconds * fps)):
+        frame = np.roll(base, i, axis=1)
+        cv2.rectangle(frame, (w // 3 + i % 50, h // 2), (w // 3 + 80 + i % 50, h // 2 + 120), (0, 80, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def write_ticks(path, seconds, size, rate=5.0):
+    """0~60% 와 80~100% 구간만 분석 (그 사이는 앞으로 seek 해서 건너뜀)"""
+    w, h = size
+    with TickLog(path) as log:
+        for i in range(int(seconds * rate)):
+            t = i / rate
+            if 0.6 * seconds <= t < 0.8 * seconds:
+                log.cut()
+                continue
+            boxes = [{"x1": w / 3 + (i * 7) % 50, "y1": h / 2, "x2": w / 3 + 80 + (i * 7) % 50, "y2": h / 2 + 120,
+                      "cls": 0, "conf": 0.6, "label": "fire"},
+                     {"x1": w / 4, "y1": h / 5, "x2": w / 2, "y2": h / 3, "cls": 1, "conf": 0.4, "label": "smoke"}]
+            log.append({"type": "tick", "t": t, "state": "FIRE_GROWING" if t > seconds / 3 else "PRE_FIRE",
+                        "scores": {"fire": 0.4, "smoke": 0.2, "hazard": 0.5}, "boxes": boxes})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="결과 영상 렌더링 속도 (렌더 fps vs 원본 fps)")
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--pool", type=int, default=8, help="프레임 버퍼 풀 크기")
+    args = ap.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        src = d / "source.avi"
+        write_source(src, args.seconds, args.fps, size)
+        write_ticks(ticks_path(d), args.seconds, size)
+
+        started = time.perf_counter()
+        out = render_annotated(src, iter_ticks(ticks_path(d)), d / "annotated.mp4", pool_size=args.pool)
+        elapsed = time.perf_counter() - started
+
+    render_fps = out["frames"] / elapsed
+    print(f"📊 렌더링 {out['width']}x{out['height']} {out['frames']}프레임 ({args.seconds:.0f}s @ {out['fps']:.0f}fps)")
+    print(f"  {elapsed:.2f}s → 렌더 {render_fps:.1f} fps / 원본 {out['fps']:.1f} fps = × {render_fps / out['fps']:.2f} 실시간")
+
+
+if __name__ == "__main__":
+    main()
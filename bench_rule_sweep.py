@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+격자 탐색(sweep_rules) 벤치마크: 합성 감지 로그에서 설정 수 × tick 수별 평가 시간
+- 불이 나는 클립 / 잡음만 있는 클립을 기록한 뒤 test_rule_sweep 과 같은 360개 설정 격자를 평가
+- 평가 시간이 --budget-s 를 넘으면 종료 코드 1
+
+사용 예: python bench_rule_sweep.py --ticks 3000 --clips 8
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append('backend')
+
+from detection_log import DetectionLog
+from sweep_rules import sweep
+
+FIRE, SMOKE, PERSON = 0, 1, 2
+RULES = {
+    "conf": 0.15,
+    "ema_alpha": 0.4,
+    "weights": {"s_smoke": 0.6, "s_fire": 0.8, "growth": 0.4},
+    "thresholds": {
+        "pre_fire": {"smoke": 0.10, "fire": 0.08},
+        "smoke_detected": {"smoke": 0.25},
+        "fire_growing": {"fire": 0.30, "hazard": 0.35},
+        "call_119": {"hazard": 0.45},
+    },
+}
+GRID = {
+    "ema_alpha": [0.2, 0.3, 0.4, 0.5, 0.6],
+    "weights.s_smoke": [0.4, 0.6, 0.8],
+    "weights.growth": [0.0, 0.2, 0.4],
+    "thresholds.smoke_detected.smoke": [0.25, 0.5],
+    "thresholds.call_119.hazard": [0.2, 0.45, 0.6, 0.85],
+}
+
+
+def write_clip(path, n_ticks, onset, seed, fps=5.0):
+    """onset(초) 이후 fire/smoke conf 가 점점 올라가는 합성 클립, 그 전에는 잡음 + 사람"""
+    rng = random.Random(seed)
+    log = DetectionLog(path, {"job_id": path.stem, "source": path.name, "fire_class_ids": [FIRE],
+                              "smoke_class_ids": [SMOKE], "rules": RULES, "filtered": True})
+    for i in range(n_ticks):
+        t = i / fps
+        dets = [(PERSON, 0.9, 10, 10, 50, 120)]
+        if rng.random() < 0.05:
+            dets.append((SMOKE, rng.uniform(0.15, 0.4), 100, 100, 150, 150))
+        if onset is not None and t >= onset:
+            level = min(0.95, 0.2 + 0.05 * (t - onset))
+            dets.append((FIRE, level, 200, 200, 260, 280))
+            dets.append((SMOKE, level * 0.8, 180, 120, 300, 220))
+        log.append(t, dets)
+    log.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="격자 탐색 평가 시간")
+    ap.add_argument("--ticks", type=int, default=600, help="클립당 tick 수 (5Hz)")
+    ap.add_argument("--clips", type=int, default=2, help="클립 수 (절반은 불, 절반은 잡음만)")
+    ap.add_argument("--budget-s", type=float, default=5.0, help="평가 시간 기준")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        paths, labels = [], {}
+        for i in range(args.clips):
+            p = Path(d) / f"clip{i}.dlog"
+            onset = args.ticks / 5.0 * 0.5 if i % 2 == 0 else None
+            write_clip(p, args.ticks, onset, seed=i)
+            paths.append(p)
+            labels[p.name] = onset
+
+        started = time.perf_counter()
+        result = sweep(paths, GRID, labels)
+        elapsed = time.perf_counter() - started
+    n_cfg = len(result["order"])
+    print(f"📊 설정 {n_cfg}개 × 클립 {args.clips}개 ({args.clips * args.ticks:,} ticks) 평가: {elapsed:.2f}s")
+    print(f"  설정×tick 당 {elapsed / (n_cfg * args.clips * args.ticks) * 1e9:.1f} ns")
+    if elapsed > args.budget_s:
+        print(f"⚠️ 평가 시간 {elapsed:.2f}s > 기준 {args.budget_s}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+감지 구역 비용 벤치마크: 구역 수별 tick 당 구역 점수 계산 시간 (박스 → 구역 배정 + 구역별 EMA/상태)
+- 감지는 프레임당 1회라 구역이 늘어도 추가 비용은 이 값뿐 (구역마다 추론하면 추론 시간 × 구역 수)
+- --weights 를 주면 실제 모델 1회 추론 시간도 함께 출력
+
+사용 예: python bench_zones.py --boxes 20 --weights models/best.pt
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('backend')
+
+import numpy as np
+
+from scoring import HazardScorer
+from testutil import RULES
+from zones import ZoneSet
+
+W, H = 1280, 720
+
+
+def random_zones(n, rng):
+    zones = []
+    for i in range(n):
+        cx, cy = rng.uniform(0.15, 0.85, size=2)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, size=6))
+        radius = rng.uniform(0.05, 0.15, size=6)
+        poly = np.stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)], axis=1)
+        zones.append({"name": f"zone{i}", "polygon": np.clip(poly, 0, 1).tolist()})
+    return zones
+
+
+def random_boxes(n, rng):
+    boxes = []
+    for _ in range(n):
+        x, y = rng.uniform(0, W - 100), rng.uniform(0, H - 100)
+        boxes.append({"x1": x, "y1": y, "x2": x + 80, "y2": y + 80, "conf": float(rng.uniform(0.2, 0.9)),
+                      "label": "fire" if rng.random() < 0.5 else "smoke"})
+    return boxes
+
+
+def time_per_tick(fn, ticks):
+    started = time.perf_counter()
+    for _ in range(ticks):
+        fn()
+    return (time.perf_counter() - started) / ticks * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="구역 수별 tick 당 구역 점수 계산 비용")
+    ap.add_argument("--boxes", type=int, default=20, help="tick 당 박스 수")
+    ap.add_argument("--ticks", type=int, default=2000)
+    ap.add_argument("--weights", default=None, help="실제 모델 추론 시간 비교용 가중치")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    boxes = random_boxes(args.boxes, rng)
+    scorer = HazardScorer(RULES)
+    base = time_per_tick(lambda: scorer.update(0.5, 0.3), args.ticks)
+    print(f"📊 boxes/tick={args.boxes}, 전체 프레임 점수 계산 {base:.1f} µs/tick")
+    for n in (1, 4, 16, 64):
+        zones = ZoneSet(random_zones(n, rng), RULES)
+        per_tick = time_per_tick(lambda: zones.update(boxes, W, H), args.ticks)
+        print(f"  구역 {n:3d}개  {per_tick:8.1f} µs/tick   (구역당 {per_tick / n:6.1f} µs)")
+
+    if args.weights:
+        from detectors.vision import FireDetector
+
+        det = FireDetector(weights=args.weights)
+        frame = rng.integers(0, 255, size=(H, W, 3), dtype=np.uint8)
+        det.infer(frame)
+        infer_us = time_per_tick(lambda: det.infer(frame), 20)
+        print(f"  모델 추론 1회 {infer_us / 1000:.1f} ms → 구역마다 추론하면 구역 64개에 {infer_us * 64 / 1e6:.2f} s/tick")
+
+
+if __name__ == "__main__":
+    main()
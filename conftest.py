@@ -0,0 +1,13 @@
+# conftest.py
+"""
+pytest 공통 설정 - 저장소 루트에서 python -m pytest 로 실행
+- backend/ 모듈을 바로 import (from scoring import ..., from detectors.vision import ...)
+- 테스트 공통 도우미는 testutil.py (from testutil import RULES, ColorBlobBackend, ...) - 테스트 파일끼리는 import 하지 않음
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+# 모델 가중치로 직접 실행하는 스크립트 (python quick_test.py / python test_detection.py) - pytest 수집 제외
+collect_ignore = ["quick_test.py", "test_detection.py"]
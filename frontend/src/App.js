@@ -1,5 +1,5 @@
 // frontend/src/App.js
-import React, { useState, useRef, useEffect } from 'react';
+import React, { useState, useRef, useEffect, useCallback } from 'react';
 import Header from './components/Header';
 import Footer from './components/Footer';
 import VideoUpload from './components/VideoUpload';
@@ -28,6 +28,7 @@ function App() {
   const [isProcessing, setIsProcessing] = useState(false);
   const [error, setError] = useState(null);
   const [isPaused, setIsPaused] = useState(false);
+  const [preview, setPreview] = useState(null);
   const eventSourceRef = useRef(null);
 
   useEffect(() => {
@@ -44,6 +45,46 @@ function App() {
     };
   }, []);
 
+  // 업로드 후 백그라운드에서 생성되는 스프라이트 인덱스 폴링
+  useEffect(() => {
+    if (!jobId) {
+      setPreview(null);
+      return;
+    }
+
+    let cancelled = false;
+    let timer = null;
+
+    const poll = async () => {
+      try {
+        const response = await fetch(`http://localhost:8000/jobs/${jobId}/preview`);
+        if (!response.ok) return;
+        const data = await response.json();
+        if (cancelled) return;
+        if (data.status === 'ready') {
+          setPreview(data);
+        } else if (data.status === 'pending') {
+          timer = setTimeout(poll, 2000);
+        }
+      } catch (err) {
+        if (DEBUG) console.error('프리뷰 조회 오류:', err);
+      }
+    };
+
+    poll();
+    return () => {
+      cancelled = true;
+      if (timer) clearTimeout(timer);
+    };
+  }, [jobId]);
+
+  const handlePreviewSeek = (t) => {
+    const videoElement = document.querySelector('video');
+    if (videoElement) {
+      videoElement.currentTime = t;
+    }
+  };
+
   const handleLogin = (userData) => {
     setUser(userData);
   };
@@ -107,6 +148,11 @@ function App() {
             frame: prev.length
           }]);
 
+        } else if (data.type === 'seeked') {
+          // 분석 위치 이동 → 이동한 시각 이후의 이전 기록은 버리고 새 위치부터 다시 쌓음
+          if (DEBUG) console.log('분석 위치 이동:', data.t, '체크포인트:', data.checkpoint_t, `${data.warmup_ms}ms`);
+          setEvents(prev => prev.filter(e => e.timestamp < data.t));
+
         } else if (data.type === 'end') {
           if (DEBUG) console.log('영상 분석 완료');
           setIsProcessing(false);
@@ -270,26 +316,31 @@ function App() {
     }
   };
 
-  // 영상 재생/일시정지 제어
-  const handleVideoPlayPause = async (isPlaying) => {
-    if (!jobId) return;
+  // 플레이어 재생 시계 보고 → 서버는 이 시계 기준으로 앞서 분석해 두고 재생 위치에 맞춰 tick 전달
+  // (탐색/배속/버퍼링/일시정지도 여기서 반영 - 앞서 분석한 구간 밖으로 탐색하면 서버가 분석 위치를 옮김)
+  const handleVideoClock = useCallback(async (clock) => {
+    if (!jobId || !isProcessing) return;
 
     try {
-      const response = await fetch(`http://localhost:8000/jobs/${jobId}/control`, {
+      const response = await fetch(`http://localhost:8000/jobs/${jobId}/clock`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ cmd: isPlaying ? 'resume' : 'pause' })
+        body: JSON.stringify(clock)
       });
-
-      if (response.ok) {
-        setIsPaused(!isPlaying);
-        if (DEBUG) console.log(`분석 ${isPlaying ? '재개' : '일시정지'}`);
+      if (response.ok && DEBUG) {
+        const sync = await response.json();
+        console.log('재생 시계:', sync.position, '앞선 분석:', sync.ahead_s, '평균 지연(ms):', sync.mean_drift_ms);
       }
-    } catch (error) {
-      if (DEBUG) console.error('영상 제어 오류:', error);
+    } catch (err) {
+      if (DEBUG) console.error('재생 시계 보고 오류:', err);
     }
+  }, [jobId, isProcessing]);
+
+  // 영상 재생/일시정지 - 분석 쪽은 재생 시계 보고(paused)로 맞춰짐
+  const handleVideoPlayPause = (isPlaying) => {
+    setIsPaused(!isPlaying);
   };
 
   // 로그인하지 않은 경우 로그인 화면 표시
@@ -355,6 +406,7 @@ function App() {
                       currentData={currentData}
                       onPlayPauseChange={handleVideoPlayPause}
                       onVideoReplay={handleRestart}
+                      onClock={handleVideoClock}
                     />
                   </div>
 
@@ -379,6 +431,8 @@ function App() {
                 <Timeline
                   events={events}
                   currentFrame={events.length - 1}
+                  preview={preview}
+                  onSeek={handlePreviewSeek}
                 />
               )}
             </div>
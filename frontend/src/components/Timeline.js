@@ -1,8 +1,60 @@
 // frontend/src/components/Timeline.js
-import React from 'react';
+import React, { useState } from 'react';
 import './Timeline.css';
 
-const Timeline = ({ events, currentFrame }) => {
+// 스프라이트 시트 한 장으로 hover 미리보기 (프레임 요청 없음)
+const PreviewStrip = ({ preview, onSeek }) => {
+  const [hover, setHover] = useState(null);
+  const index = preview && preview.index;
+
+  if (!index || !index.count) return null;
+
+  const spriteUrl = `http://localhost:8000${preview.base_url}${index.sprite}`;
+
+  const positionAt = (e) => {
+    const rect = e.currentTarget.getBoundingClientRect();
+    const pos = Math.min(Math.max((e.clientX - rect.left) / rect.width, 0), 1);
+    return { x: e.clientX - rect.left, t: pos * index.duration };
+  };
+
+  const handleMove = (e) => {
+    const { x, t } = positionAt(e);
+    const tile = Math.min(Math.floor(t / index.interval), index.count - 1);
+    setHover({ x, t, col: tile % index.cols, row: Math.floor(tile / index.cols) });
+  };
+
+  const formatSeconds = (t) => {
+    const minutes = Math.floor(t / 60);
+    const seconds = Math.floor(t % 60);
+    return `${minutes}:${seconds.toString().padStart(2, '0')}`;
+  };
+
+  return (
+    <div
+      className="preview-strip"
+      onMouseMove={handleMove}
+      onMouseLeave={() => setHover(null)}
+      onClick={(e) => onSeek(positionAt(e).t)}
+    >
+      {hover && (
+        <div className="preview-thumb" style={{ left: hover.x - index.tile_w / 2 }}>
+          <div
+            className="preview-thumb-image"
+            style={{
+              width: index.tile_w,
+              height: index.tile_h,
+              backgroundImage: `url(${spriteUrl})`,
+              backgroundPosition: `-${hover.col * index.tile_w}px -${hover.row * index.tile_h}px`
+            }}
+          />
+          <span className="preview-thumb-time">{formatSeconds(hover.t)}</span>
+        </div>
+      )}
+    </div>
+  );
+};
+
+const Timeline = ({ events, currentFrame, preview = null, onSeek = () => {} }) => {
   if (!events || events.length === 0) {
     return (
       <div className="timeline-container">
@@ -55,6 +107,8 @@ const Timeline = ({ events, currentFrame }) => {
         </div>
       </div>
 
+      <PreviewStrip preview={preview} onSeek={onSeek} />
+
       <div className="timeline">
         <div className="timeline-header">
           <span>시간</span>
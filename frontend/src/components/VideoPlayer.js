@@ -12,7 +12,8 @@ const VideoPlayer = ({
   timestamp = null,
   currentData = null,
   onPlayPauseChange = () => {},
-  onVideoReplay = () => {}
+  onVideoReplay = () => {},
+  onClock = () => {}
 }) => {
   const videoRef = useRef(null);
   const canvasRef = useRef(null);
@@ -85,6 +86,38 @@ const VideoPlayer = ({
     };
   }, [videoUrl, onPlayPauseChange]);
 
+  // 재생 시계 보고: 재생/정지/배속/탐색/버퍼링 시 바로, 재생 중 timeupdate 는 0.5초마다, 그 외에도 2초마다
+  // (버퍼링 중이거나 탐색 중이면 멈춘 것으로 보고)
+  useEffect(() => {
+    const video = videoRef.current;
+    if (!video) return;
+
+    let lastReport = 0;
+    const report = () => {
+      lastReport = performance.now();
+      onClock({
+        t: video.currentTime,
+        rate: video.playbackRate,
+        paused: video.paused || video.seeking || video.readyState < 3
+      });
+    };
+    const handleTimeUpdate = () => {
+      if (performance.now() - lastReport >= 500) report();
+    };
+    const clockEvents = ['play', 'playing', 'pause', 'ratechange', 'seeked', 'waiting', 'ended'];
+
+    clockEvents.forEach(name => video.addEventListener(name, report));
+    video.addEventListener('timeupdate', handleTimeUpdate);
+    const timer = setInterval(report, 2000);
+    report();
+
+    return () => {
+      clockEvents.forEach(name => video.removeEventListener(name, report));
+      video.removeEventListener('timeupdate', handleTimeUpdate);
+      clearInterval(timer);
+    };
+  }, [videoUrl, onClock]);
+
   // letterbox 보정을 적용한 박스 그리기 함수
   const fitCanvasToVideo = useCallback(() => {
     const canvas = canvasRef.current;
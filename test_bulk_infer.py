@@ -0,0 +1,200 @@
+"""
+정지 이미지 일괄 추론(POST /infer) 파이프라인 테스트
+- multipart 파서: 임의 청크 분할에도 파트가 그대로 복원되는지
+- tar / zip 아카이브 멤버 순회
+- 입력 순서 유지, 디코딩 실패 보고, 배치 추론, 대기열 상한(입력을 앞서 읽지 않음)
+- 잘린 multipart 본문 / tar: 끊기기 전까지 받은 이미지는 모두 결과를 낸 뒤 오류
+"""
+import asyncio
+import io
+import random
+import tarfile
+import zipfile
+
+import cv2
+import numpy as np
+
+from bulk_infer import MultipartSplitter, PartTooLarge, infer_images, iter_archive, iter_multipart, iterate_in_thread
+from testutil import FIRE_BGR, ColorBlobBackend, frame_with, make_detector
+
+BOUNDARY = b"----bulkboundary7MA4YWxk"
+
+
+def jpeg(*rects, size=(240, 320)):
+    ok, buf = cv2.imencode(".jpg", frame_with(*rects, size=size))
+    assert ok
+    return buf.tobytes()
+
+
+def multipart_body(files, fields=()):
+    out = io.BytesIO()
+    for name, value in fields:
+        out.write(b"--" + BOUNDARY + b"\r\n")
+        out.write(f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+        out.write(value + b"\r\n")
+    for name, data in files:
+        out.write(b"--" + BOUNDARY + b"\r\n")
+        out.write(f'Content-Disposition: form-data; name="files"; filename="{name}"\r\n'.encode())
+        out.write(b"Content-Type: image/jpeg\r\n\r\n")
+        out.write(data + b"\r\n")
+    out.write(b"--" + BOUNDARY + b"--\r\n")
+    return out.getvalue()
+
+
+async def chunked(data, rng, max_chunk=97):
+    pos = 0
+    while pos < len(data):
+        n = rng.randint(1, max_chunk)
+        yield data[pos:pos + n]
+        pos += n
+
+
+async def collect(agen):
+    return [x async for x in agen]
+
+
+def test_multipart_splitter_any_chunking():
+    rng = random.Random(0)
+    files = [(f"img_{i}.bin", bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 600)))) for i in range(8)]
+    files.append(("tricky.bin", b"\r\n--" + BOUNDARY[:-1] + b"\r\n--\r\n"))  # 경계와 비슷한 내용
+    body = multipart_body(files, fields=[("note", b"hello")])
+    for seed in range(20):
+        got = asyncio.run(collect(iter_multipart(chunked(body, random.Random(seed)), BOUNDARY)))
+        assert got == files  # 폼 필드는 제외, 파일은 순서/내용 그대로
+
+    splitter = MultipartSplitter(BOUNDARY, max_part_bytes=100)
+    try:
+        splitter.feed(multipart_body([("big.jpg", b"x" * 500)]))
+        assert False, "expected PartTooLarge"
+    except PartTooLarge:
+        pass
+
+
+def test_archives():
+    images = [(f"dir/{i}.jpg", jpeg()) for i in range(3)]
+    tar_buf = io.BytesIO()
+    with tarfile.open(fileobj=tar_buf, mode="w:gz") as tf:
+        for name, data in images + [("readme.txt", b"skip"), ("dir/.hidden.jpg", b"skip")]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    tar_buf.seek(0)
+    assert list(iter_archive(tar_buf, "tar")) == images
+
+    zip_buf = io.BytesIO()
+    with zipfile.ZipFile(zip_buf, "w") as zf:
+        for name, data in images + [("notes.md", b"skip")]:
+            zf.writestr(name, data)
+    zip_buf.seek(0)
+    assert list(iter_archive(zip_buf, "zip")) == images
+
+    zip_buf.seek(0)
+    names = [(n, d) for n, d in iter_archive(zip_buf, "zip", max_member_bytes=10)]
+    assert [d for _, d in names] == [None] * 3  # 크기 초과 멤버는 내용 없이 보고
+
+
+def test_infer_images_order_errors_and_batches():
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    fire = jpeg(((40, 40, 140, 140), FIRE_BGR))
+    plain = jpeg()
+    items = [("a.jpg", fire), ("b.jpg", b"not an image"), ("c.jpg", plain),
+             ("d.jpg", None), ("e.jpg", fire), ("f.jpg", plain)]
+
+    async def source():
+        for item in items:
+            yield item
+
+    async def run():
+        return await collect(infer_images(det, source(), batch_size=4, workers=2, max_pending=8))
+
+    recs = asyncio.run(run())
+    assert [r["index"] for r in recs] == list(range(6))
+    assert [r["name"] for r in recs] == [n for n, _ in items]
+    assert recs[1]["error"] == "decode failed" and recs[3]["error"] == "too large"
+    assert recs[0]["fire_score"] > 0.8 and len(recs[0]["boxes"]) == 1
+    assert recs[2]["fire_score"] == 0.0 and recs[2]["boxes"] == []
+    assert (recs[0]["img_w"], recs[0]["img_h"]) == (320, 240)
+    assert sum(backend.calls) == 4 and max(backend.calls) <= 4
+
+
+def test_infer_images_bounded_read_ahead():
+    det = make_detector(ColorBlobBackend(delay=0.01))
+    data = jpeg(((40, 40, 140, 140), FIRE_BGR))
+    read = [0]
+    max_ahead = [0]
+
+    async def source():
+        for i in range(60):
+            read[0] += 1
+            yield f"{i}.jpg", data
+
+    async def run():
+        n = 0
+        async for _ in infer_images(det, source(), batch_size=2, workers=2, max_pending=4):
+            n += 1
+            max_ahead[0] = max(max_ahead[0], read[0] - n)
+            await asyncio.sleep(0.005)  # 느린 클라이언트
+            if n == 20:
+                break
+        return n
+
+    assert asyncio.run(run()) == 20
+    # 대기열(4) + 처리 중 배치(2) + 생산자 대기 1장 이상은 읽지 않음
+    assert max_ahead[0] <= 4 + 2 + 1, max_ahead[0]
+    assert read[0] < 60
+
+
+async def collect_until_error(agen):
+    """오류가 나기 전까지 받은 결과와 오류"""
+    got = []
+    try:
+        async for x in agen:
+            got.append(x)
+    except Exception as e:
+        return got, e
+    return got, None
+
+
+def test_truncated_input_reports_received_images():
+    det = make_detector(ColorBlobBackend())
+    fire, plain = jpeg(((40, 40, 140, 140), FIRE_BGR)), jpeg()
+    files = [("a.jpg", fire), ("b.jpg", plain), ("c.jpg", b"broken"), ("d.jpg", fire), ("e.jpg", plain)]
+
+    # multipart: d.jpg 중간에서 끊김 → a~c 는 결과/오류 기록, 그 뒤 ValueError
+    body = multipart_body(files)
+    cut = body.index(b'filename="d.jpg"') + 200
+    items = iter_multipart(chunked(body[:cut], random.Random(0), max_chunk=4096), BOUNDARY)
+    recs, err = asyncio.run(collect_until_error(infer_images(det, items, batch_size=8, workers=2)))
+    assert isinstance(err, ValueError) and "truncated" in str(err)
+    assert [r["name"] for r in recs] == ["a.jpg", "b.jpg", "c.jpg"]
+    assert recs[0]["fire_score"] > 0.8 and recs[1]["boxes"] == [] and recs[2]["error"] == "decode failed"
+
+    # tar: 4번째 멤버 중간에서 끊김 → 앞의 3장 결과 후 tarfile.ReadError
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        for name, data in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    data = buf.getvalue()
+    with tarfile.open(fileobj=io.BytesIO(data)) as tf:
+        cut = tf.getmember("d.jpg").offset_data + 100
+    items = iterate_in_thread(iter_archive(io.BytesIO(data[:cut]), "tar"))
+    recs, err = asyncio.run(collect_until_error(infer_images(det, items, batch_size=8, workers=2)))
+    assert isinstance(err, tarfile.ReadError)
+    assert [r["index"] for r in recs] == [0, 1, 2] and recs[0]["fire_score"] > 0.8
+
+    # 오류가 배치 처리 중간에 와도 (배치 크기 1) 같은 결과
+    async def source():
+        for item in files[:3]:
+            yield item
+        raise ValueError("client disconnected")
+
+    recs, err = asyncio.run(collect_until_error(infer_images(det, source(), batch_size=1)))
+    assert str(err) == "client disconnected" and [r["name"] for r in recs] == ["a.jpg", "b.jpg", "c.jpg"]
+
+
+def test_iterate_in_thread():
+    got = asyncio.run(collect(iterate_in_thread(iter([("a", b"1"), ("b", b"2")]))))
+    assert got == [("a", b"1"), ("b", b"2")]
@@ -0,0 +1,96 @@
+"""
+캐스케이드 게이트 테스트
+- 불꽃 색 / 움직이는 회색(연기) 프레임은 통과, 정지한 어두운 장면은 건너뜀
+- NORMAL 이 아니면 항상 통과, force_every 안전장치, 통계
+- 평가 모드: 합성 클립에서 always-on 대비 놓친 감지 0, 화재 없는 구간 호출 절약
+"""
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detectors.cascade import FrameGate
+from eval_cascade import evaluate_clip, write_synthetic_clips
+from testutil import FIRE_BGR, RULES, ColorBlobBackend, frame_with, make_detector
+
+
+def dark(size=(480, 640)):
+    return np.full((*size, 3), 40, dtype=np.uint8)
+
+
+def test_gate_scores():
+    gate = FrameGate()
+    assert gate.score(dark())[0] == 0.0
+    fire = frame_with(((300, 200, 340, 240), FIRE_BGR))  # 화면의 약 0.5%
+    s, cues = gate.score(fire)
+    assert s >= gate.cfg["threshold"] and cues["fire"] > 0
+    orange = frame_with(((300, 200, 340, 240), (0, 160, 255)))
+    assert gate.score(orange)[0] >= gate.cfg["threshold"]
+    blue = frame_with(((300, 200, 400, 300), (200, 60, 20)))
+    assert gate.score(blue)[0] == 0.0
+
+    # 회색 영역: 정지해 있으면 0, 움직이면(연기) 통과
+    gate = FrameGate()
+    still = frame_with(((100, 100, 300, 200), (150, 150, 150)))
+    gate.score(still)
+    assert gate.score(still)[0] == 0.0
+    drift = frame_with(((100, 100, 300, 200), (150, 150, 150)), ((120, 100, 320, 200), (170, 170, 170)))
+    assert gate.score(drift)[0] >= gate.cfg["threshold"]
+
+
+def test_gate_decisions_and_stats():
+    gate = FrameGate({"force_every": 4})
+    decisions = [gate.should_detect(dark()) for _ in range(9)]
+    # 첫 프레임(비교 대상 없음) 감지, 이후 3번 건너뛰고 4번째마다 강제 감지
+    assert decisions == [True, False, False, False, True, False, False, False, True]
+    assert gate.stats["passed_by"] == {"score": 0, "state": 0, "forced": 3}
+    assert gate.stats["skipped"] == 6 and abs(gate.stats["saved_ratio"] - 6 / 9) < 1e-3
+
+    assert gate.should_detect(dark(), state="PRE_FIRE")
+    assert gate.stats["passed_by"]["state"] == 1
+
+    fire = frame_with(((300, 200, 340, 240), FIRE_BGR))
+    assert gate.should_detect(fire)
+    gate.record(True)
+    assert gate.stats["passed_by"]["score"] == 1
+    assert gate.stats["hits"] == 1 and gate.stats["score_hits"] == 1 and gate.stats["gate_precision"] == 1.0
+
+    gate.reset()
+    assert gate.should_detect(dark())  # 연속성이 끊기면 다음 프레임은 감지
+
+
+def write_clip(path, fps=10, seconds=10, onset=4.0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (320, 240))
+    for i in range(fps * seconds):
+        frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+        cv2.putText(frame, f"{i:03d}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        if i / fps >= onset:
+            cv2.rectangle(frame, (120, 80), (180, 160), FIRE_BGR, -1)
+        writer.write(frame)
+    writer.release()
+
+
+def test_evaluate_clip_no_missed_detections():
+    with tempfile.TemporaryDirectory() as d:
+        clip = Path(d) / "clip.avi"
+        write_clip(clip)
+        rep = evaluate_clip(make_detector(ColorBlobBackend()), clip, RULES)
+        st = rep["cascade"]
+        assert st["frames"] == 50
+        assert rep["missed_detections"] == 0
+        assert not rep["timeline_changed"]
+        assert rep["first_detection"]["always_on"] == rep["first_detection"]["gated"] == 4.0
+        # 화재 전 4초(20 tick)는 대부분 건너뜀, 화재 이후는 모두 감지
+        assert st["skipped"] >= 15 and st["passed_by"]["forced"] >= 1
+        assert st["hits"] == 30
+
+
+def test_synthetic_clips():
+    with tempfile.TemporaryDirectory() as d:
+        paths = write_synthetic_clips(Path(d), fps=5, seconds=4, size=(320, 240))
+        assert [p.name for p in paths] == ["fire_smoke.mp4", "smoke_only.mp4", "no_fire.mp4"]
+        for p in paths:
+            cap = cv2.VideoCapture(str(p))
+            assert cap.isOpened() and int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 20
+            cap.release()
@@ -0,0 +1,165 @@
+"""
+분석 결과 내보내기 테스트 (media/runs/{job_id}/ticks.ndjson → NDJSON / CSV / Parquet)
+- 행 변환(점수/원시 점수/상태/박스), 청크 단위 스트리밍, 영상 시각/분석 시각 구간 필터
+- 분석 중인 job 의 덜 써진 마지막 줄 무시, 행 수가 10배가 되어도 메모리 최대치는 거의 그대로
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from export_ticks import (COLUMNS, csv_chunks, export_chunks, find_jobs, iter_job_rows, iter_range_rows,
+                          ndjson_chunks, parquet_available)
+from tick_log import TickLog, ticks_path
+
+T0 = 1_700_000_000.0
+
+
+def make_tick(i, wall_ts=None, boxes=1):
+    tick = {
+        "type": "tick", "job_id": "x", "t": i * 0.2,
+        "state": "PRE_FIRE" if i % 7 == 0 else "NORMAL",
+        "scores": {"fire": round(0.001 * i, 3), "smoke": 0.05, "hazard": 0.1},
+        "raw_scores": {"fire": 0.5, "smoke": 0.0},
+        "img_w": 640, "img_h": 480,
+        "boxes": [{"x1": 10.0 + b, "y1": 20.0, "x2": 110.0, "y2": 220.0, "cls": 0, "conf": 0.8,
+                   "label": "fire", "class_name": "fire", "ema_score": 0.3} for b in range(boxes)],
+    }
+    if wall_ts is not None:
+        tick["wall_ts"] = wall_ts
+    if i % 5 == 3:
+        tick["gated"] = True
+    return tick
+
+
+def write_job(runs, job_id, n, wall_start=None, boxes=1):
+    with TickLog(ticks_path(runs / job_id)) as log:
+        for i in range(n):
+            log.append(make_tick(i, None if wall_start is None else wall_start + i * 0.2, boxes))
+    return ticks_path(runs / job_id)
+
+
+def test_rows_and_formats():
+    with tempfile.TemporaryDirectory() as d:
+        path = write_job(Path(d), "job1", 50)
+        rows = list(iter_job_rows(path, "job1"))
+        assert len(rows) == 50 and list(rows[0]) == COLUMNS
+        r = rows[3]
+        assert r["job_id"] == "job1" and abs(r["t"] - 0.6) < 1e-9 and r["gated"] is True and r["n_boxes"] == 1
+        assert r["fire"] == 0.003 and r["raw_fire"] == 0.5 and r["state"] == "NORMAL"
+        assert r["boxes"] == [{"label": "fire", "cls": 0, "conf": 0.8, "x1": 10.0, "y1": 20.0, "x2": 110.0, "y2": 220.0}]
+
+        # NDJSON: 청크 여러 개, 합치면 행과 같음
+        chunks = list(ndjson_chunks(iter_job_rows(path, "job1"), chunk_bytes=1024))
+        assert len(chunks) > 3
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line) for line in lines] == rows
+
+        # CSV: 헤더 + 행, 박스는 JSON 문자열, None 은 빈 칸
+        chunks = list(csv_chunks(iter_job_rows(path, "job1"), chunk_bytes=1024))
+        assert len(chunks) > 3
+        table = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert len(table) == 50 and table[3]["wall_ts"] == "" and table[3]["gated"] == "True"
+        assert json.loads(table[3]["boxes"]) == r["boxes"]
+
+        # 영상 시각 구간
+        sub = [row["t"] for row in iter_job_rows(path, "job1", start=1.0, end=2.0)]
+        assert sub[0] == 1.0 and sub[-1] == 2.0 and len(sub) == 6
+
+        try:
+            export_chunks(iter([]), "xml")
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+
+
+def test_partial_last_line_is_ignored():
+    with tempfile.TemporaryDirectory() as d:
+        path = write_job(Path(d), "live", 10)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"type":"tick","t":9.9,"sta')  # 분석 중 - 아직 줄이 끝나지 않음
+        assert len(list(iter_job_rows(path, "live"))) == 10
+
+
+def test_forward_seek_gap_is_marked():
+    with tempfile.TemporaryDirectory() as d:
+        path = ticks_path(Path(d) / "seek")
+        with TickLog(path) as log:
+            for i in range(5):
+                log.append(make_tick(i))
+            log.cut()                  # 앞으로 seek → 건너뛴 구간 뒤 첫 tick 에 gap
+            for i in range(50, 53):
+                log.append(make_tick(i))
+            log.cut()                  # 뒤로 seek → 이미 기록한 tick 은 건너뛰고 기록 끝에서 이어짐
+            for i in range(45, 56):
+                log.append(make_tick(i))
+        rows = list(iter_job_rows(path, "seek"))
+        assert [round(r["t"] / 0.2) for r in rows] == [0, 1, 2, 3, 4, 50, 51, 52, 53, 54, 55]
+        assert [r["gap"] for r in rows] == [False] * 5 + [True] + [False] * 5
+        table = list(csv.DictReader(io.StringIO(b"".join(csv_chunks(iter(rows))).decode("utf-8"))))
+        assert table[5]["gap"] == "True"
+
+
+def test_range_export_across_jobs():
+    with tempfile.TemporaryDirectory() as d:
+        runs = Path(d)
+        write_job(runs, "late", 20, wall_start=T0 + 100)    # T0+100 ~ T0+103.8
+        write_job(runs, "early", 20, wall_start=T0)         # T0 ~ T0+3.8
+        write_job(runs, "old", 20, wall_start=T0 - 1000)    # 구간 밖
+        write_job(runs, "legacy", 20)                       # wall_ts 없음 (이전 기록)
+        os.utime(ticks_path(runs / "old"), (T0 - 990, T0 - 990))
+
+        jobs = [job for _, job, _ in find_jobs(runs, T0 - 1, T0 + 200)]
+        assert jobs == ["early", "late"]  # 첫 tick 시각 순, old 는 수정 시각으로 건너뜀
+
+        rows = list(iter_range_rows(runs, T0 + 2.0, T0 + 101.0))
+        assert [r["job_id"] for r in rows] == ["early"] * 10 + ["late"] * 6
+        assert all(T0 + 2.0 <= r["wall_ts"] <= T0 + 101.0 for r in rows)
+
+        rows = list(iter_range_rows(runs, T0 - 1, None, job_ids=["late", "../etc"]))
+        assert {r["job_id"] for r in rows} == {"late"} and len(rows) == 20
+
+
+def peak_export_bytes(path, fmt):
+    tracemalloc.start()
+    total = 0
+    for chunk in export_chunks(iter_job_rows(path, "big"), fmt):
+        total += len(chunk)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, total
+
+
+def test_memory_constant_in_row_count():
+    with tempfile.TemporaryDirectory() as d:
+        small = write_job(Path(d) / "s", "big", 1000, wall_start=T0, boxes=3)
+        large = write_job(Path(d) / "l", "big", 10000, wall_start=T0, boxes=3)
+        for fmt in ("ndjson", "csv"):
+            peak_small, out_small = peak_export_bytes(small, fmt)
+            peak_large, out_large = peak_export_bytes(large, fmt)
+            assert out_large > 9 * out_small
+            # 출력은 10배지만 메모리 최대치는 청크 크기 수준 (전체 결과를 모으지 않음)
+            assert peak_large < 2 * peak_small + (256 << 10), (fmt, peak_small, peak_large)
+            assert peak_large < out_large / 4
+
+
+def test_parquet_row_groups():
+    if not parquet_available():
+        print("   (pyarrow 없음 - parquet 검증 생략)")
+        return
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as d:
+        path = write_job(Path(d), "pq", 2500, wall_start=T0, boxes=2)
+        out = Path(d) / "out.parquet"
+        chunks = list(export_chunks(iter_job_rows(path, "pq"), "parquet"))
+        out.write_bytes(b"".join(chunks))
+        meta = pq.ParquetFile(out).metadata
+        assert meta.num_rows == 2500
+        table = pq.read_table(out)
+        assert table.column_names == COLUMNS
+        row = table.slice(3, 1).to_pylist()[0]
+        assert row["gated"] is True and row["n_boxes"] == 2 and row["boxes"][1]["x1"] == 11.0
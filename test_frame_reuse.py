@@ -0,0 +1,260 @@
+"""
+감지 결과 재사용 테스트 (backend/frame_reuse.py)
+- 재인코딩/해상도 변경/앞부분을 잘라 다시 올린 영상: 정렬 구간 확인 뒤 감지 엔진 호출 없이 저장된 결과 재사용, 상태 열은 같음
+- 원본에 없던 작은 불꽃 / 옅은 연기 막 / 다른 모델 설정 / 같은 job 의 기록이면 재사용하지 않음
+- 큰 색인에서도 재인코딩된 프레임을 찾고, 조각 값이 흔한 색인에서도 거리 조건을 만족하는 프레임을 놓치지 않음
+  (조회 시간은 bench_frame_reuse.py)
+"""
+import random
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from frame_reuse import REUSE_DEFAULTS, FrameIndex, _dist, fingerprint, model_signature
+from scoring import HazardScorer
+from testutil import FIRE_BGR, RULES, ColorBlobBackend, make_detector
+
+
+def scene(seed, size=(480, 640)):
+    """저채도 질감 배경 (실내 CCTV 비슷하게) + 빨간 소화기"""
+    h, w = size
+    g = np.random.default_rng(seed).integers(30, 200, (h // 16, w // 16), dtype=np.uint8)
+    g = cv2.GaussianBlur(cv2.resize(g, (w, h), interpolation=cv2.INTER_CUBIC), (0, 0), 3)
+    img = cv2.merge([g, (g * 0.95).astype(np.uint8), (g * 0.9).astype(np.uint8)])
+    cv2.rectangle(img, (500, 300), (540, 400), (20, 20, 200), -1)
+    return img
+
+
+def clip(n=40):
+    """불이 번지는 클립: 배경은 조금씩 흔들리고 불꽃 영역이 커짐"""
+    base = scene(1)
+    frames = []
+    for i in range(n):
+        f = np.roll(base, i // 4, axis=1)
+        if i >= 10:
+            s = 10 + 3 * (i - 10)
+            cv2.rectangle(f, (100, 200), (100 + s, 200 + s), FIRE_BGR, -1)
+        frames.append(f)
+    return frames
+
+
+def haze(frame, alpha, box=(200, 150, 500, 400)):
+    """옅은 회색 연기 막 (300×250 영역) - 윤곽은 그대로라 해시 비트는 거의 안 바뀜"""
+    x1, y1, x2, y2 = box
+    out = frame.copy()
+    roi = out[y1:y2, x1:x2].astype(np.float32)
+    out[y1:y2, x1:x2] = np.rint(roi * (1 - alpha) + 170 * alpha).astype(np.uint8)
+    return out
+
+
+def reencode(frame, scale=0.75, quality=70):
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+def analyse(det, backend, session, frames, fps=5.0, offset=0.0):
+    """main.gated_detect 와 같은 순서: 조회 → 없으면 추론 후 기록 → EMA/상태"""
+    scorer, states, results = HazardScorer(RULES), [], []
+    for i, frame in enumerate(frames):
+        t = offset + i / fps
+        hit = session.lookup(frame, t) if session else None
+        if hit is None:
+            calls = len(backend.calls)
+            res = det.infer(frame)
+            assert len(backend.calls) == calls + 1
+            hit = res["fire_score"], res["smoke_score"], res["boxes"], res["dets"]
+            if session:
+                session.record(t, *hit, frame.shape[1], frame.shape[0], 0.05)
+        states.append(scorer.update(hit[0], hit[1]))
+        results.append(hit)
+    if session:
+        session.flush()
+    return states, results
+
+
+def test_fingerprint_survives_reencode_but_not_new_flame():
+    a = scene(1, (720, 1280))
+    fa = fingerprint(a)
+    for scale, quality in ((1.0, 90), (0.75, 40), (0.5, 40)):
+        fb = fingerprint(reencode(a, scale, quality))
+        assert (fa[0] ^ fb[0]).bit_count() <= 3 and _dist(fa[1], fb[1]) <= 20, (scale, quality)
+    assert (fa[0] ^ fingerprint(scene(2, (720, 1280)))[0]).bit_count() > 10
+
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", "m")
+    index.insert([("orig", 0.0, fa, 50.0, '{"fire":0,"smoke":0,"boxes":[],"dets":[]}')])
+    assert index.match(fingerprint(reencode(a, 0.5, 40))) is not None
+    for x, y in ((100, 300), (640, 100), (1100, 600), (480, 260)):
+        flame = a.copy()
+        cv2.rectangle(flame, (x, y), (x + 11, y + 11), (0, 120, 255), -1)  # 12px 불꽃 (해시 비트는 그대로)
+        fp = fingerprint(flame)
+        assert fp[0] == fa[0] and index.match(fp) is None, (x, y)
+
+
+def test_haze_only_change_is_reinferred():
+    a = scene(1, (720, 1280))
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", "m")
+    index.insert([("orig", 0.0, fingerprint(a), 50.0, '{"fire":0,"smoke":0,"boxes":[],"dets":[]}')])
+    for alpha in (0.1, 0.2, 0.3, 0.5):
+        fp = fingerprint(haze(a, alpha))
+        assert index.match(fp) is None, alpha
+
+    # 재사용 중인 구간에 연기가 끼기 시작하면 그 프레임부터 다시 추론
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", model_signature(det))
+    frames = clip(12)[:10]
+    analyse(det, backend, index.session("orig"), frames)
+    session = index.session("smoky")
+    calls = len(backend.calls)
+    analyse(det, backend, session, [f if i < 6 else haze(f, 0.25) for i, f in enumerate(frames)])
+    confirm = REUSE_DEFAULTS["confirm"]
+    assert session.stats["hits"] == 6 - confirm and len(backend.calls) - calls == confirm + 4
+
+
+def test_reencoded_trimmed_upload_reuses_detections():
+    tmp = Path(tempfile.mkdtemp())
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    index = FrameIndex(tmp / "frames.db", model_signature(det))
+    frames = clip()
+    orig_states, orig_results = analyse(det, backend, index.session("orig"), frames)
+    assert len(backend.calls) == len(frames) and "CALL_119" in orig_states
+
+    # 앞 4프레임을 잘라내고 해상도를 줄여 재인코딩한 영상
+    calls = len(backend.calls)
+    session = index.session("recut")
+    states, results = analyse(det, backend, session, [reencode(f) for f in frames[4:]])
+    st = session.stats
+    # 처음 confirm 프레임은 정렬 구간 확인 - 추론해서 원본 결과와 비교
+    assert len(backend.calls) - calls == st["lookups"] - st["hits"] == REUSE_DEFAULTS["confirm"]
+    assert st["reuse_ratio"] >= 0.9 and st["sources"] == {"orig": st["hits"]} and st["segments"] == 1
+    assert st["cpu_saved_s"] > 0 and st["recorded"] == st["lookups"] - st["hits"]
+
+    # 같은 감지 결과 (좌표는 새 해상도로) → EMA 는 다시 계산하므로 상태 열은 잘린 원본을 새로 분석한 것과 같음
+    for (f0, s0, b0, _), (f1, s1, b1, d1) in zip(orig_results[4:], results):
+        assert (f0, s0) == (f1, s1) and len(b0) == len(b1)
+        for x, y in zip(b0, b1):
+            assert abs(x["x2"] * 0.75 - y["x2"]) < 1e-6 and x["label"] == y["label"]
+        assert d1.shape[1] == 6
+    fresh = ColorBlobBackend()
+    fresh_states, _ = analyse(make_detector(fresh), fresh, None, frames[4:])
+    assert states == fresh_states
+
+    # 같은 job 의 기록은 재사용하지 않음 (정지 화면 카메라가 자기 프레임을 재사용하지 않도록)
+    again = index.session("recut")
+    analyse(det, backend, again, [reencode(f) for f in frames[4:]])
+    assert again.stats["sources"] == {"orig": again.stats["hits"]}
+    static = index.session("static")
+    analyse(det, backend, static, [scene(7)] * 8)
+    assert static.stats["hits"] == 0 and static.stats["recorded"] == 8
+
+
+def test_reuse_needs_agreeing_aligned_segment():
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", model_signature(det))
+    frames = clip(20)
+    analyse(det, backend, index.session("orig"), frames)
+    confirm = REUSE_DEFAULTS["confirm"]
+
+    # 원본과 같은 프레임 1~2개만 겹치면 (정렬 구간이 confirm 보다 짧음) 재사용하지 않음
+    s = index.session("short")
+    analyse(det, backend, s, [frames[3], frames[4], scene(9), scene(10)])
+    assert s.stats["hits"] == 0
+
+    # 원본 순서와 어긋난 프레임 열: 매번 새 위치라 확인이 끝나지 않음
+    s = index.session("shuffled")
+    analyse(det, backend, s, [frames[i] for i in (2, 7, 4, 9, 1, 6, 3, 8)])
+    assert s.stats["hits"] == 0 and s.stats["segments"] == 0
+
+    # 지문은 맞아도 현재 감지 결과가 원본과 다르면 (감지 엔진 쪽 변화) 그 구간은 버림
+    other = ColorBlobBackend()
+    odet = make_detector(other)
+    odet.infer = lambda frame: {**det.infer(frame), "fire_score": 0.9}
+    s = index.session("disagree")
+    analyse(odet, backend, s, frames[:confirm + 3])
+    assert s.stats["hits"] == 0 and s.stats["rejected"] >= 1
+
+
+def test_not_reused_across_models_or_new_flame():
+    tmp = Path(tempfile.mkdtemp())
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    frames = clip(12)
+    index = FrameIndex(tmp / "frames.db", model_signature(det))
+    analyse(det, backend, index.session("orig"), frames)
+
+    # 감지 설정이 다른 모델은 같은 DB 라도 서로 섞이지 않음
+    other = make_detector(backend, model={"imgsz": 320, "max_batch": 4, "conf": 0.5})
+    assert model_signature(other) != model_signature(det)
+    s = FrameIndex(tmp / "frames.db", model_signature(other)).session("x")
+    assert s.lookup(frames[0], 0.0) is None and not s.last_hit
+
+    # 원본에 없던 작은 불꽃이 생긴 프레임 → 재사용하지 않음
+    s = index.session("y")
+    n = REUSE_DEFAULTS["confirm"] + 1
+    analyse(det, backend, s, frames[:n])
+    assert s.last_hit and s.stats["hits"] == 1
+    flame = frames[n].copy()
+    cv2.rectangle(flame, (300, 100), (311, 111), (0, 120, 255), -1)
+    assert s.lookup(flame, n / 5.0) is None and s.stats["hits"] == 1
+
+
+def test_stale_session_after_restart_writes_nothing():
+    """재분석이 이전 기록을 지우고 새 세션을 연 뒤, 이전 실행의 flush 는 아무것도 쓰지 않음"""
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", model_signature(det))
+    frames = clip(8)
+    old = index.session("cam1")
+    for i, frame in enumerate(frames):
+        res = det.infer(frame)
+        old.record(i / 5.0, res["fire_score"], res["smoke_score"], res["boxes"], res["dets"],
+                   frame.shape[1], frame.shape[0], 0.05)
+    index.delete_job("cam1")
+    new = index.session("cam1")
+    old.close()  # 이전 실행의 finally
+    assert index.report()["frames"] == 0
+    analyse(det, backend, new, frames[:3])
+    new.close()
+    assert index.report()["frames"] == 3 and not index._sessions
+
+
+def test_lookup_finds_matches_in_large_index():
+    index = FrameIndex(Path(tempfile.mkdtemp()) / "frames.db", "m")
+    rng = random.Random(0)
+    empty = b""
+    tone = bytes(512)
+    rows = []
+    for i in range(200_000):
+        fp = (rng.getrandbits(64), rng.getrandbits(256).to_bytes(32, "big"), empty, tone)
+        rows.append((f"job{i // 5000}", i * 0.2, fp, 40.0, '{"fire":0,"smoke":0,"boxes":[],"dets":[]}'))
+    # 조각 값이 흔한 프레임 (어두운 화면 등): 하위 16비트가 모두 같은 2만 개
+    for i in range(20_000):
+        h64 = (rng.getrandbits(48) << 16) | 0x0F0F
+        fp = (h64, rng.getrandbits(256).to_bytes(32, "big"), empty, tone)
+        rows.append((f"dark{i // 5000}", i * 0.2, fp, 40.0, '{"fire":0,"smoke":0,"boxes":[],"dets":[]}'))
+    for i in range(0, len(rows), 20000):
+        index.insert(rows[i:i + 20000])
+
+    def noisy_256(h256):
+        flips = sum(1 << bit for bit in rng.sample(range(256), 10))
+        return (int.from_bytes(h256, "big") ^ flips).to_bytes(32, "big")
+
+    probes = rng.sample(rows[:200_000], 200)
+    for job_id, t, (h64, h256, fire, tone), _, _ in probes:
+        # 재인코딩으로 조회 키 2비트, 검증 해시 10비트가 바뀐 프레임
+        noisy = h64 ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+        hit = index.match((noisy, noisy_256(h256), fire, tone))
+        assert hit is not None and (hit["job_id"], hit["t"]) == (job_id, t)
+    assert index.match((rng.getrandbits(64), bytes(32), empty, tone)) is None
+
+    # 재현율: 흔한 조각에서만 맞는 프레임(나머지 세 조각은 1비트씩 다름)도 max_candidates 에 잘리지 않고 찾음
+    for job_id, t, (h64, h256, fire, tone), _, _ in rng.sample(rows[200_000:], 50):
+        noisy = h64 ^ (1 << (16 + rng.randrange(16))) ^ (1 << (32 + rng.randrange(16))) ^ (1 << (48 + rng.randrange(16)))
+        hit = index.match((noisy, noisy_256(h256), fire, tone))
+        assert hit is not None and (hit["job_id"], hit["t"]) == (job_id, t)
+    assert index.report()["frames"] == 220_000
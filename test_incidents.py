@@ -0,0 +1,190 @@
+"""
+사고 구간 색인 테스트 (backend/incidents.py, GET /incidents)
+- tick 상태 열 → run-length 구간 (상태 전이/seek/종료에서 닫힘, 최대 점수, 영상 시각 링크)
+- 전체 프레임 + 구역별 구간, 이미 분석한 영상 시각은 다시 기록하지 않음
+- 겹침 조회(min_state, 구간 잘라 합산), 진행 중인 구간 포함, 재분석 삭제, 많은 기록에서도 빠짐없이 조회
+  (조회 시간은 bench_incidents.py)
+"""
+import random
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from incidents import IncidentStore, parse_time, public, summarize
+
+T0 = 1_700_000_000.0
+
+
+def tick(t, state, hazard=0.1, fire=0.0, smoke=0.0, zones=None):
+    ev = {"type": "tick", "t": t, "wall_ts": T0 + t, "state": state,
+          "scores": {"fire": fire, "smoke": smoke, "hazard": hazard}}
+    if zones is not None:
+        ev["zones"] = zones
+    return ev
+
+
+def new_store():
+    return IncidentStore(Path(tempfile.mkdtemp()) / "incidents.db")
+
+
+def test_run_length_intervals_with_peaks_and_video_links():
+    store = new_store()
+    tr = store.tracker("cam1", "upload", "lobby.mp4", "/media/uploads/cam1.mp4")
+    states = ["NORMAL"] * 3 + ["SMOKE_DETECTED"] * 4 + ["CALL_119"] * 2 + ["SMOKE_DETECTED"] + ["NORMAL"] * 2
+    for i, s in enumerate(states):
+        tr.observe(tick(i * 0.5, s, hazard=0.1 * i, smoke=0.05 * i))
+    store.release(tr)
+
+    rows = store.query(min_state="PRE_FIRE")
+    assert [(r["state"], r["start_t"], r["end_t"], r["ticks"]) for r in rows] == [
+        ("SMOKE_DETECTED", 1.5, 3.5, 4),  # 다음 상태의 첫 tick 까지
+        ("CALL_119", 3.5, 4.5, 2),
+        ("SMOKE_DETECTED", 4.5, 5.0, 1),
+    ]
+    assert rows[1]["peak_hazard"] == 0.1 * 8 and rows[0]["peak_smoke"] == 0.05 * 6
+    out = public(rows[1])
+    assert out["video"] == {"start": 3.5, "end": 4.5, "url": "/media/uploads/cam1.mp4#t=3.50,4.50"}
+    assert out["duration"] == 1.0 and out["open"] is False and out["name"] == "lobby.mp4"
+    assert [r["state"] for r in store.query(min_state="CALL_119")] == ["CALL_119"]
+
+
+def test_seek_cuts_intervals_and_skips_reanalysed_time():
+    store = new_store()
+    tr = store.tracker("cam1")
+    for i in range(10):
+        tr.observe(tick(i, "SMOKE_DETECTED"))
+    tr.cut()  # seek → 앞으로 점프
+    for i in range(30, 35):
+        tr.observe(tick(i, "SMOKE_DETECTED"))
+    tr.cut()  # seek → 뒤로: 이미 기록한 영상 시각은 건너뜀
+    for i in range(20, 40):
+        tr.observe(tick(i, "SMOKE_DETECTED"))
+    store.release(tr)
+    assert [(r["start_t"], r["end_t"]) for r in store.query()] == [(0, 9), (30, 34), (35, 39)]
+
+
+def test_gap_tick_closes_interval():
+    """tick 타임라인의 gap (앞으로 seek 해서 건너뛴 구간) 을 지나 구간이 이어지지 않음"""
+    store = new_store()
+    tr = store.tracker("cam1")
+    for i in range(5):
+        tr.observe(tick(i, "SMOKE_DETECTED"))
+    tr.observe({**tick(40, "SMOKE_DETECTED"), "gap": True})
+    tr.observe(tick(41, "SMOKE_DETECTED"))
+    store.release(tr)
+    assert [(r["start_t"], r["end_t"]) for r in store.query()] == [(0, 4), (40, 41)]
+
+
+def test_stale_tracker_after_restart_writes_nothing():
+    """재분석(reset) 뒤 이전 실행의 기록기가 늦게 끝나도 그 구간은 다시 들어가지 않음"""
+    store = new_store()
+    old = store.tracker("cam1")
+    for i in range(5):
+        old.observe(tick(i, "SMOKE_DETECTED"))
+    old.observe(tick(5, "CALL_119"))  # SMOKE 구간은 DB 에, CALL_119 는 진행 중
+    new = store.tracker("cam1", reset=True)
+    assert store.query() == []
+    for i in range(3):
+        new.observe(tick(i, "PRE_FIRE"))
+    old.observe(tick(6, "NORMAL"))  # 이전 실행이 아직 돌고 있음
+    store.release(old)
+    assert [(r["state"], r.get("open")) for r in store.query()] == [("PRE_FIRE", True)]
+    store.release(new)
+    assert [(r["state"], r["start_t"], r["end_t"]) for r in store.query()] == [("PRE_FIRE", 0, 2)]
+    assert not store.trackers
+
+
+def test_zone_intervals_are_separate():
+    store = new_store()
+    tr = store.tracker("cam1", "stream", "rtsp://cam1")
+    for i in range(6):
+        zones = {"stove": {"state": "CALL_119" if i >= 2 else "NORMAL", "scores": {"hazard": 0.9, "fire": 0.8}},
+                 "door": {"state": "NORMAL", "scores": {}}}
+        tr.observe(tick(i, "FIRE_GROWING" if i >= 3 else "NORMAL", zones=zones))
+    store.release(tr)
+    assert [r["state"] for r in store.query()] == ["FIRE_GROWING"]
+    stove = store.query(zone="stove")
+    assert [(r["state"], r["start_t"], r["peak_fire"]) for r in stove] == [("CALL_119", 2, 0.8)]
+    assert len(store.query(zone="*")) == 2 and store.query(zone="door") == []
+    assert public(stove[0])["video"] == {"start": 2, "end": 5}  # 스트림은 영상 링크 없음
+
+
+def test_overlap_query_clip_open_and_delete():
+    store = new_store()
+    # 긴 구간(1시간) 하나가 조회 구간 앞에서 시작해도 찾아야 함
+    store.insert([
+        {"job_id": "a", "kind": "stream", "name": "cam-a", "zone": None, "state": "SMOKE_DETECTED", "rank": 2,
+         "start_ts": T0 - 3600, "end_ts": T0 + 60, "start_t": 0.0, "end_t": 3660.0,
+         "peak_hazard": 0.4, "peak_fire": 0.1, "peak_smoke": 0.5, "ticks": 18300, "video_url": None},
+        {"job_id": "b", "kind": "stream", "name": "cam-b", "zone": None, "state": "PRE_FIRE", "rank": 1,
+         "start_ts": T0 + 10, "end_ts": T0 + 20, "start_t": 10.0, "end_t": 20.0,
+         "peak_hazard": 0.2, "peak_fire": 0.2, "peak_smoke": 0.0, "ticks": 50, "video_url": None},
+        {"job_id": "b", "kind": "stream", "name": "cam-b", "zone": None, "state": "CALL_119", "rank": 4,
+         "start_ts": T0 + 500, "end_ts": T0 + 600, "start_t": 500.0, "end_t": 600.0,
+         "peak_hazard": 0.9, "peak_fire": 0.9, "peak_smoke": 0.3, "ticks": 500, "video_url": None},
+    ])
+    rows = store.query(T0, T0 + 300, "SMOKE_DETECTED")
+    assert [r["job_id"] for r in rows] == ["a"]
+    assert summarize(rows, T0, T0 + 300) == [{
+        "job_id": "a", "name": "cam-a", "kind": "stream", "zone": None, "max_state": "SMOKE_DETECTED",
+        "peak_hazard": 0.4, "total_s": 60.0, "intervals": 1,
+    }]
+    assert [r["state"] for r in store.query(T0, None, "PRE_FIRE")] == ["SMOKE_DETECTED", "PRE_FIRE", "CALL_119"]
+    assert store.query(T0 + 61, T0 + 499, "PRE_FIRE") == []
+
+    # 진행 중인 구간도 조회에 포함 (아직 DB 에는 없음)
+    tr = store.tracker("c", "upload", "c.mp4", "/media/uploads/c.mp4")
+    for i in range(5):
+        tr.observe({**tick(i, "CALL_119"), "wall_ts": T0 + 100 + i})
+    rows = store.query(T0 + 90, T0 + 200, "CALL_119")
+    assert [(r["job_id"], r.get("open")) for r in rows] == [("c", True)]
+
+    # 재분석: 이전 구간 삭제
+    tr2 = store.tracker("b", reset=True)
+    assert [r["job_id"] for r in store.query(min_state="PRE_FIRE")] == ["a", "c"]
+    store.release(tr)
+    store.release(tr2)
+    assert not store.trackers
+
+    # 다시 열어도 R*Tree 색인으로 긴 구간을 찾음 (삭제한 job 은 색인에서도 빠짐)
+    reopened = IncidentStore(store.path)
+    assert [r["job_id"] for r in reopened.query(T0 + 30, T0 + 40)] == ["a"]
+    assert [r["job_id"] for r in reopened.query(T0 + 450, T0 + 700, "PRE_FIRE")] == []
+    try:
+        store.query(min_state="FIRE")
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def test_parse_time():
+    assert parse_time(None) is None and parse_time("") is None
+    assert parse_time("1700000000.5") == 1700000000.5
+    assert parse_time("2023-11-14T22:13:20+00:00") == T0
+    assert parse_time("2024-03-01T02:00") == datetime(2024, 3, 1, 2, 0).timestamp()
+    try:
+        parse_time("yesterday")
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def test_query_complete_over_long_history():
+    store = new_store()
+    rng = random.Random(0)
+    rows = []
+    ts = T0
+    for i in range(100_000):  # 카메라 20대 × 약 3개월
+        ts += rng.expovariate(1 / 80.0)
+        length = rng.expovariate(1 / 30.0)
+        rank = rng.choice([1, 1, 1, 2, 2, 3, 4])
+        rows.append({"job_id": f"cam{i % 20}", "kind": "stream", "name": None, "zone": None,
+                     "state": ["NORMAL", "PRE_FIRE", "SMOKE_DETECTED", "FIRE_GROWING", "CALL_119"][rank],
+                     "rank": rank, "start_ts": ts, "end_ts": ts + length, "start_t": 0.0, "end_t": length,
+                     "peak_hazard": 0.5, "peak_fire": 0.5, "peak_smoke": 0.5, "ticks": 10, "video_url": None})
+    store.insert(rows)
+    for frac in (0.0, 0.3, 0.7, 0.99):
+        since = T0 + (ts - T0) * frac
+        got = store.query(since, since + 7200, "SMOKE_DETECTED")
+        expected = [r for r in rows if r["rank"] >= 2 and r["end_ts"] >= since and r["start_ts"] <= since + 7200]
+        assert [r["start_ts"] for r in got] == sorted(r["start_ts"] for r in expected) and got, frac
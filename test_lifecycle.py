@@ -0,0 +1,128 @@
+"""
+job 수명 관리 테스트 (backend/lifecycle.py)
+- sweep_memory: 완료 job 은 job_ttl 뒤 메모리에서 제거, 구독자 없는 완료 job 큐는 queue_idle_ttl 뒤 제거
+- 분석/렌더/프리뷰 중이거나 구독자가 있는 job 은 TTL 이 지나도 유지
+- pick_disk_victims: 한도를 넘는 만큼만 LRU 순(last_access, 없으면 파일 수정 시각)으로, 진행 중인 job 은 제외
+- delete_files: 업로드/산출물/스냅샷 삭제, 다른 job 파일은 그대로
+"""
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from lifecycle import LifecycleManager
+from snapshots import SnapshotStore
+
+NOW = 1_700_000_000.0
+MB = 1 << 20
+
+
+def make_manager(root, **cfg):
+    uploads, runs = root / "uploads", root / "runs"
+    uploads.mkdir()
+    runs.mkdir()
+    snaps = SnapshotStore(root / "snap", quota_bytes=100 * MB)
+    jobs, queues, flags, renders = {}, {}, {}, {}
+    cfg = {"job_ttl": 3600, "queue_idle_ttl": 600, "disk_quota_mb": 10, **cfg}
+    return LifecycleManager(jobs, queues, flags, renders, snaps, uploads, runs, cfg)
+
+
+def add_job(m, job_id, finished=None, idle=None, last_access=None, queue=True):
+    m.jobs[job_id] = {"done": finished is not None, "finished_at": finished, "idle_since": idle,
+                      "last_access": last_access}
+    if queue:
+        m.queues[job_id] = asyncio.Queue()
+
+
+def write_job_files(m, job_id, upload_mb, runs_mb=0, snap_mb=0, mtime=None):
+    (m.uploads / f"{job_id}.mp4").write_bytes(b"\0" * int(upload_mb * MB))
+    paths = [m.uploads / f"{job_id}.mp4"]
+    if runs_mb:
+        (m.runs / job_id).mkdir()
+        (m.runs / job_id / "ticks.ndjson").write_bytes(b"\0" * int(runs_mb * MB))
+        paths.append(m.runs / job_id)
+    if snap_mb:
+        (m.snapshots.root / job_id).mkdir()
+        (m.snapshots.root / job_id / "0000001000_CALL_119_transition.jpg").write_bytes(b"\0" * int(snap_mb * MB))
+        paths.append(m.snapshots.root / job_id)
+    if mtime is not None:
+        for p in paths:
+            os.utime(p, (mtime, mtime))
+
+
+def test_sweep_memory_ttl_and_idle_queues():
+    with tempfile.TemporaryDirectory() as d:
+        m = make_manager(Path(d))
+        add_job(m, "old", finished=NOW - 4000, idle=NOW - 4000)     # job_ttl 지남 → 메모리/큐 모두 제거
+        add_job(m, "recent", finished=NOW - 700, idle=NOW - 700)    # 큐만 idle ttl 지남
+        add_job(m, "watched", finished=NOW - 700, idle=NOW - 100)   # 구독자가 방금 떠남 → 큐 유지
+        add_job(m, "running")                                       # 분석 중
+        m.flags["running"] = {}
+        add_job(m, "busy_old", finished=NOW - 9000, idle=NOW - 9000)  # 구독자 있음 → TTL 무시
+        m.subscribers["busy_old"] = 1
+        add_job(m, "rendering", finished=NOW - 9000, idle=NOW - 9000)
+        m.renders["rendering"] = {"status": "running"}
+        add_job(m, "preview", finished=NOW - 9000, idle=NOW - 9000)
+        m.jobs["preview"]["preview"] = "pending"
+        m.queues["orphan"] = asyncio.Queue()                          # job 정보 없는 큐 → 제거
+
+        stats = m.sweep_memory(NOW)
+        assert stats == {"queues_dropped": 3, "jobs_dropped": 1}
+        assert set(m.jobs) == {"recent", "watched", "running", "busy_old", "rendering", "preview"}
+        assert set(m.queues) == {"watched", "running", "busy_old", "rendering", "preview"}
+        assert "rendering" in m.renders
+
+        # 구독자가 떠나고 TTL 이 지나면 제거
+        m.unsubscribe("busy_old")
+        m.jobs["busy_old"]["idle_since"] = NOW - 9000
+        m.renders["rendering"]["status"] = "done"
+        assert m.sweep_memory(NOW) == {"queues_dropped": 2, "jobs_dropped": 2}
+        assert "busy_old" not in m.jobs and "rendering" not in m.jobs and "rendering" not in m.renders
+
+
+def test_pick_disk_victims_lru_until_under_quota():
+    with tempfile.TemporaryDirectory() as d:
+        m = make_manager(Path(d), disk_quota_mb=5)
+        write_job_files(m, "a", 3, runs_mb=1, mtime=NOW - 500)       # 접근 기록 없음 → 수정 시각
+        write_job_files(m, "b", 3, snap_mb=1, mtime=NOW - 100)
+        write_job_files(m, "c", 4, mtime=NOW - 50)
+        write_job_files(m, "d", 2, mtime=NOW - 900)
+        add_job(m, "b", finished=NOW - 100, last_access=NOW - 2000)  # 오래 전에 본 job
+        add_job(m, "c", finished=NOW - 50, last_access=NOW - 10)
+
+        usage = m.disk_usage()
+        assert usage["a"]["total"] == 4 * MB and usage["b"]["snap"] == 1 * MB
+        assert sum(u["total"] for u in usage.values()) == 14 * MB
+        # 가장 오래 쓰지 않은 순: b(2000초 전 접근) → d(900) → a(500) → c(10) / 14MB → 5MB 이하가 될 때까지
+        assert m.pick_disk_victims(usage) == ["b", "d", "a"]
+
+        # 진행 중(분석/렌더/구독자)인 job 은 건너뛰고 다음 후보
+        m.flags["b"] = {}
+        m.subscribers["d"] = 1
+        assert m.pick_disk_victims(usage) == ["a", "c"]
+
+        # 한도 안이면 아무것도 지우지 않음
+        m.cfg["disk_quota_mb"] = 14
+        assert m.pick_disk_victims(usage) == []
+
+
+def test_delete_files_and_sweep_skip_running_jobs():
+    with tempfile.TemporaryDirectory() as d:
+        m = make_manager(Path(d), disk_quota_mb=5)
+        write_job_files(m, "done", 4, runs_mb=1, snap_mb=1, mtime=NOW - 1000)
+        write_job_files(m, "live", 4, runs_mb=1, mtime=NOW - 2000)
+        add_job(m, "done", finished=NOW - 1000)
+        add_job(m, "live")
+        m.flags["live"] = {}
+
+        stats = asyncio.run(m.sweep())
+        assert stats["files_purged"] == 1 and stats["bytes_freed"] == 6 * MB
+        assert not (m.uploads / "done.mp4").exists() and not (m.runs / "done").exists()
+        assert not (m.snapshots.root / "done").exists() and "done" not in m.jobs
+        # 가장 오래됐어도 분석 중인 job 은 파일/메모리 모두 유지 (한도를 넘은 채로)
+        assert (m.uploads / "live.mp4").exists() and (m.runs / "live" / "ticks.ndjson").exists()
+        assert "live" in m.jobs and "live" in m.queues
+
+        m.delete_files("missing")  # 없는 job 도 오류 없음
+        m.delete_files("live")
+        assert not (m.uploads / "live.mp4").exists() and not (m.runs / "live").exists()
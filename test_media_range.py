@@ -0,0 +1,111 @@
+"""
+영상 Range 서빙 테스트 (backend/media_range.py)
+- parse_range: bytes=a-b / a- / -n, 파일 끝을 넘는 끝 위치는 잘라냄, 다중 범위는 무시, 시작이 파일 크기 이상이면 416
+- If-Range: ETag/날짜가 현재 파일과 같으면 206, 다르면 200 전체 / If-None-Match → 304
+- HEAD 는 헤더만 (본문 없음), ETag 는 업로드 때 기록한 해시 (.etag 파일) → 없으면 크기+mtime
+"""
+import os
+import tempfile
+from email.utils import formatdate
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import media_range
+from media_range import RangeNotSatisfiable, etag_sidecar, forget_etag, parse_range, seed_etag, serve_file
+
+SIZE = 1000
+DATA = bytes(i % 251 for i in range(SIZE))
+
+
+def make_client():
+    root = Path(tempfile.mkdtemp())
+    (root / "clip.mp4").write_bytes(DATA)
+
+    async def media(request):
+        return await serve_file(request, root / request.path_params["name"])
+
+    app = Starlette(routes=[Route("/media/{name}", media, methods=["GET", "HEAD"])])
+    return TestClient(app), root / "clip.mp4"
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", SIZE) == (0, 99)
+    assert parse_range("bytes=500-", SIZE) == (500, 999)
+    assert parse_range("bytes=-100", SIZE) == (900, 999)
+    assert parse_range("bytes=-5000", SIZE) == (0, 999)      # 파일보다 긴 suffix → 전체
+    assert parse_range("bytes=900-5000", SIZE) == (900, 999)  # 끝이 파일 밖 → 파일 끝까지
+    assert parse_range("bytes=999-999", SIZE) == (999, 999)
+    # 다중 범위 / 잘못된 형식 → None (Range 무시, 200 전체)
+    for header in ("bytes=0-1,5-9", "bytes=5-2", "items=0-1", "bytes=a-b", "bytes=10"):
+        assert parse_range(header, SIZE) is None, header
+    for header in ("bytes=1000-", "bytes=5000-6000", "bytes=-0"):
+        try:
+            parse_range(header, SIZE)
+            raise AssertionError(f"expected RangeNotSatisfiable: {header}")
+        except RangeNotSatisfiable:
+            pass
+
+
+def test_range_requests():
+    client, _ = make_client()
+    full = client.get("/media/clip.mp4")
+    assert full.status_code == 200 and full.content == DATA
+    assert full.headers["accept-ranges"] == "bytes" and full.headers["content-length"] == str(SIZE)
+
+    r = client.get("/media/clip.mp4", headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206 and r.content == DATA[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{SIZE}" and r.headers["content-length"] == "100"
+    r = client.get("/media/clip.mp4", headers={"Range": "bytes=-10"})
+    assert r.status_code == 206 and r.content == DATA[-10:]
+    r = client.get("/media/clip.mp4", headers={"Range": "bytes=0-1,5-9"})
+    assert r.status_code == 200 and r.content == DATA
+
+    r = client.get("/media/clip.mp4", headers={"Range": f"bytes={SIZE}-"})
+    assert r.status_code == 416 and r.headers["content-range"] == f"bytes */{SIZE}" and r.content == b""
+
+
+def test_if_range_and_if_none_match():
+    client, path = make_client()
+    head = client.head("/media/clip.mp4")
+    etag, last_modified = head.headers["etag"], head.headers["last-modified"]
+    stale_date = formatdate(path.stat().st_mtime - 3600, usegmt=True)
+
+    for if_range, status in ((etag, 206), ('"stale"', 200), (last_modified, 206), (stale_date, 200)):
+        r = client.get("/media/clip.mp4", headers={"Range": "bytes=10-19", "If-Range": if_range})
+        assert r.status_code == status, if_range
+        assert r.content == (DATA[10:20] if status == 206 else DATA)
+
+    for inm in (etag, f'"other", {etag}', "*"):
+        r = client.get("/media/clip.mp4", headers={"If-None-Match": inm})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag, inm
+    assert client.get("/media/clip.mp4", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_head_has_headers_without_body():
+    client, _ = make_client()
+    r = client.head("/media/clip.mp4")
+    assert r.status_code == 200 and r.content == b""
+    assert r.headers["content-length"] == str(SIZE) and r.headers["content-type"] == "video/mp4"
+    r = client.head("/media/clip.mp4", headers={"Range": "bytes=0-9"})
+    assert r.status_code == 206 and r.content == b"" and r.headers["content-range"] == f"bytes 0-9/{SIZE}"
+
+
+def test_etag_from_upload_digest_survives_restart():
+    client, path = make_client()
+    st = path.stat()
+    assert client.head("/media/clip.mp4").headers["etag"] == f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+    seed_etag(path, "0123abcd")
+    media_range._ETAG_CACHE.clear()  # 서버 재시작: .etag 파일에서 복원
+    assert client.head("/media/clip.mp4").headers["etag"] == '"0123abcd"'
+
+    # 파일이 바뀌면 기록한 해시는 쓰지 않음
+    path.write_bytes(DATA[:500])
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert client.head("/media/clip.mp4").headers["etag"] != '"0123abcd"'
+
+    forget_etag(path)
+    assert not etag_sidecar(path).exists()
@@ -0,0 +1,170 @@
+"""
+공유 모델 서버 테스트 (서버는 테스트 프로세스 안의 스레드, worker 는 클라이언트/자식 프로세스)
+- RemoteDetector 결과 = 로컬 FireDetector 결과, 동시 요청은 서버에서 한 배치로 묶임
+- 이벤트 버스: 다른 클라이언트에서 history + 실시간 이벤트 구독, 재분석(run) 이전 이벤트 무시
+- worker 메모리: 모델 서버 모드에서는 worker 수와 무관하게 worker 당 증가량이 모델 크기보다 훨씬 작음
+"""
+import asyncio
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from model_server import BusClient, BusQueue, ModelServer, RemoteDetector
+from testutil import FIRE_BGR, SMOKE_BGR, ColorBlobBackend, frame_with, make_detector
+
+MODEL_MB = 64
+
+
+class HeavyBackend(ColorBlobBackend):
+    """MODEL_MB 크기의 가중치를 메모리에 올리는 가짜 모델"""
+
+    def __init__(self):
+        super().__init__()
+        self.weights = np.ones(MODEL_MB << 20, dtype=np.uint8)  # 페이지를 실제로 채움
+
+
+def process_rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def start_server(d, backend=None, **cfg):
+    return ModelServer(make_detector(backend), str(Path(d) / "model.sock"), cfg).start()
+
+
+def test_remote_matches_local():
+    with tempfile.TemporaryDirectory() as d:
+        server = start_server(d)
+        remote = RemoteDetector(server.address, timeout=5)
+        try:
+            local = make_detector()
+            assert remote.names == local.names and remote.fire_ids == local.fire_ids
+            frames = [frame_with(((40 + 30 * i, 60, 140 + 30 * i, 160), FIRE_BGR), ((300, 200, 400, 300), SMOKE_BGR))
+                      for i in range(3)]
+            frames.append(frame_with(((10, 10, 90, 90), FIRE_BGR), size=(720, 1280)))  # 크기가 다른 프레임 → 공유 메모리 확장
+            for got, want in zip(remote.infer_many(frames), local.infer_many(frames)):
+                assert got["boxes"] == want["boxes"] and got["fire_score"] == want["fire_score"]
+                assert np.array_equal(got["dets"], want["dets"])
+            assert remote.infer(frames[0])["boxes"] == local.infer(frames[0])["boxes"]
+            assert remote.server_stats()["frames"] == 5
+        finally:
+            remote.close()
+            server.close()
+
+
+def test_concurrent_workers_share_one_batch():
+    with tempfile.TemporaryDirectory() as d:
+        backend = ColorBlobBackend()
+        server = start_server(d, backend, max_wait_ms=200)
+        workers = [RemoteDetector(server.address, timeout=5) for _ in range(2)]
+        try:
+            results = {}
+            barrier = threading.Barrier(4)
+
+            def call(i):
+                x = 20 + 60 * i
+                barrier.wait()
+                res = workers[i % 2].infer(frame_with(((x, 100, x + 50, 150), FIRE_BGR)))
+                results[i] = res["fire_boxes"][0]["x1"]
+
+            threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            # 각 요청은 자기 프레임의 결과를 받음
+            assert all(abs(results[i] - (20 + 60 * i)) <= 4 for i in range(4))
+            assert max(backend.calls) > 1 and sum(backend.calls) == 4
+            assert server.report()["max_batch_frames"] > 1
+        finally:
+            for w in workers:
+                w.close()
+            server.close()
+
+
+def test_event_bus_across_workers():
+    with tempfile.TemporaryDirectory() as d:
+        server = start_server(d)
+        owner, other = BusClient(server.address, timeout=5), BusClient(server.address, timeout=5)
+        try:
+            assert other.get_job("nope") is None
+
+            async def produce(run, n, end=True):
+                q = BusQueue("job1", owner, run)
+                for i in range(n):
+                    await q.put({"type": "tick", "t": i, "run": run})
+                if end:
+                    await q.put({"type": "end", "job_id": "job1"})
+                owner.flush()
+
+            run1 = owner.set_job("job1", {"kind": "upload", "worker": 1}, reset=True)
+            asyncio.run(produce(run1, 3, end=False))
+            assert other.get_job("job1")["kind"] == "upload"
+
+            # 늦게 붙은 구독자: history 3개 + 이후 실시간 이벤트
+            got, stop = [], threading.Event()
+            follower = threading.Thread(target=other.follow, args=("job1", got.append, stop))
+            follower.start()
+            asyncio.run(produce(run1, 2))
+            follower.join(timeout=5)
+            assert [e["type"] for e in got] == ["tick"] * 5 + ["end"]
+            assert [e["t"] for e in got[:5]] == [0, 1, 2, 0, 1]
+            assert other.get_job("job1")["done"] is True
+
+            # 재분석: 새 run 이후 이전 run 의 늦은 이벤트는 버려짐
+            run2 = owner.set_job("job1", {}, reset=True)
+            assert run2 == run1 + 1 and other.get_job("job1")["done"] is False
+            asyncio.run(produce(run1, 2, end=False))
+            asyncio.run(produce(run2, 1))
+            got = []
+            assert other.follow("job1", got.append, threading.Event())
+            assert [(e["type"], e.get("run")) for e in got] == [("tick", run2), ("end", None)]
+            assert not other.follow("unknown", got.append, threading.Event())
+        finally:
+            owner.close()
+            other.close()
+            server.close()
+
+
+def _worker_rss(mode, address, out):
+    """자식 프로세스(uvicorn worker 역할): 감지 엔진 준비 + 추론 후 RSS 증가량(MB)"""
+    before = process_rss()
+    if mode == "remote":
+        det = RemoteDetector(address, timeout=10)
+    else:
+        det = make_detector(HeavyBackend())
+    for i in range(3):
+        det.infer(frame_with(((50 + 10 * i, 50, 150, 150), FIRE_BGR)))
+    out.put((process_rss() - before) / (1 << 20))
+
+
+def run_workers(mode, n, address=None):
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker_rss, args=(mode, address, out)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    deltas = [out.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(timeout=10)
+    return deltas
+
+
+def test_worker_memory_flat_in_worker_count():
+    local = run_workers("local", 1)
+    assert local[0] >= MODEL_MB * 0.9  # worker 마다 모델 1벌
+    with tempfile.TemporaryDirectory() as d:
+        server = start_server(d, HeavyBackend())
+        try:
+            one = run_workers("remote", 1, server.address)
+            three = run_workers("remote", 3, server.address)
+        finally:
+            server.close()
+    print(f"   worker RSS 증가(MB): local {local[0]:.1f} / remote x1 {one[0]:.1f} / remote x3 {[round(v, 1) for v in three]}")
+    # 모델 서버 모드: worker 당 증가량은 모델 크기와 무관하게 작고, worker 3개 합도 로컬 1개보다 작음
+    assert max(one + three) < MODEL_MB / 4
+    assert sum(three) < local[0]
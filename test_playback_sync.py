@@ -0,0 +1,163 @@
+"""
+클라이언트 재생 시계 기준 analyze-ahead 테스트 (backend/playback_sync.py)
+- 재생 위치 외삽(배속/일시정지), 탐색 판정(앞서 분석한 구간 안/밖), 보고가 없거나 끊기면 바로 전달
+- 2배속 + 버퍼링 정지 + 탐색 시나리오: 분석은 ahead 창까지 앞서 가고 tick 은 재생 위치와 1 tick 이내로 전달
+"""
+import asyncio
+import time
+
+from playback_sync import PlaybackSync
+
+TICK = 0.2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_position_and_seek_detection():
+    clock = FakeClock()
+    sync = PlaybackSync({"ahead": 2.0, "jump": 1.0}, tick=TICK, now=clock)
+    assert not sync.active and sync.position() == 0.0
+
+    # 첫 보고: 마지막 분석 위치와 비교 (아직 분석 전이면 그대로)
+    assert sync.report(0.0, rate=2.0) is None
+    clock.now += 1.5
+    assert sync.position() == 3.0 and sync.until(4.0) == 0.5
+    assert sync.report(3.1, rate=2.0) is None  # 외삽과 거의 같음 → 탐색 아님
+
+    sync.report(3.1, rate=2.0, paused=True)
+    clock.now += 5
+    assert sync.position() == 3.1 and sync.until(4.0) is None
+
+    for i in range(16, 26):  # 3.2 ~ 5.0 앞서 분석
+        sync.push({"type": "tick", "t": round(i * TICK, 1)})
+
+    # 앞서 분석한 구간 안으로 탐색 → 분석은 그대로, 지나간 tick 만 버림
+    assert sync.report(4.5, paused=False) is None
+    assert sync.buffer[0]["t"] == 4.4 and sync.stats["dropped"] == 6
+
+    # 구간 밖으로 탐색 (앞/뒤) → 분석 위치 이동 요청, 버퍼 비움
+    assert sync.report(20.0) == 20.0 and not sync.buffer and sync.analyzed_t is None
+    sync.push({"type": "tick", "t": 20.0})
+    assert sync.report(2.0) == 2.0 and sync.stats["seeks"] == 2
+
+    # 보고가 끊기면 비활성
+    clock.now += sync.cfg["stale_after"] + 1
+    assert not sync.active
+
+
+def test_flushes_without_client_clock():
+    async def scenario():
+        sync = PlaybackSync(tick=TICK)
+        got = []
+
+        async def send(ev):
+            got.append(ev["t"])
+
+        deliver = asyncio.create_task(sync.run(send))
+        for i in range(5):
+            sync.push({"type": "tick", "t": 100 + i * TICK})  # 재생 위치 0 이어도 시계가 없으면 바로 전달
+            assert await sync.wait_room(100 + i * TICK)
+        await asyncio.sleep(0.01)
+        deliver.cancel()
+        return got
+
+    assert len(asyncio.run(scenario())) == 5
+
+
+class Player:
+    """브라우저 플레이어 흉내: 실제 시간으로 진행, 배속/정지/탐색"""
+
+    def __init__(self):
+        self.t, self.rate, self.paused, self.at = 0.0, 1.0, True, time.monotonic()
+
+    def position(self):
+        if self.paused:
+            return self.t
+        return self.t + self.rate * (time.monotonic() - self.at)
+
+    def set(self, t=None, rate=None, paused=None):
+        self.t = self.position() if t is None else t
+        self.at = time.monotonic()
+        if rate is not None:
+            self.rate = rate
+        if paused is not None:
+            self.paused = paused
+
+
+def test_drift_under_one_tick_with_2x_stall_and_seek():
+    async def scenario():
+        sync = PlaybackSync({"ahead": 1.0, "idle_wait": 0.05}, tick=TICK)
+        player = Player()
+        flags = {"seek": None, "done": False}
+        delivered = []  # (tick t, 전달 순간 실제 재생 위치)
+
+        def report():
+            seek_t = sync.report(player.position(), player.rate, player.paused)
+            if seek_t is not None:
+                flags["seek"] = seek_t
+
+        async def send(ev):
+            delivered.append((ev["t"], player.position()))
+
+        async def analyse():
+            """main.process_video_job 의 루프와 같은 순서: seek → 창 대기 → 추론 → push → 밀렸으면 건너뜀"""
+            idx, max_ahead = 0, 0.0
+            while not flags["done"]:
+                if flags["seek"] is not None:
+                    idx, flags["seek"] = round(flags["seek"] / TICK), None
+                    sync.clear()
+                t = round(idx * TICK, 3)
+                if not await sync.wait_room(t):
+                    continue
+                time.sleep(0.01)  # 추론 (이벤트 루프를 막음)
+                sync.push({"type": "tick", "t": t})
+                max_ahead = max(max_ahead, t - sync.position())
+                idx += 1 + max(0, int((sync.position() - t) / TICK))
+                await asyncio.sleep(0)
+            return max_ahead
+
+        async def play():
+            async def run_for(seconds):
+                end = time.monotonic() + seconds
+                while time.monotonic() < end:
+                    report()
+                    await asyncio.sleep(0.25)
+
+            player.set(t=0.0, rate=2.0, paused=False)   # 2배속 재생
+            await run_for(1.5)
+            player.set(paused=True)                     # 버퍼링 정지
+            await run_for(0.6)
+            player.set(paused=False)
+            await run_for(0.6)
+            player.set(t=15.0)                          # 앞서 분석한 구간 밖으로 탐색
+            await run_for(1.0)
+            flags["done"] = True
+
+        deliver = asyncio.create_task(sync.run(send))
+        producer = asyncio.create_task(analyse())
+        await play()
+        max_ahead = await producer
+        deliver.cancel()
+        return sync, delivered, max_ahead
+
+    sync, delivered, max_ahead = asyncio.run(scenario())
+    drifts = [pos - t for t, pos in delivered]
+    print(f"   전달 {len(delivered)}개, 지연 최대 {max(drifts) * 1000:.1f}ms / 평균 {sum(drifts) / len(drifts) * 1000:.1f}ms, "
+          f"앞선 분석 최대 {max_ahead:.2f}s, 창 대기 {sync.stats['ahead_wait_s']:.2f}s")
+
+    # 재생 위치보다 먼저 보낸 tick 이 없고, 모두 1 tick 이내 지연
+    assert min(drifts) >= -0.02 and max(drifts) < TICK, (min(drifts), max(drifts))
+    # 분석은 창 끝까지 앞서 갔다가 재생을 기다림 (대기/프레임 버리기 대신 look-ahead)
+    assert max_ahead > 0.8 and sync.stats["ahead_wait_s"] > 0
+    # 탐색 전: 0 ~ 4.x 초 빠짐없이, 탐색 후: 15초부터
+    before = [t for t, _ in delivered if t < 10]
+    after = [t for t, _ in delivered if t >= 10]
+    assert before == [round(i * TICK, 3) for i in range(len(before))] and before[-1] >= 4.0
+    assert after[0] == 15.0 and after[-1] >= 16.6
+    assert sync.stats["seeks"] == 1
@@ -0,0 +1,85 @@
+"""
+미리보기 자산 생성 테스트 (backend/proxy_media.py)
+- 짧은 합성 클립 (create_test_video.py 와 같은 방식, 초마다 밝기가 다름) → proxy.mp4 / sprite.jpg / sprite.json
+- sprite.json 의 타일 크기/열·행 수/개수가 실제 스프라이트 크기와 일치, 각 타일은 interval 시각의 프레임
+- 프록시 영상은 index 의 해상도/프레임레이트 그대로, 긴 영상은 max_tiles 에 맞춰 간격 확대
+"""
+import json
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from proxy_media import INDEX_NAME, build_preview_assets, read_index
+
+FPS = 10
+
+
+def level(sec):
+    """초마다 다른 밝기 - 타일이 어느 시각의 프레임인지 구분"""
+    return 20 + 25 * sec
+
+
+def write_clip(path, seconds, size=(320, 240)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, size)
+    for i in range(seconds * FPS):
+        frame = np.full((size[1], size[0], 3), level(i // FPS), dtype=np.uint8)
+        cv2.circle(frame, (size[0] // 2, size[1] // 2), 30, (0, 140, 255), -1)  # 가운데 불색 원
+        writer.write(frame)
+    writer.release()
+
+
+def test_build_preview_assets_on_synthetic_clip():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        src = d / "clip.mp4"
+        write_clip(src, 7)
+        out = d / "preview"
+        index = build_preview_assets(str(src), str(out), {"proxy_height": 120, "proxy_fps": 5, "tile_width": 80,
+                                                          "tile_interval": 2.0, "sprite_cols": 3})
+        for name in ("proxy.mp4", "sprite.jpg", INDEX_NAME):
+            assert (out / name).stat().st_size > 0
+        assert not (out / (INDEX_NAME + ".tmp")).exists()
+        assert read_index(out) == json.loads((out / INDEX_NAME).read_text(encoding="utf-8")) == index
+
+        # 7초 / 2초 간격 → 0, 2, 4, 6초 4장 → 3열 2행
+        assert (index["count"], index["cols"], index["rows"], index["interval"]) == (4, 3, 2, 2.0)
+        assert (index["tile_w"], index["tile_h"], index["src_w"], index["src_h"]) == (80, 60, 320, 240)
+        assert abs(index["duration"] - 6.9) < 1e-6
+
+        sprite = cv2.imread(str(out / "sprite.jpg"))
+        assert sprite.shape[:2] == (index["rows"] * index["tile_h"], index["cols"] * index["tile_w"])
+        for k in range(index["count"]):
+            r, c = divmod(k, index["cols"])
+            tile = sprite[r * index["tile_h"]:(r + 1) * index["tile_h"], c * index["tile_w"]:(c + 1) * index["tile_w"]]
+            corner = tile[:10, :10].mean()
+            assert abs(corner - level(k * 2)) < 8, (k, corner)          # k 번째 타일 = k*interval 초 프레임
+            assert tile[index["tile_h"] // 2, index["tile_w"] // 2, 2] > 200  # 가운데 원도 축소돼 들어감
+        assert sprite[index["tile_h"]:, index["tile_w"]:].max() < 30      # 채우지 않은 칸은 검은색
+
+        # 프록시: 120p, 10fps → 5fps (2프레임마다 1장)
+        cap = cv2.VideoCapture(str(out / index["proxy"]))
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        frames = 0
+        while cap.read()[0]:
+            frames += 1
+        cap.release()
+        assert size == (index["proxy_w"], index["proxy_h"]) == (160, 120)
+        assert index["proxy_fps"] == 5.0 and frames == 35
+
+
+def test_max_tiles_widens_interval():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        src = d / "clip.mp4"
+        write_clip(src, 9, size=(200, 100))
+        index = build_preview_assets(str(src), str(d / "preview"), {"tile_width": 40, "tile_interval": 1.0,
+                                                                    "max_tiles": 3, "sprite_cols": 20})
+        # 1초 간격이면 9장 → 한도 3장에 맞춰 3초 간격 (0, 3, 6초)
+        assert index["interval"] == 3.0 and index["count"] == 3
+        assert (index["cols"], index["rows"], index["tile_h"]) == (3, 1, 20)
+        sprite = cv2.imread(str(d / "preview" / "sprite.jpg"))
+        assert sprite.shape[:2] == (20, 120)
+        for k, sec in enumerate((0, 3, 6)):
+            assert abs(sprite[:5, k * 40:k * 40 + 5].mean() - level(sec)) < 8, (k, sec)
@@ -0,0 +1,92 @@
+"""
+INT8 모델 선택 / 보정 프레임 공급 / FP32↔INT8 비교 하네스 테스트
+- 실제 양자화(onnxruntime)는 하지 않고, conf 를 흔드는 합성 모델로 비교 지표를 검증
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from compare_models import compare_clip, first_reach, transitions
+from detectors.vision import int8_weights, select_weights
+from quantize import FrameCalibrationReader, sample_frames
+from testutil import RULES, ColorBlobBackend, make_detector, write_video
+
+
+class ScaledConf(ColorBlobBackend):
+    """양자화 오차 흉내: conf 에 배율을 곱함"""
+
+    def __init__(self, scale):
+        super().__init__()
+        self.scale = scale
+
+    def predict(self, batch, conf, iou, max_det):
+        out = super().predict(batch, conf, iou, max_det)
+        for d in out:
+            d[:, 4] *= self.scale
+        return out
+
+
+def test_select_weights():
+    with tempfile.TemporaryDirectory() as d:
+        fp32 = Path(d) / "best_nano_111.pt"
+        fp32.touch()
+        assert int8_weights(fp32) == Path(d) / "best_nano_111_int8.onnx"
+        assert select_weights(str(fp32), "fp32") == str(fp32)
+        assert select_weights(str(fp32), "int8") == str(fp32)  # 아직 없음 → FP32
+        int8_weights(fp32).touch()
+        assert select_weights(str(fp32), "int8") == str(int8_weights(fp32))
+        assert select_weights(str(int8_weights(fp32)), "int8") == str(int8_weights(fp32))
+        try:
+            select_weights(str(fp32), "fp16")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_calibration_reader_uses_letterbox():
+    with tempfile.TemporaryDirectory() as d:
+        clips = [Path(d) / "a.avi", Path(d) / "b.avi"]
+        write_video(clips[0], 40)
+        write_video(clips[1], 10)
+        frames = list(sample_frames(clips, 7))
+        assert len(frames) == 7  # 4 + 3
+        reader = FrameCalibrationReader("images", iter(frames), 320)
+        batches = []
+        while True:
+            item = reader.get_next()
+            if item is None:
+                break
+            batches.append(item["images"])
+        assert reader.count == 7
+        assert all(b.shape == (1, 3, 320, 320) and b.dtype == np.float32 for b in batches)
+        assert batches[0] is not batches[1] and not np.shares_memory(batches[0], batches[1])
+
+
+def test_timeline_helpers():
+    t = np.arange(6) * 0.2
+    states = ["NORMAL", "PRE_FIRE", "PRE_FIRE", "FIRE_GROWING", "CALL_119", "FIRE_GROWING"]
+    assert transitions(t, states) == [(0.0, "NORMAL"), (0.2, "PRE_FIRE"), (0.6, "FIRE_GROWING"),
+                                      (0.8, "CALL_119"), (1.0, "FIRE_GROWING")]
+    reach = first_reach(t, states)
+    assert reach == {"PRE_FIRE": 0.2, "SMOKE_DETECTED": 0.6, "FIRE_GROWING": 0.6, "CALL_119": 0.8}
+
+
+def test_compare_clip_detects_timeline_change():
+    with tempfile.TemporaryDirectory() as d:
+        clip = Path(d) / "fire.avi"
+        write_video(clip, 50)
+        ref = make_detector(ColorBlobBackend())
+
+        same = compare_clip(ref, make_detector(ScaledConf(0.98)), clip, RULES)
+        assert same["ticks"] == 10
+        assert abs(same["conf_delta"]["fire"]["bias"] + 0.9 * 0.02) < 1e-3
+        assert same["conf_delta"]["smoke"]["max_abs"] == 0.0
+        assert not same["timeline_changed"]
+        assert same["ms_per_frame"]["ref"] > 0 and same["ms_per_frame"]["cand"] > 0
+
+        # conf 가 크게 떨어지면 CALL_119 도달이 늦어지거나 사라짐
+        weak = compare_clip(ref, make_detector(ScaledConf(0.4)), clip, RULES)
+        assert weak["timeline_changed"]
+        assert weak["first_reach_shift"]["CALL_119"] == "missing" or weak["first_reach_shift"]["CALL_119"] > 0.2
+        assert weak["state_mismatch_ticks"] > 0
@@ -0,0 +1,121 @@
+"""
+결과 영상 렌더링 테스트 (backend/render_video.py)
+- interp_boxes: 같은 클래스끼리 IoU 매칭 후 선형 보간, 매칭 안 된 박스는 가까운 쪽 tick 것
+- tick_at: MAX_INTERP_GAP 안이면 보간, 넘거나 gap tick 이면 직전 tick 을 MAX_HOLD 까지만 유지 → 그 뒤 데이터 없음
+- render_annotated: 합성 영상 + tick 로그 → 프레임 수 그대로, 분석 구간은 상태 배너 / 건너뛴 구간은 NO DATA 배너
+"""
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from render_video import (MAX_HOLD, MAX_INTERP_GAP, NO_DATA_COLOR, STATE_COLORS, TickCursor, interp_boxes,
+                          render_annotated, tick_at)
+from tick_log import TickLog, iter_ticks, ticks_path
+
+
+def box(x1, y1, x2, y2, label="fire", conf=0.5):
+    return {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "conf": conf, "label": label}
+
+
+def tick(t, state="NORMAL", boxes=(), gap=False):
+    out = {"type": "tick", "t": t, "state": state, "scores": {"fire": 0.1, "smoke": 0.0, "hazard": 0.1},
+           "boxes": list(boxes)}
+    if gap:
+        out["gap"] = True
+    return out
+
+
+def test_interp_boxes_matches_by_iou_within_class():
+    a = [box(0, 0, 100, 100), box(300, 300, 400, 400, "smoke", 0.2)]
+    # 순서가 바뀌어도 IoU 로 짝을 찾고, 클래스가 다르면 겹쳐도 짝이 아님
+    b = [box(310, 300, 410, 400, "smoke", 0.4), box(20, 0, 120, 100, conf=0.7), box(0, 0, 100, 100, "smoke")]
+    out = interp_boxes(a, b, 0.5)
+    fire = [x for x in out if x["label"] == "fire"]
+    smoke = sorted((x for x in out if x["label"] == "smoke"), key=lambda x: x["x1"])
+    assert len(fire) == 1 and fire[0]["x1"] == 10 and fire[0]["x2"] == 110 and abs(fire[0]["conf"] - 0.6) < 1e-9
+    assert [(x["x1"], round(x["conf"], 3)) for x in smoke] == [(0, 0.5), (305, 0.3)]  # 뒤 tick 의 새 박스 포함
+
+    # 겹치지 않는 박스: 앞쪽 절반은 a 의 것, 뒤쪽 절반은 b 의 것
+    far = [box(500, 500, 550, 550)]
+    assert interp_boxes(a[:1], far, 0.3) == a[:1]
+    assert interp_boxes(a[:1], far, 0.7) == far
+    assert interp_boxes(a[:1], a[:1], 0.0) == a[:1] and interp_boxes([], [], 0.5) == []
+
+
+def test_tick_at_interpolates_holds_then_no_data():
+    a = tick(1.0, "PRE_FIRE", [box(0, 0, 100, 100)])
+    b = tick(1.4, "PRE_FIRE", [box(40, 0, 140, 100)])
+    got, boxes = tick_at(a, b, 1.2)
+    assert got is a and abs(boxes[0]["x1"] - 20) < 1e-9
+
+    # 다음 tick 이 MAX_INTERP_GAP 보다 멀면 보간 없이 MAX_HOLD 까지만 직전 tick
+    far = tick(1.0 + MAX_INTERP_GAP + 0.5, "NORMAL")
+    got, boxes = tick_at(a, far, 1.0 + MAX_HOLD * 0.5)
+    assert got is a and boxes == a["boxes"]
+    assert tick_at(a, far, 1.0 + MAX_HOLD + 0.1) == (None, [])
+
+    # 앞으로 seek 한 gap tick: 간격이 짧아도 보간하지 않고 같은 규칙
+    gap = tick(2.5, "CALL_119", [box(50, 0, 150, 100)], gap=True)
+    assert tick_at(a, gap, 1.5)[1] == a["boxes"] and tick_at(a, gap, 2.2) == (None, [])
+    # 첫 tick 전 / 마지막 tick 뒤
+    assert tick_at(None, a, 0.5) == (None, [])
+    assert tick_at(b, None, 1.4 + MAX_HOLD)[0] is b and tick_at(b, None, 1.5 + MAX_HOLD) == (None, [])
+
+
+def test_tick_cursor_is_forward_only():
+    cur = TickCursor(tick(t) for t in (0.0, 0.2, 0.4))
+    assert cur.at(-0.1) == (None, cur.next) and cur.next["t"] == 0.0
+    prev, nxt = cur.at(0.3)
+    assert prev["t"] == 0.2 and nxt["t"] == 0.4
+    prev, nxt = cur.at(5.0)
+    assert prev["t"] == 0.4 and nxt is None
+
+
+def write_clip(path, n, fps=10.0, size=(320, 240)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for i in range(n):
+        frame = np.full((size[1], size[0], 3), 60, dtype=np.uint8)
+        cv2.rectangle(frame, (100 + i, 120), (160 + i, 200), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def banner_color(frame):
+    """배너 오른쪽 끝(글자 없는 곳) 색"""
+    return frame[4:10, -20:-4].reshape(-1, 3).mean(axis=0)
+
+
+def test_render_annotated_marks_skipped_range():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        src = d / "clip.avi"
+        write_clip(src, 80)  # 8초
+        # 0~2초 분석 → 앞으로 seek → 6초부터 분석 (2~6초는 기록 없음)
+        with TickLog(ticks_path(d / "run")) as log:
+            for i in range(11):
+                log.append(tick(i * 0.2, "SMOKE_DETECTED", [box(100 + 2 * i, 120, 160 + 2 * i, 200)]))
+            log.cut()
+            for i in range(30, 40):
+                log.append(tick(i * 0.2, "CALL_119", [box(100 + 2 * i, 120, 160 + 2 * i, 200)]))
+
+        progress = []
+        out = render_annotated(src, iter_ticks(ticks_path(d / "run")), d / "annotated.mp4",
+                               progress=lambda done, total: progress.append(done))
+        assert out["frames"] == 80 and progress[-1] == 80
+
+        cap = cv2.VideoCapture(str(d / "annotated.mp4"))
+        frames = []
+        while True:
+            ok, f = cap.read()
+            if not ok:
+                break
+            frames.append(f)
+        cap.release()
+        assert len(frames) == 80
+        close = lambda frame, color: np.abs(banner_color(frame) - np.array(color)).max() < 40
+        assert close(frames[10], STATE_COLORS["SMOKE_DETECTED"])        # 1초: 분석 구간
+        assert close(frames[25], STATE_COLORS["SMOKE_DETECTED"])        # 2.5초: 마지막 tick 에서 MAX_HOLD 안
+        assert close(frames[45], NO_DATA_COLOR)                         # 4.5초: 건너뛴 구간
+        assert close(frames[65], STATE_COLORS["CALL_119"])              # 6.5초: seek 뒤 분석 구간
@@ -0,0 +1,184 @@
+"""
+원시 감지 로그 + 파라미터 격자 탐색(sweep_rules) 테스트
+- 합성 감지 로그를 기록/재생하고, 벡터화된 상태 판정이 HazardScorer 와 tick 단위로 같은지 확인
+- 캐스케이드 게이트가 건너뛴 tick 은 FLAG_GATED - 기본은 실시간처럼 0, --gated hold 는 직전 감지 값
+"""
+import json
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from detection_log import DetectionLog, read_detections
+from scoring import STATES, HazardScorer
+from sweep_rules import build_grid, hold_gated, simulate_levels, sweep
+
+BASE_RULES = {
+    "conf": 0.15,
+    "ema_alpha": 0.4,
+    "weights": {"s_smoke": 0.6, "s_fire": 0.8, "growth": 0.4},
+    "thresholds": {
+        "pre_fire": {"smoke": 0.10, "fire": 0.08},
+        "smoke_detected": {"smoke": 0.25},
+        "fire_growing": {"fire": 0.30, "hazard": 0.35},
+        "call_119": {"hazard": 0.45},
+    },
+}
+FIRE, SMOKE, PERSON = 0, 1, 2
+
+
+def write_clip(path, n_ticks=300, fps=5.0, onset=None, seed=0):
+    """onset(초) 이후 fire/smoke conf 가 점점 올라가는 합성 클립, 그 전에는 잡음 + 사람"""
+    rng = random.Random(seed)
+    header = {"job_id": path.stem, "source": path.name, "fire_class_ids": [FIRE],
+              "smoke_class_ids": [SMOKE], "rules": BASE_RULES}
+    log = DetectionLog(path, header)
+    for i in range(n_ticks):
+        t = i / fps
+        dets = [(PERSON, 0.9, 10, 10, 50, 120)]
+        if rng.random() < 0.05:
+            dets.append((SMOKE, rng.uniform(0.15, 0.4), 100, 100, 150, 150))  # 잡음
+        if onset is not None and t >= onset:
+            level = min(0.95, 0.2 + 0.05 * (t - onset))
+            dets.append((FIRE, level, 200, 200, 260, 280))
+            dets.append((SMOKE, level * 0.8, 180, 120, 300, 220))
+        log.append(t, dets)
+    log.close()
+
+
+def test_log_roundtrip():
+    with tempfile.TemporaryDirectory() as d:
+        p = Path(d) / "clip.dlog"
+        write_clip(p, n_ticks=50, onset=2.0)
+        rec = read_detections(p)
+        assert len(rec) == 50
+        assert rec.header["fire_class_ids"] == [FIRE]
+        assert abs(rec.t[-1] - 49 / 5.0) < 1e-9
+        fire = rec.class_max([FIRE])
+        assert fire[0] == 0.0 and fire[-1] > 0.2
+        # 기록 중 중단된 마지막 tick 은 무시
+        with open(p, "ab") as f:
+            f.write(b"\x00\x01\x02")
+        assert len(read_detections(p)) == 50
+
+
+def test_vectorized_matches_scorer():
+    with tempfile.TemporaryDirectory() as d:
+        p = Path(d) / "clip.dlog"
+        write_clip(p, onset=20.0, seed=1)
+        rec = read_detections(p)
+        spec = {
+            "conf": [0.15, 0.3],
+            "ema_alpha": [0.2, 0.4, 0.7],
+            "weights.growth": [0.0, 0.4],
+            "thresholds.call_119.hazard": [0.45, 0.85],
+        }
+        grid = build_grid(BASE_RULES, spec)
+        levels = simulate_levels(rec, grid, [FIRE], [SMOKE])
+        assert levels.shape == (24, len(rec))
+
+        for i in range(len(grid["conf"])):
+            rules = json.loads(json.dumps(BASE_RULES))
+            rules["ema_alpha"] = float(grid["ema_alpha"][i])
+            rules["weights"]["growth"] = float(grid["weights.growth"][i])
+            rules["thresholds"]["call_119"]["hazard"] = float(grid["thresholds.call_119.hazard"][i])
+            conf = float(grid["conf"][i])
+            scorer = HazardScorer(rules)
+            fire, smoke = rec.class_max([FIRE], conf), rec.class_max([SMOKE], conf)
+            expected = [STATES.index(scorer.update(float(f), float(s))) for f, s in zip(fire, smoke)]
+            assert levels[i].tolist() == expected, i
+
+
+def test_seek_gap_resets_ema_like_live_scorer():
+    """앞으로 seek 해서 건너뛴 구간 뒤 첫 tick 은 FLAG_GAP - 재생도 분석 때처럼 EMA 를 초기 상태에서 다시 시작"""
+    with tempfile.TemporaryDirectory() as d:
+        p = Path(d) / "seek.dlog"
+        log = DetectionLog(p, {"fire_class_ids": [FIRE], "smoke_class_ids": [SMOKE], "rules": BASE_RULES})
+        fire = lambda c: [(FIRE, c, 200, 200, 260, 280)]
+        for i in range(20):
+            log.append(i * 0.2, fire(0.9))
+        log.cut()  # 60초로 seek (워밍업 tick 부터 기록)
+        for i in range(20):
+            log.append(60 + i * 0.2, fire(0.2))
+        log.cut()  # 뒤로 seek: 이미 기록한 구간을 다시 지나 기록 끝에서 이어짐 → gap 아님
+        for i in range(25):
+            log.append(62 + i * 0.2, fire(0.2))
+        log.close()
+
+        rec = read_detections(p)
+        assert len(rec) == 55 and np.flatnonzero(rec.gaps).tolist() == [20]
+        levels = simulate_levels(rec, build_grid(BASE_RULES, {}), [FIRE], [SMOKE])[0]
+        scorer = HazardScorer(BASE_RULES)
+        expected = []
+        for i, c in enumerate(rec.class_max([FIRE])):
+            if rec.gaps[i]:
+                scorer.reset()
+            expected.append(STATES.index(scorer.update(float(c), 0.0)))
+        assert levels.tolist() == expected and levels[20] < levels[19]
+
+
+def test_gated_ticks_are_marked_not_empty():
+    """게이트가 건너뛴 tick 은 박스 없음과 구분 - 기본 재생은 실시간 점수(0 으로 갱신)와 같음"""
+    with tempfile.TemporaryDirectory() as d:
+        p = Path(d) / "gated.dlog"
+        log = DetectionLog(p, {"fire_class_ids": [FIRE], "smoke_class_ids": [SMOKE], "rules": BASE_RULES,
+                               "filtered": True})
+        fire = [(FIRE, 0.9, 200, 200, 260, 280)]
+        for i in range(30):
+            ran = i % 3 == 0 or i < 5  # 불이 보이는 동안 3 tick 중 2 tick 은 게이트가 건너뜀
+            log.append(i * 0.2, fire if ran else [], gated=not ran)
+        log.cut()
+        log.append(60.0, [], gated=True)  # seek 직후 tick 이 게이트에 걸리면 gap + gated
+        log.append(60.2, fire)
+        log.close()
+
+        rec = read_detections(p)
+        assert np.flatnonzero(rec.gaps).tolist() == [30]
+        assert rec.gated.sum() == 18 and rec.gated[30] and not rec.gated[:5].any()
+        assert (rec.class_max([FIRE])[rec.gated] == 0).all()
+
+        grid = build_grid(BASE_RULES, {})
+        zero = simulate_levels(rec, grid, [FIRE], [SMOKE])[0]
+        scorer = HazardScorer(BASE_RULES)
+        live = []
+        for i, c in enumerate(rec.class_max([FIRE])):
+            if rec.gaps[i]:
+                scorer.reset()
+            live.append(STATES.index(scorer.update(float(c), 0.0)))
+        assert zero.tolist() == live
+
+        # hold: 건너뛴 tick 은 직전 감지 값 → 계속 불 (gap 너머로는 유지하지 않음)
+        held = simulate_levels(rec, grid, [FIRE], [SMOKE], gated="hold")[0]
+        assert (held[5:30] >= zero[5:30]).all() and held[29] > zero[29]
+        raw = rec.class_max([FIRE])[None, :]
+        filled = hold_gated(raw, rec.gated & ~rec.gaps, rec.gaps)[0]
+        assert (filled[:30] == 0.9).all() and filled[30] == 0.0 and filled[31] == 0.9
+
+        labels = {str(p): 1.0}
+        out = sweep([p], {}, labels)
+        assert out["clips"][0]["gated"] == 18
+
+
+def test_sweep_metrics():
+    with tempfile.TemporaryDirectory() as d:
+        d = Path(d)
+        write_clip(d / "fire.dlog", n_ticks=600, onset=60.0, seed=2)
+        write_clip(d / "quiet.dlog", n_ticks=600, onset=None, seed=3)
+        labels = {"fire.dlog": 60.0, "quiet.dlog": None}
+        spec = {
+            "ema_alpha": [0.2, 0.3, 0.4, 0.5, 0.6],
+            "weights.s_smoke": [0.4, 0.6, 0.8],
+            "weights.growth": [0.0, 0.2, 0.4],
+            "thresholds.smoke_detected.smoke": [0.25, 0.5],
+            "thresholds.call_119.hazard": [0.2, 0.45, 0.6, 0.85],
+        }
+        result = sweep([d / "fire.dlog", d / "quiet.dlog"], spec, labels)
+        assert len(result["order"]) == 5 * 3 * 3 * 2 * 4  # 평가 시간은 bench_rule_sweep.py
+
+        best = result["order"][0]
+        assert result["missed"][best] == 0 and result["false_alerts"][best] == 0
+        assert 0 <= result["tta_mean"][best] < 20
+        # 매우 낮은 call_119 임계치는 잡음에도 울림 → 오경보
+        low = np.where(result["grid"]["thresholds.call_119.hazard"] == 0.2)[0]
+        assert result["false_alerts"][low].max() > 0
@@ -0,0 +1,56 @@
+"""
+추론 스케줄러(InferenceScheduler) 테스트
+- 용량이 모자랄 때 위험 상태 job 이 먼저 채워지고 NORMAL job 만 줄어드는지 확인
+"""
+
+from scheduler import InferenceScheduler
+
+
+def make(capacity, **cfg):
+    return InferenceScheduler(dict({"capacity_ips": capacity, "min_ips": 0.5, "max_queue": 2}, **cfg))
+
+
+def test_enough_capacity_gives_everyone_max():
+    s = make(20)
+    a, b = s.register("a", 5), s.register("b", 5)
+    assert a.status == b.status == "running"
+    assert a.budget_ips == b.budget_ips == 5
+
+
+def test_hazard_job_preempts_normal_jobs():
+    """CALL_119 job 은 max 까지, 남은 용량만 NORMAL job 끼리 나눔 (최소 0.5 보장)"""
+    s = make(6)
+    slots = [s.register(j, 5) for j in "abc"]
+    s.update_state("a", "CALL_119", 0.9)
+    assert slots[0].budget_ips == 5
+    assert abs(slots[1].budget_ips - 0.5) < 1e-6
+    assert abs(slots[2].budget_ips - 0.5) < 1e-6
+    assert abs(sum(x.budget_ips for x in slots) - 6) < 1e-6
+
+    # 화재 해소 → 다시 균등 배분
+    s.update_state("a", "NORMAL", 0.0)
+    assert all(abs(x.budget_ips - 2) < 1e-6 for x in slots)
+    assert any(d["action"] == "rebalance" for d in s.decisions)
+
+
+def test_queue_and_reject_when_full():
+    s = make(1)          # min_ips 0.5 → 동시 실행 2개
+    running = [s.register(j, 5) for j in "ab"]
+    queued = s.register("c", 5)
+    assert queued.status == "queued" and s.queue_position("c") == 1
+    assert s.can_accept()
+    s.register("d", 5)
+    assert not s.can_accept()   # 실행/대기열 모두 가득
+
+    s.unregister(running[0])    # 자리가 나면 대기열 순서대로 입장
+    assert queued.status == "running" and queued.admitted.is_set()
+    assert s.queue_position("d") == 1
+
+
+def test_restart_replaces_slot():
+    """같은 job 재등록 시 이전 slot 의 unregister 는 무시"""
+    s = make(10)
+    old = s.register("a", 5)
+    new = s.register("a", 5)
+    s.unregister(old)
+    assert s.slots["a"] is new and new.status == "running"
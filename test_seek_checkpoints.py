@@ -0,0 +1,63 @@
+"""
+seek 용 점수 체크포인트 테스트
+- 체크포인트 복원 후 이어서 계산한 상태가 처음부터 계산한 것과 같은지
+- 체크포인트 없이 초기 상태 + 워밍업만 돌려도 EMA 가 허용 오차 안으로 수렴하는지
+"""
+import random
+
+from scoring import CheckpointIndex, HazardScorer
+from testutil import RULES
+
+FPS = 5.0
+
+
+def synthetic_scores(n, seed=0):
+    rng = random.Random(seed)
+    return [(rng.random() * (0.9 if i > n // 2 else 0.3), rng.random() * 0.6) for i in range(n)]
+
+
+def test_restore_continues_exactly():
+    scores = synthetic_scores(400)
+    full = HazardScorer(RULES)
+    index = CheckpointIndex(interval=2.0)
+    states = []
+    for i, (f, s) in enumerate(scores):
+        states.append(full.update(f, s))
+        index.maybe_add(i / FPS, i, full)
+
+    seek_t = 57.3
+    cp = index.nearest_before(seek_t)
+    assert cp is not None and seek_t - 2.0 <= cp["t"] <= seek_t
+
+    resumed = HazardScorer(RULES)
+    resumed.restore(cp["scorer"])
+    for i in range(cp["frame_idx"] + 1, len(scores)):
+        assert resumed.update(*scores[i]) == states[i]
+
+
+def test_warmup_from_reset_converges():
+    scores = synthetic_scores(400, seed=1)
+    full = HazardScorer(RULES)
+    for f, s in scores[:300]:
+        full.update(f, s)
+
+    cold = HazardScorer(RULES)
+    n = cold.warmup_ticks(eps=0.02)
+    assert n / FPS < 3.0  # 기본 alpha 에서 워밍업은 몇 초 이내
+    for f, s in scores[300 - n:300]:
+        cold.update(f, s)
+    assert abs(cold.F_ema - full.F_ema) < 0.02
+    assert abs(cold.S_ema - full.S_ema) < 0.02
+
+
+def test_index_spacing_with_out_of_order_inserts():
+    scorer = HazardScorer(RULES)
+    index = CheckpointIndex(interval=2.0)
+    assert index.nearest_before(10.0) is None
+    assert index.maybe_add(40.0, 200, scorer)
+    assert not index.maybe_add(41.0, 205, scorer)
+    assert index.maybe_add(10.0, 50, scorer)      # 뒤로 seek 후 앞 구간 분석
+    assert not index.maybe_add(39.0, 195, scorer)
+    assert index.nearest_before(39.9)["t"] == 10.0
+    assert index.nearest_before(40.0)["t"] == 40.0
+    assert len(index) == 2
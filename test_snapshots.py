@@ -0,0 +1,84 @@
+"""
+감지 이벤트 스냅샷 저장소 테스트 (backend/snapshots.py)
+- 용량 한도를 넘으면 가장 오래 쓰이지 않은 스냅샷부터 삭제 (조회하면 LRU 순서 갱신, 방금 쓴 것은 유지)
+- latest(): 영상 시각이 아니라 기록 순서 기준 - 뒤로 seek 한 뒤 찍은 스냅샷이 최신
+- 재시작 시 디스크의 파일로 인덱스/용량 복원
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from snapshots import SnapshotStore, snapshot_name
+
+FRAME = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def shot(store, job_id, t, state="CALL_119", reason="transition"):
+    store.submit(job_id, FRAME.copy(), {"t": t, "state": state, "boxes": []}, reason, overlay=False)
+
+
+def drain(store):
+    """작업자 1개 - 뒤에 넣은 빈 작업이 끝나면 앞의 저장도 모두 끝남"""
+    store._executor.submit(lambda: None).result()
+
+
+def names(store, job_id):
+    return [e["name"] for e in store.list(job_id)]
+
+
+def test_lru_quota_eviction():
+    with tempfile.TemporaryDirectory() as d:
+        probe = SnapshotStore(Path(d) / "probe", quota_bytes=1 << 30, max_workers=1)
+        shot(probe, "x", 0.0)
+        drain(probe)
+        size = probe.usage()["bytes"]  # 같은 프레임 → 스냅샷마다 같은 크기
+
+        store = SnapshotStore(Path(d) / "snap", quota_bytes=int(size * 2.5), max_workers=1)
+        shot(store, "a", 1.0)
+        shot(store, "a", 2.0)
+        shot(store, "b", 3.0)
+        drain(store)
+        assert store.usage() == {"bytes": 2 * size, "quota_bytes": int(size * 2.5), "files": 2}
+        assert names(store, "a") == [snapshot_name(2.0, "CALL_119", "transition")]  # 가장 오래된 a@1 삭제
+        assert not (Path(d) / "snap" / "a" / snapshot_name(1.0, "CALL_119", "transition")).exists()
+
+        # 조회한 스냅샷은 최근 사용으로 → 다음 삭제 대상은 b@3
+        assert store.path_for("a", snapshot_name(2.0, "CALL_119", "transition")) is not None
+        shot(store, "c", 4.0)
+        drain(store)
+        assert names(store, "a") and not names(store, "b") and names(store, "c")
+        assert store.path_for("b", snapshot_name(3.0, "CALL_119", "transition")) is None
+
+        # 한도보다 큰 스냅샷 1장은 방금 쓴 것이라 남김 (나머지는 모두 삭제)
+        small = SnapshotStore(Path(d) / "small", quota_bytes=size // 2, max_workers=1)
+        shot(small, "a", 1.0)
+        shot(small, "a", 2.0)
+        drain(small)
+        assert names(small, "a") == [snapshot_name(2.0, "CALL_119", "transition")]
+
+        # 재시작: 디스크의 파일로 인덱스/용량 복원
+        again = SnapshotStore(Path(d) / "snap", quota_bytes=int(size * 2.5))
+        assert again.usage() == store.usage() and names(again, "c") == names(store, "c")
+
+
+def test_latest_is_last_written_after_backward_seek():
+    with tempfile.TemporaryDirectory() as d:
+        store = SnapshotStore(Path(d), quota_bytes=1 << 30, max_workers=1)
+        assert store.latest("job") is None
+        shot(store, "job", 10.0, "FIRE_GROWING")
+        shot(store, "job", 20.0, "CALL_119", "hold")
+        drain(store)
+        assert store.latest("job").name == snapshot_name(20.0, "CALL_119", "hold")
+
+        # 뒤로 seek 해서 5초에서 다시 CALL_119 → 메일 첨부는 방금 찍은 5초 스냅샷
+        shot(store, "job", 5.0, "CALL_119")
+        drain(store)
+        assert store.latest("job").name == snapshot_name(5.0, "CALL_119", "transition")
+        assert [e["t"] for e in store.list("job")] == [5.0, 10.0, 20.0]  # 목록은 영상 시각 순
+
+        # 같은 이름을 다시 쓰면 (같은 시각/상태) 그것이 최신
+        shot(store, "job", 10.0, "FIRE_GROWING")
+        drain(store)
+        assert store.latest("job").name == snapshot_name(10.0, "FIRE_GROWING", "transition")
+        assert store.usage()["files"] == 3
@@ -0,0 +1,131 @@
+"""
+실시간 스트림 캡처(LatestFrameReader) 테스트
+- 실제 카메라 대신 일정 FPS 로 프레임을 만드는 합성 캡처 사용
+"""
+import threading
+import time
+
+from stream_source import LatestFrameReader
+
+
+class SyntheticCapture:
+    """cv2.VideoCapture 대용: fps 속도로 (번호, 생성시각) 프레임 생성, fail_after 장 이후 끊김"""
+
+    def __init__(self, fps=100.0, fail_after=None):
+        self.interval = 1.0 / fps
+        self.fail_after = fail_after
+        self.count = 0
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.fail_after is not None and self.count >= self.fail_after:
+            return False, None
+        time.sleep(self.interval)
+        self.count += 1
+        return True, (self.count, time.monotonic())
+
+    def get(self, prop):
+        return 0
+
+    def release(self):
+        self.opened = False
+
+
+class FlakyOpener:
+    """처음 n_fail 번은 열기 실패, 이후 합성 캡처 반환"""
+
+    def __init__(self, n_fail=0, **capture_kwargs):
+        self.n_fail = n_fail
+        self.calls = 0
+        self.capture_kwargs = capture_kwargs
+
+    def __call__(self, url):
+        self.calls += 1
+        if self.calls <= self.n_fail:
+            raise RuntimeError("connection refused")
+        return SyntheticCapture(**self.capture_kwargs)
+
+
+class SteppedCapture(SyntheticCapture):
+    """테스트가 release(n) 한 만큼만 프레임을 내보내는 캡처 (시간에 의존하지 않음)"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Semaphore(0)
+
+    def read(self):
+        while not self.gate.acquire(timeout=0.05):
+            if not self.opened:
+                return False, None
+        self.count += 1
+        return True, (self.count, time.monotonic())
+
+
+def wait_until(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert cond()
+
+
+def test_latest_frame_wins():
+    """추론이 캡처보다 느리면 오래된 프레임은 버리고 항상 최신 프레임을 받음 (번호/dropped 수로 확인)"""
+    cap = SteppedCapture()
+    reader = LatestFrameReader("synthetic://", opener=lambda url: cap).start()
+    try:
+        seqs, total = [], 0
+        for burst in (5, 3, 1, 4):  # 추론 한 번 하는 동안 캡처된 프레임 수
+            for _ in range(burst):
+                cap.gate.release()
+            total += burst
+            wait_until(lambda: reader.stats["frames_read"] == total)
+            seq, (count, _), _ = reader.wait_next(timeout=1.0)
+            assert seq == count == total  # 그동안 쌓인 것 중 가장 최근 프레임
+            seqs.append(seq)
+            assert reader.wait_next(timeout=0.01) is None  # 같은 프레임을 두 번 주지 않음
+        assert seqs == [5, 8, 9, 13]
+        assert reader.stats["frames_dropped"] == 4 + 2 + 0 + 3  # 추론 못 한 프레임 = 캡처 - 받은 프레임
+    finally:
+        cap.release()  # 대기 중인 read() 종료
+        reader.stop()
+
+
+def test_reconnect_with_backoff():
+    """열기 실패 시 백오프 후 재시도해서 결국 연결"""
+    opener = FlakyOpener(n_fail=2, fps=100.0)
+    reader = LatestFrameReader("synthetic://", opener=opener, backoff_initial=0.01, backoff_max=0.05).start()
+    try:
+        item = reader.wait_next(timeout=2.0)
+        assert item is not None
+        assert reader.stats["open_failures"] == 2
+        assert reader.stats["reconnects"] >= 2
+        assert reader.stats["connected"]
+    finally:
+        reader.stop()
+
+
+def test_resume_after_disconnect():
+    """스트림이 중간에 끊겨도 재연결 후 계속 프레임 수신"""
+    opener = FlakyOpener(fps=200.0, fail_after=10)
+    reader = LatestFrameReader("synthetic://", opener=opener, backoff_initial=0.01).start()
+    try:
+        deadline = time.monotonic() + 2.0
+        while reader.stats["frames_read"] <= 25 and time.monotonic() < deadline:
+            reader.wait_next(timeout=0.5)
+        assert reader.stats["frames_read"] > 25
+        assert opener.calls >= 3
+    finally:
+        reader.stop()
+
+
+def test_stop_unblocks_waiters():
+    """stop() 후에는 wait_next 가 바로 None 반환"""
+    reader = LatestFrameReader("synthetic://", opener=FlakyOpener(fps=50.0)).start()
+    reader.wait_next(timeout=1.0)
+    reader.stop()
+    t0 = time.monotonic()
+    assert reader.wait_next(timeout=1.0) is None
+    assert time.monotonic() - t0 < 0.5
@@ -0,0 +1,135 @@
+"""
+관제용 전체 job 요약 스트림 테스트 (backend/summary_hub.py, GET /events/all)
+- tick 이 많아도 refresh 간격으로 모아 보내고, 상태 변화는 바로 보냄
+- 프레임은 한 번만 인코딩해 모든 시청자가 같은 bytes 를 받음 (시청자 수와 무관한 비용)
+- 느린 시청자는 스냅샷으로 재동기화, 끝난 job 은 done_ttl 후 removed, 이벤트 큐 tap
+"""
+import asyncio
+import json
+import time
+
+from summary_hub import SummaryHub, TappedQueue
+
+
+def tick(state="NORMAL", hazard=0.1, t=0.0, **extra):
+    return {"type": "tick", "state": state, "scores": {"fire": 0.1, "smoke": 0.0, "hazard": hazard},
+            "t": t, "wall_ts": time.time(), "boxes": [{"x1": 1}] * 5, **extra}
+
+
+def decode(frame):
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    return json.loads(frame[6:])
+
+
+def drain(q):
+    out = []
+    while not q.empty():
+        out.append(q.get_nowait())
+    return out
+
+
+def test_coalesced_refresh_and_immediate_state_change():
+    async def scenario():
+        hub = SummaryHub({"refresh": 0.2}, describe=lambda j: {"kind": "stream", "name": f"cam-{j}"})
+        for j in range(50):
+            hub.observe(f"cam{j:02d}", tick())
+        q = hub.subscribe()
+        snapshot = decode(q.get_nowait())
+        assert snapshot["type"] == "snapshot" and len(snapshot["jobs"]) == 50
+
+        # 50대 × 10Hz tick 을 1초 동안 - 상태 변화 없음
+        started = time.monotonic()
+        while time.monotonic() - started < 1.0:
+            for j in range(50):
+                hub.observe(f"cam{j:02d}", tick(hazard=0.1, t=time.monotonic() - started))
+            await asyncio.sleep(0.1)
+        frames = [decode(f) for f in drain(q)]
+        assert 3 <= len(frames) <= 7, len(frames)  # tick 500개 → refresh 간격 프레임 몇 개
+        assert all(f["type"] == "summary" and len(f["jobs"]) == 50 for f in frames)
+        job = frames[-1]["jobs"][0]
+        assert set(job) == {"job_id", "kind", "name", "status", "state", "hazard", "since", "t", "updated"}
+        assert job["status"] == "running" and job["name"] == "cam-cam00"
+
+        # 상태 변화 → refresh 를 기다리지 않고 바로
+        await asyncio.sleep(0.05)
+        drain(q)
+        changed_at = time.monotonic()
+        hub.observe("cam07", tick(state="SMOKE_DETECTED", hazard=0.3))
+        frame = decode(await asyncio.wait_for(q.get(), 1.0))
+        latency = time.monotonic() - changed_at
+        assert latency < 0.05, latency
+        assert [j["job_id"] for j in frame["jobs"]] == ["cam07"]
+        assert frame["jobs"][0]["state"] == "SMOKE_DETECTED" and frame["jobs"][0]["since"] > snapshot["ts"]
+        assert hub.stats["urgent_frames"] >= 1
+        hub.unsubscribe(q)
+        await asyncio.sleep(0.25)
+        assert hub._task is None  # 시청자가 없으면 flush 루프 종료
+        return hub.stats["events"]
+
+    assert asyncio.run(scenario()) > 500
+
+
+def test_frames_encoded_once_for_all_viewers():
+    async def scenario(viewers):
+        hub = SummaryHub({"refresh": 10.0, "viewer_buffer": 64})
+        queues = [hub.subscribe() for _ in range(viewers)]
+        for q in queues:
+            drain(q)
+        for i in range(20):
+            for j in range(30):
+                hub.observe(f"job{j}", tick(hazard=i / 100))
+            hub.flush()
+        received = [drain(q) for q in queues]
+        for q in queues:
+            hub.unsubscribe(q)
+        await asyncio.sleep(0)
+        return hub.stats, received
+
+    one, got_one = asyncio.run(scenario(1))
+    many, got_many = asyncio.run(scenario(25))
+    assert one["frames"] == many["frames"] == 20
+    assert abs(one["encoded_bytes"] - many["encoded_bytes"]) < one["encoded_bytes"] * 0.01  # 시각 숫자 길이 차이만
+    # 모든 시청자가 같은 bytes 객체를 받음 (시청자별 직렬화 없음)
+    assert all(a is b for a, b in zip(got_many[0], got_many[24])) and len(got_many[24]) == 20
+
+
+def test_slow_viewer_resync_and_expiry():
+    async def scenario():
+        hub = SummaryHub({"viewer_buffer": 3, "done_ttl": 0.05})
+        slow, fast = hub.subscribe(), hub.subscribe()
+        for i in range(10):
+            hub.observe("a", tick(hazard=i / 10))
+            hub.flush()
+            drain(fast)
+        frames = [decode(f) for f in drain(slow)]
+        # 밀린 프레임 대신 스냅샷부터 다시, 마지막에는 최신 상태
+        assert frames[0]["type"] == "snapshot" and len(frames) <= 3 and frames[-1]["jobs"][0]["hazard"] == 0.9
+        assert hub.stats["resyncs"] >= 1
+
+        hub.observe("a", {"type": "end", "job_id": "a"})
+        hub.flush()
+        assert decode(drain(fast)[-1])["jobs"][0]["status"] == "done"
+        await asyncio.sleep(0.06)
+        hub.flush()
+        frame = decode(drain(fast)[-1])
+        assert frame["removed"] == ["a"] and frame["jobs"] == [] and "a" not in hub.jobs
+        hub.unsubscribe(slow)
+        hub.unsubscribe(fast)
+
+    asyncio.run(scenario())
+
+
+def test_tapped_queue_reports_only_enqueued_events():
+    async def scenario():
+        seen = []
+        q = TappedQueue("job1", lambda job_id, ev: seen.append((job_id, ev["t"])), maxsize=2)
+        await q.put({"type": "tick", "t": 0})
+        q.put_nowait({"type": "tick", "t": 1})
+        try:
+            q.put_nowait({"type": "tick", "t": 2})
+            raise AssertionError("expected QueueFull")
+        except asyncio.QueueFull:
+            pass
+        return seen
+
+    assert asyncio.run(scenario()) == [("job1", 0), ("job1", 1)]
@@ -0,0 +1,183 @@
+"""
+감지 엔진(FireDetector) 테스트 - YOLO 대신 색 영역을 찾는 합성 모델 사용
+- letterbox 좌표 복원, 배치 추론 = 단건 추론, ROI/사람 억제/HSV 필터
+- process_video 의 backpressure(디코더가 앞서가지 않음)와 중간 종료 정리
+"""
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detectors.vision import Letterbox
+from testutil import FIRE_BGR, PERSON_BGR, SMOKE_BGR, ColorBlobBackend, frame_with, make_detector, write_video
+
+
+def test_letterbox_reuses_buffers():
+    lb = Letterbox(320, 2)
+    frame = frame_with(((100, 100, 200, 200), FIRE_BGR))
+    addr = lambda a: a.__array_interface__["data"][0]
+    before = [addr(lb.batch), addr(lb.canvas)] + [addr(p) for p in lb.planes]
+    lb.load(0, frame)
+    lb.load(1, frame)
+    assert [addr(lb.batch), addr(lb.canvas)] + [addr(p) for p in lb.planes] == before
+    assert np.allclose(lb.batch[0], lb.batch[1])
+    # 패딩 영역은 114 회색, 값 범위 0~1
+    assert abs(lb.batch[0, 0, 0, 0] - 114 / 255) < 1e-6
+    assert 0.0 <= lb.batch.min() and lb.batch.max() <= 1.0
+
+    # 단순 구현(resize → copyMakeBorder → RGB → CHW → /255)과 같은 결과
+    r, nw, nh, left, top = lb.geometry(*frame.shape[:2])
+    padded = cv2.copyMakeBorder(cv2.resize(frame, (nw, nh)), top, 320 - nh - top, left, 320 - nw - left,
+                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    expected = cv2.cvtColor(padded, cv2.COLOR_BGR2RGB).transpose(2, 0, 1).astype(np.float32) / 255
+    assert np.allclose(lb.batch[0], expected, atol=1e-6)
+
+    # 크기가 다른 프레임이 오면 패딩을 다시 칠함 (이전 프레임 잔상 없음)
+    tall = frame_with(((10, 10, 50, 50), FIRE_BGR), size=(640, 200))
+    lb.load(0, tall)
+    r, nw, nh, left, top = lb.geometry(640, 200)
+    assert np.allclose(lb.batch[0, :, :, :left], 114 / 255)
+
+
+def test_boxes_mapped_back_to_frame_coordinates():
+    det = make_detector()
+    for size in ((480, 640), (720, 1280), (600, 300)):
+        h, w = size
+        rect = (w // 4, h // 3, w // 2, h // 2)
+        res = det.infer(frame_with((rect, FIRE_BGR), size=size))
+        assert res["img_w"] == w and res["img_h"] == h
+        (box,) = res["fire_boxes"]
+        scale = max(h, w) / 320
+        for got, want in zip((box["x1"], box["y1"], box["x2"], box["y2"]), rect):
+            assert abs(got - want) <= 2 * scale, (size, box, rect)
+        assert res["fire_score"] > 0.8 and res["smoke_score"] == 0.0
+        assert box["label"] == "fire" and box["class_name"] == "fire"
+
+
+def test_infer_many_matches_infer_and_batches():
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    frames = [
+        frame_with(((50 + 20 * i, 60, 150 + 20 * i, 160), FIRE_BGR), ((300, 200, 400, 300), SMOKE_BGR))
+        for i in range(6)
+    ]
+    many = det.infer_many(frames)
+    assert backend.calls == [4, 2]  # max_batch 4 → 2 번의 forward
+    singles = [det.infer(f) for f in frames]
+    for a, b in zip(many, singles):
+        assert a["boxes"] == b["boxes"]
+        assert a["fire_score"] == b["fire_score"] and a["smoke_score"] == b["smoke_score"]
+
+
+def test_roi_and_person_suppression():
+    # 빨간 영역이 사람 박스와 거의 겹치지만 불색 비율이 낮은 경우(빨강은 일부) → 억제
+    frame = frame_with(((200, 100, 300, 300), PERSON_BGR), ((200, 100, 300, 300), PERSON_BGR))
+    frame[100:110, 200:300] = FIRE_BGR  # 얇은 빨간 띠
+    backend = ColorBlobBackend()
+
+    class WideFire(ColorBlobBackend):
+        def predict(self, batch, conf, iou, max_det):
+            out = backend.predict(batch, conf, iou, max_det)
+            for d in out:
+                d[d[:, 5] == 0, :4] = d[d[:, 5] == 2, :4]  # fire 박스를 사람 박스와 같게
+            return out
+
+    on = make_detector(WideFire(), person_suppression={"enabled": True, "iou_threshold": 0.5,
+                                                       "fire_ratio_threshold": 0.2})
+    off = make_detector(WideFire())
+    assert len(off.infer(frame)["fire_boxes"]) == 1
+    res = on.infer(frame)
+    assert res["fire_boxes"] == [] and res["fire_score"] == 0.0
+    assert len(res["person_boxes"]) == 1
+    assert any(d[0] == 0 for d in res["dets"])  # 원시 박스는 필터와 무관하게 유지
+    assert not res["kept"][res["dets"][:, 0] == 0].any()  # 억제된 fire / person 박스는 점수에 안 쓰임 (감지 로그 제외)
+    assert not res["kept"][res["dets"][:, 0] == 2].any()
+
+    roi = make_detector(roi={"enabled": True, "coordinates": [0.5, 0.0, 1.0, 1.0]})
+    frame = frame_with(((50, 50, 150, 150), FIRE_BGR), ((450, 300, 550, 400), SMOKE_BGR))
+    res = roi.infer(frame)
+    assert res["fire_boxes"] == [] and len(res["smoke_boxes"]) == 1
+    assert res["dets"][res["kept"]][:, 0].tolist() == [1]  # ROI 밖 fire 는 제외, smoke 만
+
+
+def test_hsv_filter_drops_non_fire_colors():
+    class GrayAsFire(ColorBlobBackend):
+        def predict(self, batch, conf, iou, max_det):
+            out = super().predict(batch, conf, iou, max_det)
+            for d in out:
+                d[d[:, 5] == 1, 5] = 0  # 회색 영역을 fire 로 오감지
+            return out
+
+    frame = frame_with(((50, 50, 150, 150), FIRE_BGR), ((300, 200, 400, 300), SMOKE_BGR))
+    det = make_detector(GrayAsFire(), hsv_filter={"enabled": True})
+    res = det.infer(frame)
+    assert len(res["fire_boxes"]) == 1 and res["fire_boxes"][0]["x1"] < 200
+
+
+def test_process_video_streams_in_order():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "clip.avi"
+        write_video(path, 50)
+        det = make_detector()
+
+        async def run():
+            return [r async for r in det.process_video(path, fps_target=5, batch_size=4)]
+
+        results = asyncio.run(run())
+        assert [r["frame_number"] for r in results] == list(range(0, 50, 5))
+        assert all(r["scores"]["fire"] > 0.8 for r in results)
+        assert abs(results[1]["t"] - 0.2) < 1e-6
+        # 기존 process_video 계약: boxes 는 클래스별, 박스는 confidence 키도 가짐 (quick_test.py)
+        box = results[0]["boxes"]["fire"][0]
+        assert results[0]["boxes"]["smoke"] == results[0]["smoke_boxes"]
+        assert box["confidence"] == box["conf"] and box["class_name"] == "fire"
+
+
+def test_process_video_backpressure_and_early_close():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "clip.avi"
+        write_video(path, 300)
+        det = make_detector()
+        before = threading.active_count()
+
+        async def run():
+            gen = det.process_video(path, fps_target=None, batch_size=2, max_pending=4)
+            got = []
+            async for r in gen:
+                got.append(r["frame_number"])
+                await asyncio.sleep(0.02)  # 느린 소비자
+                if len(got) == 5:
+                    break
+            await gen.aclose()
+            return got
+
+        got = asyncio.run(run())
+        assert got == [0, 1, 2, 3, 4]
+        time.sleep(0.2)
+        assert threading.active_count() <= before  # 디코더 스레드 종료
+
+
+def test_process_video_reuses_frame_buffers():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "clip.avi"
+        write_video(path, 60)
+        det = make_detector()
+        seen = set()
+        infer_many = det.infer_many
+
+        def recording(frames):
+            seen.update(f.__array_interface__["data"][0] for f in frames)
+            return infer_many(frames)
+
+        det.infer_many = recording
+
+        async def run():
+            return [r async for r in det.process_video(path, fps_target=None, batch_size=2, max_pending=3)]
+
+        results = asyncio.run(run())
+        assert len(results) == 60 and all(r["scores"]["fire"] > 0.8 for r in results)
+        assert len(seen) <= 3 + 2 + 1  # 버퍼 풀 크기 이상으로 새로 할당하지 않음
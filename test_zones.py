@@ -0,0 +1,109 @@
+"""
+감지 구역 테스트 (backend/zones.py)
+- 격자 마스크로 나눈 박스 소속 = 다각형 점 포함 판정 (오목 다각형/겹치는 구역)
+- 프레임당 추론 1회로 구역별 임계치/상태, 박스에 구역 이름, 가장 높은 상태
+- 체크포인트에 구역 상태 저장/복원, 잘못된 구역 정의 거절
+"""
+
+import cv2
+import numpy as np
+
+from scoring import CheckpointIndex, HazardScorer
+from testutil import FIRE_BGR, RULES, SMOKE_BGR, ColorBlobBackend, frame_with, make_detector
+from zones import GRID, ZoneError, ZoneSet
+
+W, H = 640, 480
+L_SHAPE = [[0.1, 0.1], [0.6, 0.1], [0.6, 0.4], [0.3, 0.4], [0.3, 0.9], [0.1, 0.9]]  # 오목 다각형
+
+
+def box_at(cx, cy, label="fire", conf=0.8, half=5):
+    return {"x1": cx - half, "y1": cy - half, "x2": cx + half, "y2": cy + half, "conf": conf, "label": label}
+
+
+def test_assign_matches_point_in_polygon():
+    zones = ZoneSet([
+        {"name": "L", "polygon": L_SHAPE},
+        {"name": "right", "polygon": [[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]},
+    ], RULES)
+    rng = np.random.default_rng(0)
+    centres = rng.uniform([0, 0], [W, H], size=(2000, 2))
+    boxes = [box_at(x, y) for x, y in centres]
+    hit = zones.assign(boxes, W, H)
+    assert hit.shape == (2, 2000)
+
+    for z, zone in enumerate(zones.defs):
+        poly = (np.asarray(zone["polygon"]) * [W, H]).astype(np.float32)
+        dist = np.array([cv2.pointPolygonTest(poly, (float(x), float(y)), True) for x, y in centres])
+        far = np.abs(dist) > max(W, H) / GRID * 1.5  # 경계 근처(격자 1~2칸)는 어느 쪽이든 허용
+        assert np.array_equal(hit[z][far], (dist > 0)[far]), zone["name"]
+    # 겹치는 구역: 한 박스가 두 구역에 동시에 속함
+    assert (hit[0] & hit[1]).any()
+
+
+def test_zone_states_from_single_inference():
+    backend = ColorBlobBackend()
+    det = make_detector(backend)
+    right = [[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]]
+    zones = ZoneSet([
+        {"name": "range", "polygon": [[0.0, 0.0], [0.5, 0.0], [0.5, 1.0], [0.0, 1.0]]},
+        # 같은 선반을 보는 두 구역: 임계치만 다름
+        {"name": "rack", "polygon": right,
+         "thresholds": {"call_119": {"hazard": 0.9}, "fire_growing": {"hazard": 0.9}}},
+        {"name": "rack_strict", "polygon": right, "ema_alpha": 0.8},
+        {"name": "door", "polygon": [[0.0, 0.9], [1.0, 0.9], [1.0, 1.0], [0.0, 1.0]]},
+    ], RULES)
+    scorer = HazardScorer(RULES)
+    frame = frame_with(((60, 100, 200, 250), FIRE_BGR), ((400, 120, 560, 300), SMOKE_BGR))
+
+    for _ in range(10):
+        res = det.infer(frame)
+        state = scorer.update(res["fire_score"], res["smoke_score"])
+        out = zones.update(res["boxes"], res["img_w"], res["img_h"])
+
+    assert len(backend.calls) == 10  # 구역 수와 무관하게 프레임당 1회
+    assert out["range"]["state"] == "CALL_119" and out["range"]["raw_scores"] == {"fire": 0.9, "smoke": 0.0}
+    assert out["rack"]["state"] == "SMOKE_DETECTED" and out["rack"]["raw_scores"] == {"fire": 0.0, "smoke": 0.8}
+    assert out["rack_strict"]["state"] == "CALL_119" and out["rack"]["n_boxes"] == 1
+    assert out["door"]["state"] == "NORMAL" and out["door"]["scores"]["hazard"] == 0.0
+    assert {b["label"]: b["zones"] for b in res["boxes"]} == {"fire": ["range"], "smoke": ["rack", "rack_strict"]}
+    assert zones.worst("NORMAL", 0.0)[0] == "CALL_119" and state == "CALL_119"
+
+    # 박스가 없는 tick
+    out = zones.update([], W, H)
+    assert out["door"]["n_boxes"] == 0 and out["range"]["raw_scores"]["fire"] == 0.0
+
+
+def test_checkpoint_restore_and_validation():
+    defs = [{"name": "a", "polygon": L_SHAPE}, {"name": "b", "polygon": [[0.5, 0.5], [1, 0.5], [1, 1]]}]
+    zones, scorer = ZoneSet(defs, RULES), HazardScorer(RULES)
+    index = CheckpointIndex(interval=2.0)
+    for i in range(20):
+        scorer.update(0.5, 0.2)
+        zones.update([box_at(100, 100, conf=0.7)], W, H)
+        index.maybe_add(i / 5.0, i, scorer, zones)
+    cp = index.nearest_before(3.0)
+    assert cp["zones"]["a"]["F_ema"] > 0.5 and cp["zones"]["b"]["F_ema"] == 0.0
+
+    # 구역을 바꾼 뒤 복원: 이름이 같은 구역만 복원, 새 구역은 초기 상태
+    changed = ZoneSet([defs[0], {"name": "c", "polygon": L_SHAPE}], RULES)
+    changed.scorers[1].update(0.9, 0.9)
+    changed.restore(cp["zones"])
+    assert changed.scorers[0].F_ema == cp["zones"]["a"]["F_ema"] and changed.scorers[1].F_ema == 0.0
+    assert index.nearest_before(0.0)["zones"] is not None
+    index.maybe_add(100.0, 500, scorer)
+    assert index.nearest_before(100.0)["zones"] is None
+
+    for bad in (
+        [{"name": "x", "polygon": [[0, 0], [1, 1]]}],
+        [{"name": "x", "polygon": [[0, 0], [1, 0], [1, 2]]}],
+        [{"name": "x", "polygon": L_SHAPE}, {"name": "x", "polygon": L_SHAPE}],
+        [{"name": "x", "polygon": L_SHAPE, "thresholds": {"call_911": {"hazard": 0.5}}}],
+        [{"name": "x", "polygon": L_SHAPE, "thresholds": {"call_119": {"smoke": 0.5}}}],
+        [{"polygon": L_SHAPE}],
+    ):
+        try:
+            ZoneSet(bad, RULES)
+            raise AssertionError(f"expected ZoneError: {bad}")
+        except ZoneError:
+            pass
+    assert len(ZoneSet([], RULES)) == 0
@@ -0,0 +1,79 @@
+"""
+테스트 공통 도우미 (여러 테스트/벤치마크에서 import)
+- RULES: main.py 기본값과 같은 점수 규칙
+- ColorBlobBackend: YOLO 대신 색 영역을 찾는 합성 모델 → make_detector 로 FireDetector 에 연결
+- frame_with / write_video: 색 사각형을 그린 합성 프레임 / 영상
+"""
+import time
+
+import cv2
+import numpy as np
+
+from detectors.vision import FireDetector
+
+RULES = {
+    "fps_target": 5,
+    "ema_alpha": 0.4,
+    "weights": {"s_smoke": 0.6, "s_fire": 0.8, "growth": 0.4},
+    "thresholds": {
+        "pre_fire": {"smoke": 0.10, "fire": 0.08},
+        "smoke_detected": {"smoke": 0.25},
+        "fire_growing": {"fire": 0.30, "hazard": 0.35},
+        "call_119": {"hazard": 0.45},
+    },
+}
+FIRE_BGR = (0, 0, 255)        # 빨강 → fire
+SMOKE_BGR = (200, 200, 200)   # 밝은 회색 → smoke
+PERSON_BGR = (255, 0, 0)      # 파랑 → person
+
+
+class ColorBlobBackend:
+    """배치(B, 3, S, S, RGB 0~1)에서 색 영역의 bbox 를 감지 결과로 반환"""
+
+    names = {0: "fire", 1: "smoke", 2: "person"}
+    max_batch = None
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, batch, conf, iou, max_det):
+        self.calls.append(len(batch))
+        if self.delay:
+            time.sleep(self.delay)
+        out = []
+        for img in batch:
+            r, g, b = img
+            dets = []
+            masks = {
+                0: (r > 0.9) & (g < 0.1) & (b < 0.1),
+                1: (np.abs(r - 0.784) < 0.02) & (np.abs(g - 0.784) < 0.02) & (np.abs(b - 0.784) < 0.02),
+                2: (b > 0.9) & (r < 0.1) & (g < 0.1),
+            }
+            for cls, mask in masks.items():
+                ys, xs = np.nonzero(mask)
+                if len(xs) > 20:
+                    dets.append([xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9 - 0.1 * cls, cls])
+            out.append(np.array(dets, dtype=np.float32).reshape(-1, 6))
+        return out
+
+
+def make_detector(backend=None, **config):
+    cfg = {"model": {"imgsz": 320, "max_batch": 4}}
+    cfg.update(config)
+    return FireDetector(config=cfg, config_path=None, backend=backend or ColorBlobBackend())
+
+
+def frame_with(*rects, size=(480, 640)):
+    img = np.full((*size, 3), 40, dtype=np.uint8)
+    for (x1, y1, x2, y2), color in rects:
+        cv2.rectangle(img, (x1, y1), (x2 - 1, y2 - 1), color, -1)
+    return img
+
+
+def write_video(path, n_frames, fps=25.0, size=(320, 240)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for i in range(n_frames):
+        x = 10 + (i * 3) % 200
+        writer.write(frame_with(((x, 60, x + 60, 140), FIRE_BGR), size=(size[1], size[0])))
+    writer.release()